@@ -0,0 +1,60 @@
+"""Add account_daily_balance rollup and backfill it from journal_lines.
+
+Revision ID: 20261018_account_daily_balance
+Revises: 20260713_backfill_product_consignment_schema
+Create Date: 2026-10-18 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_account_daily_balance"
+down_revision = "20260713_backfill_product_consignment_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if not inspector.has_table("account_daily_balance"):
+        op.create_table(
+            "account_daily_balance",
+            sa.Column("account_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column("debit_total", sa.Numeric(18, 2), nullable=False, server_default=sa.text("0")),
+            sa.Column("credit_total", sa.Numeric(18, 2), nullable=False, server_default=sa.text("0")),
+            sa.Column("line_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.ForeignKeyConstraint(["account_id"], ["accounts.id"]),
+            sa.PrimaryKeyConstraint("account_id", "date"),
+        )
+        op.create_index("ix_account_daily_balance_date", "account_daily_balance", ["date"], unique=False)
+
+    op.execute(sa.text("DELETE FROM account_daily_balance"))
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO account_daily_balance (account_id, date, debit_total, credit_total, line_count)
+            SELECT jl.account_id, je.date, SUM(jl.debit), SUM(jl.credit), COUNT(*)
+            FROM journal_lines jl
+            JOIN journal_entries je ON je.id = jl.entry_id
+            GROUP BY jl.account_id, je.date
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if inspector.has_table("account_daily_balance"):
+        op.drop_index("ix_account_daily_balance_date", table_name="account_daily_balance")
+        op.drop_table("account_daily_balance")
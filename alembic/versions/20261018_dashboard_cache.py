@@ -0,0 +1,43 @@
+"""Add dashboard_cache table for the shared dashboard aggregates.
+
+Revision ID: 20261018_dashboard_cache
+Revises: 20261018_workorder_summary
+Create Date: 2026-10-18 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_dashboard_cache"
+down_revision = "20261018_workorder_summary"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    # Entries are computed on the first dashboard request, no backfill needed.
+    if not inspector.has_table("dashboard_cache"):
+        op.create_table(
+            "dashboard_cache",
+            sa.Column("cache_key", sa.String(length=64), nullable=False),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("computed_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("cache_key"),
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if inspector.has_table("dashboard_cache"):
+        op.drop_table("dashboard_cache")
@@ -0,0 +1,44 @@
+"""Add document_sequence counter table for document numbers.
+
+Revision ID: 20261018_document_sequence
+Revises: 20261018_account_daily_balance
+Create Date: 2026-10-18 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_document_sequence"
+down_revision = "20261018_account_daily_balance"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    # Counters are seeded lazily from existing numbers the first time a
+    # (prefix, period) is allocated, so no backfill is needed here.
+    if not inspector.has_table("document_sequence"):
+        op.create_table(
+            "document_sequence",
+            sa.Column("prefix", sa.String(length=32), nullable=False),
+            sa.Column("period", sa.String(length=16), nullable=False),
+            sa.Column("last_value", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+            sa.PrimaryKeyConstraint("prefix", "period"),
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if inspector.has_table("document_sequence"):
+        op.drop_table("document_sequence")
@@ -0,0 +1,103 @@
+"""Add monthly_business_summary rollup and backfill it.
+
+Revision ID: 20261018_monthly_business_summary
+Revises: 20261018_dashboard_cache
+Create Date: 2026-10-18 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_monthly_business_summary"
+down_revision = "20261018_dashboard_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if inspector.has_table("monthly_business_summary"):
+        return
+
+    op.create_table(
+        "monthly_business_summary",
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("sales_total", sa.Numeric(18, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("purchase_total", sa.Numeric(18, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("expense_total", sa.Numeric(18, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("purchase_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("expense_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("workorder_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("workorder_completed_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("workorder_status_counts", sa.JSON(), nullable=False, server_default=sa.text("'{}'")),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("month"),
+    )
+
+    # Same rules as services_business_summary: sales are completed workorders,
+    # purchases are dijalankan/diterima/dibayarkan POs.
+    op.execute(
+        """
+        WITH wo AS (
+            SELECT date_trunc('month', tanggal_masuk)::date AS month, lower(status) AS status,
+                   count(*) AS row_count, coalesce(sum(total_biaya), 0) AS total
+            FROM workorder
+            GROUP BY 1, 2
+        ), wo_month AS (
+            SELECT month,
+                   sum(row_count) AS workorder_count,
+                   sum(row_count) FILTER (
+                       WHERE status IN ('selesai', 'finished', 'done', 'complete', 'completed')
+                   ) AS workorder_completed_count,
+                   sum(total) FILTER (
+                       WHERE status IN ('selesai', 'finished', 'done', 'complete', 'completed')
+                   ) AS sales_total,
+                   json_object_agg(coalesce(status, ''), row_count) AS workorder_status_counts
+            FROM wo
+            GROUP BY month
+        ), po AS (
+            SELECT date_trunc('month', date)::date AS month, count(*) AS purchase_count,
+                   coalesce(sum(total), 0) AS purchase_total
+            FROM purchase_order
+            WHERE status::text IN ('dijalankan', 'diterima', 'dibayarkan')
+            GROUP BY 1
+        ), ex AS (
+            SELECT date_trunc('month', date)::date AS month, count(*) AS expense_count,
+                   coalesce(sum(amount), 0) AS expense_total
+            FROM expenses
+            GROUP BY 1
+        ), months AS (
+            SELECT month FROM wo_month UNION SELECT month FROM po UNION SELECT month FROM ex
+        )
+        INSERT INTO monthly_business_summary (
+            month, sales_total, purchase_total, expense_total, purchase_count, expense_count,
+            workorder_count, workorder_completed_count, workorder_status_counts, refreshed_at
+        )
+        SELECT
+            m.month,
+            coalesce(wo_month.sales_total, 0), coalesce(po.purchase_total, 0), coalesce(ex.expense_total, 0),
+            coalesce(po.purchase_count, 0), coalesce(ex.expense_count, 0),
+            coalesce(wo_month.workorder_count, 0), coalesce(wo_month.workorder_completed_count, 0),
+            coalesce(wo_month.workorder_status_counts, '{}'::json), now()
+        FROM months m
+        LEFT JOIN wo_month ON wo_month.month = m.month
+        LEFT JOIN po ON po.month = m.month
+        LEFT JOIN ex ON ex.month = m.month
+        WHERE m.month IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if inspector.has_table("monthly_business_summary"):
+        op.drop_table("monthly_business_summary")
@@ -0,0 +1,66 @@
+"""Point purchase order receipts at their PO line.
+
+Revision ID: 20261018_po_receipt_line_ref
+Revises: 20261018_sales_line_fact
+Create Date: 2026-10-18 00:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_po_receipt_line_ref"
+down_revision = "20261018_sales_line_fact"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Legacy receipts carry the PO id as reference_id. Pair each with the PO
+    # line of the same product, quantity and price (the n-th receipt with the
+    # n-th such line), so an edited line can find its own receipt.
+    op.execute(
+        """
+        WITH receipts AS (
+            SELECT id, purchase_order_id, product_id, quantity, purchase_price,
+                   row_number() OVER (
+                       PARTITION BY purchase_order_id, product_id, quantity, purchase_price
+                       ORDER BY timestamp, id
+                   ) AS n
+            FROM product_moved_history
+            WHERE reference_type = 'purchase_order' AND type = 'income'
+              AND reference_id = purchase_order_id
+        ),
+        lines AS (
+            SELECT id, purchase_order_id, product_id, quantity, price,
+                   row_number() OVER (
+                       PARTITION BY purchase_order_id, product_id, quantity, price
+                       ORDER BY id
+                   ) AS n
+            FROM purchase_order_line
+        )
+        UPDATE product_moved_history AS pmh
+        SET reference_id = l.id
+        FROM receipts AS r
+        JOIN lines AS l
+          ON l.purchase_order_id = r.purchase_order_id
+         AND l.product_id = r.product_id
+         AND l.quantity = r.quantity
+         AND l.price = r.purchase_price
+         AND l.n = r.n
+        WHERE pmh.id = r.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        UPDATE product_moved_history
+        SET reference_id = purchase_order_id
+        WHERE reference_type = 'purchase_order' AND type = 'income'
+          AND purchase_order_id IS NOT NULL
+        """
+    )
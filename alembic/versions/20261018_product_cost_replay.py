@@ -0,0 +1,54 @@
+"""Add product_cost_replay queue for backdated cost corrections.
+
+Revision ID: 20261018_product_cost_replay
+Revises: 20261018_document_sequence
+Create Date: 2026-10-18 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_product_cost_replay"
+down_revision = "20261018_document_sequence"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if not inspector.has_table("product_cost_replay"):
+        op.create_table(
+            "product_cost_replay",
+            sa.Column("product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("product.id"), nullable=False),
+            sa.Column("replay_from", sa.DateTime(), nullable=False),
+            sa.Column("requested_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+            sa.PrimaryKeyConstraint("product_id"),
+        )
+
+    # The replay streams movements per product in timestamp order
+    existing = {index["name"] for index in inspector.get_indexes("product_moved_history")}
+    if "ix_product_moved_history_product_timestamp" not in existing:
+        op.create_index(
+            "ix_product_moved_history_product_timestamp",
+            "product_moved_history",
+            ["product_id", "timestamp", "id"],
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    existing = {index["name"] for index in inspector.get_indexes("product_moved_history")}
+    if "ix_product_moved_history_product_timestamp" in existing:
+        op.drop_index("ix_product_moved_history_product_timestamp", table_name="product_moved_history")
+    if inspector.has_table("product_cost_replay"):
+        op.drop_table("product_cost_replay")
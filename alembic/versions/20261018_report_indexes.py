@@ -0,0 +1,62 @@
+"""Add indexes matching the report and dashboard predicates.
+
+Revision ID: 20261018_report_indexes
+Revises: 20261018_monthly_business_summary
+Create Date: 2026-10-18 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_report_indexes"
+down_revision = "20261018_monthly_business_summary"
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns); columns may be SQL expressions
+INDEXES = [
+    # Workorder date ranges (sales, work order summary and mechanic reports, rollup refresh)
+    ("ix_workorder_tanggal_masuk", "workorder", ["tanggal_masuk", "id"]),
+    ("ix_workorder_karyawan_tanggal_masuk", "workorder", ["karyawan_id", "tanggal_masuk"]),
+    # Workorder -> lines joins; Postgres does not index foreign keys by itself
+    ("ix_product_ordered_workorder", "product_ordered", ["workorder_id"]),
+    ("ix_service_ordered_workorder", "service_ordered", ["workorder_id"]),
+    # Ledger, cash book and daily report: lines of an account joined to the entry date
+    ("ix_journal_lines_account_entry", "journal_lines", ["account_id", "entry_id"]),
+    ("ix_journal_lines_entry", "journal_lines", ["entry_id"]),
+    # Movement history ranges and the adjustment/loss listings
+    ("ix_product_moved_history_timestamp", "product_moved_history", ["timestamp", "id"]),
+    ("ix_product_moved_history_type_timestamp", "product_moved_history", ["type", "timestamp"]),
+    # Purchase order report and the monthly rollup refresh
+    ("ix_purchase_order_date", "purchase_order", ["date"]),
+    ("ix_purchase_order_line_purchase_order", "purchase_order_line", ["purchase_order_id"]),
+    ("ix_expenses_date", "expenses", ["date"]),
+    # Dashboard "present today" card: date = ? AND lower(status) = 'present'
+    ("ix_attendance_date_lower_status", "attendance", ["date", sa.text("lower(status)")]),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    for name, table, columns in INDEXES:
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    for name, table, _ in reversed(INDEXES):
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        if name in existing:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,123 @@
+"""Add sales_line_fact and backfill it from workorders with a sale journal entry.
+
+Revision ID: 20261018_sales_line_fact
+Revises: 20261018_workorder_stock_moved_ref
+Create Date: 2026-10-18 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_sales_line_fact"
+down_revision = "20261018_workorder_stock_moved_ref"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    existing = {index["name"] for index in inspector.get_indexes("journal_entries")}
+    if "ix_journal_entries_workorder_type" not in existing:
+        op.create_index("ix_journal_entries_workorder_type", "journal_entries", ["workorder_id", "journal_type"])
+
+    if inspector.has_table("sales_line_fact"):
+        return
+
+    op.create_table(
+        "sales_line_fact",
+        sa.Column("line_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("line_type", sa.String(16), nullable=False),
+        sa.Column("sale_date", sa.Date(), nullable=False),
+        sa.Column("workorder_id", postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("workorder.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("no_wo", sa.String(), nullable=False),
+        sa.Column("tanggal_masuk", sa.DateTime(), nullable=False),
+        sa.Column("customer_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("customer_name", sa.String(), nullable=True),
+        sa.Column("vehicle_no_pol", sa.String(), nullable=True),
+        sa.Column("karyawan_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("karyawan_name", sa.String(), nullable=True),
+        sa.Column("item_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("item_name", sa.String(), nullable=True),
+        sa.Column("quantity", sa.Numeric(10, 2), nullable=False),
+        sa.Column("price", sa.Numeric(10, 2), nullable=False),
+        sa.Column("discount", sa.Numeric(10, 2), nullable=True),
+        sa.Column("subtotal", sa.Numeric(10, 2), nullable=False),
+        sa.Column("hpp", sa.Numeric(10, 2), nullable=True),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("line_id"),
+    )
+    op.create_index("ix_sales_line_fact_workorder", "sales_line_fact", ["workorder_id"])
+    op.create_index("ix_sales_line_fact_tanggal_masuk", "sales_line_fact", ["tanggal_masuk"])
+    op.create_index("ix_sales_line_fact_karyawan", "sales_line_fact", ["karyawan_id", "tanggal_masuk"])
+    op.create_index("ix_sales_line_fact_item", "sales_line_fact", ["item_id", "tanggal_masuk"])
+    op.create_index("ix_sales_line_fact_customer", "sales_line_fact", ["customer_id", "tanggal_masuk"])
+
+    # Product HPP comes from the workorder's stock deduction snapshot where
+    # one exists (the cost when the stock left), else the current cost.
+    op.execute(
+        """
+        WITH sales AS (
+            SELECT workorder_id, MIN(date) AS sale_date
+            FROM journal_entries
+            WHERE journal_type = 'sale' AND workorder_id IS NOT NULL
+            GROUP BY workorder_id
+        ),
+        deducted AS (
+            SELECT DISTINCT ON (workorder_id, product_id) workorder_id, product_id, hpp_snapshot
+            FROM product_moved_history
+            WHERE reference_type = 'workorder' AND hpp_snapshot IS NOT NULL
+            ORDER BY workorder_id, product_id, timestamp DESC
+        )
+        INSERT INTO sales_line_fact (
+            line_id, line_type, sale_date,
+            workorder_id, no_wo, tanggal_masuk, customer_id, customer_name, vehicle_no_pol,
+            karyawan_id, karyawan_name,
+            item_id, item_name, quantity, price, discount, subtotal, hpp, refreshed_at
+        )
+        SELECT po.id, 'product', s.sale_date,
+               w.id, w.no_wo, w.tanggal_masuk, w.customer_id, c.nama, v.no_pol,
+               w.karyawan_id, k.nama,
+               pr.id, pr.name, po.quantity, po.price, po.discount, po.subtotal,
+               COALESCE(d.hpp_snapshot, pr.cost), now()
+        FROM product_ordered po
+        JOIN workorder w ON w.id = po.workorder_id
+        JOIN sales s ON s.workorder_id = w.id
+        JOIN product pr ON pr.id = po.product_id
+        LEFT JOIN deducted d ON d.workorder_id = w.id AND d.product_id = pr.id
+        LEFT JOIN customer c ON c.id = w.customer_id
+        LEFT JOIN vehicle v ON v.id = w.vehicle_id
+        LEFT JOIN karyawan k ON k.id = w.karyawan_id
+        UNION ALL
+        SELECT so.id, 'service', s.sale_date,
+               w.id, w.no_wo, w.tanggal_masuk, w.customer_id, c.nama, v.no_pol,
+               w.karyawan_id, k.nama,
+               sv.id, sv.name, so.quantity, so.price, so.discount, so.subtotal, sv.cost, now()
+        FROM service_ordered so
+        JOIN workorder w ON w.id = so.workorder_id
+        JOIN sales s ON s.workorder_id = w.id
+        JOIN service sv ON sv.id = so.service_id
+        LEFT JOIN customer c ON c.id = w.customer_id
+        LEFT JOIN vehicle v ON v.id = w.vehicle_id
+        LEFT JOIN karyawan k ON k.id = w.karyawan_id
+        """
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if inspector.has_table("sales_line_fact"):
+        op.drop_table("sales_line_fact")
+    existing = {index["name"] for index in inspector.get_indexes("journal_entries")}
+    if "ix_journal_entries_workorder_type" in existing:
+        op.drop_index("ix_journal_entries_workorder_type", table_name="journal_entries")
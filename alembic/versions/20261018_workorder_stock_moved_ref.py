@@ -0,0 +1,59 @@
+"""Index workorder stock deductions and backfill their workorder_id.
+
+Revision ID: 20261018_workorder_stock_moved_ref
+Revises: 20261018_report_indexes
+Create Date: 2026-10-18 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_workorder_stock_moved_ref"
+down_revision = "20261018_report_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    # Legacy completion deductions only carry the workorder in notes
+    # ('WO:<uuid> (<no_wo>) complete → ...'); fill the structured columns
+    # the completion check now reads.
+    op.execute(
+        """
+        UPDATE product_moved_history AS pmh
+        SET workorder_id = w.id,
+            reference_type = coalesce(pmh.reference_type, 'workorder'),
+            reference_id = coalesce(pmh.reference_id, w.id)
+        FROM workorder AS w
+        WHERE pmh.notes LIKE 'WO:%'
+          AND (pmh.workorder_id IS NULL OR pmh.reference_type IS NULL)
+          AND w.id::text = lower(substring(pmh.notes FROM '^WO:([0-9A-Fa-f-]{36})'))
+        """
+    )
+
+    existing = {index["name"] for index in inspector.get_indexes("product_moved_history")}
+    if "ix_product_moved_history_workorder_ref" not in existing:
+        op.create_index(
+            "ix_product_moved_history_workorder_ref",
+            "product_moved_history",
+            ["workorder_id"],
+            postgresql_where=sa.text("reference_type = 'workorder'"),
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    # The backfilled columns are left in place; they are correct either way.
+    existing = {index["name"] for index in inspector.get_indexes("product_moved_history")}
+    if "ix_product_moved_history_workorder_ref" in existing:
+        op.drop_index("ix_product_moved_history_workorder_ref", table_name="product_moved_history")
@@ -0,0 +1,111 @@
+"""Add workorder_summary read model and backfill it.
+
+Revision ID: 20261018_workorder_summary
+Revises: 20261018_product_cost_replay
+Create Date: 2026-10-18 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_workorder_summary"
+down_revision = "20261018_product_cost_replay"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if inspector.has_table("workorder_summary"):
+        return
+
+    op.create_table(
+        "workorder_summary",
+        sa.Column("workorder_id", postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("workorder.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("no_wo", sa.String(), nullable=False),
+        sa.Column("tanggal_masuk", sa.DateTime(), nullable=False),
+        sa.Column("tanggal_keluar", sa.DateTime(), nullable=True),
+        sa.Column("keluhan", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("status_pembayaran", sa.String(), nullable=True),
+        sa.Column("customer_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("customer_name", sa.String(), nullable=True),
+        sa.Column("customer_hp", sa.String(), nullable=True),
+        sa.Column("vehicle_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("vehicle_no_pol", sa.String(), nullable=True),
+        sa.Column("vehicle_model", sa.String(), nullable=True),
+        sa.Column("vehicle_brand", sa.String(), nullable=True),
+        sa.Column("vehicle_color", sa.String(), nullable=True),
+        sa.Column("karyawan_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("karyawan_name", sa.String(), nullable=True),
+        sa.Column("product_line_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("service_line_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("product_total", sa.Numeric(14, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("service_total", sa.Numeric(14, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("hpp_total", sa.Numeric(14, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("total_discount", sa.Numeric(10, 2), nullable=True),
+        sa.Column("pajak", sa.Numeric(10, 2), nullable=True),
+        sa.Column("dp", sa.Numeric(10, 2), nullable=True),
+        sa.Column("total_biaya", sa.Numeric(10, 2), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("workorder_id"),
+    )
+    op.create_index("ix_workorder_summary_tanggal_masuk", "workorder_summary", ["tanggal_masuk", "workorder_id"])
+    op.create_index("ix_workorder_summary_status", "workorder_summary", ["status", "tanggal_masuk"])
+    op.create_index("ix_workorder_summary_customer", "workorder_summary", ["customer_id", "tanggal_masuk"])
+    op.create_index("ix_workorder_summary_karyawan", "workorder_summary", ["karyawan_id", "tanggal_masuk"])
+
+    op.execute(
+        """
+        INSERT INTO workorder_summary (
+            workorder_id, no_wo, tanggal_masuk, tanggal_keluar, keluhan, status, status_pembayaran,
+            customer_id, customer_name, customer_hp,
+            vehicle_id, vehicle_no_pol, vehicle_model, vehicle_brand, vehicle_color,
+            karyawan_id, karyawan_name,
+            product_line_count, service_line_count, product_total, service_total, hpp_total,
+            total_discount, pajak, dp, total_biaya, refreshed_at
+        )
+        SELECT
+            w.id, w.no_wo, w.tanggal_masuk, w.tanggal_keluar, w.keluhan, w.status, w.status_pembayaran,
+            w.customer_id, c.nama, c.hp,
+            w.vehicle_id, v.no_pol, v.model, b.name, v.warna,
+            w.karyawan_id, k.nama,
+            COALESCE(p.line_count, 0), COALESCE(s.line_count, 0),
+            COALESCE(p.total, 0), COALESCE(s.total, 0), COALESCE(p.hpp, 0) + COALESCE(s.hpp, 0),
+            w.total_discount, w.pajak, w.dp, w.total_biaya, now()
+        FROM workorder w
+        LEFT JOIN customer c ON c.id = w.customer_id
+        LEFT JOIN vehicle v ON v.id = w.vehicle_id
+        LEFT JOIN brand b ON b.id = v.brand_id
+        LEFT JOIN karyawan k ON k.id = w.karyawan_id
+        LEFT JOIN (
+            SELECT po.workorder_id, COUNT(po.id) AS line_count, SUM(po.subtotal) AS total,
+                   SUM(po.quantity * COALESCE(pr.cost, 0)) AS hpp
+            FROM product_ordered po LEFT JOIN product pr ON pr.id = po.product_id
+            GROUP BY po.workorder_id
+        ) p ON p.workorder_id = w.id
+        LEFT JOIN (
+            SELECT so.workorder_id, COUNT(so.id) AS line_count, SUM(so.subtotal) AS total,
+                   SUM(so.quantity * COALESCE(sv.cost, 0)) AS hpp
+            FROM service_ordered so LEFT JOIN service sv ON sv.id = so.service_id
+            GROUP BY so.workorder_id
+        ) s ON s.workorder_id = w.id
+        """
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    if inspector.has_table("workorder_summary"):
+        op.drop_table("workorder_summary")
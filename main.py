@@ -23,6 +23,10 @@ async def lifespan(app: FastAPI):
     # Uncomment untuk auto-start scheduler saat app startup
     # from services.scheduler_maintenance_reminder import start_scheduler
     # start_scheduler(hour=7, minute=0)
+    # from services.scheduler_inventory_reconciliation import start_inventory_reconciliation
+    # start_inventory_reconciliation(hour=2, minute=0)
+    # from services.scheduler_cost_replay import start_cost_replay
+    # start_cost_replay(hour=2, minute=30)
     print("✓ Aplikasi siap digunakan")
     
     yield
@@ -16,3 +16,5 @@ from .user import *
 from .workorder import *
 from .accounting import *
 from .whatsapp_report import *
+from .document_sequence import *
+from .dashboard import *
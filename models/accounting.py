@@ -6,7 +6,7 @@ import datetime
 from decimal import Decimal
 
 from sqlalchemy import (
-    Column, String, Date, DateTime, Boolean, Enum, Numeric,
+    Column, String, Date, DateTime, Boolean, Enum, Numeric, Integer,
     ForeignKey, CheckConstraint, Index
 )
 from sqlalchemy.dialects.postgresql import UUID
@@ -83,6 +83,7 @@ class JournalEntry(Base):
 
     __table_args__ = (
         Index("ix_journal_entries_date_type", "date", "journal_type"),
+        Index("ix_journal_entries_workorder_type", "workorder_id", "journal_type"),
     )
 
 
@@ -101,7 +102,33 @@ class JournalLine(Base):
     account: Mapped["Account"] = relationship("Account")
 
     __table_args__ = (
+        Index("ix_journal_lines_account_entry", "account_id", "entry_id"),
+        Index("ix_journal_lines_entry", "entry_id"),
         CheckConstraint("debit >= 0", name="chk_journal_lines_debit_nonneg"),
         CheckConstraint("credit >= 0", name="chk_journal_lines_credit_nonneg"),
         CheckConstraint("(debit = 0 AND credit > 0) OR (credit = 0 AND debit > 0)", name="chk_one_side_positive"),
     )
+
+
+class AccountDailyBalance(Base):
+    """
+    Rollup of journal_lines per account per day.
+
+    Kept current by the journal posting/deleting services and rebuildable from
+    journal_lines, so opening balances and range totals can be read without
+    scanning the whole ledger history.
+    """
+    __tablename__ = "account_daily_balance"
+
+    account_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("accounts.id"), primary_key=True)
+    date: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+
+    debit_total: Mapped[Decimal] = mapped_column(Numeric(18, 2), default=Decimal("0.00"), nullable=False)
+    credit_total: Mapped[Decimal] = mapped_column(Numeric(18, 2), default=Decimal("0.00"), nullable=False)
+    line_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    account: Mapped["Account"] = relationship("Account")
+
+    __table_args__ = (
+        Index("ix_account_daily_balance_date", "date"),
+    )
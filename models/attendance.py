@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Date, Time, Boolean
+from sqlalchemy import Column, String, ForeignKey, DateTime, Date, Time, Boolean, Index, func
 from sqlalchemy.orm import relationship
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
@@ -19,3 +19,8 @@ class Attendance(Base):
     updated_at = Column(DateTime, nullable=False, server_default=text('now()'))
 
     karyawan = relationship('Karyawan', back_populates='attendances')
+
+    # Matches the dashboard's "present today" card: date = ? AND lower(status) = 'present'
+    __table_args__ = (
+        Index('ix_attendance_date_lower_status', 'date', func.lower(status)),
+    )
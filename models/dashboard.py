@@ -0,0 +1,43 @@
+"""
+Dashboard Models
+- DashboardCache: short-lived snapshot of the dashboard aggregates, shared
+  by every worker process. Rows are recomputed when they expire and deleted
+  whenever workorders, purchase orders, expenses or attendance change.
+- MonthlyBusinessSummary: one row per calendar month with sales, purchase
+  and expense totals and workorder counts by status, refreshed for the
+  touched months on every write and rebuildable from the source tables.
+"""
+
+import datetime
+
+from sqlalchemy import Column, String, DateTime, Date, Integer, Numeric, JSON
+from models.database import Base
+
+class DashboardCache(Base):
+    __tablename__ = 'dashboard_cache'
+
+    cache_key = Column(String(64), primary_key=True)   # e.g., dashboard:2026-10-18
+    payload = Column(JSON, nullable=False)
+    computed_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<DashboardCache {self.cache_key} until {self.expires_at}>"
+
+
+class MonthlyBusinessSummary(Base):
+    __tablename__ = 'monthly_business_summary'
+
+    month = Column(Date, primary_key=True)   # first day of the month
+    sales_total = Column(Numeric(18, 2), nullable=False, default=0)       # completed workorders' total_biaya
+    purchase_total = Column(Numeric(18, 2), nullable=False, default=0)    # dijalankan/diterima/dibayarkan POs
+    expense_total = Column(Numeric(18, 2), nullable=False, default=0)
+    purchase_count = Column(Integer, nullable=False, default=0)
+    expense_count = Column(Integer, nullable=False, default=0)
+    workorder_count = Column(Integer, nullable=False, default=0)
+    workorder_completed_count = Column(Integer, nullable=False, default=0)
+    workorder_status_counts = Column(JSON, nullable=False, default=dict)  # lower(status) -> count
+    refreshed_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MonthlyBusinessSummary {self.month} sales={self.sales_total}>"
@@ -0,0 +1,21 @@
+"""
+Document Sequence Model
+Counter per (prefix, period) for document numbers such as journal entries,
+workorders and consignment receipts
+"""
+
+import datetime
+
+from sqlalchemy import Column, String, BigInteger, DateTime
+from models.database import Base
+
+class DocumentSequence(Base):
+    __tablename__ = 'document_sequence'
+
+    prefix = Column(String(32), primary_key=True)   # e.g., SAL, WO, CR
+    period = Column(String(16), primary_key=True)   # e.g., 20261018, 202610, 2026
+    last_value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DocumentSequence {self.prefix}/{self.period}={self.last_value}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Date, Numeric, Enum
+from sqlalchemy import Column, String, DateTime, Date, Numeric, Enum, Index
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
 from .database import Base
@@ -33,3 +33,7 @@ class Expenses(Base):
     bukti_transfer = Column(String, nullable=True)
     created_at = Column(DateTime, nullable=False, server_default=text('now()'))
     updated_at = Column(DateTime, nullable=False, server_default=text('now()'))
+
+    __table_args__ = (
+        Index('ix_expenses_date', 'date'),
+    )
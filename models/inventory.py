@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime, Date
+from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime, Date, Index, text
 from sqlalchemy.orm import relationship
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
@@ -38,6 +38,16 @@ class ProductMovedHistory(Base):
     selling_price = Column(Numeric(14,2), nullable=True)
     hpp_snapshot = Column(Numeric(14,2), nullable=True)
 
+    __table_args__ = (
+        Index('ix_product_moved_history_product_timestamp', 'product_id', 'timestamp', 'id'),
+        Index('ix_product_moved_history_timestamp', 'timestamp', 'id'),
+        Index('ix_product_moved_history_type_timestamp', 'type', 'timestamp'),
+        # "Has this workorder's stock been deducted already?" on completion
+        Index('ix_product_moved_history_workorder_ref', 'workorder_id',
+              postgresql_where=text("reference_type = 'workorder'"),
+              sqlite_where=text("reference_type = 'workorder'")),
+    )
+
 class ProductCostHistory(Base):
     __tablename__ = 'product_cost_history'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, index=True)
@@ -54,3 +64,10 @@ class ProductCostHistory(Base):
     notes = Column(String, nullable=True)
     created_at = Column(DateTime, nullable=False)
     created_by = Column(String, nullable=False)
+
+class ProductCostReplay(Base):
+    __tablename__ = 'product_cost_replay'
+    # Pending moving-average replays, one row per product; replay_from keeps the earliest backdated change
+    product_id = Column(UUID(as_uuid=True), ForeignKey('product.id'), primary_key=True)
+    replay_from = Column(DateTime, nullable=False)
+    requested_at = Column(DateTime, nullable=False)
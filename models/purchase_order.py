@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime, Date, Enum
+from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime, Date, Enum, Index
 from sqlalchemy.orm import relationship
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
@@ -32,6 +32,10 @@ class PurchaseOrder(Base):
     lines = relationship('PurchaseOrderLine', back_populates='purchase_order')
     journal_entries = relationship('JournalEntry', back_populates='purchase_order')
 
+    __table_args__ = (
+        Index('ix_purchase_order_date', 'date'),
+    )
+
 class PurchaseOrderLine(Base):
     __tablename__ = 'purchase_order_line'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, index=True)
@@ -45,3 +49,7 @@ class PurchaseOrderLine(Base):
     price = Column(Numeric(10,2), nullable=False)
     discount = Column(Numeric(10,2), nullable=True, default=0)
     subtotal = Column(Numeric(10,2), nullable=False)
+
+    __table_args__ = (
+        Index('ix_purchase_order_line_purchase_order', 'purchase_order_id'),
+    )
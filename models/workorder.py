@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime, Date, Boolean
+from sqlalchemy import Column, String, ForeignKey, Numeric, DateTime, Date, Boolean, Integer, Index
 from sqlalchemy.orm import relationship
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
@@ -88,6 +88,10 @@ class ProductOrdered(Base):
     workorder_id = Column(UUID(as_uuid=True), ForeignKey('workorder.id'))
     workorder = relationship('Workorder', back_populates='product_ordered')
 
+    __table_args__ = (
+        Index('ix_product_ordered_workorder', 'workorder_id'),
+    )
+
 class ServiceOrdered(Base):
     __tablename__ = 'service_ordered'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, index=True)
@@ -102,6 +106,10 @@ class ServiceOrdered(Base):
     workorder_id = Column(UUID(as_uuid=True), ForeignKey('workorder.id'))
     workorder = relationship('Workorder', back_populates='service_ordered')
 
+    __table_args__ = (
+        Index('ix_service_ordered_workorder', 'workorder_id'),
+    )
+
 class Workorder(Base):
     __tablename__ = 'workorder'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, index=True)
@@ -135,5 +143,87 @@ class Workorder(Base):
 
     journal_entries = relationship('JournalEntry', back_populates='workorder')
 
+    # Report and rollup predicates are half-open ranges on tanggal_masuk
+    __table_args__ = (
+        Index('ix_workorder_tanggal_masuk', 'tanggal_masuk', 'id'),
+        Index('ix_workorder_karyawan_tanggal_masuk', 'karyawan_id', 'tanggal_masuk'),
+    )
+
+class WorkorderSummary(Base):
+    # Read model for workorder lists/detail headers: flattened display fields and line totals.
+    # Refreshed by services_workorder_summary in the same transaction as every workorder write.
+    __tablename__ = 'workorder_summary'
+    workorder_id = Column(UUID(as_uuid=True), ForeignKey('workorder.id', ondelete='CASCADE'), primary_key=True)
+    no_wo = Column(String, nullable=False)
+    tanggal_masuk = Column(DateTime, nullable=False)
+    tanggal_keluar = Column(DateTime, nullable=True)
+    keluhan = Column(String, nullable=True)
+    status = Column(String, nullable=False)
+    status_pembayaran = Column(String, nullable=True)
+
+    customer_id = Column(UUID(as_uuid=True), nullable=True)
+    customer_name = Column(String, nullable=True)
+    customer_hp = Column(String, nullable=True)
+    vehicle_id = Column(UUID(as_uuid=True), nullable=True)
+    vehicle_no_pol = Column(String, nullable=True)
+    vehicle_model = Column(String, nullable=True)
+    vehicle_brand = Column(String, nullable=True)
+    vehicle_color = Column(String, nullable=True)
+    karyawan_id = Column(UUID(as_uuid=True), nullable=True)
+    karyawan_name = Column(String, nullable=True)
+
+    product_line_count = Column(Integer, nullable=False, default=0)
+    service_line_count = Column(Integer, nullable=False, default=0)
+    product_total = Column(Numeric(14,2), nullable=False, default=0)
+    service_total = Column(Numeric(14,2), nullable=False, default=0)
+    hpp_total = Column(Numeric(14,2), nullable=False, default=0)
+    total_discount = Column(Numeric(10,2), nullable=True)
+    pajak = Column(Numeric(10,2), nullable=True)
+    dp = Column(Numeric(10,2), nullable=True)
+    total_biaya = Column(Numeric(10,2), nullable=False)
+    refreshed_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('ix_workorder_summary_tanggal_masuk', 'tanggal_masuk', 'workorder_id'),
+        Index('ix_workorder_summary_status', 'status', 'tanggal_masuk'),
+        Index('ix_workorder_summary_customer', 'customer_id', 'tanggal_masuk'),
+        Index('ix_workorder_summary_karyawan', 'karyawan_id', 'tanggal_masuk'),
+    )
+
+class SalesLineFact(Base):
+    # One row per product/service line of a workorder recognized as a sale (has a sale journal entry).
+    # Refreshed by services_sales_fact when the sale is journaled and on every later workorder write;
+    # the sales reports read only this table.
+    __tablename__ = 'sales_line_fact'
+    line_id = Column(UUID(as_uuid=True), primary_key=True)  # product_ordered.id / service_ordered.id
+    line_type = Column(String(16), nullable=False)  # 'product' | 'service'
+    sale_date = Column(Date, nullable=False)  # date of the workorder's sale journal entry
+
+    workorder_id = Column(UUID(as_uuid=True), ForeignKey('workorder.id', ondelete='CASCADE'), nullable=False)
+    no_wo = Column(String, nullable=False)
+    tanggal_masuk = Column(DateTime, nullable=False)
+    customer_id = Column(UUID(as_uuid=True), nullable=True)
+    customer_name = Column(String, nullable=True)
+    vehicle_no_pol = Column(String, nullable=True)
+    karyawan_id = Column(UUID(as_uuid=True), nullable=True)
+    karyawan_name = Column(String, nullable=True)
+
+    item_id = Column(UUID(as_uuid=True), nullable=False)  # product.id / service.id
+    item_name = Column(String, nullable=True)
+    quantity = Column(Numeric(10,2), nullable=False)
+    price = Column(Numeric(10,2), nullable=False)
+    discount = Column(Numeric(10,2), nullable=True)
+    subtotal = Column(Numeric(10,2), nullable=False)
+    hpp = Column(Numeric(10,2), nullable=True)  # unit cost when the sale was recognized, kept on later refreshes
+    refreshed_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('ix_sales_line_fact_workorder', 'workorder_id'),
+        Index('ix_sales_line_fact_tanggal_masuk', 'tanggal_masuk'),
+        Index('ix_sales_line_fact_karyawan', 'karyawan_id', 'tanggal_masuk'),
+        Index('ix_sales_line_fact_item', 'item_id', 'tanggal_masuk'),
+        Index('ix_sales_line_fact_customer', 'customer_id', 'tanggal_masuk'),
+    )
+
 # Agar relationship('Inventory', ...) dapat ditemukan oleh SQLAlchemy
 
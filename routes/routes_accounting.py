@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date
 from models.database import get_db
 from schemas.service_accounting import (
-    JournalEntryCreate, JournalEntryOut,
+    JournalEntryCreate, JournalEntryOut, JournalEntryBulkCreate,
     PurchaseRecordCreate, SaleRecordCreate,
     SalesWithConsignments,
     PaymentARCreate, PaymentAPCreate, ExpenseRecordCreate, ConsignmentPaymentCreate, SalesJournalEntry, SalesPaymentJournalEntry,PurchaseJournalEntry,PurchasePaymentJournalEntry,ExpenseJournalEntry, ExpensePaymentJournalEntry,
@@ -16,7 +18,7 @@ from schemas.service_accounting import (
     ReceivablePayableReportRequest, ReceivablePayableReport, ConsignmentPayableReport,
     ProductSalesReportRequest, ProductSalesReport,
     ServiceSalesReportRequest, ServiceSalesReport,
-    MechanicSalesReportRequest, MechanicSalesReport,
+    MechanicSalesReportRequest, MechanicSalesReport, MechanicSalesDetailRequest, MechanicSalesDetailPage,
     PurchaseOrderReportRequest, PurchaseOrderReport,
     DailyReportRequest, DailyReport,
 )
@@ -26,9 +28,11 @@ from services.services_accounting import (
     create_sales_journal_entry, create_sales_payment_journal_entry, create_purchase_journal_entry,
     create_purchase_payment_journal_entry, create_expense_journal_entry, create_expense_payment_journal_entry,
     cash_in, cash_out,
-    generate_cash_book_report, generate_expense_report, getBankCodes, generate_profit_loss_report, generate_cash_report, getEquityCodes, getTarikCodes, generate_receivable_payable_report, generate_product_sales_report, generate_service_sales_report, generate_mechanic_sales_report, generate_daily_report
+    generate_cash_book_report, generate_expense_report, getBankCodes, generate_profit_loss_report, generate_cash_report, getEquityCodes, getTarikCodes, generate_receivable_payable_report, generate_product_sales_report, generate_service_sales_report, generate_mechanic_sales_report, get_mechanic_sales_details, generate_daily_report,
+    delete_journal_entry, rebuild_account_daily_balance, export_cash_book_report, create_journal_entries_bulk
 )
 from services.services_inventory import consume_internal_product
+from services.services_sales_fact import rebuild_sales_line_facts
 from services.services_accounting import generate_consignment_payable_report
 
 from models.accounting import JournalEntry
@@ -173,6 +177,42 @@ def get_journal_list(db: Session = Depends(get_db), ):
     except Exception as e:
         return error_response(message=f"Gagal mengambil list jurnal: {str(e)}")
 
+@router.post("/journal/bulk", dependencies=[Depends(jwt_required)])
+def create_journal_bulk_route(data: JournalEntryBulkCreate, db: Session = Depends(get_db)):
+    try:
+        result = create_journal_entries_bulk(db, data.entries, created_by=data.created_by or "system", atomic=data.atomic)
+        if result["errors"] and not result["created"]:
+            return error_response(message="Tidak ada jurnal yang disimpan, periksa daftar error", status_code=422, data=result)
+        return success_response(data=result, message=f"{result['created']} jurnal berhasil dibuat")
+    except Exception as e:
+        return error_response(message=f"Gagal membuat jurnal massal: {str(e)}")
+
+@router.delete("/journal/{entry_id}", dependencies=[Depends(jwt_required)])
+def delete_journal_route(entry_id: str, db: Session = Depends(get_db)):
+    try:
+        result = delete_journal_entry(db, entry_id)
+        return success_response(data=result, message="Jurnal berhasil dihapus")
+    except ValueError as e:
+        return error_response(message=str(e), status_code=404)
+    except Exception as e:
+        return error_response(message=f"Gagal menghapus jurnal: {str(e)}")
+
+@router.post("/account-daily-balance/rebuild", dependencies=[Depends(jwt_required)])
+def rebuild_account_daily_balance_route(start_date: Optional[date] = None, end_date: Optional[date] = None, db: Session = Depends(get_db)):
+    try:
+        result = rebuild_account_daily_balance(db, start_date=start_date, end_date=end_date)
+        return success_response(data=result, message="Saldo harian akun berhasil dibangun ulang")
+    except Exception as e:
+        return error_response(message=f"Gagal membangun ulang saldo harian akun: {str(e)}")
+
+@router.post("/sales-line-fact/rebuild", dependencies=[Depends(jwt_required)])
+def rebuild_sales_line_fact_route(db: Session = Depends(get_db)):
+    try:
+        result = rebuild_sales_line_facts(db)
+        return success_response(data=result, message="Fakta penjualan berhasil dibangun ulang")
+    except Exception as e:
+        return error_response(message=f"Gagal membangun ulang fakta penjualan: {str(e)}")
+
 @router.post("/account/create", dependencies=[Depends(jwt_required)])
 def create_account_route(account_data: CreateAccount, db: Session = Depends(get_db)):
     try:
@@ -213,6 +253,24 @@ def generate_cash_book_report_route(request: CashBookReportRequest, db: Session
     except Exception as e:
         return error_response(message=f"Gagal menghasilkan laporan buku kas: {str(e)}")
 
+@router.post("/cash-book-report/export", dependencies=[Depends(jwt_required)])
+def export_cash_book_report_route(
+    request: CashBookReportRequest,
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db),
+):
+    try:
+        rows = export_cash_book_report(db, request, export_format=format)
+    except Exception as e:
+        return error_response(message=f"Gagal mengekspor laporan buku kas: {str(e)}")
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"cash-book-{request.start_date.isoformat()}-{request.end_date.isoformat()}.{format}"
+    return StreamingResponse(
+        rows,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 @router.post("/expense-report", response_model=ExpenseReport, dependencies=[Depends(jwt_required)])
 def generate_expense_report_route(request: ExpenseReportRequest, db: Session = Depends(get_db)):
     try:
@@ -310,6 +368,17 @@ def generate_mechanic_sales_report_route(request: MechanicSalesReportRequest, db
     except Exception as e:
         return error_response(message=f"Gagal menghasilkan laporan penjualan mekanik: {str(e)}")
 
+@router.post("/mechanic-sales-report/details", response_model=MechanicSalesDetailPage, dependencies=[Depends(jwt_required)])
+def get_mechanic_sales_details_route(request: MechanicSalesDetailRequest, db: Session = Depends(get_db)):
+    try:
+        result = get_mechanic_sales_details(db, request)
+        data = result.model_dump()
+        return success_response(data=data, message="Detail penjualan mekanik berhasil diambil")
+    except ValueError as e:
+        return error_response(message=str(e), status_code=404)
+    except Exception as e:
+        return error_response(message=f"Gagal mengambil detail penjualan mekanik: {str(e)}")
+
 @router.post("/daily-report", response_model=DailyReport, dependencies=[Depends(jwt_required)])
 def generate_daily_report_route(request: DailyReportRequest, db: Session = Depends(get_db)):
     try:
@@ -10,7 +10,10 @@ from services.services_dashboard import (
     get_purchase_monthly,
     get_expenses_monthly,
     get_combined_monthly,
+    get_dashboard_overview,
+    DASHBOARD_MAX_MONTHS,
 )
+from services.services_business_summary import rebuild_monthly_business_summary
 from supports.utils_json_response import success_response, error_response
 from middleware.jwt_required import jwt_required
 
@@ -25,6 +28,20 @@ def get_db():
         db.close()
 
 
+@router.get("/overview", dependencies=[Depends(jwt_required)])
+def dashboard_overview(months: Optional[int] = 6, db: Session = Depends(get_db)):
+    try:
+        months = months or 6
+        if months < 1 or months > DASHBOARD_MAX_MONTHS:
+            raise HTTPException(status_code=400, detail=f"months must be between 1 and {DASHBOARD_MAX_MONTHS}")
+        data = get_dashboard_overview(db, months=months)
+        return success_response(data=data)
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        return error_response(message=str(e))
+
+
 @router.get("/summary", dependencies=[Depends(jwt_required)])
 def dashboard_summary(db: Session = Depends(get_db)):
     try:
@@ -47,8 +64,8 @@ def workorders_pie(db: Session = Depends(get_db)):
 def sales_monthly(months: Optional[int] = 6, db: Session = Depends(get_db)):
     try:
         months = months or 6
-        if months < 1 or months > 24:
-            raise HTTPException(status_code=400, detail="months must be between 1 and 24")
+        if months < 1 or months > DASHBOARD_MAX_MONTHS:
+            raise HTTPException(status_code=400, detail=f"months must be between 1 and {DASHBOARD_MAX_MONTHS}")
         data = get_sales_monthly(db, months=months)
         return success_response(data=data)
     except Exception as e:
@@ -61,8 +78,8 @@ def sales_monthly(months: Optional[int] = 6, db: Session = Depends(get_db)):
 def purchase_monthly(months: Optional[int] = 6, db: Session = Depends(get_db)):
     try:
         months = months or 6
-        if months < 1 or months > 24:
-            raise HTTPException(status_code=400, detail="months must be between 1 and 24")
+        if months < 1 or months > DASHBOARD_MAX_MONTHS:
+            raise HTTPException(status_code=400, detail=f"months must be between 1 and {DASHBOARD_MAX_MONTHS}")
         data = get_purchase_monthly(db, months=months)
         return success_response(data=data)
     except Exception as e:
@@ -75,8 +92,8 @@ def purchase_monthly(months: Optional[int] = 6, db: Session = Depends(get_db)):
 def expenses_monthly(months: Optional[int] = 6, db: Session = Depends(get_db)):
     try:
         months = months or 6
-        if months < 1 or months > 24:
-            raise HTTPException(status_code=400, detail="months must be between 1 and 24")
+        if months < 1 or months > DASHBOARD_MAX_MONTHS:
+            raise HTTPException(status_code=400, detail=f"months must be between 1 and {DASHBOARD_MAX_MONTHS}")
         data = get_expenses_monthly(db, months=months)
         return success_response(data=data)
     except Exception as e:
@@ -89,11 +106,20 @@ def expenses_monthly(months: Optional[int] = 6, db: Session = Depends(get_db)):
 def combined_monthly(months: Optional[int] = 6, db: Session = Depends(get_db)):
     try:
         months = months or 6
-        if months < 1 or months > 24:
-            raise HTTPException(status_code=400, detail="months must be between 1 and 24")
+        if months < 1 or months > DASHBOARD_MAX_MONTHS:
+            raise HTTPException(status_code=400, detail=f"months must be between 1 and {DASHBOARD_MAX_MONTHS}")
         data = get_combined_monthly(db, months=months)
         return success_response(data=data)
     except Exception as e:
         if isinstance(e, HTTPException):
             raise e
         return error_response(message=str(e))
+
+
+@router.post("/monthly-summary/rebuild", dependencies=[Depends(jwt_required)])
+def rebuild_monthly_summary(db: Session = Depends(get_db)):
+    try:
+        data = rebuild_monthly_business_summary(db)
+        return success_response(data=data, message="Ringkasan bulanan berhasil dibangun ulang")
+    except Exception as e:
+        return error_response(message=f"Gagal membangun ulang ringkasan bulanan: {str(e)}")
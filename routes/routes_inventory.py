@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import Session
-from services.services_inventory import get_or_create_inventory, createProductMoveHistoryNew, generate_product_move_history_report, createProductMoveHistoryNewLoss, updateCostCostingMethodeAverage
+from services.services_inventory import get_or_create_inventory, createProductMoveHistoryNew, generate_product_move_history_report, createProductMoveHistoryNewLoss, updateCostCostingMethodeAverage, reconcile_inventory_quantities
+from services.services_costing import replay_average_costs, replay_pending_costs
 from services.services_inventory_extended import update_inventory_loss, delete_inventory_loss, get_loss_by_id, get_inventory_losses
 from uuid import UUID
 from schemas.service_inventory import CreateProductMovedHistory, ProductMoveHistoryReportRequest, ProductMoveHistoryReportResponse, InventoryReportErrorResponse, PurchaseOrderUpdateCost
@@ -68,6 +71,29 @@ def product_move_router(
     except Exception as e:
         return error_response(message=str(e))
     
+@router.post("/reconcile", dependencies=[Depends(jwt_required)])
+def reconcile_inventory_router(
+    fix: bool = False,
+    db: Session = Depends(get_db)
+):
+    try:
+        result = reconcile_inventory_quantities(db, fix=fix)
+        return success_response(data=result, message=f"{len(result['drifts'])} produk dengan selisih stok")
+    except Exception as e:
+        return error_response(message=f"Gagal rekonsiliasi stok: {str(e)}")
+
+@router.post("/cost-replay", dependencies=[Depends(jwt_required)])
+def cost_replay_router(
+    since: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Replay HPP produk di antrian, atau seluruh katalog sejak `since` bila diisi."""
+    try:
+        result = replay_pending_costs(db) if since is None else replay_average_costs(db, since=since)
+        return success_response(data=result, message=f"Replay HPP selesai untuk {result['products']} produk")
+    except Exception as e:
+        return error_response(message=f"Gagal replay HPP: {str(e)}")
+
 @router.post("/move/loss", dependencies=[Depends(jwt_required)])
 def product_move_loss_router(
     data_move: CreateProductMovedHistory,
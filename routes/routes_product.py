@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from models.database import SessionLocal
 from services.services_customer import create_customer_with_vehicles,getListCustomersWithvehicles, getListCustomersWithVehiclesCustomersID
 from services.services_product import CreateProductNew, get_all_products, get_product_by_id, update_product, delete_product, ProductInUseError, createServicenya,get_all_services, createBrandnya, createCategorynya, createSatuannya, getAllBrands, getAllCategories, getAllSatuans, getAllInventoryProducts, getInventoryByProductID, createProductMoveHistoryNew, get_service_by_id, update_product_cost, getAllInventoryProductsConsignment,getAllInventoryProductsExcConsignment, update_service, delete_service, get_inventory_products_paginated
-from services.services_inventory import manual_adjustment_inventory
+from services.services_inventory import manual_adjustment_inventory, create_stock_movements
 from services.services_inventory_extended import update_inventory_adjustment, delete_inventory_adjustment, get_adjustment_by_id, get_inventory_adjustments
 from uuid import UUID
 from services.services_costing import get_product_cost_history, get_product_cost_summary
@@ -313,12 +313,7 @@ def createProductMoveHistoryMultiRouter(
     db: Session = Depends(get_db)
 ):
     try:
-        results = []
-        for item in move_data.items:
-            result = createProductMoveHistoryNew(db, item)
-            if not result:
-                return error_response(message=f"Failed to create product move history for product {item.product_id}")
-            results.append(result)
+        results = create_stock_movements(db, move_data.items, commit=False)
         db.commit()  # Commit all changes after processing all items
         return success_response(data=results)
     except Exception as e:
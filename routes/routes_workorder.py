@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from uuid import UUID
+from datetime import date
+from typing import Optional
 from models.database import SessionLocal
 from services.services_customer import create_customer_with_vehicles,getListCustomersWithvehicles, getListCustomersWithVehiclesCustomersID
 from services.services_product import CreateProductNew, get_all_products, get_product_by_id, createServicenya,get_all_services, createBrandnya, createCategorynya, createSatuannya, getAllBrands, getAllCategories, getAllSatuans, getAllInventoryProducts, getInventoryByProductID, createProductMoveHistoryNew
-from services.services_workorder import createNewWorkorder,getAllWorkorders, getWorkorderByID, updateServiceorderedOnlynya,updateWorkOrdeKeluhannya,UpdateDateWorkordernya,UpdateWorkorderOrdersnya,updateProductOrderedOnlynya,updateStatusWorkorder,update_only_productordered, update_only_serviceordered,update_only_workorder,update_workorder_lengkap, addProductOrder, updateProductOrder, deleteProductOrder, addServiceOrder, updateServiceOrder, deleteServiceOrder, deleteWorkorder, getWorkordersByCustomerID, get_workorder_status_pembayaran, get_workorder_status
+from services.services_workorder import createNewWorkorder,getAllWorkorders, getWorkorderByID, updateServiceorderedOnlynya,updateWorkOrdeKeluhannya,UpdateDateWorkordernya,UpdateWorkorderOrdersnya,updateProductOrderedOnlynya,updateStatusWorkorder,update_only_productordered, update_only_serviceordered,update_only_workorder,update_workorder_lengkap, addProductOrder, updateProductOrder, deleteProductOrder, addServiceOrder, updateServiceOrder, deleteServiceOrder, deleteWorkorder, getWorkordersByCustomerID, list_workorders, list_workorder_summaries, get_workorder_summary, get_workorder_status_pembayaran, get_workorder_status
+from services.services_workorder_summary import rebuild_workorder_summaries
 from schemas.service_inventory import CreateProductMovedHistory
 from schemas.service_product import CreateProduct, ProductResponse, CreateService, ServiceResponse
 from schemas.service_accounting import SalesPaymentJournalEntry
@@ -49,6 +52,75 @@ def listAllWorkorders(
     finally:
         db.close()
 
+@router.get("/list")
+def listWorkordersPaginated(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    status_pembayaran: Optional[str] = None,
+    karyawan_id: Optional[UUID] = None,
+    customer_id: Optional[UUID] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    no_pol: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        result = list_workorders(
+            db, limit=limit, cursor=cursor, status=status, status_pembayaran=status_pembayaran,
+            karyawan_id=karyawan_id, customer_id=customer_id, start_date=start_date, end_date=end_date,
+            no_pol=no_pol,
+        )
+        return success_response(data=result)
+    except Exception as e:
+        return error_response(message=f"Gagal mengambil daftar workorder: {str(e)}")
+
+@router.get("/summary")
+def listWorkorderSummaries(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    status_pembayaran: Optional[str] = None,
+    karyawan_id: Optional[UUID] = None,
+    customer_id: Optional[UUID] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    no_pol: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        result = list_workorder_summaries(
+            db, limit=limit, cursor=cursor, status=status, status_pembayaran=status_pembayaran,
+            karyawan_id=karyawan_id, customer_id=customer_id, start_date=start_date, end_date=end_date,
+            no_pol=no_pol,
+        )
+        return success_response(data=result)
+    except Exception as e:
+        return error_response(message=f"Gagal mengambil ringkasan workorder: {str(e)}")
+
+@router.get("/summary/{workorder_id}")
+def getWorkorderSummary(
+    workorder_id: UUID,
+    db: Session = Depends(get_db)
+):
+    try:
+        result = get_workorder_summary(db, workorder_id)
+        if not result:
+            return error_response(message="Workorder tidak ditemukan", status_code=404)
+        return success_response(data=result)
+    except Exception as e:
+        return error_response(message=f"Gagal mengambil ringkasan workorder: {str(e)}")
+
+@router.post("/summary/rebuild", dependencies=[Depends(jwt_required)])
+def rebuildWorkorderSummaries(
+    db: Session = Depends(get_db)
+):
+    try:
+        result = rebuild_workorder_summaries(db)
+        return success_response(data=result, message="Ringkasan workorder berhasil dibangun ulang")
+    except Exception as e:
+        return error_response(message=f"Gagal membangun ulang ringkasan workorder: {str(e)}")
+
 @router.get("/{workorder_id}", response_model=CreateWorkOrder)
 def getWorkorder(
     workorder_id: UUID,
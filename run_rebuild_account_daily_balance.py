@@ -0,0 +1,35 @@
+"""
+Rebuild the account_daily_balance rollup from journal_lines.
+
+Usage:
+    python run_rebuild_account_daily_balance.py                          # full rebuild
+    python run_rebuild_account_daily_balance.py 2026-01-01 2026-01-31    # only that range
+"""
+import sys
+from datetime import date
+
+from models.database import SessionLocal
+import models  # noqa: F401
+from services.services_accounting import rebuild_account_daily_balance
+
+
+def main():
+    start_date = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+    end_date = date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    db = SessionLocal()
+    try:
+        print("🔄 Rebuilding account_daily_balance...")
+        result = rebuild_account_daily_balance(db, start_date=start_date, end_date=end_date)
+        print(f"✅ {result['rows']} rollup rows written "
+              f"(range: {result['start_date'] or 'awal'} s/d {result['end_date'] or 'akhir'})")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Rebuild the monthly_business_summary rollup from workorders, purchase orders and expenses.
+
+Usage:
+    python run_rebuild_monthly_business_summary.py
+"""
+import sys
+
+from models.database import SessionLocal
+import models  # noqa: F401
+from services.services_business_summary import rebuild_monthly_business_summary
+
+
+def main():
+    db = SessionLocal()
+    try:
+        print("🔄 Rebuilding monthly_business_summary...")
+        result = rebuild_monthly_business_summary(db)
+        print(f"✅ {result['months']} month rows written")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
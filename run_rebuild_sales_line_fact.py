@@ -0,0 +1,31 @@
+"""
+Rebuild sales_line_fact from the workorders that have a sale journal entry.
+
+Existing rows keep their HPP snapshot; missing rows take the current cost.
+
+Usage:
+    python run_rebuild_sales_line_fact.py
+"""
+import sys
+
+from models.database import SessionLocal
+import models  # noqa: F401
+from services.services_sales_fact import rebuild_sales_line_facts
+
+
+def main():
+    db = SessionLocal()
+    try:
+        print("🔄 Rebuilding sales_line_fact...")
+        result = rebuild_sales_line_facts(db)
+        print(f"✅ {result['workorders']} recognized workorders refreshed")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
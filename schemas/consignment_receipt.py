@@ -20,7 +20,7 @@ class ConsignmentReceiptBase(BaseModel):
     received_by: str
 
 class ConsignmentReceiptCreate(ConsignmentReceiptBase):
-    pass
+    receipt_number: Optional[str] = None  # auto: CR-YYYY-NNN
 
 class ConsignmentReceiptUpdate(BaseModel):
     receipt_date: Optional[date] = None
@@ -54,6 +54,12 @@ class JournalEntryCreate(JournalEntryBase):
     lines: List[JournalLineCreate]
 
 
+class JournalEntryBulkCreate(BaseModel):
+    entries: List[JournalEntryCreate] = Field(..., min_length=1, max_length=5000)
+    atomic: bool = Field(True, description="True: batch dibatalkan bila ada item yang tidak valid")
+    created_by: Optional[str] = None
+
+
 class JournalLineOut(DecimalModel):
     account_code: str
     account_name: str
@@ -286,6 +292,9 @@ class CashBookReportRequest(BaseModel):
     account_id: UUID
     start_date: date
     end_date: date
+    # Paginated mode: set limit, then pass next_cursor back to get the next page
+    limit: Optional[int] = Field(default=None, ge=1, le=1000)
+    cursor: Optional[str] = None
 
 
 class CashBookEntry(DecimalModel):
@@ -299,8 +308,10 @@ class CashBookEntry(DecimalModel):
 class CashBookReport(DecimalModel):
     account_code: Optional[str] = None
     account_name: Optional[str] = None
-    opening_balance: Decimal
+    opening_balance: Decimal  # in paginated mode: balance brought forward into this page
     entries: List[CashBookEntry]
+    next_cursor: Optional[str] = None
+    has_next: bool = False
 
     model_config = ConfigDict()
 
@@ -391,6 +402,11 @@ class ReceivablePayableItem(DecimalModel):
     total_receivable: Decimal  # for customers
     total_payable: Decimal  # for suppliers
     balance: Decimal  # receivable - payable (positive = receivable, negative = payable)
+    # outstanding amount by age of the underlying entries (days before end_date)
+    aging_0_30: Decimal = Decimal("0.00")
+    aging_31_60: Decimal = Decimal("0.00")
+    aging_61_90: Decimal = Decimal("0.00")
+    aging_90_plus: Decimal = Decimal("0.00")
 
 
 class ReceivablePayableReport(DecimalModel):
@@ -512,6 +528,8 @@ class PurchaseOrderReport(DecimalModel):
 class MechanicSalesReportRequest(BaseModel):
     start_date: date
     end_date: date
+    # False: per-mechanic per-day totals only, lines via /mechanic-sales-report/details
+    include_details: bool = True
 
 
 class MechanicProductSalesItem(DecimalModel):
@@ -543,8 +561,10 @@ class MechanicSalesReportItem(DecimalModel):
     total_product_sales: Decimal
     total_service_sales: Decimal
     total_sales: Decimal
-    product_details: List[MechanicProductSalesItem]
-    service_details: List[MechanicServiceSalesItem]
+    product_line_count: int = 0
+    service_line_count: int = 0
+    product_details: List[MechanicProductSalesItem] = Field(default_factory=list)
+    service_details: List[MechanicServiceSalesItem] = Field(default_factory=list)
 
 
 class MechanicSalesReport(DecimalModel):
@@ -556,6 +576,41 @@ class MechanicSalesReport(DecimalModel):
     model_config = ConfigDict()
 
 
+class MechanicSalesDetailRequest(BaseModel):
+    mechanic_id: UUID
+    date: date
+    page: int = Field(default=1, ge=1)
+    limit: int = Field(default=50, ge=1, le=200)
+
+
+class MechanicSalesDetailItem(DecimalModel):
+    line_type: str  # product / service
+    line_id: str
+    workorder_no: str
+    workorder_date: date
+    customer_name: str
+    item_name: str
+    quantity: Decimal
+    price: Decimal
+    subtotal: Decimal
+    discount: Optional[Decimal] = None
+
+
+class MechanicSalesDetailPage(DecimalModel):
+    mechanic_id: str
+    mechanic_name: str
+    date: date
+    items: List[MechanicSalesDetailItem]
+    page: int
+    limit: int
+    total: int
+    total_pages: int
+    has_previous: bool
+    has_next: bool
+
+    model_config = ConfigDict()
+
+
 class DailyReportRequest(BaseModel):
     date: date
 
@@ -0,0 +1,216 @@
+"""
+Benchmark: success_response() encoding, legacy _normalize + stdlib JSONResponse
+vs. FastJSONResponse, on the payloads of our largest list endpoints.
+
+Seeds a throwaway SQLite database, builds the payloads the routes pass to
+success_response() for
+    GET  /inventory            (getAllInventoryProducts)
+    GET  /workorders           (getAllWorkorders)
+    POST /product-sales-report (generate_product_sales_report(...).model_dump())
+and times building the response (normalize + render) with both
+implementations, checking they produce the same JSON.
+
+Run with:
+    python scripts/bench_json_response.py
+    python scripts/bench_json_response.py --workorders 5000 --products 2000 --repeat 10
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+import models  # noqa: F401
+from models.database import Base
+from models.accounting import JournalEntry, JournalType
+from models.customer import Customer, Vehicle
+from models.inventory import Inventory
+from models.karyawan import Karyawan
+from models.workorder import Brand, Product, ProductOrdered, Service, ServiceOrdered, Workorder
+from schemas.service_accounting import ProductSalesReportRequest
+from services.services_accounting import generate_product_sales_report
+from services.services_product import getAllInventoryProducts
+from services.services_sales_fact import rebuild_sales_line_facts
+from services.services_workorder import getAllWorkorders
+from supports import utils_json_response
+from supports.utils_serializer import to_dict
+
+
+def legacy_success_response(data=None, message="Success", status_code=200):
+    """Verbatim copy of the pre-rewrite implementation (recursive _normalize, then stdlib JSONResponse)."""
+    # Normalize data (convert Decimal, UUID, datetime, Enum, SQLAlchemy models, etc.)
+    def _normalize(value):
+        # import here to avoid top-level heavy imports
+        import uuid as _uuid
+        import decimal as _decimal
+        import datetime as _datetime
+        from enum import Enum as _Enum
+
+        # SQLAlchemy model instance -> convert via to_dict
+        try:
+            # detect SQLAlchemy declarative model by presence of __table__
+            if hasattr(value, '__table__'):
+                return to_dict(value)
+        except Exception:
+            pass
+
+        if isinstance(value, _decimal.Decimal):
+            return float(value)
+        if isinstance(value, _uuid.UUID):
+            return str(value)
+        if isinstance(value, (_datetime.datetime, _datetime.date, _datetime.time)):
+            return value.isoformat()
+        if isinstance(value, bytes):
+            try:
+                return value.decode('utf-8')
+            except Exception:
+                return str(value)
+        # Enum -> return underlying value
+        if isinstance(value, _Enum):
+            return value.value
+        # recurse for dicts and lists
+        if isinstance(value, dict):
+            return {k: _normalize(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [_normalize(v) for v in value]
+        if isinstance(value, tuple):
+            return tuple(_normalize(v) for v in value)
+
+        return value
+
+    normalized = _normalize(data)
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "status": "success",
+            "message": message,
+            "data": normalized
+        }
+    )
+
+
+def seed(db, n_workorders: int, n_products: int) -> None:
+    honda = Brand(name="Honda")
+    asep = Karyawan(nama="Asep", hp="0812", email="asep@bengkel.id")
+    servis = Service(name="Servis Rutin", price="50000", cost=Decimal("20000"))
+    db.add_all([honda, asep, servis])
+    db.flush()
+    products = [Product(id=uuid.uuid4(), name=f"Sparepart {i}", price=Decimal("150000"), cost=Decimal("100000"),
+                        min_stock=Decimal("10")) for i in range(n_products)]
+    db.add_all(products)
+    db.flush()
+    db.execute(insert(Inventory), [
+        {'id': uuid.uuid4(), 'product_id': p.id, 'quantity': Decimal(random.randint(0, 80)),
+         'created_at': datetime.datetime(2026, 1, 1)}
+        for p in products
+    ])
+
+    customers = [Customer(nama=f"Pelanggan {i}", hp=f"08{i:09d}", alamat="Jl. Raya") for i in range(200)]
+    db.add_all(customers)
+    db.flush()
+    vehicles = [Vehicle(no_pol=f"B {1000 + i} XY", brand_id=honda.id, customer_id=customers[i % 200].id)
+                for i in range(400)]
+    db.add_all(vehicles)
+    db.flush()
+
+    workorders, product_lines, service_lines = [], [], []
+    for i in range(n_workorders):
+        vehicle = vehicles[i % len(vehicles)]
+        wo_id = uuid.uuid4()
+        workorders.append({
+            'id': wo_id, 'no_wo': f"WO-202610-{i:05d}",
+            'tanggal_masuk': datetime.datetime(2026, 10, 1 + i % 28, 9),
+            'keluhan': "Servis berkala", 'status': 'selesai', 'status_pembayaran': 'lunas',
+            'total_biaya': Decimal("350000"), 'customer_id': vehicle.customer_id,
+            'vehicle_id': vehicle.id, 'karyawan_id': asep.id,
+        })
+        for product in random.sample(products, 3):
+            product_lines.append({'id': uuid.uuid4(), 'workorder_id': wo_id, 'product_id': product.id,
+                                  'quantity': Decimal("1"), 'price': Decimal("150000"),
+                                  'subtotal': Decimal("150000"), 'discount': Decimal("0")})
+        service_lines.append({'id': uuid.uuid4(), 'workorder_id': wo_id, 'service_id': servis.id,
+                              'quantity': Decimal("1"), 'price': Decimal("50000"),
+                              'subtotal': Decimal("50000"), 'discount': Decimal("0")})
+    db.execute(insert(Workorder), workorders)
+    db.execute(insert(ProductOrdered), product_lines)
+    db.execute(insert(ServiceOrdered), service_lines)
+    # Every workorder is a recognized sale, so the sales reports see all of them
+    db.execute(insert(JournalEntry), [
+        {'id': uuid.uuid4(), 'entry_no': f"SAL-{i:05d}", 'date': wo['tanggal_masuk'].date(),
+         'journal_type': JournalType.sale, 'workorder_id': wo['id'], 'created_at': wo['tanggal_masuk']}
+        for i, wo in enumerate(workorders)
+    ])
+    db.commit()
+    rebuild_sales_line_facts(db)
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workorders', type=int, default=2000)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+        @event.listens_for(engine, "connect")
+        def _register_now(dbapi_connection, connection_record):
+            dbapi_connection.create_function("now", 0, lambda: datetime.date.today().isoformat())
+
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        seed(db, args.workorders, args.products)
+
+        payloads = {
+            'inventory': getAllInventoryProducts(db),
+            'workorders': getAllWorkorders(db),
+            'product-sales-report': generate_product_sales_report(db, ProductSalesReportRequest(
+                start_date=datetime.date(2026, 10, 1), end_date=datetime.date(2026, 10, 31)
+            )).model_dump(),
+        }
+
+        encoder = 'orjson' if utils_json_response.orjson is not None else 'stdlib json'
+        print(f"encoder: {encoder}, best of {args.repeat}")
+        for name, data in payloads.items():
+            legacy_body = legacy_success_response(data=data).body
+            fast_body = utils_json_response.success_response(data=data).body
+            assert json.loads(legacy_body) == json.loads(fast_body), name
+
+            legacy_time = best_of(args.repeat, lambda: legacy_success_response(data=data))
+            fast_time = best_of(args.repeat, lambda: utils_json_response.success_response(data=data))
+            print(f"{name:22s} {len(fast_body) / 1024:8.0f} KiB  "
+                  f"legacy {legacy_time * 1000:8.1f} ms  fast {fast_time * 1000:8.1f} ms  "
+                  f"({legacy_time / fast_time:.1f}x)")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: generate_mechanic_sales_report() with line details (the previous
+behaviour) vs. the GROUP BY summary mode (include_details=False), for a
+month of workorders across all mechanics.
+
+Seeds a throwaway SQLite database and checks both modes report the same
+per-mechanic per-day totals.
+
+Run with:
+    python scripts/bench_mechanic_sales_report.py
+    python scripts/bench_mechanic_sales_report.py --workorders 20000 --mechanics 12 --repeat 5
+"""
+import argparse
+import datetime
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+import models  # noqa: F401
+from models.database import Base
+from models.accounting import JournalEntry, JournalType
+from models.customer import Customer
+from models.karyawan import Karyawan
+from models.workorder import Product, ProductOrdered, Service, ServiceOrdered, Workorder
+from schemas.service_accounting import MechanicSalesReportRequest
+from services.services_accounting import generate_mechanic_sales_report
+from services.services_sales_fact import rebuild_sales_line_facts
+
+
+def seed(db, n_workorders: int, n_mechanics: int) -> None:
+    customers = [Customer(nama=f"Pelanggan {i}", hp=f"08{i:09d}", alamat="Jl. Raya") for i in range(200)]
+    mechanics = [Karyawan(nama=f"Mekanik {i}", hp=f"07{i:09d}", email=f"m{i}@bengkel.id") for i in range(n_mechanics)]
+    products = [Product(name=f"Sparepart {i}", price=Decimal("150000"), cost=Decimal("100000"), min_stock=Decimal("0"))
+                for i in range(300)]
+    servis = Service(name="Servis Rutin", price="50000", cost=Decimal("20000"))
+    db.add_all([*customers, *mechanics, *products, servis])
+    db.flush()
+
+    workorders, product_lines, service_lines = [], [], []
+    for i in range(n_workorders):
+        wo_id = uuid.uuid4()
+        workorders.append({
+            'id': wo_id, 'no_wo': f"WO-202610-{i:05d}",
+            'tanggal_masuk': datetime.datetime(2026, 10, 1 + i % 31, 8 + i % 10),
+            'keluhan': "Servis berkala", 'status': 'selesai', 'total_biaya': Decimal("350000"),
+            'customer_id': customers[i % len(customers)].id, 'karyawan_id': mechanics[i % n_mechanics].id,
+        })
+        for product in random.sample(products, 3):
+            product_lines.append({'id': uuid.uuid4(), 'workorder_id': wo_id, 'product_id': product.id,
+                                  'quantity': Decimal("1"), 'price': Decimal("150000"),
+                                  'subtotal': Decimal("150000"), 'discount': Decimal("0")})
+        service_lines.append({'id': uuid.uuid4(), 'workorder_id': wo_id, 'service_id': servis.id,
+                              'quantity': Decimal("1"), 'price': Decimal("50000"),
+                              'subtotal': Decimal("50000"), 'discount': Decimal("0")})
+    db.execute(insert(Workorder), workorders)
+    db.execute(insert(ProductOrdered), product_lines)
+    db.execute(insert(ServiceOrdered), service_lines)
+    # Every workorder is a recognized sale, so the sales reports see all of them
+    db.execute(insert(JournalEntry), [
+        {'id': uuid.uuid4(), 'entry_no': f"SAL-{i:05d}", 'date': wo['tanggal_masuk'].date(),
+         'journal_type': JournalType.sale, 'workorder_id': wo['id'], 'created_at': wo['tanggal_masuk']}
+        for i, wo in enumerate(workorders)
+    ])
+    db.commit()
+    rebuild_sales_line_facts(db)
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def totals(report):
+    return sorted((i.mechanic_id, i.date, i.total_product_sales, i.total_service_sales) for i in report.items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workorders', type=int, default=5000)
+    parser.add_argument('--mechanics', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+        @event.listens_for(engine, "connect")
+        def _register_now(dbapi_connection, connection_record):
+            dbapi_connection.create_function("now", 0, lambda: datetime.date.today().isoformat())
+
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        seed(db, args.workorders, args.mechanics)
+
+        month = dict(start_date=datetime.date(2026, 10, 1), end_date=datetime.date(2026, 10, 31))
+        detailed = MechanicSalesReportRequest(**month)
+        summary = MechanicSalesReportRequest(**month, include_details=False)
+        assert totals(generate_mechanic_sales_report(db, detailed)) == totals(generate_mechanic_sales_report(db, summary))
+
+        detail_time = best_of(args.repeat, lambda: generate_mechanic_sales_report(db, detailed))
+        summary_time = best_of(args.repeat, lambda: generate_mechanic_sales_report(db, summary))
+        print(f"{args.workorders} workorders, {args.mechanics} mechanics, best of {args.repeat}")
+        print(f"with details {detail_time * 1000:8.1f} ms  summary {summary_time * 1000:8.1f} ms  "
+              f"({detail_time / summary_time:.1f}x)")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark: product and service sales reports joined over the OLTP tables
+(workorder, product_ordered/service_ordered, product/service, customer,
+vehicle; the previous implementation) vs. the single-table read of
+sales_line_fact, for a month of recognized sales. Both sides build the
+report with the same code; the legacy query is fed in through a stand-in
+session.
+
+Seeds a throwaway SQLite database where every workorder has a sale journal
+entry, builds the facts with rebuild_sales_line_facts(), and checks both
+implementations return the same report (costs are not changed
+after the sale, so the HPP snapshot equals the current cost).
+
+Run with:
+    python scripts/bench_sales_line_fact.py
+    python scripts/bench_sales_line_fact.py --workorders 20000 --repeat 5
+"""
+import argparse
+import datetime
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+import models  # noqa: F401
+from models.database import Base
+from models.accounting import JournalEntry, JournalType
+from models.customer import Customer, Vehicle
+from models.karyawan import Karyawan
+from models.workorder import Brand, Product, ProductOrdered, Service, ServiceOrdered, Workorder
+from schemas.service_accounting import ProductSalesReportRequest, ServiceSalesReportRequest
+from services.services_accounting import generate_product_sales_report, generate_service_sales_report
+from services.services_sales_fact import rebuild_sales_line_facts
+
+
+def legacy_lines(db, line, item, name_label, start_date, end_date):
+    """The query both reports ran before sales_line_fact (joins per request, current cost as HPP)."""
+    return db.query(
+        Workorder.no_wo,
+        Workorder.tanggal_masuk,
+        Customer.nama.label('customer_name'),
+        item.name.label(name_label),
+        Vehicle.no_pol,
+        line.quantity,
+        line.price,
+        item.cost.label('hpp'),
+        line.subtotal,
+        line.discount
+    ).join(line, Workorder.id == line.workorder_id)\
+     .join(item, getattr(line, f"{item.__tablename__}_id") == item.id)\
+     .join(Customer, Workorder.customer_id == Customer.id)\
+     .outerjoin(Vehicle, Workorder.vehicle_id == Vehicle.id)\
+     .filter(Workorder.tanggal_masuk >= start_date)\
+     .filter(Workorder.tanggal_masuk < end_date + datetime.timedelta(days=1))\
+     .order_by(Workorder.tanggal_masuk, Workorder.no_wo)\
+     .all()
+
+
+class LegacyQuery:
+    """Stands in for db.query(...) so the report code builds its items from the legacy query's rows."""
+
+    def __init__(self, run):
+        self.run = run
+
+    def filter(self, *args):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def all(self):
+        return self.run()
+
+
+class LegacySession:
+    def __init__(self, run):
+        self.run = run
+
+    def query(self, *args):
+        return LegacyQuery(self.run)
+
+
+def seed(db, n_workorders: int) -> None:
+    honda = Brand(name="Honda")
+    customers = [Customer(nama=f"Pelanggan {i}", hp=f"08{i:09d}", alamat="Jl. Raya") for i in range(200)]
+    mechanics = [Karyawan(nama=f"Mekanik {i}", hp=f"07{i:09d}", email=f"m{i}@bengkel.id") for i in range(8)]
+    products = [Product(name=f"Sparepart {i}", price=Decimal("150000"), cost=Decimal("100000"), min_stock=Decimal("0"))
+                for i in range(300)]
+    servis = Service(name="Servis Rutin", price="50000", cost=Decimal("20000"))
+    db.add_all([honda, *customers, *mechanics, *products, servis])
+    db.flush()
+    vehicles = [Vehicle(no_pol=f"B {1000 + i} XY", brand_id=honda.id, customer_id=customers[i % 200].id)
+                for i in range(400)]
+    db.add_all(vehicles)
+    db.flush()
+
+    workorders, product_lines, service_lines, entries = [], [], [], []
+    for i in range(n_workorders):
+        vehicle = vehicles[i % len(vehicles)]
+        wo_id = uuid.uuid4()
+        entered = datetime.datetime(2026, 10, 1 + i % 31, 8 + i % 10)
+        workorders.append({
+            'id': wo_id, 'no_wo': f"WO-202610-{i:05d}", 'tanggal_masuk': entered,
+            'keluhan': "Servis berkala", 'status': 'selesai', 'total_biaya': Decimal("500000"),
+            'customer_id': vehicle.customer_id, 'vehicle_id': vehicle.id, 'karyawan_id': mechanics[i % 8].id,
+        })
+        for product in random.sample(products, 3):
+            product_lines.append({'id': uuid.uuid4(), 'workorder_id': wo_id, 'product_id': product.id,
+                                  'quantity': Decimal("1"), 'price': Decimal("150000"),
+                                  'subtotal': Decimal("150000"), 'discount': Decimal("0")})
+        service_lines.append({'id': uuid.uuid4(), 'workorder_id': wo_id, 'service_id': servis.id,
+                              'quantity': Decimal("1"), 'price': Decimal("50000"),
+                              'subtotal': Decimal("50000"), 'discount': Decimal("0")})
+        entries.append({'id': uuid.uuid4(), 'entry_no': f"SAL-{i:05d}", 'date': entered.date(),
+                        'journal_type': JournalType.sale, 'workorder_id': wo_id, 'created_at': entered})
+    db.execute(insert(Workorder), workorders)
+    db.execute(insert(ProductOrdered), product_lines)
+    db.execute(insert(ServiceOrdered), service_lines)
+    db.execute(insert(JournalEntry), entries)
+    db.commit()
+    rebuild_sales_line_facts(db)
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workorders', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+        @event.listens_for(engine, "connect")
+        def _register_now(dbapi_connection, connection_record):
+            dbapi_connection.create_function("now", 0, lambda: datetime.date.today().isoformat())
+
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        seed(db, args.workorders)
+
+        month = dict(start_date=datetime.date(2026, 10, 1), end_date=datetime.date(2026, 10, 31))
+        product_request = ProductSalesReportRequest(**month)
+        service_request = ServiceSalesReportRequest(**month)
+        legacy_products = LegacySession(lambda: legacy_lines(db, ProductOrdered, Product, 'product_name', **month))
+        legacy_services = LegacySession(lambda: legacy_lines(db, ServiceOrdered, Service, 'service_name', **month))
+        reports = {
+            'product-sales-report': (
+                lambda: generate_product_sales_report(legacy_products, product_request),
+                lambda: generate_product_sales_report(db, product_request),
+            ),
+            'service-sales-report': (
+                lambda: generate_service_sales_report(legacy_services, service_request),
+                lambda: generate_service_sales_report(db, service_request),
+            ),
+        }
+
+        print(f"{args.workorders} recognized workorders, best of {args.repeat}")
+        for name, (legacy, fact) in reports.items():
+            legacy_report = legacy()
+            fact_report = fact()
+            assert legacy_report.model_dump() == fact_report.model_dump(), name
+
+            legacy_time = best_of(args.repeat, legacy)
+            fact_time = best_of(args.repeat, fact)
+            print(f"{name:22s} {len(fact_report.items):7d} lines  "
+                  f"joins {legacy_time * 1000:8.1f} ms  sales_line_fact {fact_time * 1000:8.1f} ms  "
+                  f"({legacy_time / fact_time:.1f}x)")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
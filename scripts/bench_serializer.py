@@ -0,0 +1,125 @@
+"""
+Benchmark: per-service to_dict() loop vs. the shared compiled serializer.
+
+Seeds N product_moved_history rows (default 10,000) in a throwaway SQLite
+database, loads them back through the ORM, and times converting the loaded
+instances with the legacy to_dict(), the cached supports.utils_serializer
+to_dict() and the batch to_dicts(), checking all three produce the same dicts.
+
+Run with:
+    python scripts/bench_serializer.py
+    python scripts/bench_serializer.py --rows 50000 --repeat 20
+"""
+import argparse
+import datetime
+import decimal
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+import models  # noqa: F401
+from models.database import Base
+from models.inventory import ProductMovedHistory
+from models.workorder import Product
+from supports.utils_serializer import to_dict, to_dicts
+
+
+def legacy_to_dict(obj):
+    """Verbatim copy of the pre-rewrite implementation (one isinstance chain per column per row)."""
+    result = {}
+    for c in obj.__table__.columns:
+        value = getattr(obj, c.name)
+        # Konversi UUID ke string
+        if isinstance(value, uuid.UUID):
+            value = str(value)
+        # Konversi Decimal ke float
+        elif isinstance(value, decimal.Decimal):
+            value = float(value)
+        # Konversi datetime/date/time ke isoformat string
+        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            value = value.isoformat()
+        # Konversi bytes ke string (opsional, jika ada kolom bytes)
+        elif isinstance(value, bytes):
+            value = value.decode('utf-8')
+        result[c.name] = value
+    return result
+
+
+def seed(db, rows: int) -> None:
+    products = [Product(id=uuid.uuid4(), name=f"Produk {i}", price=Decimal("100"), min_stock=Decimal("5"))
+                for i in range(50)]
+    db.add_all(products)
+    db.flush()
+    start = datetime.datetime(2026, 1, 1)
+    db.execute(insert(ProductMovedHistory), [
+        {
+            'id': uuid.uuid4(),
+            'product_id': random.choice(products).id,
+            'type': random.choice(['income', 'outcome', 'adjustment']),
+            'quantity': Decimal(random.randint(1, 20)),
+            'timestamp': start + datetime.timedelta(minutes=i),
+            'performed_by': 'bench',
+            'notes': None if i % 3 else f"Catatan {i}",
+            'purchase_price': Decimal("95.50"),
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        seed(db, args.rows)
+        db.expunge_all()
+        loaded = db.execute(select(ProductMovedHistory)).scalars().all()
+
+        legacy = [legacy_to_dict(row) for row in loaded]
+        assert [to_dict(row) for row in loaded] == legacy
+        assert to_dicts(loaded) == legacy
+
+        legacy_time = best_of(args.repeat, lambda: [legacy_to_dict(row) for row in loaded])
+        single_time = best_of(args.repeat, lambda: [to_dict(row) for row in loaded])
+        batch_time = best_of(args.repeat, lambda: to_dicts(loaded))
+
+        print(f"rows: {len(loaded)} (best of {args.repeat})")
+        print(f"legacy to_dict     : {legacy_time * 1000:8.1f} ms")
+        print(f"shared to_dict     : {single_time * 1000:8.1f} ms  ({legacy_time / single_time:.2f}x)")
+        print(f"shared to_dicts    : {batch_time * 1000:8.1f} ms  ({legacy_time / batch_time:.2f}x)")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Background job untuk replay harga pokok rata-rata (moving average) produk yang
+mengalami koreksi mundur (edit PO line / adjustment). Hanya produk yang masuk
+antrian product_cost_replay yang dihitung ulang.
+Memakai instance APScheduler yang sama dengan maintenance reminder.
+"""
+from apscheduler.triggers.cron import CronTrigger
+from models.database import SessionLocal
+from services.scheduler_maintenance_reminder import scheduler
+from services.services_costing import replay_pending_costs
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def cost_replay_job():
+    """
+    Job replay HPP untuk produk di antrian.
+    """
+    db = SessionLocal()
+    try:
+        result = replay_pending_costs(db)
+        logger.info(
+            f"[{datetime.now()}] Replay HPP selesai: {result['products']} produk, "
+            f"{result['cost_history']} riwayat HPP, {result['hpp_updated']} hpp_snapshot diperbarui"
+        )
+        return result
+    except Exception as e:
+        logger.error(f"[{datetime.now()}] Error dalam cost_replay_job: {str(e)}")
+    finally:
+        db.close()
+
+
+def start_cost_replay(hour: int = 2, minute: int = 30):
+    """
+    Jadwalkan replay HPP setiap hari pada jam yang ditentukan.
+
+    Args:
+        hour: Jam untuk menjalankan job (default: 2, di luar jam operasional bengkel)
+        minute: Menit untuk menjalankan job (default: 30, setelah rekonsiliasi stok)
+
+    Returns:
+        BackgroundScheduler instance
+    """
+    scheduler.add_job(
+        cost_replay_job,
+        CronTrigger(hour=hour, minute=minute),
+        id='cost_replay_job',
+        name='Moving Average Cost Replay',
+        replace_existing=True,
+        max_instances=1
+    )
+    if not scheduler.running:
+        scheduler.start()
+    logger.info(f"Replay HPP dijadwalkan setiap hari jam {hour:02d}:{minute:02d}")
+    return scheduler
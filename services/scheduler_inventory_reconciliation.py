@@ -0,0 +1,62 @@
+"""
+Background job untuk rekonsiliasi stok: membandingkan inventory.quantity dengan
+total product_moved_history per produk dan melaporkan selisihnya.
+Memakai instance APScheduler yang sama dengan maintenance reminder.
+"""
+from apscheduler.triggers.cron import CronTrigger
+from models.database import SessionLocal
+from services.scheduler_maintenance_reminder import scheduler
+from services.services_inventory import reconcile_inventory_quantities
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def inventory_reconciliation_job(fix: bool = False):
+    """
+    Job rekonsiliasi stok. Selisih hanya dilaporkan ke log kecuali fix=True.
+    """
+    db = SessionLocal()
+    try:
+        result = reconcile_inventory_quantities(db, fix=fix)
+        if result['drifts']:
+            for drift in result['drifts']:
+                logger.warning(
+                    f"[{datetime.now()}] Selisih stok {drift['product_name']} ({drift['product_id']}): "
+                    f"inventory={drift['inventory_quantity']} history={drift['history_quantity']}"
+                )
+        else:
+            logger.info(f"[{datetime.now()}] Rekonsiliasi stok selesai, tidak ada selisih")
+        return result
+    except Exception as e:
+        logger.error(f"[{datetime.now()}] Error dalam inventory_reconciliation_job: {str(e)}")
+    finally:
+        db.close()
+
+
+def start_inventory_reconciliation(hour: int = 2, minute: int = 0, fix: bool = False):
+    """
+    Jadwalkan rekonsiliasi stok setiap hari pada jam yang ditentukan.
+
+    Args:
+        hour: Jam untuk menjalankan job (default: 2, di luar jam operasional bengkel)
+        minute: Menit untuk menjalankan job (default: 0)
+        fix: Samakan inventory dengan total history bila ada selisih
+
+    Returns:
+        BackgroundScheduler instance
+    """
+    scheduler.add_job(
+        inventory_reconciliation_job,
+        CronTrigger(hour=hour, minute=minute),
+        kwargs={'fix': fix},
+        id='inventory_reconciliation_job',
+        name='Inventory Reconciliation',
+        replace_existing=True,
+        max_instances=1
+    )
+    if not scheduler.running:
+        scheduler.start()
+    logger.info(f"Rekonsiliasi stok dijadwalkan setiap hari jam {hour:02d}:{minute:02d}")
+    return scheduler
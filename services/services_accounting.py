@@ -1,19 +1,30 @@
 # services_accounting.py
 import uuid
+import base64
+import csv
+import io
+import json
+import os
+import threading
+import time
 from decimal import Decimal
-from typing import Iterable, List, Optional, Any, cast
+from typing import Iterable, Iterator, List, Optional, Any, cast
 from sqlalchemy.orm import Session
-from sqlalchemy import func, select, Date
+from sqlalchemy import func, select, case, delete, insert, tuple_, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import date
 import decimal
 import datetime
 from models.expenses import Expenses
-from models.workorder import Workorder, ProductOrdered, Product, ServiceOrdered, Service
+from models.workorder import Workorder, Product, SalesLineFact
 from models.customer import Customer
 from models.supplier import Supplier
 from models.purchase_order import PurchaseOrder, PurchaseOrderLine
 
-from models.accounting import Account, JournalEntry, JournalLine, JournalType
+from services.services_document_number import allocate_document_numbers, parse_sequence_suffix
+from services.services_sales_fact import refresh_sales_line_facts
+from models.accounting import Account, AccountType, AccountDailyBalance, JournalEntry, JournalLine, JournalType
 from schemas.service_accounting import (
     JournalEntryCreate,
     JournalEntryOut,
@@ -62,6 +73,9 @@ from schemas.service_accounting import (
     MechanicSalesReportItem,
     MechanicProductSalesItem,
     MechanicServiceSalesItem,
+    MechanicSalesDetailRequest,
+    MechanicSalesDetailItem,
+    MechanicSalesDetailPage,
     PurchaseOrderReportRequest,
     PurchaseOrderReport,
     PurchaseOrderReportItem,
@@ -71,46 +85,105 @@ from schemas.service_accounting import (
     WorkOrderSummaryItem
 )
 from collections import defaultdict
+from supports.utils_serializer import to_dict, to_dicts
 
 def to_float(value: Any) -> float:
     return float(cast(Decimal, value))
 
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = to_float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        result[c.name] = value
-    return result
-
 # ---------- Helpers ----------
-def _get_account_by_code(db: Session, code: str) -> Account:
+ACCOUNT_CACHE_TTL_SECONDS = float(os.getenv("ACCOUNT_CACHE_TTL_SECONDS", "300"))
+
+
+class ChartOfAccountsCache:
+    """
+    In-process snapshot of the chart of accounts, keyed by code and by id.
+
+    The whole table is loaded in one query and kept for ``ttl_seconds``.
+    ``create_account``/``edit_account`` invalidate it explicitly; the TTL
+    bounds staleness for edits made through another worker process.
+    Cached values are plain rows (id, code, name, normal_balance,
+    account_type, is_active), never session-bound ORM instances.
     """
-    Retrieve an active account by its code.
+
+    def __init__(self, ttl_seconds: float = ACCOUNT_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._by_code: dict = {}
+        self._by_id: dict = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def _load(self, db: Session) -> None:
+        rows = db.execute(select(
+            Account.id,
+            Account.code,
+            Account.name,
+            Account.normal_balance,
+            Account.account_type,
+            Account.is_active,
+        )).all()
+        with self._lock:
+            self._by_code = {row.code: row for row in rows}
+            self._by_id = {row.id: row for row in rows}
+            self._loaded_at = time.monotonic()
+
+    def _lookup(self, db: Session, index: str, key: Any):
+        reloaded = False
+        if not self._is_fresh():
+            self._load(db)
+            reloaded = True
+        row = getattr(self, index).get(key)
+        if row is None and not reloaded:
+            # Possibly created by another worker since the last load
+            self._load(db)
+            row = getattr(self, index).get(key)
+        return row
+
+    def get_by_code(self, db: Session, code: str):
+        """Return the cached account row for ``code``, or None."""
+        return self._lookup(db, "_by_code", code)
+
+    def get_by_id(self, db: Session, account_id: Any):
+        """Return the cached account row for ``account_id``, or None."""
+        if isinstance(account_id, str):
+            account_id = uuid.UUID(account_id)
+        return self._lookup(db, "_by_id", account_id)
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next lookup reloads it."""
+        with self._lock:
+            self._by_code = {}
+            self._by_id = {}
+            self._loaded_at = None
+
+
+account_cache = ChartOfAccountsCache()
+
+
+def invalidate_account_cache() -> None:
+    """Invalidate the chart-of-accounts cache after accounts change."""
+    account_cache.invalidate()
+
+
+def _get_account_by_code(db: Session, code: str):
+    """
+    Retrieve an active account by its code from the chart-of-accounts cache.
 
     Args:
-        db: Database session.
+        db: Database session (used only when the cache needs reloading).
         code: Account code to search for.
 
     Returns:
-        Account: The active account object.
+        Row: Cached account snapshot with id, code, name, normal_balance,
+        account_type and is_active.
 
     Raises:
         ValueError: If the account code is not found or inactive.
     """
-    acc = db.execute(select(Account).where(Account.code == code, Account.is_active == True)).scalar_one_or_none()
-    if not acc:
+    acc = account_cache.get_by_code(db, code)
+    if not acc or not acc.is_active:
         raise ValueError(f"Account code '{code}' not found or inactive")
     return acc
 
@@ -172,11 +245,13 @@ def _create_entry(db: Session, payload: JournalEntryCreate, created_by: Optional
         customer_id=payload.customer_id,
         supplier_id=payload.supplier_id,
         workorder_id=payload.workorder_id,
+        purchase_id=payload.purchase_id,
         created_by=created_by,
     )
     db.add(entry)
     db.flush()  # Ensure entry.id is available
 
+    posted = []
     for line in payload.lines:
         acc = _get_account_by_code(db, line.account_code)
         jl = JournalLine(
@@ -188,13 +263,278 @@ def _create_entry(db: Session, payload: JournalEntryCreate, created_by: Optional
             credit=line.credit,
         )
         db.add(jl)
+        posted.append((acc.id, line.debit, line.credit))
 
     db.flush()  # Ensure lines are flushed to the database
+    _apply_daily_balance(db, payload.date, posted)
+    if entry.journal_type == JournalType.sale and entry.workorder_id:
+        # The workorder is now a recognized sale
+        refresh_sales_line_facts(db, [entry.workorder_id])
     if commit:
         db.commit()  # Commit the transaction
     return entry
 
 
+def _apply_daily_balance(db: Session, entry_date: date, lines: Iterable[tuple], sign: int = 1) -> None:
+    """
+    Apply journal lines to the account_daily_balance rollup.
+
+    Args:
+        db: Database session.
+        entry_date: Journal entry date (the rollup bucket).
+        lines: Iterable of (account_id, debit, credit) tuples.
+        sign: 1 when posting lines, -1 when removing them.
+    """
+    deltas: dict = {}
+    for account_id, debit, credit in lines:
+        total_debit, total_credit, count = deltas.get(account_id, (Decimal("0.00"), Decimal("0.00"), 0))
+        deltas[account_id] = (total_debit + debit, total_credit + credit, count + 1)
+    if not deltas:
+        return
+
+    rows = [
+        {
+            "account_id": account_id,
+            "date": entry_date,
+            "debit_total": total_debit * sign,
+            "credit_total": total_credit * sign,
+            "line_count": count * sign,
+        }
+        for account_id, (total_debit, total_credit, count) in deltas.items()
+    ]
+
+    dialect = db.get_bind().dialect.name
+    upsert_insert = {"postgresql": pg_insert, "sqlite": sqlite_insert}.get(dialect)
+    if upsert_insert is not None:
+        # Single statement, safe against concurrent posts creating the same (account, day) row
+        stmt = upsert_insert(AccountDailyBalance).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AccountDailyBalance.account_id, AccountDailyBalance.date],
+            set_={
+                "debit_total": AccountDailyBalance.debit_total + stmt.excluded.debit_total,
+                "credit_total": AccountDailyBalance.credit_total + stmt.excluded.credit_total,
+                "line_count": AccountDailyBalance.line_count + stmt.excluded.line_count,
+            },
+        )
+        db.execute(stmt)
+    else:
+        for row in rows:
+            bucket = db.get(AccountDailyBalance, (row["account_id"], entry_date))
+            if bucket:
+                bucket.debit_total += row["debit_total"]
+                bucket.credit_total += row["credit_total"]
+                bucket.line_count += row["line_count"]
+            else:
+                db.add(AccountDailyBalance(**row))
+        db.flush()
+
+    if sign < 0:
+        db.execute(delete(AccountDailyBalance).where(
+            AccountDailyBalance.date == entry_date,
+            AccountDailyBalance.account_id.in_(list(deltas.keys())),
+            AccountDailyBalance.line_count <= 0
+        ))
+
+
+def _get_opening_balances(db: Session, account_ids: list, before_date: date) -> dict:
+    """
+    Net (debit - credit) per account for everything posted before a date,
+    read from the account_daily_balance rollup.
+
+    Args:
+        db: Database session.
+        account_ids: Accounts to compute.
+        before_date: First day that is NOT included.
+
+    Returns:
+        dict: account_id -> Decimal (debit - credit). Missing accounts are zero.
+    """
+    if not account_ids:
+        return {}
+    rows = db.query(
+        AccountDailyBalance.account_id,
+        func.sum(AccountDailyBalance.debit_total - AccountDailyBalance.credit_total).label('net')
+    ).filter(
+        AccountDailyBalance.account_id.in_(account_ids),
+        AccountDailyBalance.date < before_date
+    ).group_by(AccountDailyBalance.account_id).all()
+    return {row.account_id: row.net or Decimal("0.00") for row in rows}
+
+
+def _to_normal_balance(net_debit: Decimal, normal_balance) -> Decimal:
+    """Express a (debit - credit) amount in the account's normal-balance direction."""
+    return net_debit if normal_balance == "debit" else -net_debit
+
+
+def rebuild_account_daily_balance(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> dict:
+    """
+    Rebuild the account_daily_balance rollup from journal_lines.
+
+    Used for the initial backfill and to repair drift. Without dates the whole
+    rollup is rebuilt; with dates only that (inclusive) range is replaced.
+
+    Returns:
+        dict: Number of rollup rows written and the rebuilt range.
+    """
+    delete_stmt = delete(AccountDailyBalance)
+    source = select(
+        JournalLine.account_id,
+        JournalEntry.date,
+        func.sum(JournalLine.debit),
+        func.sum(JournalLine.credit),
+        func.count(JournalLine.id)
+    ).join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+
+    if start_date:
+        delete_stmt = delete_stmt.where(AccountDailyBalance.date >= start_date)
+        source = source.where(JournalEntry.date >= start_date)
+    if end_date:
+        delete_stmt = delete_stmt.where(AccountDailyBalance.date <= end_date)
+        source = source.where(JournalEntry.date <= end_date)
+
+    source = source.group_by(JournalLine.account_id, JournalEntry.date)
+
+    db.execute(delete_stmt)
+    result = db.execute(insert(AccountDailyBalance).from_select(
+        ["account_id", "date", "debit_total", "credit_total", "line_count"],
+        source
+    ))
+    db.commit()
+
+    return {
+        "rows": result.rowcount,
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+    }
+
+
+def delete_journal_entry(db: Session, entry_id: str) -> dict:
+    """
+    Delete a journal entry and its lines, keeping account_daily_balance and sales_line_fact current.
+
+    Raises:
+        ValueError: If the entry does not exist.
+    """
+    entry = db.query(JournalEntry).filter(JournalEntry.id == entry_id).first()
+    if not entry:
+        raise ValueError(f"Journal entry with id '{entry_id}' not found")
+
+    _apply_daily_balance(
+        db,
+        entry.date,
+        [(ln.account_id, ln.debit, ln.credit) for ln in entry.lines],
+        sign=-1
+    )
+    deleted = {"id": str(entry.id), "entry_no": entry.entry_no, "date": entry.date.isoformat()}
+    sale_workorder_id = entry.workorder_id if entry.journal_type == JournalType.sale else None
+    db.delete(entry)
+    # Drops the workorder's sales facts unless another sale entry still recognizes it
+    refresh_sales_line_facts(db, [sale_workorder_id])
+    db.commit()
+    return deleted
+
+
+def create_journal_entries_bulk(
+    db: Session,
+    payloads: List[JournalEntryCreate],
+    created_by: Optional[str] = "system",
+    atomic: bool = True
+) -> dict:
+    """
+    Validate and post a batch of journal entries in one transaction.
+
+    Every payload is validated up front (balance, at least one line, active
+    account codes). Entry numbers for payloads without ``entry_no`` are
+    allocated in one block per (journal type, date). Entries and lines are
+    then written with two multi-row INSERTs, the account_daily_balance
+    rollup is updated once per date, the sales facts of workorders with a
+    sale entry are refreshed in one call, and the batch is committed once.
+
+    Args:
+        db: Database session.
+        payloads: Journal entries to post.
+        created_by: User recorded on every entry.
+        atomic: When True, any invalid item aborts the whole batch; when
+            False, valid items are posted and invalid ones only reported.
+
+    Returns:
+        dict: ``created`` (count), ``entries`` (index, id, entry_no) and
+        ``errors`` (index, entry_no, error) for items that failed validation.
+    """
+    errors = []
+    valid = []  # (index, payload, [(account_id, line), ...])
+    for index, payload in enumerate(payloads):
+        try:
+            if not payload.lines:
+                raise ValueError("Journal has no lines")
+            _validate_balance(payload.lines)
+            resolved = [(_get_account_by_code(db, line.account_code).id, line) for line in payload.lines]
+        except ValueError as e:
+            errors.append({"index": index, "entry_no": payload.entry_no, "error": str(e)})
+            continue
+        valid.append((index, payload, resolved))
+
+    if errors and atomic:
+        return {"created": 0, "entries": [], "errors": errors}
+
+    # Allocate missing entry numbers in one block per (journal type, date)
+    pending: dict = {}
+    for index, payload, _ in valid:
+        if not payload.entry_no:
+            pending.setdefault((payload.journal_type.value, payload.date), []).append(index)
+    allocated = {}
+    for (journal_type, entry_date), indexes in pending.items():
+        allocated.update(zip(indexes, generate_entry_nos(db, journal_type, entry_date, len(indexes))))
+
+    now = datetime.datetime.utcnow()
+    entry_rows, line_rows, created = [], [], []
+    posted_by_date: dict = {}
+    for index, payload, resolved in valid:
+        entry_id = uuid.uuid4()
+        entry_no = payload.entry_no or allocated[index]
+        entry_rows.append({
+            "id": entry_id,
+            "entry_no": entry_no,
+            "date": payload.date,
+            "memo": payload.memo,
+            "journal_type": JournalType(payload.journal_type.value),
+            "customer_id": payload.customer_id,
+            "supplier_id": payload.supplier_id,
+            "workorder_id": payload.workorder_id,
+            "purchase_id": payload.purchase_id,
+            "created_at": now,
+            "created_by": created_by,
+        })
+        posted = posted_by_date.setdefault(payload.date, [])
+        for account_id, line in resolved:
+            line_rows.append({
+                "id": uuid.uuid4(),
+                "entry_id": entry_id,
+                "account_id": account_id,
+                "description": line.description,
+                "debit": line.debit,
+                "credit": line.credit,
+            })
+            posted.append((account_id, line.debit, line.credit))
+        created.append({"index": index, "id": str(entry_id), "entry_no": entry_no})
+
+    if entry_rows:
+        try:
+            db.execute(insert(JournalEntry), entry_rows)
+            db.execute(insert(JournalLine), line_rows)
+            for entry_date, posted in posted_by_date.items():
+                _apply_daily_balance(db, entry_date, posted)
+            refresh_sales_line_facts(db, [
+                row["workorder_id"] for row in entry_rows if row["journal_type"] == JournalType.sale
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    return {"created": len(created), "entries": created, "errors": errors}
+
+
 def _to_entry_out(db: Session, entry: JournalEntry) -> dict:
     """
     Convert a JournalEntry object to a dictionary for JSON serialization.
@@ -206,12 +546,12 @@ def _to_entry_out(db: Session, entry: JournalEntry) -> dict:
     Returns:
         dict: The output dictionary.
     """
-    # Ensure accounts are loaded
     lines_out = []
     for ln in entry.lines:
+        account = account_cache.get_by_id(db, ln.account_id) or ln.account
         lines_out.append({
-            "account_code": ln.account.code,
-            "account_name": ln.account.name,
+            "account_code": account.code,
+            "account_name": account.name,
             "description": ln.description,
             "debit": to_float(ln.debit),
             "credit": to_float(ln.credit),
@@ -388,14 +728,14 @@ def record_sale(
         cons_entries = []
         for supplier_id, amount in consign_by_supplier.items():
             if amount and amount > 0:
-                acc_hpp = db.execute(select(Account).where(Account.code == "5001")).scalar_one_or_none()
-                acc_payable = db.execute(select(Account).where(Account.code == "3002")).scalar_one_or_none()
+                acc_hpp = account_cache.get_by_code(db, "5001")
+                acc_payable = account_cache.get_by_code(db, "3002")
                 if not acc_hpp or not acc_payable:
                     raise ValueError("Akun untuk HPP atau hutang konsinyasi (5001/3002) belum tersedia")
 
                 cons_entry = JournalEntry(
                     id=uuid.uuid4(),
-                    entry_no=f"CONS-{uuid.uuid4().hex[:8]}",
+                    entry_no=generate_entry_no(db, "consignment", sale_data.tanggal),
                     date=sale_data.tanggal,
                     memo=f"Hutang konsinyasi untuk supplier {supplier_id} - WO {sale_data.workorder_id}",  # type: ignore
                     journal_type=JournalType.CONSIGNMENT,  # type: ignore
@@ -424,6 +764,7 @@ def record_sale(
                     credit=amount
                 )
                 db.add_all([jl1, jl2])
+                _apply_daily_balance(db, sale_data.tanggal, [(acc_hpp.id, amount, Decimal("0.00")), (acc_payable.id, Decimal("0.00"), amount)])
                 cons_entries.append(cons_entry)
 
     # convert sale and consignment entries to output schema
@@ -600,6 +941,7 @@ def create_account(db: Session, account_data: CreateAccount):
     db.add(new_account)
     db.commit()
     db.refresh(new_account)
+    invalidate_account_cache()
 
     return to_dict(new_account)
 
@@ -617,6 +959,7 @@ def edit_account(db: Session, account_id: str, account_data: CreateAccount):
 
     db.commit()
     db.refresh(account)
+    invalidate_account_cache()
 
     return to_dict(account)
 
@@ -628,12 +971,24 @@ def get_account(db: Session, account_id: str):
 
 def get_all_accounts(db: Session):
     results = db.query(Account).all()
-    return [to_dict(result) for result in results] if isinstance(results, Iterable) else []
+    return to_dicts(results) if isinstance(results, Iterable) else []
+
+ENTRY_NO_PREFIXES = {
+    'purchase': 'PUR',
+    'sale': 'SAL',
+    'ar_receipt': 'ARR',
+    'ap_payment': 'APP',
+    'expense': 'EXP',
+    'consignment': 'CONS',
+    'general': 'GEN'
+}
+
 
 def generate_entry_no(db: Session, journal_type: str, date: date) -> str:
     """
     Generate a unique entry_no that is not affected by deletions.
-    Format: {journal_type_prefix}-{YYYYMMDD}-{sequential_number}
+    Format: {journal_type_prefix}-{YYYYMMDD}-{sequential_number}, allocated
+    from the document_sequence counter for that prefix and date.
 
     Args:
         db: Database session.
@@ -643,38 +998,37 @@ def generate_entry_no(db: Session, journal_type: str, date: date) -> str:
     Returns:
         str: Generated entry_no.
     """
-    # Define prefixes for journal types
-    prefixes = {
-        'purchase': 'PUR',
-        'sale': 'SAL',
-        'ar_receipt': 'ARR',
-        'ap_payment': 'APP',
-        'expense': 'EXP',
-        'general': 'GEN'
-    }
-    prefix = prefixes.get(journal_type, 'GEN')
+    return generate_entry_nos(db, journal_type, date, 1)[0]
+
+
+def generate_entry_nos(db: Session, journal_type: str, date: date, count: int) -> List[str]:
+    """
+    Allocate ``count`` consecutive entry numbers for one journal type and date.
+
+    Args:
+        db: Database session.
+        journal_type: Type of journal (e.g., 'purchase', 'sale').
+        date: Date of the entries.
+        count: How many numbers to allocate.
+
+    Returns:
+        List[str]: Entry numbers in ascending order.
+    """
+    prefix = ENTRY_NO_PREFIXES.get(journal_type, 'GEN')
 
     # Format date as YYYYMMDD
     date_str = date.strftime('%Y%m%d')
 
-    # Find the next sequential number for this prefix and date
-    max_entry_no = db.query(func.max(JournalEntry.entry_no)).filter(
-        JournalEntry.entry_no.like(f'{prefix}-{date_str}-%')
-    ).scalar()
-
-    if max_entry_no:
-        # Extract the sequential number and increment
-        parts = max_entry_no.split('-')
-        if len(parts) == 3:
-            seq_num = int(parts[2]) + 1
-        else:
-            seq_num = 1
-    else:
-        seq_num = 1
+    def _legacy_max() -> int:
+        # Numbers issued before the counter existed for this prefix and date
+        max_entry_no = db.query(func.max(JournalEntry.entry_no)).filter(
+            JournalEntry.entry_no.like(f'{prefix}-{date_str}-%')
+        ).scalar()
+        return parse_sequence_suffix(max_entry_no)
 
-    # Generate the new entry_no
-    entry_no = f'{prefix}-{date_str}-{seq_num:03d}'  # Pad with zeros to 3 digits
-    return entry_no
+    numbers = allocate_document_numbers(db, prefix, date_str, count, seed=_legacy_max)
+    # Pad with zeros to 3 digits
+    return [f'{prefix}-{date_str}-{n:03d}' for n in numbers]
 
 
 def create_sales_journal_entry(db: Session, data_entry: SalesJournalEntry) -> dict:
@@ -798,14 +1152,14 @@ def create_sales_journal_entry(db: Session, data_entry: SalesJournalEntry) -> di
     for supplier_id, amount in consign_by_supplier.items():
         if amount and amount > 0:
             # Use HPP (5001) as the debit account for consignment payable clearing
-            acc_hpp = db.execute(select(Account).where(Account.code == "5001")).scalar_one_or_none()
-            acc_payable = db.execute(select(Account).where(Account.code == "3002")).scalar_one_or_none()
+            acc_hpp = account_cache.get_by_code(db, "5001")
+            acc_payable = account_cache.get_by_code(db, "3002")
             if not acc_hpp or not acc_payable:
                 raise ValueError("Akun untuk HPP atau hutang konsinyasi (5001/3002) belum tersedia")
 
             cons_entry = JournalEntry(
                 id=uuid.uuid4(),
-                entry_no=f"CONS-{uuid.uuid4().hex[:8]}",
+                entry_no=generate_entry_no(db, "consignment", data_entry.date),
                 date=data_entry.date,
                 memo=f"Hutang konsinyasi untuk supplier {supplier_id} - WO {data_entry.workorder_id}",
                 journal_type=JournalType.consignment,
@@ -834,6 +1188,7 @@ def create_sales_journal_entry(db: Session, data_entry: SalesJournalEntry) -> di
                 credit=amount
             )
             db.add_all([jl1, jl2])
+            _apply_daily_balance(db, data_entry.date, [(acc_hpp.id, amount, Decimal("0.00")), (acc_payable.id, Decimal("0.00"), amount)])
             cons_entries.append(cons_entry)
 
     db.commit()
@@ -1012,10 +1367,11 @@ def create_internal_consumption_journal_entry(
     return _to_entry_out(db, entry)
 
 
-def create_purchase_journal_entry(db: Session, data_entry: PurchaseJournalEntry) -> dict:
+def create_purchase_journal_entry(db: Session, data_entry: PurchaseJournalEntry, commit: bool = True) -> dict:
     """
     Create a purchase journal entry for product and service purchases (perpetual inventory).
-    Assumes hutang (payable) for purchases, with HPP for costs.
+    Assumes hutang (payable) for purchases, with HPP for costs. Pass commit=False
+    to post it inside the caller's transaction (e.g. a PO goods receipt).
     """
     lines: List[JournalLineCreate] = []
 
@@ -1071,7 +1427,7 @@ def create_purchase_journal_entry(db: Session, data_entry: PurchaseJournalEntry)
         purchase_id=data_entry.purchase_id,
         lines=lines
     )
-    entry = _create_entry(db, payload, created_by="system")
+    entry = _create_entry(db, payload, created_by="system", commit=commit)
     return _to_entry_out(db, entry)
 
 
@@ -1260,67 +1616,192 @@ def create_lost_goods_journal_entry(db: Session, data_entry: LostGoodsJournalEnt
     return _to_entry_out(db, entry)
 
 
+CASH_BOOK_STREAM_BATCH = 1000
+
+
+def _encode_cash_book_cursor(account_id, entry_date: date, created_at, line_id, balance: Decimal) -> str:
+    payload = {
+        "a": str(account_id),
+        "d": entry_date.isoformat(),
+        "c": created_at.isoformat() if created_at else None,
+        "i": str(line_id),
+        "b": str(balance),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def _decode_cash_book_cursor(cursor: str, account_id) -> tuple:
+    """
+    Decode a cash book cursor into (date, created_at, line_id, running_balance).
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another account.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        cursor_account = uuid.UUID(payload["a"])
+        entry_date = date.fromisoformat(payload["d"])
+        created_at = datetime.datetime.fromisoformat(payload["c"]) if payload["c"] else None
+        line_id = uuid.UUID(payload["i"])
+        balance = Decimal(payload["b"])
+    except (ValueError, KeyError, TypeError, decimal.InvalidOperation) as e:
+        raise ValueError("Invalid cash book cursor") from e
+    if cursor_account != uuid.UUID(str(account_id)):
+        raise ValueError("Cash book cursor does not belong to this account")
+    return entry_date, created_at, line_id, balance
+
+
+def _cash_book_side(normal_balance, debit: Decimal, credit: Decimal) -> tuple:
+    """Debit/credit as shown in the cash book (reversed for credit-normal accounts)."""
+    if normal_balance == "debit":
+        return debit, credit
+    return credit, debit
+
+
+def _cash_book_lines_query(db: Session, request: CashBookReportRequest):
+    """Lines of one account in the date range, in stable (date, created_at, id) order."""
+    return db.query(
+        JournalLine.id,
+        JournalEntry.date,
+        JournalEntry.created_at,
+        JournalEntry.memo,
+        JournalLine.debit,
+        JournalLine.credit
+    ).join(JournalEntry, JournalLine.entry_id == JournalEntry.id).filter(
+        JournalLine.account_id == request.account_id,
+        JournalEntry.date >= request.start_date,
+        JournalEntry.date <= request.end_date
+    ).order_by(JournalEntry.date, JournalEntry.created_at, JournalLine.id)
+
+
+def _get_cash_book_account(db: Session, request: CashBookReportRequest) -> tuple:
+    account = db.query(Account).filter(Account.id == request.account_id).first()
+    if not account:
+        raise ValueError(f"Account with id '{request.account_id}' not found")
+
+    # Opening balance from the daily rollup (everything before start_date),
+    # expressed in the account's normal-balance direction
+    opening_net = _get_opening_balances(db, [account.id], request.start_date).get(account.id, Decimal("0.00"))
+    return account, _to_normal_balance(opening_net, account.normal_balance)
+
+
 def generate_cash_book_report(db: Session, request: CashBookReportRequest) -> CashBookReport:
     """
     Generate a cash book report for a specific account within a date range.
     Includes opening balance, all transactions (cash-in and cash-out), and running balance.
+
+    When request.limit is set the report is keyset-paginated on
+    (date, created_at, line id). next_cursor carries the running balance, so
+    later pages never re-read earlier rows.
     """
-    # Get the account
-    account = db.query(Account).filter(Account.id == request.account_id).first()
-    if not account:
-        raise ValueError(f"Account with id '{request.account_id}' not found")
+    lines_query = _cash_book_lines_query(db, request)
 
-    # Calculate opening balance (sum of all transactions before start_date)
-    # Adjust based on normal_balance
-    if account.normal_balance == "debit":
-        net_change_expr = (JournalLine.debit - JournalLine.credit).label('net_change')
+    if request.cursor:
+        account = db.query(Account).filter(Account.id == request.account_id).first()
+        if not account:
+            raise ValueError(f"Account with id '{request.account_id}' not found")
+        after_date, after_created, after_id, opening_balance = _decode_cash_book_cursor(request.cursor, account.id)
+        lines_query = lines_query.filter(
+            tuple_(JournalEntry.date, JournalEntry.created_at, JournalLine.id) > tuple_(after_date, after_created, after_id)
+        )
     else:
-        net_change_expr = (JournalLine.credit - JournalLine.debit).label('net_change')
+        account, opening_balance = _get_cash_book_account(db, request)
 
-    opening_balance_query = db.query(net_change_expr).join(JournalEntry).filter(
-        JournalLine.account_id == request.account_id,
-        JournalEntry.date < request.start_date
-    )
-    opening_balance_result = db.execute(opening_balance_query).all()
-    opening_balance = sum(row.net_change for row in opening_balance_result)
+    if request.limit:
+        # One extra row tells us whether there is a next page
+        lines_query = lines_query.limit(request.limit + 1)
 
-    # Get all journal lines for the account within the date range, ordered by date
-    lines_query = db.query(JournalLine, JournalEntry).join(JournalEntry).filter(
-        JournalLine.account_id == request.account_id,
-        JournalEntry.date >= request.start_date,
-        JournalEntry.date <= request.end_date
-    ).order_by(JournalEntry.date, JournalEntry.created_at)
+    rows = lines_query.all()
+    has_next = bool(request.limit) and len(rows) > request.limit
+    if has_next:
+        rows = rows[:request.limit]
 
     entries = []
     running_balance = opening_balance
 
-    for line, entry in lines_query:
-        # Determine debit and credit based on normal balance
-        if account.normal_balance == "debit":
-            debit = line.debit
-            credit = line.credit
-        else:
-            # For credit normal accounts, reverse the signs for cash book
-            debit = line.credit
-            credit = line.debit
-
-        # Update running balance
+    for row in rows:
+        debit, credit = _cash_book_side(account.normal_balance, row.debit, row.credit)
         running_balance += debit - credit
 
         entries.append(CashBookEntry(
-            date=entry.date,
-            memo=entry.memo,
+            date=row.date,
+            memo=row.memo,
             debit=debit,
             credit=credit,
             balance=running_balance
         ))
 
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        next_cursor = _encode_cash_book_cursor(account.id, last.date, last.created_at, last.id, running_balance)
+
     return CashBookReport(
+        account_code=account.code,
+        account_name=account.name,
         opening_balance=opening_balance,  # type: ignore
-        entries=entries
+        entries=entries,
+        next_cursor=next_cursor,
+        has_next=has_next
     )
 
 
+def export_cash_book_report(db: Session, request: CashBookReportRequest, export_format: str = "ndjson") -> Iterator[str]:
+    """
+    Stream a cash book as NDJSON or CSV without materializing the report.
+
+    The account and opening balance are resolved eagerly (so errors surface
+    before streaming starts); rows are then fetched from a server-side cursor
+    in batches of CASH_BOOK_STREAM_BATCH. The first record is the opening balance.
+
+    Raises:
+        ValueError: If the format is unsupported or the account does not exist.
+    """
+    if export_format not in ("ndjson", "csv"):
+        raise ValueError(f"Unsupported export format '{export_format}'")
+
+    account, opening_balance = _get_cash_book_account(db, request)
+    lines_query = _cash_book_lines_query(db, request).execution_options(yield_per=CASH_BOOK_STREAM_BATCH)
+
+    def _records():
+        yield {
+            "date": request.start_date.isoformat(),
+            "memo": "Saldo awal",
+            "debit": "0.00",
+            "credit": "0.00",
+            "balance": str(opening_balance),
+        }
+        running_balance = opening_balance
+        for row in lines_query:
+            debit, credit = _cash_book_side(account.normal_balance, row.debit, row.credit)
+            running_balance += debit - credit
+            yield {
+                "date": row.date.isoformat(),
+                "memo": row.memo,
+                "debit": str(debit),
+                "credit": str(credit),
+                "balance": str(running_balance),
+            }
+
+    if export_format == "ndjson":
+        return (json.dumps(record) + "\n" for record in _records())
+
+    def _csv_lines():
+        fieldnames = ["date", "memo", "debit", "credit", "balance"]
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+        writer.writeheader()
+        for record in _records():
+            writer.writerow(record)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        if buffer.getvalue():
+            yield buffer.getvalue()
+
+    return _csv_lines()
+
+
 def generate_expense_report(db: Session, request: ExpenseReportRequest) -> ExpenseReport:
     """
     Generate an expense report within a date range, optionally filtered by expense_type and status.
@@ -1401,80 +1882,60 @@ def generate_profit_loss_report(db: Session, request: ProfitLossReportRequest) -
     """
     Generate a profit and loss report within a date range.
     Summarizes total revenue and total expenses, calculates net profit.
-    """
-    # Get all revenue accounts (account_type == 'revenue')
-    revenue_accounts = db.query(Account).filter(Account.account_type == 'revenue', Account.is_active == True).all()
-    revenue_account_ids = [acc.id for acc in revenue_accounts]
 
-    # Get all expense accounts (account_type == 'expense')
-    expense_accounts = db.query(Account).filter(Account.account_type == 'expense', Account.is_active == True).all()
-    expense_account_ids = [acc.id for acc in expense_accounts]
-
-    # Calculate total revenue: sum of credits for revenue accounts (since revenue is credited)
-    revenue_query = db.query(
-        (JournalLine.credit - JournalLine.debit).label('net_revenue')
-    ).join(JournalEntry).filter(
-        JournalLine.account_id.in_(revenue_account_ids),
-        JournalEntry.date >= request.start_date,
-        JournalEntry.date <= request.end_date
-    )
-    revenue_result = db.execute(revenue_query).all()
-    total_revenue = sum(row.net_revenue for row in revenue_result)
-
-    # Calculate total expenses: sum of debits for expense accounts (since expenses are debited)
-    expense_query = db.query(
-        (JournalLine.debit - JournalLine.credit).label('net_expense')
-    ).join(JournalEntry).filter(
-        JournalLine.account_id.in_(expense_account_ids),
-        JournalEntry.date >= request.start_date,
-        JournalEntry.date <= request.end_date
+    Totals and the per-account breakdown come from a single aggregate query
+    grouped by account over the account_daily_balance rollup, so the cost
+    depends on accounts x days in range rather than on the number of lines.
+    """
+    # Revenue is credit-normal, expense is debit-normal
+    signed_amount = case(
+        (Account.account_type == AccountType.revenue, AccountDailyBalance.credit_total - AccountDailyBalance.debit_total),
+        else_=AccountDailyBalance.debit_total - AccountDailyBalance.credit_total,
     )
-    expense_result = db.execute(expense_query).all()
-    total_expenses = sum(row.net_expense for row in expense_result)
 
-    # Calculate net profit
-    net_profit = total_revenue - total_expenses
+    rows = db.query(
+        Account.code,
+        Account.name,
+        Account.account_type,
+        func.sum(signed_amount).label('amount')
+    ).join(AccountDailyBalance, AccountDailyBalance.account_id == Account.id)\
+     .filter(
+        Account.account_type.in_([AccountType.revenue, AccountType.expense]),
+        Account.is_active == True,
+        AccountDailyBalance.date >= request.start_date,
+        AccountDailyBalance.date <= request.end_date
+    ).group_by(Account.id, Account.code, Account.name, Account.account_type)\
+     .order_by(Account.code)\
+     .all()
 
-    # Build revenue items
     revenues = []
-    for acc in revenue_accounts:
-        rev_query = db.query(
-            (JournalLine.credit - JournalLine.debit).label('amount')
-        ).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.date >= request.start_date,
-            JournalEntry.date <= request.end_date
-        )
-        rev_amount = sum(row.amount for row in db.execute(rev_query).all())
-        if rev_amount != 0:
-            revenues.append(ProfitLossReportItem(
-                account_code=acc.code,
-                account_name=acc.name,
-                amount=rev_amount  # type: ignore
-            ))
-
-    # Build expense items
     expenses = []
-    for acc in expense_accounts:
-        exp_query = db.query(
-            (JournalLine.debit - JournalLine.credit).label('amount')
-        ).join(JournalEntry).filter(
-            JournalLine.account_id == acc.id,
-            JournalEntry.date >= request.start_date,
-            JournalEntry.date <= request.end_date
+    total_revenue = Decimal("0.00")
+    total_expenses = Decimal("0.00")
+
+    for row in rows:
+        amount = row.amount or Decimal("0.00")
+        if amount == 0:
+            continue
+        item = ProfitLossReportItem(
+            account_code=row.code,
+            account_name=row.name,
+            amount=amount
         )
-        exp_amount = sum(row.amount for row in db.execute(exp_query).all())
-        if exp_amount != 0:
-            expenses.append(ProfitLossReportItem(
-                account_code=acc.code,
-                account_name=acc.name,
-                amount=exp_amount  # type: ignore
-            ))
+        if row.account_type == AccountType.revenue:
+            revenues.append(item)
+            total_revenue += amount
+        else:
+            expenses.append(item)
+            total_expenses += amount
+
+    # Calculate net profit
+    net_profit = total_revenue - total_expenses
 
     return ProfitLossReport(
-        total_revenue=total_revenue,  # type: ignore
-        total_expenses=total_expenses,  # type: ignore
-        net_profit=net_profit,  # type: ignore
+        total_revenue=total_revenue,
+        total_expenses=total_expenses,
+        net_profit=net_profit,
         revenues=revenues,
         expenses=expenses
     )
@@ -1552,77 +2013,131 @@ def generate_cash_report(db: Session, request: CashReportRequest) -> CashReport:
         entries=entries
     )
 
+AGING_BUCKETS = ("aging_0_30", "aging_31_60", "aging_61_90", "aging_90_plus")
+
+
+def _age_outstanding(outstanding: Decimal, charges: List[Decimal]) -> List[Decimal]:
+    """
+    Spread an outstanding balance over the aging buckets, newest first.
+
+    Payments settle the oldest charges first, so whatever is still open is
+    made up of the most recent charges. Each bucket takes at most the charges
+    booked in its window; what is left falls into the oldest bucket. A credit
+    (negative) balance is reported as current.
+    """
+    buckets = [Decimal("0.00")] * len(charges)
+    if outstanding <= 0:
+        buckets[0] = outstanding
+        return buckets
+    remaining = outstanding
+    for i, charged in enumerate(charges[:-1]):
+        buckets[i] = min(remaining, charged or Decimal("0.00"))
+        remaining -= buckets[i]
+    buckets[-1] = remaining
+    return buckets
+
+
+def _open_balances_by_entity(
+    db: Session,
+    account_code: str,
+    entity_column,
+    entity_model,
+    charge_side: str,
+    request: ReceivablePayableReportRequest
+) -> list:
+    """
+    Aggregate one control account per customer/supplier in a single pass.
+
+    Returns rows of (entity_id, entity_name, balance, charged per aging
+    bucket) for entities with a non-zero balance. The balance is signed so
+    that an open receivable/payable is positive; aging is measured from
+    request.end_date.
+    """
+    account = account_cache.get_by_code(db, account_code)
+    if account is None:
+        return []
+
+    charge = JournalLine.debit if charge_side == "debit" else JournalLine.credit
+    settle = JournalLine.credit if charge_side == "debit" else JournalLine.debit
+    # Bucket boundaries as dates keep the predicate on JournalEntry.date sargable
+    cutoffs = [request.end_date - datetime.timedelta(days=days) for days in (30, 60, 90)]
+    windows = [
+        JournalEntry.date >= cutoffs[0],
+        (JournalEntry.date < cutoffs[0]) & (JournalEntry.date >= cutoffs[1]),
+        (JournalEntry.date < cutoffs[1]) & (JournalEntry.date >= cutoffs[2]),
+    ]
+    balance = func.sum(charge - settle)
+    aggregated = (
+        select(
+            entity_column.label("entity_id"),
+            balance.label("balance"),
+            *[func.sum(case((window, charge), else_=0)).label(f"charged_{i}") for i, window in enumerate(windows)],
+        )
+        .select_from(JournalLine)
+        .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+        .where(
+            JournalLine.account_id == account.id,
+            entity_column.isnot(None),
+            JournalEntry.date >= request.start_date,
+            JournalEntry.date <= request.end_date,
+        )
+        .group_by(entity_column)
+        .having(balance != 0)
+        .subquery()
+    )
+    # Names are joined only for the (few) entities that still have a balance
+    return db.execute(
+        select(aggregated, entity_model.nama.label("entity_name"))
+        .join(entity_model, entity_model.id == aggregated.c.entity_id)
+        .order_by(entity_model.nama)
+    ).all()
+
+
 def generate_receivable_payable_report(db: Session, request: ReceivablePayableReportRequest):
+    """
+    Open receivables (2001) per customer and payables (3001) per supplier.
 
-    # Get all customers with receivable balances
-    customer_receivables = db.query(
-        Customer.id.label('entity_id'),
-        Customer.nama.label('entity_name'),
-        func.sum(
-            func.coalesce(
-                select(func.sum(JournalLine.debit - JournalLine.credit))
-                .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-                .where(JournalLine.account_id == select(Account.id).where(Account.code == '2001'))
-                .where(JournalEntry.customer_id == Customer.id)
-                .where(JournalEntry.date >= request.start_date)
-                .where(JournalEntry.date <= request.end_date)
-                .scalar_subquery(), 0
-            )
-        ).label('total_receivable')
-    ).group_by(Customer.id, Customer.nama).all()
-
-    # Get all suppliers with payable balances
-    supplier_payables = db.query(
-        Supplier.id.label('entity_id'),
-        Supplier.nama.label('entity_name'),
-        func.sum(
-            func.coalesce(
-                select(func.sum(JournalLine.credit - JournalLine.debit))
-                .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
-                .where(JournalLine.account_id == select(Account.id).where(Account.code == '3001'))
-                .where(JournalEntry.supplier_id == Supplier.id)
-                .where(JournalEntry.date >= request.start_date)
-                .where(JournalEntry.date <= request.end_date)
-                .scalar_subquery(), 0
-            )
-        ).label('total_payable')
-    ).group_by(Supplier.id, Supplier.nama).all()
+    Each control account is aggregated once, grouped by the entry's
+    customer_id/supplier_id, and only non-zero balances are returned. Aging
+    buckets (0-30/31-60/61-90/90+ days before end_date) come from the same
+    pass.
+
+    Args:
+        db: Database session.
+        request: Date range of the journal entries to include.
 
+    Returns:
+        ReceivablePayableReport: Totals and one item per entity, with aging.
+    """
     items = []
     total_receivable = Decimal("0.00")
     total_payable = Decimal("0.00")
 
-    # Process customers (receivables)
-    for cust in customer_receivables:
-        if cust.total_receivable > 0:
-            item = ReceivablePayableItem(
-                entity_id=str(cust.entity_id),
-                entity_name=cust.entity_name,
-                entity_type="customer",
-                customer_id=str(cust.entity_id),
-                supplier_id=None,
-                total_receivable=cust.total_receivable,
-                total_payable=Decimal("0.00"),
-                balance=cust.total_receivable
-            )
-            items.append(item)
-            total_receivable += cust.total_receivable
-
-    # Process suppliers (payables)
-    for supp in supplier_payables:
-        if supp.total_payable > 0:
-            item = ReceivablePayableItem(
-                entity_id=str(supp.entity_id),
-                entity_name=supp.entity_name,
-                entity_type="supplier",
-                customer_id=None,
-                supplier_id=str(supp.entity_id),
-                total_receivable=Decimal("0.00"),
-                total_payable=supp.total_payable,
-                balance=-supp.total_payable
-            )
-            items.append(item)
-            total_payable += supp.total_payable
+    sides = (
+        ("2001", JournalEntry.customer_id, Customer, "debit", "customer"),
+        ("3001", JournalEntry.supplier_id, Supplier, "credit", "supplier"),
+    )
+    for account_code, entity_column, entity_model, charge_side, entity_type in sides:
+        for row in _open_balances_by_entity(db, account_code, entity_column, entity_model, charge_side, request):
+            amount = Decimal(row.balance)
+            charges = [Decimal(row.charged_0 or 0), Decimal(row.charged_1 or 0), Decimal(row.charged_2 or 0), Decimal("0.00")]
+            aging = _age_outstanding(amount, charges)
+            is_customer = entity_type == "customer"
+            items.append(ReceivablePayableItem(
+                entity_id=str(row.entity_id),
+                entity_name=row.entity_name,
+                entity_type=entity_type,
+                customer_id=str(row.entity_id) if is_customer else None,
+                supplier_id=None if is_customer else str(row.entity_id),
+                total_receivable=amount if is_customer else Decimal("0.00"),
+                total_payable=Decimal("0.00") if is_customer else amount,
+                balance=amount if is_customer else -amount,
+                **dict(zip(AGING_BUCKETS, aging))
+            ))
+            if is_customer:
+                total_receivable += amount
+            else:
+                total_payable += amount
 
     net_balance = total_receivable - total_payable
 
@@ -1676,41 +2191,39 @@ def generate_consignment_payable_report(db: Session, request: ReceivablePayableR
 def generate_product_sales_report(db: Session, request: ProductSalesReportRequest) -> ProductSalesReport:
     """
     Generate a product sales report within a date range.
-    Lists each product line sold in workorders, with totals for quantity and sales.
+    Lists each product line of workorders recognized as a sale, with totals for quantity and sales.
     Optionally filters by product_id and customer_id.
-    """
-    from models.customer import Vehicle
 
-    # Query product_ordered joined with workorder, product, customer, vehicle
+    Reads sales_line_fact only; hpp is the unit cost recorded when the sale
+    was recognized, not the product's current cost.
+    """
     query = db.query(
-        Workorder.no_wo,
-        Workorder.tanggal_masuk,
-        Customer.nama.label('customer_name'),
-        Product.name.label('product_name'),
-        Vehicle.no_pol,
-        ProductOrdered.quantity,
-        ProductOrdered.price,
-        Product.cost.label('hpp'),
-        ProductOrdered.subtotal,
-        ProductOrdered.discount
-    ).join(ProductOrdered, Workorder.id == ProductOrdered.workorder_id)\
-     .join(Product, ProductOrdered.product_id == Product.id)\
-     .join(Customer, Workorder.customer_id == Customer.id)\
-     .outerjoin(Vehicle, Workorder.vehicle_id == Vehicle.id)
+        SalesLineFact.no_wo,
+        SalesLineFact.tanggal_masuk,
+        SalesLineFact.customer_name,
+        SalesLineFact.item_name.label('product_name'),
+        SalesLineFact.vehicle_no_pol.label('no_pol'),
+        SalesLineFact.quantity,
+        SalesLineFact.price,
+        SalesLineFact.hpp,
+        SalesLineFact.subtotal,
+        SalesLineFact.discount
+    ).filter(SalesLineFact.line_type == 'product')\
+     .filter(SalesLineFact.customer_id.is_not(None))
 
     if request.workorder_ids is None:
-        query = query.filter(Workorder.tanggal_masuk >= request.start_date)\
-            .filter(Workorder.tanggal_masuk < request.end_date + datetime.timedelta(days=1))
+        query = query.filter(SalesLineFact.tanggal_masuk >= request.start_date)\
+            .filter(SalesLineFact.tanggal_masuk < request.end_date + datetime.timedelta(days=1))
 
     if request.product_id:
-        query = query.filter(ProductOrdered.product_id == request.product_id)
+        query = query.filter(SalesLineFact.item_id == request.product_id)
 
     if request.customer_id:
-        query = query.filter(Workorder.customer_id == request.customer_id)
+        query = query.filter(SalesLineFact.customer_id == request.customer_id)
     if request.workorder_ids is not None:
-        query = query.filter(Workorder.id.in_(request.workorder_ids))
+        query = query.filter(SalesLineFact.workorder_id.in_(request.workorder_ids))
 
-    query = query.order_by(Workorder.tanggal_masuk, Workorder.no_wo)
+    query = query.order_by(SalesLineFact.tanggal_masuk, SalesLineFact.no_wo)
 
     results = query.all()
 
@@ -1759,43 +2272,39 @@ def generate_product_sales_report(db: Session, request: ProductSalesReportReques
 def generate_service_sales_report(db: Session, request: ServiceSalesReportRequest) -> ServiceSalesReport:
     """
     Generate a service sales report within a date range.
-    Lists each service line sold in workorders, with totals for quantity and sales.
+    Lists each service line of workorders recognized as a sale, with totals for quantity and sales.
     Optionally filters by service_id and customer_id.
-    """
-    from models.workorder import Workorder, ServiceOrdered, Service
-    from models.customer import Customer, Vehicle
-    from sqlalchemy import func
 
-    # Query service_ordered joined with workorder, service, customer, vehicle
+    Reads sales_line_fact only; hpp is the unit cost recorded when the sale
+    was recognized, not the service's current cost.
+    """
     query = db.query(
-        Workorder.no_wo,
-        Workorder.tanggal_masuk,
-        Customer.nama.label('customer_name'),
-        Service.name.label('service_name'),
-        Vehicle.no_pol,
-        ServiceOrdered.quantity,
-        ServiceOrdered.price,
-        Service.cost.label('hpp'),
-        ServiceOrdered.subtotal,
-        ServiceOrdered.discount
-    ).join(ServiceOrdered, Workorder.id == ServiceOrdered.workorder_id)\
-     .join(Service, ServiceOrdered.service_id == Service.id)\
-     .join(Customer, Workorder.customer_id == Customer.id)\
-     .outerjoin(Vehicle, Workorder.vehicle_id == Vehicle.id)
+        SalesLineFact.no_wo,
+        SalesLineFact.tanggal_masuk,
+        SalesLineFact.customer_name,
+        SalesLineFact.item_name.label('service_name'),
+        SalesLineFact.vehicle_no_pol.label('no_pol'),
+        SalesLineFact.quantity,
+        SalesLineFact.price,
+        SalesLineFact.hpp,
+        SalesLineFact.subtotal,
+        SalesLineFact.discount
+    ).filter(SalesLineFact.line_type == 'service')\
+     .filter(SalesLineFact.customer_id.is_not(None))
 
     if request.workorder_ids is None:
-        query = query.filter(func.date(Workorder.tanggal_masuk) >= request.start_date)\
-            .filter(func.date(Workorder.tanggal_masuk) <= request.end_date)
+        query = query.filter(SalesLineFact.tanggal_masuk >= request.start_date)\
+            .filter(SalesLineFact.tanggal_masuk < request.end_date + datetime.timedelta(days=1))
 
     if request.service_id:
-        query = query.filter(ServiceOrdered.service_id == request.service_id)
+        query = query.filter(SalesLineFact.item_id == request.service_id)
 
     if request.customer_id:
-        query = query.filter(Workorder.customer_id == request.customer_id)
+        query = query.filter(SalesLineFact.customer_id == request.customer_id)
     if request.workorder_ids is not None:
-        query = query.filter(Workorder.id.in_(request.workorder_ids))
+        query = query.filter(SalesLineFact.workorder_id.in_(request.workorder_ids))
 
-    query = query.order_by(Workorder.tanggal_masuk, Workorder.no_wo)
+    query = query.order_by(SalesLineFact.tanggal_masuk, SalesLineFact.no_wo)
 
     results = query.all()
 
@@ -1979,68 +2488,83 @@ def _build_payment_channels(cash_books: list[CashBookReport]) -> tuple[list[dict
 
 
 def _extract_daily_outflows(db: Session, report_date: date) -> dict:
+    """
+    Cash outflows (paid expenses and PO payments) for one day.
+
+    All lines of the day's expense/AP-payment entries are fetched in one query
+    together with their account, PO number and supplier name, then grouped per
+    entry in Python, so the query count does not depend on the day's volume.
+    """
     expense_items: list[dict] = []
     po_payment_items: list[dict] = []
     expense_total = Decimal("0.00")
     po_payment_total = Decimal("0.00")
 
-    expense_entries = db.query(JournalEntry).filter(
-        JournalEntry.date == report_date,
-        JournalEntry.journal_type == JournalType.expense
-    ).all()
-
-    for entry in expense_entries:
-        lines = db.query(JournalLine, Account).join(Account, JournalLine.account_id == Account.id).filter(
-            JournalLine.entry_id == entry.id
-        ).all()
-
-        expense_line = next((x for x in lines if x[1].account_type == "expense" and cast(Decimal, x[0].debit) > 0), None)
-        cash_lines = [x for x in lines if x[1].account_type == "asset" and cast(Decimal, x[0].credit) > 0]
-
-        for cash_line, cash_account in cash_lines:
-            amount = cast(Decimal, cash_line.credit)
-            stable_code, channel_type = _classify_payment_channel(cash_account.code, cash_account.name)
-            expense_items.append({
-                "expense_id": None,
-                "payment_id": str(entry.id),
-                "payment_date": entry.date.isoformat(),
-                "category": expense_line[1].name if expense_line else None,
-                "description": entry.memo,
-                "amount": amount,
-                "payment_channel": channel_type,
-                "account_code": cash_account.code,
-                "account_name": cash_account.name,
-                "channel_code": stable_code
-            })
-            expense_total += amount
-
-    po_payment_entries = db.query(JournalEntry).filter(
+    rows = db.query(
+        JournalLine.entry_id,
+        JournalLine.debit,
+        JournalLine.credit,
+        JournalEntry.date,
+        JournalEntry.memo,
+        JournalEntry.journal_type,
+        JournalEntry.purchase_id,
+        Account.code.label('account_code'),
+        Account.name.label('account_name'),
+        Account.account_type,
+        PurchaseOrder.po_no,
+        Supplier.nama.label('supplier_name')
+    ).join(JournalEntry, JournalLine.entry_id == JournalEntry.id)\
+     .join(Account, JournalLine.account_id == Account.id)\
+     .outerjoin(PurchaseOrder, JournalEntry.purchase_id == PurchaseOrder.id)\
+     .outerjoin(Supplier, JournalEntry.supplier_id == Supplier.id)\
+     .filter(
         JournalEntry.date == report_date,
-        JournalEntry.journal_type == JournalType.ap_payment
-    ).all()
-
-    for entry in po_payment_entries:
-        lines = db.query(JournalLine, Account).join(Account, JournalLine.account_id == Account.id).filter(
-            JournalLine.entry_id == entry.id
-        ).all()
-        cash_lines = [x for x in lines if x[1].account_type == "asset" and cast(Decimal, x[0].credit) > 0]
-
-        for cash_line, cash_account in cash_lines:
-            amount = cast(Decimal, cash_line.credit)
-            stable_code, channel_type = _classify_payment_channel(cash_account.code, cash_account.name)
-            po_payment_items.append({
-                "purchase_order_id": str(entry.purchase_id) if entry.purchase_id else None,
-                "purchase_order_no": entry.purchase_order.po_no if entry.purchase_order else None,
-                "payment_id": str(entry.id),
-                "payment_date": entry.date.isoformat(),
-                "supplier_name": entry.supplier.nama if entry.supplier else None,
-                "amount_paid": amount,
-                "payment_channel": channel_type,
-                "account_code": cash_account.code,
-                "account_name": cash_account.name,
-                "channel_code": stable_code
-            })
-            po_payment_total += amount
+        JournalEntry.journal_type.in_([JournalType.expense, JournalType.ap_payment])
+    ).order_by(JournalEntry.created_at, JournalEntry.id, JournalLine.id).all()
+
+    lines_by_entry: dict = {}
+    for row in rows:
+        lines_by_entry.setdefault(row.entry_id, []).append(row)
+
+    for entry_id, lines in lines_by_entry.items():
+        entry = lines[0]
+        cash_lines = [x for x in lines if x.account_type == "asset" and cast(Decimal, x.credit) > 0]
+
+        if entry.journal_type == JournalType.expense:
+            expense_line = next((x for x in lines if x.account_type == "expense" and cast(Decimal, x.debit) > 0), None)
+            for cash_line in cash_lines:
+                amount = cast(Decimal, cash_line.credit)
+                stable_code, channel_type = _classify_payment_channel(cash_line.account_code, cash_line.account_name)
+                expense_items.append({
+                    "expense_id": None,
+                    "payment_id": str(entry_id),
+                    "payment_date": entry.date.isoformat(),
+                    "category": expense_line.account_name if expense_line else None,
+                    "description": entry.memo,
+                    "amount": amount,
+                    "payment_channel": channel_type,
+                    "account_code": cash_line.account_code,
+                    "account_name": cash_line.account_name,
+                    "channel_code": stable_code
+                })
+                expense_total += amount
+        else:
+            for cash_line in cash_lines:
+                amount = cast(Decimal, cash_line.credit)
+                stable_code, channel_type = _classify_payment_channel(cash_line.account_code, cash_line.account_name)
+                po_payment_items.append({
+                    "purchase_order_id": str(entry.purchase_id) if entry.purchase_id else None,
+                    "purchase_order_no": entry.po_no,
+                    "payment_id": str(entry_id),
+                    "payment_date": entry.date.isoformat(),
+                    "supplier_name": entry.supplier_name,
+                    "amount_paid": amount,
+                    "payment_channel": channel_type,
+                    "account_code": cash_line.account_code,
+                    "account_name": cash_line.account_name,
+                    "channel_code": stable_code
+                })
+                po_payment_total += amount
 
     return {
         "total_cash_out": expense_total + po_payment_total,
@@ -2059,6 +2583,9 @@ def generate_daily_report(db: Session, request: DailyReportRequest) -> DailyRepo
     """
     Generate a comprehensive daily report combining multiple reports for a specific date.
     Includes cash book for all cash/bank accounts combined, product sales, service sales, profit/loss, and work order summary.
+
+    Built from a fixed number of set-based queries; the count does not grow
+    with the number of accounts, entries or workorders of the day.
     """
     # Use the date as both start and end for single day
     start_date = request.date
@@ -2079,48 +2606,45 @@ def generate_daily_report(db: Session, request: DailyReportRequest) -> DailyRepo
     cash_accounts = db.query(Account).filter(
         Account.code.in_(['1001', '1002', '1003', '1004', '1005']),
         Account.is_active == True
-    ).all()
+    ).order_by(Account.code).all()
+
+    cash_account_ids = [account.id for account in cash_accounts]
+    opening_nets = _get_opening_balances(db, cash_account_ids, start_date)
+
+    # Lines of every payment-channel account in one query, grouped per account below
+    lines_by_account: dict = defaultdict(list)
+    if cash_account_ids:
+        day_lines = db.query(
+            JournalLine.account_id,
+            JournalEntry.date,
+            JournalEntry.memo,
+            JournalLine.debit,
+            JournalLine.credit
+        ).join(JournalEntry, JournalLine.entry_id == JournalEntry.id).filter(
+            JournalLine.account_id.in_(cash_account_ids),
+            JournalEntry.date >= start_date,
+            JournalEntry.date <= end_date
+        ).order_by(JournalEntry.date, JournalEntry.created_at, JournalLine.id).all()
+        for row in day_lines:
+            lines_by_account[row.account_id].append(row)
 
     cash_books = []
     for account in cash_accounts:
-        # Calculate opening balance for this account
-        if account.normal_balance == "debit":
-            net_change_expr = (JournalLine.debit - JournalLine.credit).label('net_change')
-        else:
-            net_change_expr = (JournalLine.credit - JournalLine.debit).label('net_change')
-
-        opening_balance_query = db.query(net_change_expr).join(JournalEntry).filter(
-            JournalLine.account_id == account.id,
-            JournalEntry.date < start_date
+        opening_balance = _to_normal_balance(
+            opening_nets.get(account.id, Decimal("0.00")),
+            account.normal_balance
         )
-        opening_balance = sum(row.net_change for row in db.execute(opening_balance_query).all())
-
-        # Get entries for this account within the date range
-        lines_query = db.query(JournalLine, JournalEntry).join(JournalEntry).filter(
-            JournalLine.account_id == account.id,
-            JournalEntry.date >= start_date,
-            JournalEntry.date <= end_date
-        ).order_by(JournalEntry.date, JournalEntry.created_at)
 
         entries = []
         running_balance = opening_balance
 
-        for line, entry in lines_query:
-            # Determine debit and credit based on normal balance
-            if account.normal_balance == "debit":
-                debit = line.debit
-                credit = line.credit
-            else:
-                # For credit normal accounts, reverse the signs for cash book
-                debit = line.credit
-                credit = line.debit
-
-            # Update running balance
+        for row in lines_by_account[account.id]:
+            debit, credit = _cash_book_side(account.normal_balance, row.debit, row.credit)
             running_balance += debit - credit
 
             entries.append(CashBookEntry(
-                date=entry.date,
-                memo=entry.memo,
+                date=row.date,
+                memo=row.memo,
                 debit=debit,
                 credit=credit,
                 balance=running_balance
@@ -2329,8 +2853,8 @@ def generate_work_order_summary(
     ).join(Customer, Workorder.customer_id == Customer.id)
 
     if workorder_ids is None:
-        query = query.filter(func.date(Workorder.tanggal_masuk) >= start_date)\
-            .filter(func.date(Workorder.tanggal_masuk) <= end_date)
+        query = query.filter(Workorder.tanggal_masuk >= start_date)\
+            .filter(Workorder.tanggal_masuk < end_date + datetime.timedelta(days=1))
     else:
         query = query.filter(Workorder.id.in_(workorder_ids))
 
@@ -2365,64 +2889,98 @@ def generate_work_order_summary(
     )
 
 
+def _mechanic_sales_lines(start_date: date, end_date: date):
+    """Predicates selecting the sales_line_fact rows the mechanic sales report covers."""
+    return (
+        SalesLineFact.tanggal_masuk >= start_date,
+        SalesLineFact.tanggal_masuk < end_date + datetime.timedelta(days=1),
+        SalesLineFact.karyawan_id.is_not(None),
+        SalesLineFact.customer_id.is_not(None),
+    )
+
+
+def _mechanic_sales_summary(db: Session, request: MechanicSalesReportRequest) -> MechanicSalesReport:
+    """Per-mechanic per-day totals from one GROUP BY over sales_line_fact, no line detail."""
+    day = func.date(SalesLineFact.tanggal_masuk)
+
+    def by_type(line_type, column):
+        return func.coalesce(func.sum(case((SalesLineFact.line_type == line_type, column), else_=0)), 0)
+
+    rows = db.execute(
+        select(
+            SalesLineFact.karyawan_id.label('mechanic_id'),
+            SalesLineFact.karyawan_name.label('mechanic_name'),
+            day.label('date'),
+            by_type('product', SalesLineFact.subtotal).label('product_sales'),
+            by_type('service', SalesLineFact.subtotal).label('service_sales'),
+            by_type('product', 1).label('product_line_count'),
+            by_type('service', 1).label('service_line_count'),
+        ).where(*_mechanic_sales_lines(request.start_date, request.end_date))
+        .group_by(SalesLineFact.karyawan_id, SalesLineFact.karyawan_name, day)
+        .order_by(SalesLineFact.karyawan_name, day)
+    ).all()
+
+    items = []
+    total_product_sales = Decimal("0.00")
+    total_service_sales = Decimal("0.00")
+    for row in rows:
+        product_sales = Decimal(row.product_sales)
+        service_sales = Decimal(row.service_sales)
+        items.append(MechanicSalesReportItem(
+            mechanic_id=str(row.mechanic_id),
+            mechanic_name=row.mechanic_name,
+            date=row.date,
+            total_product_sales=product_sales,
+            total_service_sales=service_sales,
+            total_sales=product_sales + service_sales,
+            product_line_count=row.product_line_count,
+            service_line_count=row.service_line_count,
+        ))
+        total_product_sales += product_sales
+        total_service_sales += service_sales
+
+    return MechanicSalesReport(
+        total_product_sales=total_product_sales,
+        total_service_sales=total_service_sales,
+        total_sales=total_product_sales + total_service_sales,
+        items=items
+    )
+
+
 def generate_mechanic_sales_report(db: Session, request: MechanicSalesReportRequest) -> MechanicSalesReport:
     """
     Generate a sales report grouped by mechanic (karyawan) and date.
     Includes product and service sales for each mechanic per day with detailed breakdowns.
-    """
-    from models.karyawan import Karyawan
 
-    # Query detailed product sales by mechanic and date
-    product_detail_query = db.query(
-        Karyawan.id.label('mechanic_id'),
-        Karyawan.nama.label('mechanic_name'),
-        func.date(Workorder.tanggal_masuk).label('date'),
-        Workorder.no_wo,
-        Workorder.tanggal_masuk,
-        Customer.nama.label('customer_name'),
-        Product.name.label('product_name'),
-        ProductOrdered.quantity,
-        ProductOrdered.price,
-        ProductOrdered.subtotal,
-        ProductOrdered.discount
-    ).join(Workorder, Karyawan.id == Workorder.karyawan_id)\
-     .join(ProductOrdered, Workorder.id == ProductOrdered.workorder_id)\
-     .join(Product, ProductOrdered.product_id == Product.id)\
-     .join(Customer, Workorder.customer_id == Customer.id)\
-     .filter(func.date(Workorder.tanggal_masuk) >= request.start_date)\
-     .filter(func.date(Workorder.tanggal_masuk) <= request.end_date)\
-     .order_by(Karyawan.nama, func.date(Workorder.tanggal_masuk), Workorder.no_wo)
-
-    product_details = product_detail_query.all()
-
-    # Query detailed service sales by mechanic and date
-    service_detail_query = db.query(
-        Karyawan.id.label('mechanic_id'),
-        Karyawan.nama.label('mechanic_name'),
-        func.date(Workorder.tanggal_masuk).label('date'),
-        Workorder.no_wo,
-        Workorder.tanggal_masuk,
-        Customer.nama.label('customer_name'),
-        Service.name.label('service_name'),
-        ServiceOrdered.quantity,
-        ServiceOrdered.price,
-        ServiceOrdered.subtotal,
-        ServiceOrdered.discount
-    ).join(Workorder, Karyawan.id == Workorder.karyawan_id)\
-     .join(ServiceOrdered, Workorder.id == ServiceOrdered.workorder_id)\
-     .join(Service, ServiceOrdered.service_id == Service.id)\
-     .join(Customer, Workorder.customer_id == Customer.id)\
-     .filter(func.date(Workorder.tanggal_masuk) >= request.start_date)\
-     .filter(func.date(Workorder.tanggal_masuk) <= request.end_date)\
-     .order_by(Karyawan.nama, func.date(Workorder.tanggal_masuk), Workorder.no_wo)
-
-    service_details = service_detail_query.all()
+    Covers workorders recognized as a sale and reads sales_line_fact only.
+    With request.include_details=False only the per-day totals are computed,
+    in SQL; the lines of one mechanic-day come from get_mechanic_sales_details().
+    """
+    if not request.include_details:
+        return _mechanic_sales_summary(db, request)
+
+    day = func.date(SalesLineFact.tanggal_masuk)
+    lines = db.query(
+        SalesLineFact.karyawan_id.label('mechanic_id'),
+        SalesLineFact.karyawan_name.label('mechanic_name'),
+        day.label('date'),
+        SalesLineFact.line_type,
+        SalesLineFact.no_wo,
+        SalesLineFact.tanggal_masuk,
+        SalesLineFact.customer_name,
+        SalesLineFact.item_name,
+        SalesLineFact.quantity,
+        SalesLineFact.price,
+        SalesLineFact.subtotal,
+        SalesLineFact.discount
+    ).filter(*_mechanic_sales_lines(request.start_date, request.end_date))\
+     .order_by(SalesLineFact.karyawan_name, day, SalesLineFact.no_wo, SalesLineFact.line_type, SalesLineFact.line_id)\
+     .all()
 
     # Group by mechanic and date
     mechanic_data = {}
 
-    # Process product details
-    for row in product_details:
+    for row in lines:
         key = (row.mechanic_id, row.date)
         if key not in mechanic_data:
             mechanic_data[key] = {
@@ -2432,40 +2990,31 @@ def generate_mechanic_sales_report(db: Session, request: MechanicSalesReportRequ
                 'product_details': [],
                 'service_details': []
             }
-        mechanic_data[key]['product_sales'] += row.subtotal
-        mechanic_data[key]['product_details'].append(MechanicProductSalesItem(
-            workorder_no=row.no_wo,
-            workorder_date=row.tanggal_masuk.date() if isinstance(row.tanggal_masuk, datetime.datetime) else row.tanggal_masuk,
-            customer_name=row.customer_name,
-            product_name=row.product_name,
-            quantity=row.quantity,
-            price=row.price,
-            subtotal=row.subtotal,
-            discount=row.discount
-        ))
-
-    # Process service details
-    for row in service_details:
-        key = (row.mechanic_id, row.date)
-        if key not in mechanic_data:
-            mechanic_data[key] = {
-                'mechanic_name': row.mechanic_name,
-                'product_sales': Decimal("0.00"),
-                'service_sales': Decimal("0.00"),
-                'product_details': [],
-                'service_details': []
-            }
-        mechanic_data[key]['service_sales'] += row.subtotal
-        mechanic_data[key]['service_details'].append(MechanicServiceSalesItem(
-            workorder_no=row.no_wo,
-            workorder_date=row.tanggal_masuk.date() if isinstance(row.tanggal_masuk, datetime.datetime) else row.tanggal_masuk,
-            customer_name=row.customer_name,
-            service_name=row.service_name,
-            quantity=row.quantity,
-            price=row.price,
-            subtotal=row.subtotal,
-            discount=row.discount
-        ))
+        workorder_date = row.tanggal_masuk.date() if isinstance(row.tanggal_masuk, datetime.datetime) else row.tanggal_masuk
+        if row.line_type == 'product':
+            mechanic_data[key]['product_sales'] += row.subtotal
+            mechanic_data[key]['product_details'].append(MechanicProductSalesItem(
+                workorder_no=row.no_wo,
+                workorder_date=workorder_date,
+                customer_name=row.customer_name,
+                product_name=row.item_name,
+                quantity=row.quantity,
+                price=row.price,
+                subtotal=row.subtotal,
+                discount=row.discount
+            ))
+        else:
+            mechanic_data[key]['service_sales'] += row.subtotal
+            mechanic_data[key]['service_details'].append(MechanicServiceSalesItem(
+                workorder_no=row.no_wo,
+                workorder_date=workorder_date,
+                customer_name=row.customer_name,
+                service_name=row.item_name,
+                quantity=row.quantity,
+                price=row.price,
+                subtotal=row.subtotal,
+                discount=row.discount
+            ))
 
     items = []
     total_product_sales = Decimal("0.00")
@@ -2486,6 +3035,8 @@ def generate_mechanic_sales_report(db: Session, request: MechanicSalesReportRequ
             total_product_sales=product_sales,
             total_service_sales=service_sales,
             total_sales=total_sales,
+            product_line_count=len(data['product_details']),
+            service_line_count=len(data['service_details']),
             product_details=data['product_details'],
             service_details=data['service_details']
         )
@@ -2501,3 +3052,73 @@ def generate_mechanic_sales_report(db: Session, request: MechanicSalesReportRequ
         total_sales=total_sales,
         items=items
     )
+
+
+def get_mechanic_sales_details(db: Session, request: MechanicSalesDetailRequest) -> MechanicSalesDetailPage:
+    """
+    One page of the product and service lines behind a mechanic-day of the mechanic sales report.
+
+    Lines are ordered by workorder number, product lines before service lines.
+
+    Raises:
+        ValueError: If the mechanic does not exist.
+    """
+    from models.karyawan import Karyawan
+
+    mechanic = db.query(Karyawan).filter(Karyawan.id == request.mechanic_id).first()
+    if not mechanic:
+        raise ValueError(f"Mechanic with id '{request.mechanic_id}' not found")
+
+    day_lines = select(
+        SalesLineFact.line_type,
+        SalesLineFact.line_id,
+        SalesLineFact.no_wo,
+        SalesLineFact.tanggal_masuk,
+        SalesLineFact.customer_name,
+        SalesLineFact.item_name,
+        SalesLineFact.quantity,
+        SalesLineFact.price,
+        SalesLineFact.subtotal,
+        SalesLineFact.discount,
+    ).where(
+        SalesLineFact.karyawan_id == mechanic.id,
+        *_mechanic_sales_lines(request.date, request.date),
+    ).subquery()
+
+    total = db.execute(select(func.count()).select_from(day_lines)).scalar() or 0
+    rows = db.execute(
+        select(day_lines)
+        .order_by(day_lines.c.no_wo, day_lines.c.line_type, day_lines.c.line_id)
+        .limit(request.limit)
+        .offset((request.page - 1) * request.limit)
+    ).all()
+
+    items = [
+        MechanicSalesDetailItem(
+            line_type=row.line_type,
+            line_id=str(row.line_id),
+            workorder_no=row.no_wo,
+            workorder_date=row.tanggal_masuk.date() if isinstance(row.tanggal_masuk, datetime.datetime) else row.tanggal_masuk,
+            customer_name=row.customer_name,
+            item_name=row.item_name,
+            quantity=row.quantity,
+            price=row.price,
+            subtotal=row.subtotal,
+            discount=row.discount,
+        )
+        for row in rows
+    ]
+
+    total_pages = (total + request.limit - 1) // request.limit if total else 0
+    return MechanicSalesDetailPage(
+        mechanic_id=str(mechanic.id),
+        mechanic_name=mechanic.nama,
+        date=request.date,
+        items=items,
+        page=request.page,
+        limit=request.limit,
+        total=total,
+        total_pages=total_pages,
+        has_previous=request.page > 1,
+        has_next=request.page < total_pages,
+    )
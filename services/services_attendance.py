@@ -3,31 +3,12 @@ import datetime
 from sqlalchemy.orm import Session
 from models.attendance import Attendance
 from schemas.service_attendance import CreateAttendance, UpdateAttendance
-import uuid
-import decimal
 import logging
+from supports.utils_serializer import to_dict
+from services.services_dashboard import invalidate_dashboard_cache
 
 logger = logging.getLogger(__name__)
 
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        result[c.name] = value
-    return result
-
 def create_attendance(db: Session, data: CreateAttendance):
     try:
         attendance = Attendance(
@@ -39,6 +20,7 @@ def create_attendance(db: Session, data: CreateAttendance):
             notes=data.notes
         )
         db.add(attendance)
+        invalidate_dashboard_cache(db)
         db.commit()
         db.refresh(attendance)
         return to_dict(attendance)
@@ -105,6 +87,7 @@ def update_attendance(db: Session, attendance_id: str, data: UpdateAttendance):
 
         attendance.updated_at = datetime.datetime.now() #type: ignore
 
+        invalidate_dashboard_cache(db)
         db.commit()
         db.refresh(attendance) #type: ignore
         return to_dict(attendance)
@@ -124,6 +107,7 @@ def delete_attendance(db: Session, attendance_id: str):
             return {"message": "Attendance not found"}
 
         db.delete(attendance)
+        invalidate_dashboard_cache(db)
         db.commit()
         return {"message": "Attendance deleted successfully"}
     except IntegrityError as e:
@@ -155,6 +139,7 @@ def check_in(db: Session, karyawan_id: str, date: str = None): #type: ignore
             existing.check_in_time = datetime.datetime.now().time() #type: ignore
             existing.status = 'present' #type: ignore
             existing.updated_at = datetime.datetime.now() #type: ignore
+            invalidate_dashboard_cache(db)
             db.commit()
             db.refresh(existing)
             return to_dict(existing)
@@ -167,6 +152,7 @@ def check_in(db: Session, karyawan_id: str, date: str = None): #type: ignore
                 status='present'
             )
             db.add(attendance)
+            invalidate_dashboard_cache(db)
             db.commit()
             db.refresh(attendance)
             return to_dict(attendance)
@@ -200,6 +186,7 @@ def check_out(db: Session, karyawan_id: str, date: str = None): #type: ignore
         attendance.check_out_time = datetime.datetime.now().time() #type: ignore
         attendance.updated_at = datetime.datetime.now() #type: ignore
 
+        invalidate_dashboard_cache(db)
         db.commit()
         db.refresh(attendance)
         return to_dict(attendance)
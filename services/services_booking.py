@@ -7,28 +7,8 @@ from schemas.service_customer import CreateCustomerWithVehicles
 from models.database import get_db
 from schemas.service_customer import CustomerWithVehicleResponse, CreateCustomer, CreateVehicle
 from schemas.service_vehicle import VehicleResponse, CreateVehicle
-import decimal
-import datetime
 from dateutil.relativedelta import relativedelta
-
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        result[c.name] = value
-    return result
+from supports.utils_serializer import to_dict
 
 def createBookingnya(db: Session, booking_data: CreateBooking):
     # Create a new booking
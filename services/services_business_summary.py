@@ -0,0 +1,212 @@
+"""
+Services untuk monthly_business_summary (rollup bulanan penjualan, pembelian,
+biaya dan jumlah workorder per status)
+
+Writes call refresh_monthly_business_summary() with the dates they touched
+(old and new, when a date can change) before they commit. Only those months
+are recomputed, with one UNION ALL query over half-open month ranges, so the
+cost of a write does not depend on how much history there is. The month
+rows are locked first, so concurrent writes to one month apply in turn. Workorder
+writes go through refresh_workorder_summaries(), which does this for them.
+"""
+
+import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import String, and_, delete, extract, func, insert, literal, null, or_, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models.dashboard import DashboardCache, MonthlyBusinessSummary
+from models.expenses import Expenses
+from models.purchase_order import PurchaseOrder, PurchaseOrderStatus
+from models.workorder import Workorder
+
+# Treat these as completed keywords (lowercased)
+COMPLETED_STATUSES = ("selesai", "finished", "done", "complete", "completed")
+
+PURCHASE_STATUSES = (
+    PurchaseOrderStatus.dijalankan,
+    PurchaseOrderStatus.diterima,
+    PurchaseOrderStatus.dibayarkan,
+)
+
+
+def month_start(value: Any) -> Optional[datetime.date]:
+    """First day of the month of a date/datetime (or ISO string), None for None."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value[:10])
+    return datetime.date(value.year, value.month, 1)
+
+
+def next_month(month: datetime.date) -> datetime.date:
+    if month.month == 12:
+        return datetime.date(month.year + 1, 1, 1)
+    return datetime.date(month.year, month.month + 1, 1)
+
+
+def _in_months(date_column, months: List[datetime.date]):
+    """Half-open range predicate on date_column covering the given months."""
+    return or_(*[and_(date_column >= month, date_column < next_month(month)) for month in months])
+
+
+def _source_rows(db: Session, months: Optional[List[datetime.date]] = None):
+    """Per-month totals of the three sources; workorders are also split by lower(status)."""
+    def grouped(source: str, date_column, value_column, status, *filters):
+        year = extract("year", date_column)
+        month = extract("month", date_column)
+        group_by = [year, month] if status is None else [year, month, status]
+        query = select(
+            literal(source).label("source"),
+            year.label("year"),
+            month.label("month"),
+            (status if status is not None else null().cast(String)).label("status"),
+            func.count().label("row_count"),
+            func.sum(value_column).label("total"),
+        ).where(*filters)
+        if months is not None:
+            query = query.where(_in_months(date_column, months))
+        return query.group_by(*group_by)
+
+    return db.execute(union_all(
+        grouped("workorder", Workorder.tanggal_masuk, Workorder.total_biaya, func.lower(Workorder.status)),
+        grouped("purchase", PurchaseOrder.date, PurchaseOrder.total, None,
+                PurchaseOrder.status.in_(PURCHASE_STATUSES)),
+        grouped("expense", Expenses.date, Expenses.amount, None),
+    )).all()
+
+
+def _empty_row(month: datetime.date, now: datetime.datetime) -> Dict[str, Any]:
+    return {
+        "month": month,
+        "sales_total": Decimal("0.00"),
+        "purchase_total": Decimal("0.00"),
+        "expense_total": Decimal("0.00"),
+        "purchase_count": 0,
+        "expense_count": 0,
+        "workorder_count": 0,
+        "workorder_completed_count": 0,
+        "workorder_status_counts": {},
+        "refreshed_at": now,
+    }
+
+
+def _summary_rows(db: Session, months: Optional[List[datetime.date]] = None) -> List[Dict[str, Any]]:
+    """
+    monthly_business_summary rows for the given months, zero rows included.
+
+    Without ``months`` every month with activity is returned.
+    """
+    now = datetime.datetime.utcnow()
+    rows: Dict[datetime.date, Dict[str, Any]] = {month: _empty_row(month, now) for month in months or []}
+    for source in _source_rows(db, months):
+        month = datetime.date(int(source.year), int(source.month), 1)
+        row = rows.get(month) or rows.setdefault(month, _empty_row(month, now))
+        total = Decimal(source.total or 0)
+        if source.source == "workorder":
+            row["workorder_count"] += source.row_count
+            row["workorder_status_counts"][source.status] = source.row_count
+            if source.status in COMPLETED_STATUSES:
+                row["workorder_completed_count"] += source.row_count
+                row["sales_total"] += total
+        elif source.source == "purchase":
+            row["purchase_count"] += source.row_count
+            row["purchase_total"] += total
+        else:
+            row["expense_count"] += source.row_count
+            row["expense_total"] += total
+    return [rows[month] for month in sorted(rows)]
+
+
+def _lock_months(db: Session, months: List[datetime.date]) -> None:
+    """
+    Make sure the month rows exist and lock them, in month order.
+
+    A concurrent write to the same month waits here until the other
+    transaction commits, and the aggregate query that follows (a new
+    statement under READ COMMITTED) then sees its changes.
+    """
+    dialect = db.get_bind().dialect.name
+    upsert_insert = {"postgresql": pg_insert, "sqlite": sqlite_insert}.get(dialect)
+    now = datetime.datetime.utcnow()
+    if upsert_insert is not None:
+        db.execute(upsert_insert(MonthlyBusinessSummary).values(
+            [_empty_row(month, now) for month in months]
+        ).on_conflict_do_nothing(index_elements=[MonthlyBusinessSummary.month]))
+    else:
+        existing = set(db.execute(
+            select(MonthlyBusinessSummary.month).where(MonthlyBusinessSummary.month.in_(months))
+        ).scalars().all())
+        missing = [_empty_row(month, now) for month in months if month not in existing]
+        if missing:
+            db.execute(insert(MonthlyBusinessSummary), missing)
+    db.execute(
+        select(MonthlyBusinessSummary.month)
+        .where(MonthlyBusinessSummary.month.in_(months))
+        .order_by(MonthlyBusinessSummary.month)
+        .with_for_update()
+    ).all()
+
+
+def refresh_monthly_business_summary(db: Session, dates: Iterable[Any]) -> None:
+    """
+    Recompute the monthly_business_summary rows of the months containing ``dates``.
+
+    Pending ORM changes are flushed first. Nothing is committed: call this
+    right before the write's own commit, passing both the old and the new
+    date when the write can move a row to another month.
+
+    Args:
+        db: Database session.
+        dates: Dates/datetimes touched by the write; None values are ignored.
+    """
+    months = sorted({month_start(value) for value in dates if value is not None})
+    if not months:
+        return
+    db.flush()
+    _lock_months(db, months)
+    db.execute(update(MonthlyBusinessSummary), _summary_rows(db, months))
+
+
+def refresh_monthly_business_summary_for_workorders(db: Session, workorder_ids: Iterable[Any], previous_dates: Iterable[Any] = ()) -> None:
+    """Refresh the months the given workorders are in now, plus ``previous_dates``."""
+    ids = list({wid for wid in workorder_ids if wid})
+    if not ids:
+        return
+    db.flush()
+    current = db.execute(select(Workorder.tanggal_masuk).where(Workorder.id.in_(ids))).scalars().all()
+    refresh_monthly_business_summary(db, [*current, *previous_dates])
+
+
+def rebuild_monthly_business_summary(db: Session) -> Dict[str, int]:
+    """
+    Rebuild monthly_business_summary from workorders, purchase orders and expenses, and commit.
+
+    Use for the initial backfill and to repair drift from writes that bypass
+    the services (bulk SQL, manual fixes). Regular writes keep the table current.
+    """
+    try:
+        rows = _summary_rows(db)
+        db.execute(delete(MonthlyBusinessSummary))
+        if rows:
+            db.execute(insert(MonthlyBusinessSummary), rows)
+        # The cached dashboard snapshot was read from the old rollup
+        db.execute(delete(DashboardCache))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {"months": len(rows)}
+
+
+def get_monthly_business_summary(db: Session, start_month: datetime.date, end_month: datetime.date) -> List[MonthlyBusinessSummary]:
+    """Rollup rows from ``start_month`` to ``end_month`` inclusive, oldest first; months without activity are absent."""
+    return db.execute(
+        select(MonthlyBusinessSummary)
+        .where(MonthlyBusinessSummary.month >= start_month, MonthlyBusinessSummary.month <= end_month)
+        .order_by(MonthlyBusinessSummary.month)
+    ).scalars().all()
@@ -14,6 +14,22 @@ from models.supplier import Supplier
 from schemas.consignment_receipt import ConsignmentReceiptCreate, ConsignmentReceiptUpdate
 from schemas.service_inventory import CreateProductMovedHistory
 from services.services_inventory import createProductMoveHistoryNew
+from services.services_document_number import next_document_number, parse_sequence_suffix
+
+def generate_receipt_number(db: Session, receipt_date: date) -> str:
+    """
+    Next consignment receipt number for the year of receipt_date: CR-YYYY-NNN
+    """
+    period = f"{receipt_date.year}"
+    prefix = f"CR-{period}-"
+
+    def _legacy_max() -> int:
+        last_number = db.query(func.max(ConsignmentReceipt.receipt_number)).filter(
+            ConsignmentReceipt.receipt_number.like(f"{prefix}%")
+        ).scalar()
+        return parse_sequence_suffix(last_number)
+
+    return f"{prefix}{next_document_number(db, 'CR', period, seed=_legacy_max):03d}"
 
 def create_consignment_receipt(db: Session, receipt_data: ConsignmentReceiptCreate, username: str) -> ConsignmentReceipt:
     """
@@ -41,7 +57,7 @@ def create_consignment_receipt(db: Session, receipt_data: ConsignmentReceiptCrea
         new_receipt = ConsignmentReceipt(
             product_id=receipt_data.product_id,
             supplier_id=receipt_data.supplier_id,
-            receipt_number=receipt_data.receipt_number,
+            receipt_number=receipt_data.receipt_number or generate_receipt_number(db, receipt_data.receipt_date),
             receipt_date=receipt_data.receipt_date,
             quantity_received=receipt_data.quantity_received,
             unit_price=receipt_data.unit_price,
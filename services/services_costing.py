@@ -3,32 +3,20 @@ Average Costing Service
 Handles automatic cost calculation using average costing method
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from models.inventory import Inventory, ProductCostHistory
+from sqlalchemy import and_, insert, select, update, delete, func, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.inventory import Inventory, ProductCostHistory, ProductMovedHistory, ProductCostReplay
 from models.workorder import Product
 from decimal import Decimal
 import uuid
 import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Iterable
 import logging
+from supports.utils_serializer import to_dict
 
 logger = logging.getLogger(__name__)
 
-def to_dict(obj):
-    """Convert SQLAlchemy object to dictionary"""
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        elif isinstance(value, Decimal):
-            value = float(value)
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        result[c.name] = value
-    return result
-
-
 def calculate_average_cost(
     db: Session,
     product_id: str,
@@ -113,7 +101,7 @@ def calculate_average_cost(
             purchase_price=purchase_price,
             calculation_method='average',
             notes=notes or calculation_notes,
-            created_at=datetime.datetime.now(datetime.timezone.utc),
+            created_at=datetime.datetime.now(),
             created_by=created_by
         )
         db.add(cost_history)
@@ -143,6 +131,113 @@ def calculate_average_cost(
         raise
 
 
+def calculate_average_costs_bulk(
+    db: Session,
+    purchases: List[Tuple[Any, Decimal, Decimal]],
+    created_by: str = 'system',
+    notes: Optional[str] = None,
+    created_at: Optional[datetime.datetime] = None
+) -> List[Dict[str, Any]]:
+    """
+    Calculate average costs for every line of a goods receipt in one pass.
+
+    Products and inventories are loaded with one query each (inventories
+    locked) and the weighted average uses the stock on hand *before* the
+    receipt. A product that appears on several lines is averaged line by
+    line. Product costs are updated in the session and the cost history is
+    written with a single INSERT. Nothing is committed; the caller owns the
+    transaction.
+
+    Args:
+        db: Database session
+        purchases: (product_id, purchase_quantity, purchase_price) per line
+        created_by: User performing the action
+        notes: Prefix for the cost history notes, followed by each line's calculation
+        created_at: Time of the cost history records; pass the receipt movement
+            timestamp so a cost replay from that movement regenerates them
+
+    Returns:
+        List of per-line results, in input order, shaped like calculate_average_cost()
+
+    Raises:
+        ValueError: If a product does not exist
+    """
+    product_ids = {product_id for product_id, _, _ in purchases}
+    products = {p.id: p for p in db.query(Product).filter(Product.id.in_(product_ids)).all()}
+    quantities = {
+        inv.product_id: inv.quantity or Decimal('0')
+        for inv in db.query(Inventory)
+        .filter(Inventory.product_id.in_(product_ids))
+        .order_by(Inventory.product_id)
+        .with_for_update()
+        .all()
+    }
+
+    results = []
+    history_rows = []
+    now = created_at or datetime.datetime.now()
+    for product_id, purchase_quantity, purchase_price in purchases:
+        product = products.get(product_id)
+        if not product:
+            raise ValueError(f'Product with ID {product_id} not found')
+        if product.is_consignment:
+            results.append({
+                'success': True,
+                'skipped': True,
+                'reason': 'consignment_product',
+                'product_id': str(product_id),
+                'product_name': product.name
+            })
+            continue
+
+        current_quantity = quantities.get(product_id, Decimal('0'))
+        current_cost = product.cost if product.cost else Decimal('0')
+        total_quantity = current_quantity + purchase_quantity
+        if current_quantity == 0 or total_quantity == 0:
+            new_cost = purchase_price
+            calculation_notes = 'Initial cost set to purchase price (no existing stock)'
+        else:
+            new_cost = ((current_quantity * current_cost) + (purchase_quantity * purchase_price)) / total_quantity
+            calculation_notes = f'Average cost: ({current_quantity} × {current_cost}) + ({purchase_quantity} × {purchase_price}) / {total_quantity}'
+        new_cost = new_cost.quantize(Decimal('0.01'))
+
+        product.cost = new_cost
+        quantities[product_id] = total_quantity
+        history_id = uuid.uuid4()
+        history_rows.append({
+            'id': history_id,
+            'product_id': product_id,
+            'old_cost': current_cost,
+            'new_cost': new_cost,
+            'old_quantity': current_quantity,
+            'new_quantity': total_quantity,
+            'purchase_quantity': purchase_quantity,
+            'purchase_price': purchase_price,
+            'calculation_method': 'average',
+            'notes': f'{notes}: {calculation_notes}' if notes else calculation_notes,
+            'created_at': now,
+            'created_by': created_by,
+        })
+        results.append({
+            'success': True,
+            'skipped': False,
+            'product_id': str(product_id),
+            'product_name': product.name,
+            'old_cost': float(current_cost),
+            'new_cost': float(new_cost),
+            'old_quantity': float(current_quantity),
+            'new_quantity': float(total_quantity),
+            'purchase_quantity': float(purchase_quantity),
+            'purchase_price': float(purchase_price),
+            'cost_history_id': str(history_id)
+        })
+
+    db.flush()
+    if history_rows:
+        db.execute(insert(ProductCostHistory), history_rows)
+    return results
+
+
 def calculate_average_cost_for_adjustment(
     db: Session,
     product_id: str,
@@ -202,7 +297,7 @@ def calculate_average_cost_for_adjustment(
             purchase_price=None,  # No purchase price for adjustments
             calculation_method='adjustment',
             notes=notes or f'Manual inventory adjustment: {adjustment_quantity}',
-            created_at=datetime.datetime.now(datetime.timezone.utc),
+            created_at=datetime.datetime.now(),
             created_by=created_by
         )
         db.add(cost_history)
@@ -316,3 +411,285 @@ def get_product_cost_summary(db: Session, product_id: str) -> Dict[str, Any]:
         'total_cost_changes': total_changes,
         'latest_change': to_dict(latest_history) if latest_history else None
     }
+
+
+# Movement types that take stock out even when recorded with a positive quantity
+OUTGOING_MOVE_TYPES = ('outcome', 'loss', 'internal_consumption')
+REPLAY_BATCH_SIZE = 1000
+
+
+def request_cost_replay(db: Session, product_ids: Iterable[Any], replay_from: datetime.datetime) -> None:
+    """
+    Queue products for a moving-average replay after a backdated change.
+
+    A product that is already queued keeps the earlier of the two dates.
+    Nothing is committed; the request becomes visible with the caller's
+    change.
+
+    Args:
+        db: Database session
+        product_ids: Products whose movements changed
+        replay_from: Timestamp of the earliest changed movement
+    """
+    rows = [
+        {'product_id': product_id, 'replay_from': replay_from, 'requested_at': datetime.datetime.utcnow()}
+        for product_id in {pid for pid in product_ids if pid}
+    ]
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    upsert_insert = {'postgresql': pg_insert, 'sqlite': sqlite_insert}.get(dialect)
+    if upsert_insert is None:
+        # Without an upsert: lock the rows already queued, move their date back, queue the rest
+        queued = {
+            row.product_id: row
+            for row in db.query(ProductCostReplay)
+            .filter(ProductCostReplay.product_id.in_([row['product_id'] for row in rows]))
+            .order_by(ProductCostReplay.product_id)
+            .with_for_update()
+            .all()
+        }
+        for row in rows:
+            existing = queued.get(row['product_id'])
+            if existing is None:
+                db.add(ProductCostReplay(**row))
+            else:
+                existing.replay_from = min(existing.replay_from, replay_from)
+                existing.requested_at = row['requested_at']
+        db.flush()
+        return
+    stmt = upsert_insert(ProductCostReplay).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ProductCostReplay.product_id],
+        set_={
+            'replay_from': case(
+                (stmt.excluded.replay_from < ProductCostReplay.replay_from, stmt.excluded.replay_from),
+                else_=ProductCostReplay.replay_from,
+            ),
+            'requested_at': stmt.excluded.requested_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def replay_average_costs(
+    db: Session,
+    product_ids: Optional[List[Any]] = None,
+    since: Optional[datetime.datetime] = None,
+    created_by: str = 'system',
+    commit: bool = True
+) -> Dict[str, Any]:
+    """
+    Recompute moving-average costs forward from ``since``.
+
+    Movements are streamed once, ordered by (product_id, timestamp, id).
+    Every purchase receipt re-averages the cost against the stock on hand
+    at that point, and every outgoing movement gets the cost of its time as
+    hpp_snapshot. The average/replay cost history from ``since`` on is
+    regenerated with one DELETE and one INSERT. product.cost ends at the
+    replayed value; a product with no receipt left in the range goes back to
+    its cost before ``since`` (products that never had a cost history keep
+    theirs).
+    Consignment products are not costed and are skipped.
+
+    Args:
+        db: Database session
+        product_ids: Products to replay; None replays the whole catalogue
+        since: Replay start; None replays the full history
+        created_by: Recorded on the regenerated cost history
+        commit: Commit when done; pass False when the caller owns the transaction
+
+    Returns:
+        Dictionary with counts of products, movements, cost history rows and hpp updates
+    """
+    since = since or datetime.datetime.min
+    product_filter = [Product.is_consignment.isnot(True)]
+    if product_ids is not None:
+        if not product_ids:
+            return {'since': since.isoformat(), 'products': 0, 'movements': 0, 'cost_history': 0, 'hpp_updated': 0}
+        product_filter.append(Product.id.in_(product_ids))
+
+    movement_type = func.lower(func.coalesce(ProductMovedHistory.type, ''))
+    signed_quantity = case(
+        (movement_type.in_(OUTGOING_MOVE_TYPES) & (ProductMovedHistory.quantity > 0), -ProductMovedHistory.quantity),
+        else_=ProductMovedHistory.quantity,
+    )
+
+    try:
+        opening_quantity = dict(db.execute(
+            select(ProductMovedHistory.product_id, func.sum(signed_quantity))
+            .join(Product, Product.id == ProductMovedHistory.product_id)
+            .where(ProductMovedHistory.timestamp < since, *product_filter)
+            .group_by(ProductMovedHistory.product_id)
+        ).all())
+
+        latest_cost = select(
+            ProductCostHistory.product_id,
+            ProductCostHistory.new_cost,
+            func.row_number().over(
+                partition_by=ProductCostHistory.product_id,
+                order_by=(ProductCostHistory.created_at.desc(), ProductCostHistory.new_quantity.desc(),
+                          ProductCostHistory.id.desc()),
+            ).label('rn'),
+        ).join(Product, Product.id == ProductCostHistory.product_id).where(
+            ProductCostHistory.created_at < since,
+            ProductCostHistory.calculation_method.in_(('average', 'replay')),
+            *product_filter,
+        ).subquery()
+        opening_cost = dict(db.execute(
+            select(latest_cost.c.product_id, latest_cost.c.new_cost).where(latest_cost.c.rn == 1)
+        ).all())
+
+        # Cost before the first change being regenerated: where a product
+        # without opening history starts, and ends when no receipt is left.
+        # Lines of one receipt share a timestamp and only add stock, so the
+        # quantity orders them.
+        first_change = select(
+            ProductCostHistory.product_id,
+            ProductCostHistory.old_cost,
+            func.row_number().over(
+                partition_by=ProductCostHistory.product_id,
+                order_by=(ProductCostHistory.created_at, ProductCostHistory.old_quantity, ProductCostHistory.id),
+            ).label('rn'),
+        ).join(Product, Product.id == ProductCostHistory.product_id).where(
+            ProductCostHistory.created_at >= since,
+            ProductCostHistory.calculation_method.in_(('average', 'replay')),
+            *product_filter,
+        ).subquery()
+        prior_cost = dict(db.execute(
+            select(first_change.c.product_id, first_change.c.old_cost).where(first_change.c.rn == 1)
+        ).all())
+
+        moves = db.execute(
+            select(
+                ProductMovedHistory.id,
+                ProductMovedHistory.product_id,
+                movement_type.label('movement_type'),
+                signed_quantity.label('signed_quantity'),
+                ProductMovedHistory.timestamp,
+                ProductMovedHistory.purchase_price,
+                ProductMovedHistory.hpp_snapshot,
+                Product.cost.label('product_cost'),
+            )
+            .join(Product, Product.id == ProductMovedHistory.product_id)
+            .where(ProductMovedHistory.timestamp >= since, *product_filter)
+            .order_by(ProductMovedHistory.product_id, ProductMovedHistory.timestamp, ProductMovedHistory.id)
+            .execution_options(yield_per=REPLAY_BATCH_SIZE)
+        )
+
+        final_costs: Dict[Any, Decimal] = {}
+        moved_products = set()
+        product_count = 0
+        history_rows: List[Dict[str, Any]] = []
+        hpp_updates: List[Dict[str, Any]] = []
+        movement_count = 0
+        product_id = None
+        quantity = cost = Decimal('0')
+        for move in moves:
+            movement_count += 1
+            if move.product_id != product_id:
+                product_id = move.product_id
+                product_count += 1
+                moved_products.add(product_id)
+                quantity = Decimal(opening_quantity.get(product_id) or 0)
+                # Stock from before any cost history is valued at the product's current cost
+                cost = Decimal(opening_cost.get(product_id) or prior_cost.get(product_id) or move.product_cost or 0)
+
+            move_quantity = Decimal(move.signed_quantity)
+            if move.movement_type == 'income' and move_quantity > 0 and move.purchase_price is not None:
+                price = Decimal(move.purchase_price)
+                total_quantity = quantity + move_quantity
+                if quantity <= 0 or total_quantity <= 0:
+                    new_cost = price
+                else:
+                    new_cost = (quantity * cost + move_quantity * price) / total_quantity
+                new_cost = new_cost.quantize(Decimal('0.01'))
+                history_rows.append({
+                    'id': uuid.uuid4(),
+                    'product_id': product_id,
+                    'old_cost': cost,
+                    'new_cost': new_cost,
+                    'old_quantity': quantity,
+                    'new_quantity': total_quantity,
+                    'purchase_quantity': move_quantity,
+                    'purchase_price': price,
+                    'calculation_method': 'replay',
+                    'notes': f'Replay from {since:%Y-%m-%d %H:%M}',
+                    'created_at': move.timestamp,
+                    'created_by': created_by,
+                })
+                cost = new_cost
+                final_costs[product_id] = cost
+            elif move_quantity < 0 and cost and move.hpp_snapshot != cost:
+                hpp_updates.append({'id': move.id, 'hpp_snapshot': cost})
+            quantity += move_quantity
+
+        # Products left without receipts in the range go back to the cost before it
+        for pid in set(prior_cost) | moved_products:
+            start_cost = opening_cost.get(pid, prior_cost.get(pid))
+            if pid not in final_costs and start_cost is not None:
+                final_costs[pid] = start_cost
+
+        history_filter = [
+            ProductCostHistory.created_at >= since,
+            ProductCostHistory.calculation_method.in_(('average', 'replay')),
+        ]
+        if product_ids is not None:
+            history_filter.append(ProductCostHistory.product_id.in_(product_ids))
+        history_filter.append(ProductCostHistory.product_id.in_(select(Product.id).where(*product_filter)))
+        db.execute(delete(ProductCostHistory).where(*history_filter).execution_options(synchronize_session=False))
+        if history_rows:
+            db.execute(insert(ProductCostHistory), history_rows)
+        for start in range(0, len(hpp_updates), REPLAY_BATCH_SIZE):
+            db.execute(update(ProductMovedHistory), hpp_updates[start:start + REPLAY_BATCH_SIZE])
+        if final_costs:
+            db.execute(update(Product), [{'id': pid, 'cost': value} for pid, value in final_costs.items()])
+        if commit:
+            db.commit()
+    except Exception as e:
+        if commit:
+            db.rollback()
+        logger.error(f'Error replaying average costs: {str(e)}')
+        raise
+
+    logger.info(
+        f'Cost replay from {since}: {product_count} products, {movement_count} movements, '
+        f'{len(history_rows)} cost history rows, {len(hpp_updates)} hpp updates'
+    )
+    return {
+        'since': since.isoformat(),
+        'products': product_count,
+        'movements': movement_count,
+        'cost_history': len(history_rows),
+        'hpp_updated': len(hpp_updates),
+    }
+
+
+def replay_pending_costs(db: Session, created_by: str = 'system') -> Dict[str, Any]:
+    """
+    Replay only the products queued by request_cost_replay() and clear the queue.
+
+    All queued products are replayed from the earliest queued date, which is
+    always correct (replaying further back only repeats unchanged work).
+    Requests that arrive while the replay runs stay queued for the next run.
+    """
+    started_at = datetime.datetime.utcnow()
+    pending = db.execute(select(ProductCostReplay.product_id, ProductCostReplay.replay_from)).all()
+    if not pending:
+        return {'since': None, 'products': 0, 'movements': 0, 'cost_history': 0, 'hpp_updated': 0}
+
+    product_ids = [row.product_id for row in pending]
+    try:
+        result = replay_average_costs(
+            db, product_ids, since=min(row.replay_from for row in pending), created_by=created_by, commit=False
+        )
+        db.execute(delete(ProductCostReplay).where(
+            ProductCostReplay.product_id.in_(product_ids),
+            ProductCostReplay.requested_at <= started_at,
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
+
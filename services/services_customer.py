@@ -1,15 +1,16 @@
 from sqlalchemy.orm import Session
 from models.customer import Customer, Vehicle
+from services.services_workorder_summary import refresh_workorder_summaries_for
 import uuid
 from schemas.service_customer import CreateCustomerWithVehicles
 from models.database import get_db
 from schemas.service_customer import CustomerWithVehicleResponse, CreateCustomer, CreateVehicle, UpdateCustomer
 from schemas.service_vehicle import VehicleResponse, CreateVehicle
-import decimal
 import datetime
 from dateutil.relativedelta import relativedelta
 from contextlib import suppress
 from typing import DefaultDict, List, Optional, Tuple, TypedDict
+from supports.utils_serializer import to_dict
 
 
 class AggregatedOrder(TypedDict):
@@ -24,25 +25,6 @@ class AggregatedOrder(TypedDict):
 
 AggregatedKey = Tuple[Optional[str], Optional[str], Optional[str]]
 
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        result[c.name] = value
-    return result
-
 def create_customer_with_vehicles(db: Session, customer_data: CreateCustomerWithVehicles):
     try:
         # Satu transaksi saja
@@ -313,6 +295,7 @@ def updateCustomer(db: Session, customer_id: str, customer_data: UpdateCustomer)
         setattr(customer, field, value)
 
     customer.updated_at = datetime.datetime.now()  # type: ignore
+    refresh_workorder_summaries_for(db, customer_id=customer.id)
     db.commit()
     db.refresh(customer)
     return to_dict(customer)
@@ -1,19 +1,43 @@
-from datetime import date, datetime
-from typing import Dict, List, Union
+"""
+Services untuk dashboard
+
+The monthly series are read from the monthly_business_summary rollup
+(services_business_summary), one row per month, so any window costs the
+same regardless of how much raw history there is. The cards and the
+default series window are computed together by
+compute_dashboard_aggregates() and kept in the dashboard_cache table for
+DASHBOARD_CACHE_TTL_SECONDS, so every gunicorn worker shares one snapshot.
+Writes to workorders, purchase orders, expenses and attendance call
+invalidate_dashboard_cache() before they commit.
+"""
+
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Union
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Date
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from models.workorder import Workorder
 from models.attendance import Attendance
-from models.purchase_order import PurchaseOrder, PurchaseOrderStatus
-from models.expenses import Expenses
+from models.dashboard import DashboardCache, MonthlyBusinessSummary
+from services.services_business_summary import get_monthly_business_summary, next_month
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "60"))
+# The cached snapshot carries this many months; longer windows read the rollup directly
+DASHBOARD_CACHED_MONTHS = 24
+DASHBOARD_MAX_MONTHS = 120
 
 
 # Helpers
 
-def _start_month(months: int) -> date:
-    today = date.today()
+def _start_month(months: int, today: Optional[date] = None) -> date:
+    today = today or date.today()
     first_this_month = today.replace(day=1)
     # Walk back (months-1) months to include current month
     month = first_this_month.month - (months - 1)
@@ -36,130 +60,191 @@ def _normalize_decimal(value) -> float:
     return float(value)
 
 
-def _completed_status_filter(query):
-    # Treat these as completed keywords (lowercased)
-    completed = [
-        "selesai",
-        "finished",
-        "done",
-        "complete",
-        "completed",
-    ]
-    return query.filter(func.lower(Workorder.status).in_(completed))
+def _check_months(months: int) -> None:
+    if months < 1 or months > DASHBOARD_MAX_MONTHS:
+        raise ValueError(f"months must be between 1 and {DASHBOARD_MAX_MONTHS}")
 
 
-# Public services
+def get_monthly_series(db: Session, months: int, today: Optional[date] = None) -> List[Dict[str, Union[str, float]]]:
+    """
+    Sales, purchase and expense totals for the last ``months`` months, oldest first.
 
-def get_dashboard_summary(db: Session) -> Dict[str, float]:
-    today = date.today()
+    One range query on monthly_business_summary; months without activity
+    are filled with zero.
+    """
+    _check_months(months)
+    start = _start_month(months, today)
+    current_month = (today or date.today()).replace(day=1)
+    rows = {row.month: row for row in get_monthly_business_summary(db, start, current_month)}
 
-    workorders_today = (
-        db.query(func.count(Workorder.id))
-        .filter(cast(Workorder.tanggal_masuk, Date) == today)
-        .scalar()
-        or 0
-    )
+    # Fill missing months with zero
+    series: List[Dict[str, Union[str, float]]] = []
+    current = start
+    for _ in range(months):
+        row = rows.get(current)
+        series.append({
+            "month": _month_label(current),
+            "sales": _normalize_decimal(row.sales_total) if row else 0.0,
+            "purchase": _normalize_decimal(row.purchase_total) if row else 0.0,
+            "expenses": _normalize_decimal(row.expense_total) if row else 0.0,
+        })
+        current = next_month(current)
+    return series
 
-    completed_q = _completed_status_filter(db.query(func.count(Workorder.id)))
-    workorders_finished = completed_q.scalar() or 0
 
-    total_workorders = db.query(func.count(Workorder.id)).scalar() or 0
-    workorders_pending = max(total_workorders - workorders_finished, 0)
+# Aggregates
 
-    employees_present = (
-        db.query(func.count(Attendance.id))
-        .filter(Attendance.date == today)
-        .filter(func.lower(Attendance.status) == "present")
-        .scalar()
-        or 0
-    )
+def compute_dashboard_aggregates(db: Session, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Compute every dashboard card and the last DASHBOARD_CACHED_MONTHS of monthly series.
 
-    return {
-        "workorders_today": workorders_today,
-        "workorders_finished": workorders_finished,
-        "workorders_pending": workorders_pending,
-        "employees_present": employees_present,
-    }
+    Workorder totals by status come from the monthly rollup; only the
+    "today" count touches workorder, with a half-open range on tanggal_masuk
+    (no cast on the filtered column).
 
+    Args:
+        db: Database session.
+        today: Reference day, defaults to date.today().
 
-def get_workorder_pie(db: Session) -> Dict[str, float]:
-    completed = _completed_status_filter(db.query(func.count(Workorder.id))).scalar() or 0
-    total = db.query(func.count(Workorder.id)).scalar() or 0
-    pending = max(total - completed, 0)
+    Returns:
+        Dict with ``summary``, ``workorder_pie`` and ``monthly`` (one entry per
+        month, oldest first, with ``sales``, ``purchase`` and ``expenses``).
+    """
+    today = today or date.today()
+    tomorrow = today + timedelta(days=1)
+
+    workorders_today = db.execute(
+        select(func.count(Workorder.id))
+        .where(Workorder.tanggal_masuk >= today, Workorder.tanggal_masuk < tomorrow)
+    ).scalar() or 0
+
+    totals = db.execute(select(
+        func.coalesce(func.sum(MonthlyBusinessSummary.workorder_count), 0).label("total"),
+        func.coalesce(func.sum(MonthlyBusinessSummary.workorder_completed_count), 0).label("finished"),
+    )).one()
+
+    employees_present = db.execute(
+        select(func.count(Attendance.id))
+        .where(Attendance.date == today)
+        .where(func.lower(Attendance.status) == "present")
+    ).scalar() or 0
+
+    total = int(totals.total)
+    finished = int(totals.finished)
+    pending = max(total - finished, 0)
     return {
-        "completed": completed,
-        "pending": pending,
+        "summary": {
+            "workorders_today": int(workorders_today),
+            "workorders_finished": finished,
+            "workorders_pending": pending,
+            "employees_present": int(employees_present),
+        },
+        "workorder_pie": {
+            "completed": finished,
+            "pending": pending,
+        },
+        "monthly": get_monthly_series(db, DASHBOARD_CACHED_MONTHS, today),
     }
 
 
-def _monthly_series(db: Session, query, date_column, value_column, months: int) -> List[Dict[str, Union[str, float]]]:
-    start = _start_month(months)
-    rows = (
-        query
-        .filter(date_column >= start)
-        .group_by(func.date_trunc("month", date_column))
-        .with_entities(
-            func.date_trunc("month", date_column).label("month"),
-            func.sum(value_column).label("total"),
-        )
-        .order_by("month")
-        .all()
+def _store_dashboard_cache(db: Session, cache_key: str, payload: Dict[str, Any], now: datetime) -> None:
+    """Upsert one cache entry and drop expired ones. A failure only costs a recompute."""
+    dialect = db.get_bind().dialect.name
+    upsert_insert = {'postgresql': pg_insert, 'sqlite': sqlite_insert}.get(dialect)
+    if upsert_insert is None:
+        return
+    expires_at = now + timedelta(seconds=DASHBOARD_CACHE_TTL_SECONDS)
+    stmt = upsert_insert(DashboardCache).values(
+        cache_key=cache_key, payload=payload, computed_at=now, expires_at=expires_at
     )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DashboardCache.cache_key],
+        set_={'payload': stmt.excluded.payload, 'computed_at': now, 'expires_at': expires_at},
+    )
+    try:
+        db.execute(delete(DashboardCache).where(DashboardCache.expires_at <= now))
+        db.execute(stmt)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Gagal menyimpan cache dashboard: {e}")
+
+
+def get_dashboard_aggregates(db: Session) -> Dict[str, Any]:
+    """
+    Return the dashboard aggregates from the shared cache, computing them on a miss.
+
+    The cache key includes today's date, so the "today" cards roll over at
+    midnight without waiting for the TTL.
+    """
+    today = date.today()
+    now = datetime.utcnow()
+    cache_key = f"dashboard:{today.isoformat()}"
+    cached = db.execute(
+        select(DashboardCache.payload)
+        .where(DashboardCache.cache_key == cache_key)
+        .where(DashboardCache.expires_at > now)
+    ).scalar_one_or_none()
+    if cached is not None:
+        return cached
 
-    buckets = {_month_label(r.month.date()): _normalize_decimal(r.total) for r in rows}
+    payload = compute_dashboard_aggregates(db, today)
+    _store_dashboard_cache(db, cache_key, payload, now)
+    return payload
 
-    # Fill missing months with zero
-    series: List[Dict[str, Union[str, float]]] = []
-    current = _start_month(months)
-    for _ in range(months):
-        label = _month_label(current)
-        series.append({"month": label, "total": buckets.get(label, 0.0)})
-        # advance one month
-        if current.month == 12:
-            current = date(current.year + 1, 1, 1)
-        else:
-            current = date(current.year, current.month + 1, 1)
-    return series
+
+def invalidate_dashboard_cache(db: Session) -> None:
+    """
+    Drop the cached dashboard aggregates.
+
+    Runs in the caller's transaction and does not commit: call it right
+    before the commit of a write that touches workorders, purchase orders,
+    expenses or attendance. A dashboard read that started before that commit
+    can still store its older snapshot afterwards; the TTL bounds that.
+    """
+    db.execute(delete(DashboardCache))
+
+
+def _recent_months(db: Session, months: int) -> List[Dict[str, Union[str, float]]]:
+    _check_months(months)
+    if months > DASHBOARD_CACHED_MONTHS:
+        return get_monthly_series(db, months)
+    return get_dashboard_aggregates(db)["monthly"][-months:]
+
+
+# Public services
+
+def get_dashboard_summary(db: Session) -> Dict[str, float]:
+    return dict(get_dashboard_aggregates(db)["summary"])
+
+
+def get_workorder_pie(db: Session) -> Dict[str, float]:
+    return dict(get_dashboard_aggregates(db)["workorder_pie"])
 
 
 def get_sales_monthly(db: Session, months: int = 6) -> List[Dict[str, Union[str, float]]]:
     # Sales diambil dari total_biaya workorder yang selesai
-    q = _completed_status_filter(db.query(Workorder))
-    return _monthly_series(db, q, Workorder.tanggal_masuk, Workorder.total_biaya, months)
+    return [{"month": m["month"], "total": m["sales"]} for m in _recent_months(db, months)]
 
 
 def get_purchase_monthly(db: Session, months: int = 6) -> List[Dict[str, Union[str, float]]]:
-    allowed_status = [
-        PurchaseOrderStatus.dijalankan,
-        PurchaseOrderStatus.diterima,
-        PurchaseOrderStatus.dibayarkan,
-    ]
-    q = (
-        db.query(PurchaseOrder)
-        .filter(PurchaseOrder.status.in_(allowed_status))
-    )
-    return _monthly_series(db, q, PurchaseOrder.date, PurchaseOrder.total, months)
+    return [{"month": m["month"], "total": m["purchase"]} for m in _recent_months(db, months)]
 
 
 def get_expenses_monthly(db: Session, months: int = 6) -> List[Dict[str, Union[str, float]]]:
-    q = db.query(Expenses)
-    return _monthly_series(db, q, Expenses.date, Expenses.amount, months)
+    return [{"month": m["month"], "total": m["expenses"]} for m in _recent_months(db, months)]
 
 
 def get_combined_monthly(db: Session, months: int = 6) -> List[Dict[str, Union[str, float]]]:
-    sales = {item["month"]: item["total"] for item in get_sales_monthly(db, months)}
-    purchase = {item["month"]: item["total"] for item in get_purchase_monthly(db, months)}
-    expenses = {item["month"]: item["total"] for item in get_expenses_monthly(db, months)}
+    return [dict(m) for m in _recent_months(db, months)]
 
-    labels = list({*sales.keys(), *purchase.keys(), *expenses.keys()})
-    labels.sort()
 
-    series: List[Dict[str, Union[str, float]]] = []
-    for label in labels:
-        series.append({
-            "month": label,
-            "sales": sales.get(label, 0.0),
-            "purchase": purchase.get(label, 0.0),
-            "expenses": expenses.get(label, 0.0),
-        })
-    return series
+def get_dashboard_overview(db: Session, months: int = 6) -> Dict[str, Any]:
+    """All dashboard cards and the combined monthly series in one response."""
+    monthly = _recent_months(db, months)
+    aggregates = get_dashboard_aggregates(db)
+    return {
+        "summary": aggregates["summary"],
+        "workorder_pie": aggregates["workorder_pie"],
+        "monthly": monthly,
+    }
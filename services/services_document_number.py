@@ -0,0 +1,128 @@
+"""
+Services untuk penomoran dokumen (journal entry, workorder, consignment receipt)
+
+Numbers come from the document_sequence counter table, one row per
+(prefix, period). Incrementing the row takes its lock until the caller's
+transaction ends. Concurrent posts in the same period are serialised
+instead of racing on MAX(no) scans, and a rolled-back transaction gives its
+numbers back.
+"""
+
+import datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.document_sequence import DocumentSequence
+
+
+def allocate_document_numbers(
+    db: Session,
+    prefix: str,
+    period: str,
+    count: int = 1,
+    seed: Optional[Callable[[], int]] = None
+) -> List[int]:
+    """
+    Reserve ``count`` consecutive sequence values for (prefix, period).
+
+    Args:
+        db: Database session. The counter row stays locked until it commits.
+        prefix: Document prefix, e.g. 'SAL' or 'WO'.
+        period: Period key, e.g. '20261018' (daily) or '202610' (monthly).
+        count: Block size; bulk imports reserve all their numbers at once.
+        seed: Returns the highest number already used for this
+            (prefix, period) before the counter existed. It is only called
+            the first time a period is seen.
+
+    Returns:
+        List[int]: The reserved values in ascending order.
+
+    Raises:
+        ValueError: If count is not positive.
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
+
+    upsert_insert = {"postgresql": pg_insert, "sqlite": sqlite_insert}.get(db.get_bind().dialect.name)
+    if upsert_insert is None:
+        last_value = _increment_locked_counter(db, prefix, period, count, seed)
+        return list(range(last_value - count + 1, last_value + 1))
+
+    # Steady state: one UPDATE ... RETURNING on an existing counter row
+    last_value = db.execute(
+        update(DocumentSequence)
+        .where(DocumentSequence.prefix == prefix, DocumentSequence.period == period)
+        .values(last_value=DocumentSequence.last_value + count, updated_at=datetime.datetime.utcnow())
+        .returning(DocumentSequence.last_value)
+    ).scalar_one_or_none()
+
+    if last_value is None:
+        start = seed() if seed else 0
+        # A concurrent first allocation computed the same seed, so adding to it is safe
+        stmt = upsert_insert(DocumentSequence).values(
+            prefix=prefix,
+            period=period,
+            last_value=start + count,
+            updated_at=datetime.datetime.utcnow(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DocumentSequence.prefix, DocumentSequence.period],
+            set_={"last_value": DocumentSequence.last_value + count},
+        ).returning(DocumentSequence.last_value)
+        last_value = db.execute(stmt).scalar_one()
+
+    return list(range(last_value - count + 1, last_value + 1))
+
+
+def _increment_locked_counter(
+    db: Session,
+    prefix: str,
+    period: str,
+    count: int,
+    seed: Optional[Callable[[], int]]
+) -> int:
+    """Portable path for databases without an upsert: SELECT ... FOR UPDATE, INSERT for a new period."""
+    def locked_counter():
+        return (
+            db.query(DocumentSequence)
+            .filter(DocumentSequence.prefix == prefix, DocumentSequence.period == period)
+            .with_for_update()
+            .first()
+        )
+
+    counter = locked_counter()
+    if counter is None:
+        try:
+            with db.begin_nested():
+                counter = DocumentSequence(
+                    prefix=prefix,
+                    period=period,
+                    last_value=seed() if seed else 0,
+                    updated_at=datetime.datetime.utcnow(),
+                )
+                db.add(counter)
+        except IntegrityError:
+            # A concurrent first allocation inserted the row; wait for its lock
+            counter = locked_counter()
+    counter.last_value += count
+    counter.updated_at = datetime.datetime.utcnow()
+    db.flush()
+    return counter.last_value
+
+
+def next_document_number(db: Session, prefix: str, period: str, seed: Optional[Callable[[], int]] = None) -> int:
+    """Reserve a single sequence value for (prefix, period)."""
+    return allocate_document_numbers(db, prefix, period, 1, seed=seed)[0]
+
+
+def parse_sequence_suffix(document_no: Optional[str], separator: str = "-") -> int:
+    """Numeric tail of a legacy document number ('SAL-20261018-007' -> 7), 0 if absent."""
+    if not document_no:
+        return 0
+    tail = document_no.rsplit(separator, 1)[-1]
+    return int(tail) if tail.isdigit() else 0
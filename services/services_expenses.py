@@ -8,6 +8,8 @@ from supports.utils_json_response import to_dict
 from decimal import Decimal
 from services.services_accounting import create_expense_journal_entry
 from schemas.service_accounting import ExpenseJournalEntry
+from services.services_business_summary import refresh_monthly_business_summary
+from services.services_dashboard import invalidate_dashboard_cache
 
 
 
@@ -22,6 +24,8 @@ def create_expenses(db: Session, data: CreateExpenses):
         bukti_transfer=data.bukti_transfer
     )
     db.add(expenses)
+    refresh_monthly_business_summary(db, [expenses.date])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(expenses)
     return to_dict(expenses)
@@ -50,6 +54,8 @@ def delete_expenses(db: Session, expenses_id: str):
             return {"message": "Expenses not found"}
 
         db.delete(exp)
+        refresh_monthly_business_summary(db, [exp.date])
+        invalidate_dashboard_cache(db)
         db.commit()
         return {"message": "Expenses deleted successfully"}
     except IntegrityError:
@@ -63,6 +69,8 @@ def update_expenses(db: Session, expenses_id: str, data: UpdateExpenses):
         if not exp:
             return {"message": "Expenses not found"}
 
+        old_date = exp.date
+
         # Check if status is being changed to 'dibayarkan'
         status_changed_to_paid = data.status and data.status == ExpenseStatus.dibayarkan and exp.status != ExpenseStatus.dibayarkan
 
@@ -83,6 +91,8 @@ def update_expenses(db: Session, expenses_id: str, data: UpdateExpenses):
             exp.bukti_transfer = data.bukti_transfer  # type: ignore
         exp.updated_at = datetime.now()  # type: ignore
 
+        refresh_monthly_business_summary(db, [old_date, exp.date])
+        invalidate_dashboard_cache(db)
         db.commit()
         db.refresh(exp)
 
@@ -9,32 +9,15 @@ from services.services_product import getInventoryByProductID
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func, select
+from sqlalchemy import func, select, insert, case
+from typing import List
 import uuid
 import decimal
 import datetime
 from models.workorder import Product  # Product model is in workorder.py
 from models.customer import Customer
 from models.supplier import Supplier
-
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        result[c.name] = value
-    return result
+from supports.utils_serializer import to_dict, to_dicts
 
 def get_or_create_inventory(db: Session, product_id: str):
     inventory = db.query(Inventory).filter(Inventory.product_id == product_id).first()
@@ -52,41 +35,48 @@ def get_or_create_inventory(db: Session, product_id: str):
         db.refresh(inventory)
     return to_dict(inventory)
 
-def createProductMoveHistoryNew(db: Session, move_data: CreateProductMovedHistory):
-    inventory = db.query(Inventory).filter(Inventory.product_id == move_data.product_id).first()
-    if move_data.type.lower() == 'income':
-        now_utc = move_data.timestamp or datetime.datetime.now(datetime.timezone.utc)
-        if not inventory:
-            # Buat inventory baru
-            inventory = Inventory(
-                id=str(uuid.uuid4()),
-                product_id=move_data.product_id,
-                quantity=move_data.quantity,
-                created_at=now_utc,
-                updated_at=now_utc
-            )
-            db.add(inventory)
-        else:
-            # Update quantity lama + quantity baru
-            inventory.quantity += move_data.quantity
-            inventory.updated_at = now_utc
-    elif move_data.type.lower() == 'outcome':
-        now_utc = move_data.timestamp or datetime.datetime.now(datetime.timezone.utc)
+def _lock_inventory(db: Session, product_id):
+    """Inventory row of a product, locked (SELECT ... FOR UPDATE) until the transaction ends."""
+    return db.query(Inventory).filter(Inventory.product_id == product_id).with_for_update().first()
+
+
+def _apply_stock_movement(db: Session, move_data: CreateProductMovedHistory) -> ProductMovedHistory:
+    """
+    Apply one movement as a delta on the locked inventory row and record it.
+
+    Only flushes; the caller owns the transaction. inventory.quantity is kept
+    in step incrementally, reconcile_inventory_quantities checks it against
+    the full movement history out of band.
+    """
+    now_utc = move_data.timestamp or datetime.datetime.now(datetime.timezone.utc)
+    move_type = move_data.type.lower()
+    if move_type == 'income':
+        quantityku = move_data.quantity
+    else:
+        quantityku = -move_data.quantity
+
+    inventory = _lock_inventory(db, move_data.product_id)
+    if move_type == 'outcome':
         if not inventory:
             raise ValueError('Inventory untuk produk ini belum ada, tidak bisa outcome!')
         if inventory.quantity < move_data.quantity:
             raise ValueError('Stock tidak cukup untuk outcome!')
-        inventory.quantity -= move_data.quantity
+    if inventory:
+        inventory.quantity += quantityku
         inventory.updated_at = now_utc
-    # Catat ke ProductMovedHistory
-    now_utc = move_data.timestamp or datetime.datetime.now(datetime.timezone.utc)
-    if move_data.type.lower() == 'income':
-        quantityku = move_data.quantity
-    else:
-        quantityku = -move_data.quantity
+    elif move_type == 'income':
+        # Buat inventory baru
+        db.add(Inventory(
+            id=uuid.uuid4(),
+            product_id=move_data.product_id,
+            quantity=move_data.quantity,
+            created_at=now_utc,
+            updated_at=now_utc
+        ))
 
+    # Catat ke ProductMovedHistory
     new_move = ProductMovedHistory(
-        id=str(uuid.uuid4()),
+        id=uuid.uuid4(),
         product_id=move_data.product_id,
         type=move_data.type,
         quantity=quantityku,
@@ -105,21 +95,221 @@ def createProductMoveHistoryNew(db: Session, move_data: CreateProductMovedHistor
         hpp_snapshot=move_data.hpp_snapshot,
     )
     db.add(new_move)
-    db.commit()
-    db.refresh(new_move)
+    db.flush()
+    return new_move
 
-    # Setelah commit, update inventory.quantity = sum seluruh ProductMovedHistory.quantity untuk product_id terkait
-    inventory = db.query(Inventory).filter(Inventory.product_id == move_data.product_id).first()
-    if inventory:
-        total_quantity = db.scalar(select(func.sum(ProductMovedHistory.quantity)).where(ProductMovedHistory.product_id == move_data.product_id)) or 0
-        inventory.quantity = total_quantity
-        inventory.updated_at = datetime.datetime.now(datetime.timezone.utc)
-        db.commit()
-        db.refresh(inventory)
 
+def createProductMoveHistoryNew(db: Session, move_data: CreateProductMovedHistory, commit: bool = True):
+    try:
+        new_move = _apply_stock_movement(db, move_data)
+        if commit:
+            db.commit()
+    except Exception:
+        if commit:
+            db.rollback()
+        raise
     return to_dict(new_move)
 
 
+def create_stock_movements(db: Session, moves: List[CreateProductMovedHistory], commit: bool = True) -> List[dict]:
+    """
+    Apply many stock movements in one transaction.
+
+    The affected inventory rows are locked in one statement, ordered by
+    product_id so that concurrent batches always lock in the same order and
+    cannot deadlock. The moves are then applied in the given order (an
+    outcome is checked against the stock left by the moves before it), and
+    the history rows are written with a single multi-row INSERT. On any
+    failure nothing is committed.
+
+    Args:
+        db: Database session.
+        moves: Movement lines, e.g. every product of a workorder or PO.
+        commit: Commit when done; pass False when the caller owns the transaction.
+
+    Returns:
+        List[dict]: The recorded history rows, in input order.
+
+    Raises:
+        ValueError: If an outcome has no inventory or not enough stock.
+    """
+    if not moves:
+        return []
+    try:
+        product_ids = sorted({move.product_id for move in moves})
+        inventories = {
+            inventory.product_id: inventory
+            for inventory in db.query(Inventory)
+            .filter(Inventory.product_id.in_(product_ids))
+            .order_by(Inventory.product_id)
+            .with_for_update()
+            .all()
+        }
+
+        history_rows = []
+        for move in moves:
+            now_utc = move.timestamp or datetime.datetime.now(datetime.timezone.utc)
+            move_type = move.type.lower()
+            quantityku = move.quantity if move_type == 'income' else -move.quantity
+            inventory = inventories.get(move.product_id)
+            if move_type == 'outcome':
+                if not inventory:
+                    raise ValueError('Inventory untuk produk ini belum ada, tidak bisa outcome!')
+                if inventory.quantity < move.quantity:
+                    raise ValueError('Stock tidak cukup untuk outcome!')
+            if inventory:
+                inventory.quantity += quantityku
+                inventory.updated_at = now_utc
+            elif move_type == 'income':
+                inventory = Inventory(
+                    id=uuid.uuid4(),
+                    product_id=move.product_id,
+                    quantity=move.quantity,
+                    created_at=now_utc,
+                    updated_at=now_utc
+                )
+                db.add(inventory)
+                inventories[move.product_id] = inventory
+
+            history_rows.append({
+                'id': uuid.uuid4(),
+                'product_id': move.product_id,
+                'type': move.type,
+                'quantity': quantityku,
+                'performed_by': move.performed_by,
+                'notes': move.notes,
+                'timestamp': now_utc,
+                'reference_type': move.reference_type,
+                'reference_id': move.reference_id,
+                'purchase_order_id': move.purchase_order_id,
+                'workorder_id': move.workorder_id,
+                'supplier_id': move.supplier_id,
+                'customer_id': move.customer_id,
+                'vehicle_id': move.vehicle_id,
+                'purchase_price': move.purchase_price,
+                'selling_price': move.selling_price,
+                'hpp_snapshot': move.hpp_snapshot,
+            })
+
+        db.flush()
+        db.execute(insert(ProductMovedHistory), history_rows)
+        if commit:
+            db.commit()
+    except Exception:
+        # With commit=False the caller owns the transaction and must roll back
+        if commit:
+            db.rollback()
+        raise
+    return to_dicts(ProductMovedHistory(**row) for row in history_rows)
+
+
+def correct_income_movement(db: Session, movement: ProductMovedHistory, product_id, quantity, purchase_price) -> ProductMovedHistory:
+    """
+    Correct a recorded income (e.g. an edited PO line) in place.
+
+    The old quantity is taken back from the old product and the new quantity
+    booked on the new product, on inventory rows locked in product_id order
+    like create_stock_movements. The movement keeps its timestamp, so a cost
+    replay from there averages the corrected receipt where it happened. Only
+    flushes; the caller owns the transaction.
+
+    Raises:
+        ValueError: If the stock the receipt brought in has already left.
+    """
+    deltas = {movement.product_id: -movement.quantity}
+    deltas[product_id] = deltas.get(product_id, 0) + quantity
+    inventories = {
+        inventory.product_id: inventory
+        for inventory in db.query(Inventory)
+        .filter(Inventory.product_id.in_(sorted(deltas)))
+        .order_by(Inventory.product_id)
+        .with_for_update()
+        .all()
+    }
+
+    now_utc = datetime.datetime.now(datetime.timezone.utc)
+    for delta_product_id, delta in deltas.items():
+        inventory = inventories.get(delta_product_id)
+        if delta < 0 and (not inventory or inventory.quantity + delta < 0):
+            raise ValueError('Stock tidak cukup untuk mengoreksi penerimaan!')
+        if inventory:
+            inventory.quantity += delta
+            inventory.updated_at = now_utc
+        elif delta:
+            db.add(Inventory(
+                id=uuid.uuid4(),
+                product_id=delta_product_id,
+                quantity=delta,
+                created_at=now_utc,
+                updated_at=now_utc
+            ))
+
+    movement.product_id = product_id
+    movement.quantity = quantity
+    movement.purchase_price = purchase_price
+    movement.hpp_snapshot = purchase_price
+    db.flush()
+    return movement
+
+
+def reconcile_inventory_quantities(db: Session, fix: bool = False) -> dict:
+    """
+    Compare inventory.quantity with the sum of each product's movement history.
+
+    Runs as a scheduled job (see scheduler_inventory_reconciliation) instead of
+    on every movement. Returns the products whose stock drifted; with
+    ``fix=True`` their inventory rows are reset to the history total.
+    """
+    history_totals = select(
+        ProductMovedHistory.product_id.label('product_id'),
+        func.sum(ProductMovedHistory.quantity).label('history_quantity'),
+    ).group_by(ProductMovedHistory.product_id).subquery()
+    inventory_totals = select(
+        Inventory.product_id.label('product_id'),
+        func.sum(Inventory.quantity).label('inventory_quantity'),
+    ).group_by(Inventory.product_id).subquery()
+
+    history_quantity = func.coalesce(history_totals.c.history_quantity, 0)
+    inventory_quantity = func.coalesce(inventory_totals.c.inventory_quantity, 0)
+    rows = db.execute(
+        select(Product.id, Product.name, inventory_quantity.label('inventory_quantity'), history_quantity.label('history_quantity'))
+        .outerjoin(history_totals, history_totals.c.product_id == Product.id)
+        .outerjoin(inventory_totals, inventory_totals.c.product_id == Product.id)
+        .where(inventory_quantity != history_quantity)
+        .order_by(Product.name)
+    ).all()
+
+    drifts = [
+        {
+            'product_id': str(row.id),
+            'product_name': row.name,
+            'inventory_quantity': float(row.inventory_quantity),
+            'history_quantity': float(row.history_quantity),
+            'drift': float(decimal.Decimal(row.inventory_quantity) - decimal.Decimal(row.history_quantity)),
+        }
+        for row in rows
+    ]
+
+    if fix and rows:
+        now_utc = datetime.datetime.now(datetime.timezone.utc)
+        for row in rows:
+            inventory = _lock_inventory(db, row.id)
+            if inventory:
+                inventory.quantity = row.history_quantity
+                inventory.updated_at = now_utc
+            else:
+                db.add(Inventory(
+                    id=uuid.uuid4(),
+                    product_id=row.id,
+                    quantity=row.history_quantity,
+                    created_at=now_utc,
+                    updated_at=now_utc
+                ))
+        db.commit()
+
+    return {'checked_at': datetime.datetime.now(datetime.timezone.utc).isoformat(), 'fixed': bool(fix and rows), 'drifts': drifts}
+
+
 def consume_internal_product(db: Session, consumption_data: InternalConsumptionCreate):
     """Konsumsi internal: keluarkan stok dan catat jurnal pengeluaran barang."""
     try:
@@ -152,58 +342,24 @@ def createProductMoveHistoryNewLoss(db: Session, move_data: CreateProductMovedHi
     if move_data.type.lower() != 'outcome':
         raise ValueError("Type must be 'outcome' for product loss")
 
-    inventory = db.query(Inventory).filter(Inventory.product_id == move_data.product_id).first()
-
     now_utc = move_data.timestamp or datetime.datetime.now(datetime.timezone.utc)
-    if not inventory:
-        raise ValueError('Inventory untuk produk ini belum ada, tidak bisa outcome!')
-    if inventory.quantity < move_data.quantity:
-        raise ValueError('Stock tidak cukup untuk outcome!')
-    inventory.quantity -= move_data.quantity
-    inventory.updated_at = now_utc
-
-    # Catat ke ProductMovedHistory
-    quantityku = -move_data.quantity
-
-    new_move = ProductMovedHistory(
-        id=str(uuid.uuid4()),
-        product_id=move_data.product_id,
-        type=move_data.type,
-        quantity=quantityku,
-        performed_by=move_data.performed_by,
-        notes=move_data.notes,
-        timestamp=now_utc,
-        reference_type=move_data.reference_type or 'loss',
-        reference_id=move_data.reference_id,
-        purchase_order_id=move_data.purchase_order_id,
-        workorder_id=move_data.workorder_id,
-        supplier_id=move_data.supplier_id,
-        customer_id=move_data.customer_id,
-        vehicle_id=move_data.vehicle_id,
-        purchase_price=move_data.purchase_price,
-        selling_price=move_data.selling_price,
-        hpp_snapshot=move_data.hpp_snapshot,
-    )
-    db.add(new_move)
-    db.commit()
-    db.refresh(new_move)
-
-    # Setelah commit, update inventory.quantity = sum seluruh ProductMovedHistory.quantity untuk product_id terkait
-    inventory = db.query(Inventory).filter(Inventory.product_id == move_data.product_id).first()
-    if inventory:
-        total_quantity = db.scalar(select(func.sum(ProductMovedHistory.quantity)).where(ProductMovedHistory.product_id == move_data.product_id)) or 0
-        inventory.quantity = total_quantity
-        inventory.updated_at = datetime.datetime.now(datetime.timezone.utc)
-        db.commit()
-        db.refresh(inventory)
-
-    journal_entry = create_lost_goods_journal_entry(db, LostGoodsJournalEntry(
-        product_id=move_data.product_id,
-        quantity=move_data.quantity,
-        memo='Kehilangan Produk Gudang',
-        loss_account_code="6003",
-        inventory_account_code="2002",
-        date=now_utc,))
+    try:
+        new_move = _apply_stock_movement(db, move_data.model_copy(update={
+            'timestamp': now_utc,
+            'reference_type': move_data.reference_type or 'loss',
+        }))
+
+        # The journal commit also commits the stock movement
+        journal_entry = create_lost_goods_journal_entry(db, LostGoodsJournalEntry(
+            product_id=move_data.product_id,
+            quantity=move_data.quantity,
+            memo='Kehilangan Produk Gudang',
+            loss_account_code="6003",
+            inventory_account_code="2002",
+            date=now_utc,))
+    except Exception:
+        db.rollback()
+        raise
 
     return {
         'move': to_dict(new_move),
@@ -212,11 +368,19 @@ def createProductMoveHistoryNewLoss(db: Session, move_data: CreateProductMovedHi
 
 
 def generate_product_move_history_report(db: Session, request: ProductMoveHistoryReportRequest) -> ProductMoveHistoryReport:
-    """Generate a paginated stock card from structured movement references."""
+    """
+    Generate a paginated stock card from structured movement references.
+
+    The running balance is a window sum over the filtered movements
+    (PARTITION BY product_id ORDER BY timestamp, id) seeded with each
+    product's opening balance, so only the requested page is fetched and
+    hydrated. Summary totals come from a separate aggregate query.
+    """
     from models.customer import Customer, Vehicle
     from models.supplier import Supplier
-    from models.purchase_order import PurchaseOrder, PurchaseOrderLine
-    from models.workorder import Workorder, ProductOrdered
+    from models.purchase_order import PurchaseOrder
+    from models.workorder import Workorder
+    from schemas.service_inventory import ProductMoveHistorySummary, ProductMoveHistoryPagination
 
     start_at = datetime.datetime.combine(request.start_date, datetime.time.min)
     end_at = datetime.datetime.combine(
@@ -230,114 +394,129 @@ def generate_product_move_history_report(db: Session, request: ProductMoveHistor
     if request.customer_id and not db.query(Customer.id).filter(Customer.id == request.customer_id).first():
         raise LookupError('Customer tidak ditemukan')
 
-    opening_query = db.query(
-        ProductMovedHistory.product_id,
-        func.coalesce(func.sum(ProductMovedHistory.quantity), 0),
-    ).filter(ProductMovedHistory.timestamp < start_at)
+    opening_query = select(
+        ProductMovedHistory.product_id.label('product_id'),
+        func.sum(ProductMovedHistory.quantity).label('opening'),
+    ).where(ProductMovedHistory.timestamp < start_at)
     if request.product_id:
-        opening_query = opening_query.filter(ProductMovedHistory.product_id == request.product_id)
-    opening_rows = opening_query.group_by(ProductMovedHistory.product_id).all()
-    opening_by_product = {row[0]: decimal.Decimal(row[1]) for row in opening_rows}
+        opening_query = opening_query.where(ProductMovedHistory.product_id == request.product_id)
+    opening = opening_query.group_by(ProductMovedHistory.product_id).subquery()
+
+    # Outgoing movement types recorded with a positive quantity still reduce stock
+    movement_type = func.lower(func.coalesce(ProductMovedHistory.type, ''))
+    signed_quantity = case(
+        (movement_type.in_(['outcome', 'loss', 'internal_consumption']) & (ProductMovedHistory.quantity > 0),
+         -ProductMovedHistory.quantity),
+        else_=ProductMovedHistory.quantity,
+    )
 
-    query = db.query(ProductMovedHistory, Product).join(
-        Product, ProductMovedHistory.product_id == Product.id
-    ).filter(
+    filters = [
         ProductMovedHistory.timestamp >= start_at,
         ProductMovedHistory.timestamp < end_at,
-    )
+    ]
     if request.product_id:
-        query = query.filter(ProductMovedHistory.product_id == request.product_id)
+        filters.append(ProductMovedHistory.product_id == request.product_id)
     if request.movement_type:
-        query = query.filter(ProductMovedHistory.type == request.movement_type)
+        filters.append(ProductMovedHistory.type == request.movement_type)
     if request.reference_type:
-        query = query.filter(ProductMovedHistory.reference_type == request.reference_type)
+        filters.append(ProductMovedHistory.reference_type == request.reference_type)
     if request.supplier_id:
-        query = query.filter(ProductMovedHistory.supplier_id == request.supplier_id)
+        filters.append(ProductMovedHistory.supplier_id == request.supplier_id)
     if request.customer_id:
-        query = query.filter(ProductMovedHistory.customer_id == request.customer_id)
+        filters.append(ProductMovedHistory.customer_id == request.customer_id)
     if request.search:
         pattern = f'%{request.search}%'
-        query = query.filter(
-            (Product.name.ilike(pattern)) | (ProductMovedHistory.notes.ilike(pattern))
+        filters.append((Product.name.ilike(pattern)) | (ProductMovedHistory.notes.ilike(pattern)))
+
+    movements = select(
+        ProductMovedHistory,
+        Product.name.label('product_name'),
+        signed_quantity.label('signed_quantity'),
+        movement_type.label('movement_type'),
+        func.sum(signed_quantity).over(
+            partition_by=ProductMovedHistory.product_id,
+            order_by=(ProductMovedHistory.timestamp, ProductMovedHistory.id),
+        ).label('running_quantity'),
+    ).join(Product, ProductMovedHistory.product_id == Product.id).where(*filters).subquery()
+
+    # Summary over the whole filtered range, independent of the page
+    summary_row = db.execute(
+        select(
+            func.count().label('total'),
+            func.sum(case((movements.c.movement_type == 'adjustment', movements.c.signed_quantity), else_=0)).label('total_adjustment'),
+            func.sum(case(
+                ((movements.c.movement_type != 'adjustment') & (movements.c.signed_quantity > 0), movements.c.signed_quantity),
+                else_=0,
+            )).label('total_in'),
+            func.sum(case(
+                ((movements.c.movement_type != 'adjustment') & (movements.c.signed_quantity < 0), -movements.c.signed_quantity),
+                else_=0,
+            )).label('total_out'),
         )
-    rows = query.order_by(ProductMovedHistory.timestamp.asc(), ProductMovedHistory.id.asc()).all()
-
-    po_ids = {move.purchase_order_id for move, _ in rows if move.purchase_order_id}
-    wo_ids = {move.workorder_id for move, _ in rows if move.workorder_id}
-    supplier_ids = {move.supplier_id for move, _ in rows if move.supplier_id}
-    customer_ids = {move.customer_id for move, _ in rows if move.customer_id}
-    vehicle_ids = {move.vehicle_id for move, _ in rows if move.vehicle_id}
+    ).one()
+    opening_balance = decimal.Decimal(db.execute(select(func.coalesce(func.sum(opening.c.opening), 0))).scalar() or 0)
+    total = summary_row.total or 0
+    total_in = decimal.Decimal(summary_row.total_in or 0)
+    total_out = decimal.Decimal(summary_row.total_out or 0)
+    total_adjustment = decimal.Decimal(summary_row.total_adjustment or 0)
 
-    po_map = {po.id: po for po in db.query(PurchaseOrder).filter(PurchaseOrder.id.in_(po_ids)).all()} if po_ids else {}
-    wo_map = {wo.id: wo for wo in db.query(Workorder).filter(Workorder.id.in_(wo_ids)).all()} if wo_ids else {}
-    supplier_map = {s.id: s for s in db.query(Supplier).filter(Supplier.id.in_(supplier_ids)).all()} if supplier_ids else {}
-    customer_map = {c.id: c for c in db.query(Customer).filter(Customer.id.in_(customer_ids)).all()} if customer_ids else {}
-    vehicle_map = {v.id: v for v in db.query(Vehicle).filter(Vehicle.id.in_(vehicle_ids)).all()} if vehicle_ids else {}
+    if request.sort_order == 'desc':
+        page_order = (movements.c.timestamp.desc(), movements.c.id.desc())
+    else:
+        page_order = (movements.c.timestamp.asc(), movements.c.id.asc())
+    page_rows = db.execute(
+        select(
+            movements,
+            func.coalesce(opening.c.opening, 0).label('opening'),
+            PurchaseOrder.po_no,
+            Workorder.no_wo,
+            Supplier.supplier_code,
+            Supplier.nama.label('supplier_name'),
+            Customer.nama.label('customer_name'),
+            Vehicle.no_pol,
+        )
+        .outerjoin(opening, opening.c.product_id == movements.c.product_id)
+        .outerjoin(PurchaseOrder, PurchaseOrder.id == movements.c.purchase_order_id)
+        .outerjoin(Workorder, Workorder.id == movements.c.workorder_id)
+        .outerjoin(Supplier, Supplier.id == movements.c.supplier_id)
+        .outerjoin(Customer, Customer.id == movements.c.customer_id)
+        .outerjoin(Vehicle, Vehicle.id == movements.c.vehicle_id)
+        .order_by(*page_order)
+        .limit(request.limit)
+        .offset((request.page - 1) * request.limit)
+    ).all()
 
-    balances = dict(opening_by_product)
     items = []
-    total_in = decimal.Decimal('0')
-    total_out = decimal.Decimal('0')
-    total_adjustment = decimal.Decimal('0')
-    for move, product in rows:
-        quantity = decimal.Decimal(move.quantity)
-        movement_type = (move.type or '').lower()
-        if movement_type in {'outcome', 'loss', 'internal_consumption'} and quantity > 0:
-            quantity = -quantity
-        quantity_in = quantity if quantity > 0 else decimal.Decimal('0')
-        quantity_out = abs(quantity) if quantity < 0 else decimal.Decimal('0')
-        before = balances.get(move.product_id, decimal.Decimal('0'))
-        after = before + quantity
-        balances[move.product_id] = after
-        if movement_type == 'adjustment':
-            total_adjustment += quantity
-        elif quantity > 0:
-            total_in += quantity
-        elif quantity < 0:
-            total_out += abs(quantity)
-
-        po = po_map.get(move.purchase_order_id)
-        wo = wo_map.get(move.workorder_id)
-        supplier = supplier_map.get(move.supplier_id)
-        customer = customer_map.get(move.customer_id)
-        vehicle = vehicle_map.get(move.vehicle_id)
-        reference_type = move.reference_type
-        reference_no = po.po_no if po else (wo.no_wo if wo else None)
-        price = move.purchase_price if quantity > 0 else move.selling_price
-
+    for row in page_rows:
+        quantity = decimal.Decimal(row.signed_quantity)
+        after = decimal.Decimal(row.opening) + decimal.Decimal(row.running_quantity)
+        price = row.purchase_price if quantity > 0 else row.selling_price
         items.append(ProductMoveHistoryReportItem(
-            movement_id=str(move.id), product_id=str(move.product_id),
-            product_name=product.name, type=move.type, quantity=quantity,
-            quantity_in=quantity_in, quantity_out=quantity_out,
-            balance_before=before, balance_after=after,
-            purchase_price=move.purchase_price, selling_price=move.selling_price,
-            price=price, hpp=move.hpp_snapshot,
-            reference_type=reference_type,
-            reference_id=str(move.reference_id) if move.reference_id else None,
-            reference_no=reference_no,
-            purchase_order_id=str(move.purchase_order_id) if move.purchase_order_id else None,
-            purchase_order_no=po.po_no if po else None,
-            workorder_id=str(move.workorder_id) if move.workorder_id else None,
-            workorder_no=wo.no_wo if wo else None,
-            supplier_id=str(move.supplier_id) if move.supplier_id else None,
-            vendor_code=supplier.supplier_code if supplier else None,
-            vendor_name=supplier.nama if supplier else None,
-            customer_id=str(move.customer_id) if move.customer_id else None,
-            customer_name=customer.nama if customer else None,
-            vehicle_id=str(move.vehicle_id) if move.vehicle_id else None,
-            nopol=vehicle.no_pol if vehicle else None,
-            timestamp=move.timestamp, performed_by=move.performed_by, notes=move.notes,
+            movement_id=str(row.id), product_id=str(row.product_id),
+            product_name=row.product_name, type=row.type, quantity=quantity,
+            quantity_in=quantity if quantity > 0 else decimal.Decimal('0'),
+            quantity_out=abs(quantity) if quantity < 0 else decimal.Decimal('0'),
+            balance_before=after - quantity, balance_after=after,
+            purchase_price=row.purchase_price, selling_price=row.selling_price,
+            price=price, hpp=row.hpp_snapshot,
+            reference_type=row.reference_type,
+            reference_id=str(row.reference_id) if row.reference_id else None,
+            reference_no=row.po_no or row.no_wo,
+            purchase_order_id=str(row.purchase_order_id) if row.purchase_order_id else None,
+            purchase_order_no=row.po_no,
+            workorder_id=str(row.workorder_id) if row.workorder_id else None,
+            workorder_no=row.no_wo,
+            supplier_id=str(row.supplier_id) if row.supplier_id else None,
+            vendor_code=row.supplier_code,
+            vendor_name=row.supplier_name,
+            customer_id=str(row.customer_id) if row.customer_id else None,
+            customer_name=row.customer_name,
+            vehicle_id=str(row.vehicle_id) if row.vehicle_id else None,
+            nopol=row.no_pol,
+            timestamp=row.timestamp, performed_by=row.performed_by, notes=row.notes,
         ))
 
-    total = len(items)
     total_pages = (total + request.limit - 1) // request.limit if total else 0
-    if request.sort_order == 'desc':
-        items.reverse()
-    start = (request.page - 1) * request.limit
-    paginated_items = items[start:start + request.limit]
-    opening_balance = sum(opening_by_product.values(), decimal.Decimal('0'))
-
-    from schemas.service_inventory import ProductMoveHistorySummary, ProductMoveHistoryPagination
     return ProductMoveHistoryReport(
         summary=ProductMoveHistorySummary(
             opening_balance=opening_balance, total_in=total_in, total_out=total_out,
@@ -345,7 +524,7 @@ def generate_product_move_history_report(db: Session, request: ProductMoveHistor
             closing_balance=opening_balance + total_in - total_out + total_adjustment,
         ),
         total_entries=total,
-        items=paginated_items,
+        items=items,
         pagination=ProductMoveHistoryPagination(
             page=request.page, limit=request.limit, total=total,
             total_pages=total_pages, has_previous=request.page > 1,
@@ -359,7 +538,7 @@ def manual_adjustment_inventory(db: Session, adjustment_data: ManualAdjustment):
     This creates a ProductMovedHistory entry with type 'adjustment'.
     """
     # Get or create inventory
-    inventory = db.query(Inventory).filter(Inventory.product_id == adjustment_data.product_id).first()
+    inventory = _lock_inventory(db, adjustment_data.product_id)
     now_utc = adjustment_data.timestamp or datetime.datetime.now(datetime.timezone.utc)
     if not inventory:
         inventory = Inventory(
@@ -391,13 +570,6 @@ def manual_adjustment_inventory(db: Session, adjustment_data: ManualAdjustment):
     db.commit()
     db.refresh(new_move)
 
-    # Update inventory quantity based on sum of all ProductMovedHistory
-    total_quantity = db.scalar(select(func.sum(ProductMovedHistory.quantity)).where(ProductMovedHistory.product_id == adjustment_data.product_id)) or 0
-    inventory.quantity = total_quantity
-    inventory.updated_at = datetime.datetime.now(datetime.timezone.utc)
-    db.commit()
-    db.refresh(inventory)
-
     # Track cost history for adjustment (cost doesn't change, but we track quantity change)
     try:
         cost_result = calculate_average_cost_for_adjustment(
@@ -9,6 +9,7 @@ from decimal import Decimal
 from typing import Any, cast
 from models.inventory import ProductMovedHistory, Inventory
 from models.workorder import Product
+from services.services_costing import request_cost_replay
 
 
 def _serialize_move_history(move: ProductMovedHistory) -> dict:
@@ -61,6 +62,8 @@ def update_inventory_adjustment(db: Session, adjustment_id: UUID, update_data: d
             if inventory:
                 inventory.quantity = cast(Any, inventory.quantity) + Decimal(str(quantity_difference))
                 inventory.updated_at = cast(Any, datetime.utcnow())
+            # Later average costs were computed against the old quantity
+            request_cost_replay(db, [adjustment.product_id], cast(Any, adjustment.timestamp))
         
         db.commit()
         db.refresh(adjustment)
@@ -98,6 +101,7 @@ def delete_inventory_adjustment(db: Session, adjustment_id: UUID) -> dict:
             inventory.updated_at = cast(Any, datetime.utcnow())
         
         # Delete the adjustment record
+        request_cost_replay(db, [adjustment.product_id], cast(Any, adjustment.timestamp))
         db.delete(adjustment)
         db.commit()
         
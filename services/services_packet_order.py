@@ -5,28 +5,8 @@ from models.packet_order import PacketOrder,ProductLinePacketOrder,ServiceLinePa
 import uuid
 from models.database import get_db
 from schemas.service_packet_order import CreatePacketOrder, CreateProductLinePacketOrder, CreateServiceLinePacketOrder
-import decimal
-import datetime
-
-
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        result[c.name] = value
-    return result
+from supports.utils_serializer import to_dict
+
 
 def CreatePacketOrdernya(db: Session, data: CreatePacketOrder):
     # Step 1: Create the PacketOrder and commit to get its id
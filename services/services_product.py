@@ -7,40 +7,21 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import joinedload
 from sqlalchemy import inspect, or_
-from sqlalchemy import func, select
+from sqlalchemy import func, select, union_all, String
 from models.workorder import Product, Brand, Satuan, Category, Service, Workorder, ProductOrdered, ServiceOrdered
 from models.purchase_order import PurchaseOrderLine
 import uuid
 from models.database import get_db
 from schemas.service_product import CreateProduct, UpdateProduct, ProductResponse, BrandResponse, SatuanResponse, CategoryResponse, CreateService, ServiceResponse, CreateBrand, CreateCategory,CreateSatuan
-import decimal
 import datetime
 from decimal import Decimal
 from typing import Any, cast
+from supports.utils_serializer import to_dict, to_dicts
+from services.services_sales_fact import rename_sales_line_fact_item
 
 def to_float(value: Any) -> float:
     return float(cast(Decimal, value))
 
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = to_float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        result[c.name] = value
-    return result
-
-
 def _decimal_or_none(value):
     if value is None:
         return None
@@ -130,6 +111,93 @@ def _get_latest_purchase_source(db: Session, product_id, consignment_available:
     return candidates[0][3]
 
 
+PURCHASE_SOURCE_BATCH_SIZE = 1000
+
+
+def _get_latest_purchase_sources(db: Session, product_ids=None, consignment_available: bool | None = None) -> dict:
+    """
+    Batch version of _get_latest_purchase_source.
+
+    Resolves the latest valid consignment receipt / received PO line for many
+    products with one ROW_NUMBER() query (per chunk of product ids) instead of
+    two ordered queries per product. ``product_ids=None`` resolves every
+    product. Returns {product_id: {'price', 'supplier'}}; products without
+    purchase history are absent.
+    """
+    from models.purchase_order import PurchaseOrder, PurchaseOrderStatus
+    from models.consignment import ConsignmentReceipt
+    from models.supplier import Supplier
+
+    if consignment_available is None:
+        consignment_available = inspect(db.get_bind()).has_table(ConsignmentReceipt.__tablename__)
+
+    def _resolve(ids) -> dict:
+        purchase_candidates = select(
+            PurchaseOrderLine.product_id.label('product_id'),
+            PurchaseOrderLine.price.label('price'),
+            PurchaseOrder.supplier_id.label('supplier_id'),
+            PurchaseOrder.date.label('tx_date'),
+            PurchaseOrder.created_at.label('tx_created_at'),
+            PurchaseOrderLine.id.cast(String).label('tie_breaker'),
+        ).join(PurchaseOrder, PurchaseOrderLine.purchase_order_id == PurchaseOrder.id).where(
+            PurchaseOrderLine.quantity > 0,
+            PurchaseOrderLine.price.is_not(None),
+            PurchaseOrder.status.in_([
+                PurchaseOrderStatus.diterima,
+                PurchaseOrderStatus.dibayarkan,
+            ]),
+        )
+        if ids is not None:
+            purchase_candidates = purchase_candidates.where(PurchaseOrderLine.product_id.in_(ids))
+        candidates = purchase_candidates
+
+        if consignment_available:
+            consignment_candidates = select(
+                ConsignmentReceipt.product_id,
+                ConsignmentReceipt.unit_price,
+                ConsignmentReceipt.supplier_id,
+                ConsignmentReceipt.receipt_date,
+                ConsignmentReceipt.created_at,
+                ConsignmentReceipt.id.cast(String),
+            ).where(
+                ConsignmentReceipt.quantity_received > 0,
+                ConsignmentReceipt.unit_price.is_not(None),
+            )
+            if ids is not None:
+                consignment_candidates = consignment_candidates.where(ConsignmentReceipt.product_id.in_(ids))
+            candidates = union_all(purchase_candidates, consignment_candidates)
+
+        candidates = candidates.subquery()
+        # Same ordering as the per-product lookup: date, then creation time, then id
+        ranked = select(
+            candidates,
+            func.row_number().over(
+                partition_by=candidates.c.product_id,
+                order_by=(
+                    candidates.c.tx_date.desc(),
+                    candidates.c.tx_created_at.desc().nulls_last(),
+                    candidates.c.tie_breaker.desc(),
+                ),
+            ).label('rn'),
+        ).subquery()
+        rows = db.execute(
+            select(ranked.c.product_id, ranked.c.price, Supplier)
+            .outerjoin(Supplier, Supplier.id == ranked.c.supplier_id)
+            .where(ranked.c.rn == 1)
+        ).all()
+        return {row.product_id: {'price': row.price, 'supplier': row.Supplier} for row in rows}
+
+    if product_ids is None:
+        return _resolve(None)
+    product_ids = list(product_ids)
+    sources = {}
+    for offset in range(0, len(product_ids), PURCHASE_SOURCE_BATCH_SIZE):
+        chunk = product_ids[offset:offset + PURCHASE_SOURCE_BATCH_SIZE]
+        if chunk:
+            sources.update(_resolve(chunk))
+    return sources
+
+
 def _get_latest_purchase_price(db: Session, product_id, consignment_available: bool | None = None):
     source = _get_latest_purchase_source(db, product_id, consignment_available)
     if source is None:
@@ -141,12 +209,17 @@ def _build_inventory_item(
     db: Session,
     product: Product,
     consignment_available: bool | None = None,
+    purchase_sources: dict | None = None,
 ) -> dict:
     p_dict = to_dict(product)
     p_dict['category_name'] = product.category.name if product.category else None
     p_dict['brand_name'] = product.brand.name if product.brand else None
     p_dict['satuan_name'] = product.satuan.name if product.satuan else None
-    latest_purchase_source = _get_latest_purchase_source(db, product.id, consignment_available)
+    # List endpoints pass the batch-resolved sources; single lookups query per product
+    if purchase_sources is not None:
+        latest_purchase_source = purchase_sources.get(product.id)
+    else:
+        latest_purchase_source = _get_latest_purchase_source(db, product.id, consignment_available)
     latest_supplier = latest_purchase_source['supplier'] if latest_purchase_source else product.supplier
     p_dict['vendor_code'] = latest_supplier.supplier_code if latest_supplier else None
     p_dict['supplier_name'] = latest_supplier.nama if latest_supplier else None
@@ -248,6 +321,8 @@ def update_product(db: Session, product_id: uuid.UUID, product_data: UpdateProdu
     for field, value in changes.items():
         setattr(product, field, value)
 
+    if "name" in changes:
+        rename_sales_line_fact_item(db, "product", product.id, product.name)
     db.commit()
     db.refresh(product)
     return get_product_by_id(db, str(product.id))
@@ -300,7 +375,7 @@ def createServicenya(db: Session, service_data: CreateService):
 
 def get_all_services(db: Session):
     services = db.query(Service).all()
-    result = [to_dict(service) for service in services]
+    result = to_dicts(services)
     return result
 
 def get_service_by_id(db: Session, service_id: str):
@@ -331,6 +406,7 @@ def update_service(db: Session, service_id: str, service_data: CreateService):
         # Execute update
         stmt = update(Service).where(Service.id == service_uuid).values(**update_values)
         db.execute(stmt)
+        rename_sales_line_fact_item(db, 'service', service_uuid, service_data.name)
         db.commit()
         
         # Retrieve updated service to verify it exists
@@ -365,36 +441,31 @@ def update_product_cost(db: Session, product_id: str, cost: Decimal):
     db.refresh(product)
     return to_dict(product)
 
-def getAllInventoryProducts(db: Session):
-    products = db.query(Product).options(
+def _inventory_products_query(db: Session):
+    return db.query(Product).options(
         joinedload(Product.category),
         joinedload(Product.brand),
         joinedload(Product.satuan),
         joinedload(Product.supplier),
         joinedload(Product.inventory),
-        joinedload(Product.purchase_order_lines).joinedload(PurchaseOrderLine.product),
-    ).all()
-    return [_build_inventory_item(db, product) for product in products]
+    )
+
+def _build_inventory_items(db: Session, products, resolve_all: bool = False) -> list:
+    # resolve_all: the listing covers the whole catalogue, so skip the IN list
+    purchase_sources = _get_latest_purchase_sources(db, None if resolve_all else [product.id for product in products])
+    return [_build_inventory_item(db, product, purchase_sources=purchase_sources) for product in products]
+
+def getAllInventoryProducts(db: Session):
+    products = _inventory_products_query(db).all()
+    return _build_inventory_items(db, products, resolve_all=True)
 
 def getAllInventoryProductsExcConsignment(db: Session):
-    products = db.query(Product).options(
-        joinedload(Product.category),
-        joinedload(Product.brand),
-        joinedload(Product.satuan),
-        joinedload(Product.supplier),
-        joinedload(Product.inventory),
-    ).filter(Product.is_consignment == False).all()
-    return [_build_inventory_item(db, product) for product in products]
+    products = _inventory_products_query(db).filter(Product.is_consignment == False).all()
+    return _build_inventory_items(db, products)
 
 def getAllInventoryProductsConsignment(db: Session):
-    products = db.query(Product).options(
-        joinedload(Product.category),
-        joinedload(Product.brand),
-        joinedload(Product.satuan),
-        joinedload(Product.supplier),
-        joinedload(Product.inventory),
-    ).filter(Product.is_consignment == True).all()
-    return [_build_inventory_item(db, product) for product in products]
+    products = _inventory_products_query(db).filter(Product.is_consignment == True).all()
+    return _build_inventory_items(db, products)
 
 def getInventoryByProductID(db: Session, product_id: str):
     product = db.query(Product).filter(Product.id == product_id).first()
@@ -411,17 +482,20 @@ def get_inventory_products_paginated(
     category_id = None,
     stock_status: str | None = None,
 ):
-    query = db.query(Product).options(
-        joinedload(Product.category),
-        joinedload(Product.brand),
-        joinedload(Product.satuan),
-        joinedload(Product.supplier),
-        joinedload(Product.inventory),
-    )
+    # total_stock and stock_status are computed in SQL so that filtering,
+    # counting and paging happen before any product is hydrated
+    stock_totals = select(
+        Inventory.product_id.label('product_id'),
+        func.sum(Inventory.quantity).label('total_stock'),
+    ).group_by(Inventory.product_id).subquery()
+    total_stock = func.coalesce(stock_totals.c.total_stock, 0)
+    is_safe = total_stock > func.coalesce(Product.min_stock, 0)
+
+    query = select(Product.id).outerjoin(stock_totals, stock_totals.c.product_id == Product.id)
 
     if search:
         search_like = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             or_(
                 Product.name.ilike(search_like),
                 Product.type.ilike(search_like),
@@ -432,23 +506,30 @@ def get_inventory_products_paginated(
         )
 
     if category_id:
-        query = query.filter(Product.category_id == category_id)
-
-    products = query.order_by(Product.name.asc()).all()
-    from models.consignment import ConsignmentReceipt
-    consignment_available = inspect(db.get_bind()).has_table(ConsignmentReceipt.__tablename__)
-    data = [
-        _build_inventory_item(db, product, consignment_available)
-        for product in products
-    ]
-
-    if stock_status in {'safe', 'reorder'}:
-        data = [item for item in data if item.get('stock_status') == stock_status]
+        query = query.where(Product.category_id == category_id)
+
+    if stock_status == 'safe':
+        query = query.where(is_safe)
+    elif stock_status == 'reorder':
+        query = query.where(~is_safe)
+
+    total_after_filter = db.execute(select(func.count()).select_from(query.subquery())).scalar() or 0
+    page_ids = db.execute(
+        query.order_by(Product.name.asc(), Product.id.asc()).limit(limit).offset((page - 1) * limit)
+    ).scalars().all()
+
+    paginated_data = []
+    if page_ids:
+        products_by_id = {
+            product.id: product
+            for product in _inventory_products_query(db).filter(Product.id.in_(page_ids)).all()
+        }
+        purchase_sources = _get_latest_purchase_sources(db, page_ids)
+        paginated_data = [
+            _build_inventory_item(db, products_by_id[product_id], purchase_sources=purchase_sources)
+            for product_id in page_ids
+        ]
 
-    total_after_filter = len(data)
-    start_index = (page - 1) * limit
-    end_index = start_index + limit
-    paginated_data = data[start_index:end_index]
     total_pages = (total_after_filter + limit - 1) // limit if total_after_filter else 0
 
     return {
@@ -466,60 +547,12 @@ def get_inventory_products_paginated(
     }
 
 def createProductMoveHistoryNew(db: Session, move_data: CreateProductMovedHistory):
-    inventory = db.query(Inventory).filter(Inventory.product_id == move_data.product_id).first()
-    if move_data.type.lower() == 'income':
-        now_utc = move_data.timestamp or datetime.datetime.now(datetime.timezone.utc)
-        if not inventory:
-            # Buat inventory baru
-            inventory = Inventory(
-                id=str(uuid.uuid4()),
-                product_id=move_data.product_id,
-                quantity=move_data.quantity,
-                created_at=now_utc,
-                updated_at=now_utc
-            )
-            db.add(inventory)
-        else:
-            # Update quantity lama + quantity baru
-            inventory.quantity += move_data.quantity  # type: ignore
-            inventory.updated_at = now_utc  # type: ignore
-    elif move_data.type.lower() == 'outcome':
-        now_utc = move_data.timestamp or datetime.datetime.now(datetime.timezone.utc)
-        if not inventory:
-            raise ValueError('Inventory untuk produk ini belum ada, tidak bisa outcome!')
-        if inventory.quantity < move_data.quantity:  # type: ignore
-            raise ValueError('Stock tidak cukup untuk outcome!')
-        inventory.quantity -= move_data.quantity  # type: ignore
-        inventory.updated_at = now_utc  # type: ignore
-    # Catat ke ProductMovedHistory
-    now_utc = move_data.timestamp or datetime.datetime.now(datetime.timezone.utc)
-    if move_data.type.lower() == 'income':
-        quantityku = move_data.quantity
-    else:
-        quantityku = -move_data.quantity
-
-    new_move = ProductMovedHistory(
-        id=str(uuid.uuid4()),
-        product_id=move_data.product_id,
-        type=move_data.type,
-        quantity=quantityku,
-        performed_by=move_data.performed_by,
-        notes=move_data.notes,
-        timestamp=now_utc
-    )
-    db.add(new_move)
-    db.flush()
-    db.refresh(new_move)
-
-    # Setelah flush, update inventory.quantity = sum seluruh ProductMovedHistory.quantity untuk product_id terkait
-    inventory = db.query(Inventory).filter(Inventory.product_id == move_data.product_id).first()
-    if inventory:
-        total_quantity = db.scalar(select(func.sum(ProductMovedHistory.quantity)).where(ProductMovedHistory.product_id == move_data.product_id)) or 0
-        inventory.quantity = total_quantity  # type: ignore
-        inventory.updated_at = datetime.datetime.now(datetime.timezone.utc)  # type: ignore
-        db.flush()
-        db.refresh(inventory)
+    # Same locked-delta movement as services_inventory, but the caller commits
+    # (the product routes commit once per request). Imported lazily because
+    # services_inventory imports this module.
+    from services.services_inventory import _apply_stock_movement
 
+    new_move = _apply_stock_movement(db, move_data)
     return to_dict(new_move)
 
 def EditProductMovedHistory(db: Session, move_id: str, move_data: CreateProductMovedHistory):
@@ -602,17 +635,17 @@ def createSatuannya(db: Session, dataSatuan: CreateSatuan):
 
 def getAllBrands(db: Session):
     brands = db.query(Brand).all()
-    result = [to_dict(brand) for brand in brands]
+    result = to_dicts(brands)
     return result
 
 def getAllSatuans(db: Session):
     satuans = db.query(Satuan).all()
-    result = [to_dict(satuan) for satuan in satuans]
+    result = to_dicts(satuans)
     return result
 
 def getAllCategories(db: Session):
     categories = db.query(Category).all()
-    result = [to_dict(category) for category in categories]
+    result = to_dicts(categories)
     return result
 
 
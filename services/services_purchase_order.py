@@ -5,19 +5,22 @@ import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from models.purchase_order import PurchaseOrder, PurchaseOrderLine
+from models.inventory import ProductMovedHistory
 from schemas.service_accounting import PurchaseJournalEntry
 from services.services_accounting import create_purchase_journal_entry
 from schemas.service_purchase_order import CreatePurchaseOrder, UpdatePurchaseOrder, CreatePurchaseOrderLine, UpdatePurchaseOrderLine, UpdatePurchaseOrderLineSingle, CreatePurchaseOrderLineSingle
-from schemas.service_inventory import CreateProductMovedHistory, PurchaseOrderUpdateCost
-from services.services_inventory import createProductMoveHistoryNew, updateCostCostingMethodeAverage
-from services.services_costing import calculate_average_cost
+from schemas.service_inventory import CreateProductMovedHistory
+from services.services_inventory import create_stock_movements, correct_income_movement
+from services.services_costing import calculate_average_costs_bulk, request_cost_replay
+from services.services_business_summary import refresh_monthly_business_summary
+from services.services_dashboard import invalidate_dashboard_cache
 from services.services_expenses import edit_expense_status
-import decimal
 from decimal import Decimal
 from uuid import uuid4
 import uuid
 import enum
 import logging
+from supports.utils_serializer import to_dict
 
 logger = logging.getLogger(__name__)
 
@@ -28,27 +31,77 @@ def _status_value(status):
     return status
 
 
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi Enum ke value
-        elif isinstance(value, enum.Enum):
-            value = value.value
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        result[c.name] = value
-    return result
+def receive_purchase_order(db: Session, po: PurchaseOrder, performed_by: str = 'system', post_journal: bool = False):
+    """
+    Goods receipt for a PO: costing, stock and (optionally) the journal in one transaction.
+
+    The weighted average cost of every line is computed in one pass against
+    the stock on hand before the receipt. The stock movements are then
+    applied as one batch and, with post_journal, the purchase journal entry
+    is posted. Everything commits together or not at all.
+
+    Returns:
+        dict: purchase_order_id, per-line results (movement and costing) and
+        the journal entry, if one was posted.
+    """
+    lines = list(po.lines)
+    notes = f'Purchase order {po.po_no} received'
+    # Cost history and movements share one timestamp, so a cost replay from
+    # a receipt regenerates exactly that receipt's average cost rows
+    now = datetime.datetime.now()
+    try:
+        costing = calculate_average_costs_bulk(
+            db,
+            [(line.product_id, Decimal(line.quantity), Decimal(line.price)) for line in lines],
+            created_by=performed_by,
+            notes=notes,
+            created_at=now,
+        )
+        movements = create_stock_movements(db, [
+            CreateProductMovedHistory(
+                product_id=line.product_id,
+                type='income',
+                quantity=line.quantity,
+                performed_by=performed_by,
+                notes=notes,
+                timestamp=now,
+                reference_type='purchase_order', reference_id=line.id,
+                purchase_order_id=po.id, supplier_id=po.supplier_id,
+                purchase_price=line.price, hpp_snapshot=line.price,
+            )
+            for line in lines
+        ], commit=False)
+
+        journal_entry = None
+        if post_journal:
+            journal_entry = create_purchase_journal_entry(db, PurchaseJournalEntry(
+                date=po.date,
+                memo=notes,
+                supplier_id=po.supplier_id,
+                purchase_id=po.id,
+                harga_product=po.total,
+                pajak=po.pajak
+            ), commit=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {
+        'purchase_order_id': str(po.id),
+        'lines': [
+            {
+                'line_id': str(line.id),
+                'product_id': str(line.product_id),
+                'quantity': float(line.quantity),
+                'price': float(line.price),
+                'movement_id': movement['id'],
+                'costing': cost,
+            }
+            for line, movement, cost in zip(lines, movements, costing)
+        ],
+        'journal_entry': journal_entry,
+    }
 
 def create_purchase_order(db: Session, data: CreatePurchaseOrder):
     # Generate PO number
@@ -91,28 +144,15 @@ def create_purchase_order(db: Session, data: CreatePurchaseOrder):
 
     purchase_order.total = total
 
+    refresh_monthly_business_summary(db, [purchase_order.date])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(purchase_order)
 
     # If status is 'diterima', call productMovedHistoryNew with type 'income'
     status_value = _status_value(purchase_order.status)
     if status_value == 'diterima':
-        for line in purchase_order.lines:
-            move_data = CreateProductMovedHistory(
-                product_id=line.product_id,
-                type='income',
-                quantity=line.quantity,
-                performed_by='system',
-                notes=f'Purchase order {purchase_order.po_no} received',
-                timestamp=datetime.datetime.now(),
-                reference_type='purchase_order',
-                reference_id=purchase_order.id,
-                purchase_order_id=purchase_order.id,
-                supplier_id=purchase_order.supplier_id,
-                purchase_price=line.price,
-                hpp_snapshot=line.price,
-            )
-            createProductMoveHistoryNew(db, move_data)
+        receive_purchase_order(db, purchase_order)
 
     return to_dict(purchase_order)
 
@@ -165,6 +205,8 @@ def delete_purchase_order(db: Session, purchase_order_id: str):
             db.delete(line)
 
         db.delete(po)
+        refresh_monthly_business_summary(db, [po.date])
+        invalidate_dashboard_cache(db)
         db.commit()
         return {"message": "PurchaseOrder deleted successfully"}
     except IntegrityError:
@@ -179,6 +221,7 @@ def update_purchase_order(db: Session, purchase_order_id: str, data: UpdatePurch
 
         # Store old status for comparison
         old_status = po.status
+        old_date = po.date
 
         # Update fields
         if data.supplier_id:
@@ -218,6 +261,8 @@ def update_purchase_order(db: Session, purchase_order_id: str, data: UpdatePurch
             # Recalculate total
             po.total = sum(line.subtotal for line in data.lines)
 
+        refresh_monthly_business_summary(db, [old_date, po.date])
+        invalidate_dashboard_cache(db)
         db.commit()
         db.refresh(po)
 
@@ -225,19 +270,7 @@ def update_purchase_order(db: Session, purchase_order_id: str, data: UpdatePurch
         old_status_value = _status_value(old_status)
         status_value = _status_value(po.status)
         if old_status_value != 'diterima' and status_value == 'diterima':
-            for line in po.lines:
-                move_data = CreateProductMovedHistory(
-                    product_id=line.product_id,
-                    type='income',
-                    quantity=line.quantity,
-                    performed_by='system',
-                    notes=f'Purchase order {po.po_no} received',
-                    timestamp=datetime.datetime.now(),
-                    reference_type='purchase_order', reference_id=po.id,
-                    purchase_order_id=po.id, supplier_id=po.supplier_id,
-                    purchase_price=line.price, hpp_snapshot=line.price,
-                )
-                createProductMoveHistoryNew(db, move_data)
+            receive_purchase_order(db, po)
 
         return to_dict(po)
     except IntegrityError:
@@ -258,6 +291,8 @@ def update_purchase_order_status(db: Session, purchase_order_id: str, status: st
 
         po.updated_at = datetime.datetime.now()
 
+        refresh_monthly_business_summary(db, [po.date])
+        invalidate_dashboard_cache(db)
         db.commit()
         db.refresh(po)
 
@@ -265,19 +300,7 @@ def update_purchase_order_status(db: Session, purchase_order_id: str, status: st
         old_status_value = _status_value(old_status)
         status_value = _status_value(po.status)
         if old_status_value != 'diterima' and status_value == 'diterima':
-            for line in po.lines:
-                move_data = CreateProductMovedHistory(
-                    product_id=line.product_id,
-                    type='income',
-                    quantity=line.quantity,
-                    performed_by=created_by or 'system',
-                    notes=f'Purchase order {po.po_no} received',
-                    timestamp=datetime.datetime.now(),
-                    reference_type='purchase_order', reference_id=po.id,
-                    purchase_order_id=po.id, supplier_id=po.supplier_id,
-                    purchase_price=line.price, hpp_snapshot=line.price,
-                )
-                createProductMoveHistoryNew(db, move_data)
+            receive_purchase_order(db, po, performed_by=created_by or 'system')
 
         return to_dict(po)
     except IntegrityError:
@@ -294,6 +317,7 @@ def edit_purchase_order(db: Session, purchase_order_id: str, data: UpdatePurchas
 
         # Store old status for comparison
         old_status = po.status
+        old_date = po.date
         lines_changed = data.lines is not None
         status_value = str(po.status)
         old_lines = list(po.lines) if lines_changed and status_value == 'diterima' else None
@@ -320,86 +344,27 @@ def edit_purchase_order(db: Session, purchase_order_id: str, data: UpdatePurchas
             po.bukti_transfer = data.bukti_transfer
         
         po.updated_at = datetime.datetime.now()
+        refresh_monthly_business_summary(db, [old_date, po.date])
+        invalidate_dashboard_cache(db)
 
-        db.flush()
-        db.commit()
-        db.refresh(po)
-        print("Database commit successful")
-        print(f" purchase order id: {po.id}")
-        # If status changed to 'diterima', call productMovedHistoryNew with type 'income' and create purchase journal entry
+        # If status changed to 'diterima', the goods receipt commits the edit together with
+        # the stock movements, average costs and purchase journal entry
         old_status_value = _status_value(old_status)
         status_value = _status_value(data.status) if data.status is not None else old_status_value
+        receipt = None
         if old_status_value != 'diterima' and status_value == 'diterima':
-            print("Status changed to 'diterima', creating product moves, calculating average cost, and journal entry")
-            for line in po.lines:
-                # Create product move history
-                move_data = CreateProductMovedHistory(
-                    product_id=line.product_id,
-                    type='income',
-                    quantity=line.quantity,
-                    performed_by='system',
-                    notes=f'Purchase order {po.po_no} received',
-                    timestamp=datetime.datetime.now(),
-                    reference_type='purchase_order', reference_id=po.id,
-                    purchase_order_id=po.id, supplier_id=po.supplier_id,
-                    purchase_price=line.price, hpp_snapshot=line.price,
-                )
-                logger.info(f"Creating product move: {move_data.product_id}, type: {move_data.type}, quantity: {move_data.quantity}")
-                hasil_create_move = createProductMoveHistoryNew(db, move_data)
-                print(f"hasil moving : {hasil_create_move}")
-                
-                # Calculate average cost for the product
-                try:
-                    cost_result = calculate_average_cost(
-                        db=db,
-                        product_id=str(line.product_id),
-                        purchase_quantity=line.quantity,
-                        purchase_price=line.price,
-                        created_by='system',
-                        notes=f'Purchase order {po.po_no} received'
-                    )
-                    logger.info(f"Average cost calculation result: {cost_result}")
-                    print(f"Average cost calculated: {cost_result}")
-                except Exception as e:
-                    logger.error(f"Error calculating average cost: {str(e)}")
-                    print(f"Error calculating average cost: {str(e)}")
-                    # Continue with other operations even if costing fails
-
-                # Update cost using the new function
-                try:
-                    update_result = updateCostCostingMethodeAverage(
-                        db=db,
-                        dataPurchase=PurchaseOrderUpdateCost(
-                            product_id=line.product_id,
-                            quantity=line.quantity,
-                            price=line.price
-                        )
-                    )
-                    logger.info(f"Cost update result: {update_result}")
-                    print(f"Cost updated: {update_result}")
-                except Exception as e:
-                    logger.error(f"Error updating cost: {str(e)}")
-                    print(f"Error updating cost: {str(e)}")
-                    # Continue with other operations even if cost update fails
-
-            # Create purchase journal entry
-            journal_data = PurchaseJournalEntry(
-                date=po.date,
-                memo=f'Purchase order {po.po_no} received',
-                supplier_id=po.supplier_id,
-                purchase_id=po.id,
-                harga_product=po.total,
-                pajak=po.pajak
-            )
-            print(f"Creating journal entry: {journal_data.memo}, total: {journal_data.harga_product}")
-            print(f"po.id: {po.id}, type: {type(po.id)}")
-            print(f"po.id is None: {po.id is None}")
-
-            hasil_create_purchase = create_purchase_journal_entry(db, journal_data)
-            print(f"hasil create : {hasil_create_purchase}")
+            db.flush()
+            receipt = receive_purchase_order(db, po, post_journal=True)
+            logger.info(f"Goods receipt for {po.po_no}: {len(receipt['lines'])} lines, journal {receipt['journal_entry']['entry_no']}")
+        else:
+            db.commit()
+        db.refresh(po)
 
+        result = to_dict(po)
+        if receipt:
+            result['receipt'] = receipt
         logger.info(f"edit_purchase_order completed successfully for ID: {purchase_order_id}")
-        return to_dict(po)
+        return result
     except IntegrityError as e:
         logger.error(f"IntegrityError in edit_purchase_order: {str(e)}")
         db.rollback()
@@ -415,6 +380,8 @@ def update_purchase_order_line(db: Session, line_id: str, data: UpdatePurchaseOr
         if not line:
             return {"message": "PurchaseOrderLine not found"}
 
+        old_product_id = line.product_id
+
         # Update fields
         line.product_id = data.product_id
         line.quantity = data.quantity
@@ -428,6 +395,21 @@ def update_purchase_order_line(db: Session, line_id: str, data: UpdatePurchaseOr
         po.total = sum(l.subtotal for l in po.lines)
         po.updated_at = datetime.datetime.now()
 
+        # A received PO already moved stock: correct the line's receipt
+        # (product, quantity, price) and queue the later average costs of
+        # every affected product for the nightly replay
+        receipt = db.query(ProductMovedHistory).filter(
+            ProductMovedHistory.purchase_order_id == po.id,
+            ProductMovedHistory.reference_type == 'purchase_order',
+            ProductMovedHistory.reference_id == line.id,
+            ProductMovedHistory.type == 'income',
+        ).first()
+        if receipt:
+            correct_income_movement(db, receipt, line.product_id, line.quantity, line.price)
+            request_cost_replay(db, [old_product_id, line.product_id], receipt.timestamp)
+
+        refresh_monthly_business_summary(db, [po.date])
+        invalidate_dashboard_cache(db)
         db.commit()
         db.refresh(line)
         db.refresh(po)
@@ -436,6 +418,9 @@ def update_purchase_order_line(db: Session, line_id: str, data: UpdatePurchaseOr
     except IntegrityError:
         db.rollback()
         return {"message": "Error updating PurchaseOrderLine"}
+    except ValueError:
+        db.rollback()
+        raise
 
 def add_purchase_order_line(db: Session, purchase_order_id: str, data: CreatePurchaseOrderLineSingle):
     try:
@@ -461,6 +446,8 @@ def add_purchase_order_line(db: Session, purchase_order_id: str, data: CreatePur
         po.total = sum(l.subtotal for l in po.lines) + subtotal
         po.updated_at = datetime.datetime.now()
 
+        refresh_monthly_business_summary(db, [po.date])
+        invalidate_dashboard_cache(db)
         db.commit()
         db.refresh(line)
         db.refresh(po)
@@ -482,6 +469,8 @@ def delete_purchase_order_line(db: Session, line_id: str):
         po.updated_at = datetime.datetime.now()
 
         db.delete(line)
+        refresh_monthly_business_summary(db, [po.date])
+        invalidate_dashboard_cache(db)
         db.commit()
 
         return {"message": "PurchaseOrderLine deleted successfully"}
@@ -500,6 +489,8 @@ def update_only_status_purchase_order(db: Session, purchase_id: str):
         po.status_pembayaran = 'lunas'
         po.updated_at = datetime.datetime.now()
 
+        refresh_monthly_business_summary(db, [po.date])
+        invalidate_dashboard_cache(db)
         db.commit()
         db.refresh(po)
 
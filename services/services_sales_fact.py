@@ -0,0 +1,188 @@
+"""
+Services untuk sales_line_fact (satu baris per item produk/jasa workorder yang sudah diakui sebagai penjualan)
+
+A workorder is recognized as a sale once it has a sale journal entry.
+_create_entry() and create_journal_entries_bulk() call
+refresh_sales_line_facts() when they post one, delete_journal_entry() when
+it removes one, and refresh_workorder_summaries() on every later workorder
+write, so the facts follow line edits and renamed customers or mechanics.
+The refresh is set-based: one DELETE of lines that are gone and one upsert
+of the current lines. Renamed products and services go through
+rename_sales_line_fact_item() instead, one UPDATE on the item index.
+
+The unit HPP is taken when a line first becomes a fact and kept on later
+refreshes (unless the line's item changes), so the sales reports show the
+cost at the time of the sale rather than today's cost. Product lines take
+the hpp_snapshot of the workorder's stock deduction, like the stock card
+and the migration backfill, and fall back to product.cost; service lines
+take service.cost.
+"""
+
+import datetime
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import DateTime, String, case, delete, func, insert, literal, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models.accounting import JournalEntry, JournalType
+from models.customer import Customer, Vehicle
+from models.inventory import ProductMovedHistory
+from models.karyawan import Karyawan
+from models.workorder import Product, ProductOrdered, SalesLineFact, Service, ServiceOrdered, Workorder
+
+SALES_FACT_REBUILD_BATCH = 1000
+
+_FACT_COLUMNS = [
+    'line_id', 'line_type', 'sale_date',
+    'workorder_id', 'no_wo', 'tanggal_masuk', 'customer_id', 'customer_name', 'vehicle_no_pol',
+    'karyawan_id', 'karyawan_name',
+    'item_id', 'item_name', 'quantity', 'price', 'discount', 'subtotal', 'hpp', 'refreshed_at',
+]
+
+
+def _fact_select(workorder_ids: List[Any], now: datetime.datetime):
+    """SELECT producing the sales_line_fact rows of the given workorders; unrecognized ones yield none."""
+    sales = select(
+        JournalEntry.workorder_id.label('workorder_id'),
+        func.min(JournalEntry.date).label('sale_date'),
+    ).where(
+        JournalEntry.workorder_id.in_(workorder_ids),
+        JournalEntry.journal_type == JournalType.sale,
+    ).group_by(JournalEntry.workorder_id).subquery()
+
+    # Product HPP is the workorder's stock deduction snapshot (the cost when
+    # the stock left), else the current cost
+    deducted_hpp = select(ProductMovedHistory.hpp_snapshot).where(
+        ProductMovedHistory.workorder_id == ProductOrdered.workorder_id,
+        ProductMovedHistory.reference_type == 'workorder',
+        ProductMovedHistory.product_id == ProductOrdered.product_id,
+        ProductMovedHistory.hpp_snapshot.isnot(None),
+    ).order_by(ProductMovedHistory.timestamp.desc()).limit(1).scalar_subquery()
+
+    def lines(kind, line, item, item_id, hpp):
+        return select(
+            line.id.label('line_id'),
+            literal(kind, String),
+            sales.c.sale_date,
+            Workorder.id,
+            Workorder.no_wo,
+            Workorder.tanggal_masuk,
+            Workorder.customer_id,
+            Customer.nama,
+            Vehicle.no_pol,
+            Workorder.karyawan_id,
+            Karyawan.nama,
+            item.id,
+            item.name,
+            line.quantity,
+            line.price,
+            line.discount,
+            line.subtotal,
+            hpp,
+            literal(now, DateTime),
+        ).select_from(line).join(
+            Workorder, Workorder.id == line.workorder_id
+        ).join(
+            sales, sales.c.workorder_id == Workorder.id
+        ).join(
+            item, item.id == item_id
+        ).outerjoin(
+            Customer, Customer.id == Workorder.customer_id
+        ).outerjoin(
+            Vehicle, Vehicle.id == Workorder.vehicle_id
+        ).outerjoin(
+            Karyawan, Karyawan.id == Workorder.karyawan_id
+        ).where(line.workorder_id.in_(workorder_ids))
+
+    return union_all(
+        lines('product', ProductOrdered, Product, ProductOrdered.product_id,
+              func.coalesce(deducted_hpp, Product.cost)),
+        lines('service', ServiceOrdered, Service, ServiceOrdered.service_id, Service.cost),
+    )
+
+
+def refresh_sales_line_facts(db: Session, workorder_ids: Iterable[Any]) -> None:
+    """
+    Recompute the sales_line_fact rows of the given workorders.
+
+    Pending ORM changes are flushed first. Lines that no longer exist, and
+    every line of a workorder without a sale journal entry, lose their
+    fact row. Nothing is committed: call this right before the write's own
+    commit.
+
+    Args:
+        db: Database session.
+        workorder_ids: Workorders touched by the write.
+    """
+    ids = list({wid for wid in workorder_ids if wid})
+    if not ids:
+        return
+    db.flush()
+    now = datetime.datetime.utcnow()
+    facts = _fact_select(ids, now)
+
+    dialect = db.get_bind().dialect.name
+    upsert_insert = {'postgresql': pg_insert, 'sqlite': sqlite_insert}.get(dialect)
+    if upsert_insert is None:
+        # Without an upsert the HPP snapshot of existing lines is re-read from the current cost
+        db.execute(delete(SalesLineFact).where(SalesLineFact.workorder_id.in_(ids)))
+        db.execute(insert(SalesLineFact).from_select(_FACT_COLUMNS, facts))
+        return
+
+    current = facts.subquery()
+    db.execute(delete(SalesLineFact).where(
+        SalesLineFact.workorder_id.in_(ids),
+        SalesLineFact.line_id.notin_(select(current.c.line_id)),
+    ))
+    stmt = upsert_insert(SalesLineFact).from_select(_FACT_COLUMNS, facts)
+    updated = {column: stmt.excluded[column] for column in _FACT_COLUMNS if column not in ('line_id', 'hpp')}
+    updated['hpp'] = case(
+        (SalesLineFact.item_id == stmt.excluded.item_id, SalesLineFact.hpp),
+        else_=stmt.excluded.hpp,
+    )
+    db.execute(stmt.on_conflict_do_update(index_elements=[SalesLineFact.line_id], set_=updated))
+
+
+def rename_sales_line_fact_item(db: Session, line_type: str, item_id: Any, name: str) -> None:
+    """
+    Show a renamed product (``line_type`` 'product') or service ('service') under its new name.
+
+    Runs in the caller's transaction and does not commit: call it right
+    before the commit of the rename.
+    """
+    db.execute(
+        update(SalesLineFact)
+        .where(SalesLineFact.item_id == item_id, SalesLineFact.line_type == line_type)
+        .values(item_name=name)
+    )
+
+
+def rebuild_sales_line_facts(db: Session, batch_size: int = SALES_FACT_REBUILD_BATCH) -> Dict[str, int]:
+    """
+    Rebuild sales_line_fact for every workorder with a sale journal entry, in batches, and commit.
+
+    Use for the initial backfill and to repair drift from writes that bypass
+    the services. Existing rows keep their HPP snapshot; new rows take the
+    stock deduction's snapshot or the current cost. Regular writes keep the
+    table current.
+    """
+    ids: List[Any] = db.execute(
+        select(JournalEntry.workorder_id)
+        .where(JournalEntry.journal_type == JournalType.sale, JournalEntry.workorder_id.is_not(None))
+        .distinct()
+        .order_by(JournalEntry.workorder_id)
+    ).scalars().all()
+    try:
+        db.execute(delete(SalesLineFact).where(SalesLineFact.workorder_id.notin_(
+            select(JournalEntry.workorder_id).where(
+                JournalEntry.journal_type == JournalType.sale, JournalEntry.workorder_id.is_not(None))
+        )))
+        for start in range(0, len(ids), batch_size):
+            refresh_sales_line_facts(db, ids[start:start + batch_size])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {'workorders': len(ids)}
@@ -1,28 +1,8 @@
 from sqlalchemy.orm import Session
 from models.supplier import Supplier
-import uuid
 from schemas.service_supplier import CreateSupplier, UpdateSupplier, SupplierResponse
-import decimal
 import datetime
-
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        result[c.name] = value
-    return result
+from supports.utils_serializer import to_dict, to_dicts
 
 def create_supplier(db: Session, supplier_data: CreateSupplier):
     new_supplier = Supplier(
@@ -70,4 +50,4 @@ def get_supplier(db: Session, supplier_id: str):
 
 def get_all_suppliers(db: Session):
     suppliers = db.query(Supplier).all()
-    return [to_dict(s) for s in suppliers]
+    return to_dicts(suppliers)
@@ -3,56 +3,50 @@ from schemas.service_workorder import CreateWorkOrder,CreateServiceOrder,CreateP
 from schemas.service_inventory import CreateProductMovedHistory
 from schemas.service_accounting import SalesPaymentJournalEntry
 from services.services_accounting import create_sales_payment_journal_entry
-from services.services_inventory import createProductMoveHistoryNew
+from services.services_inventory import create_stock_movements
 from services.services_accounting import create_sales_journal_entry
+from services.services_document_number import next_document_number, parse_sequence_suffix
+from services.services_workorder_summary import refresh_workorder_summaries
+from services.services_dashboard import invalidate_dashboard_cache
 from schemas.service_accounting import SalesJournalEntry
 from models.inventory import Inventory, ProductMovedHistory
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import joinedload, selectinload
 from datetime import datetime
 from sqlalchemy.orm import Session
-from models.workorder import Product, Brand, Satuan, Category, Service, Workorder, ProductOrdered, ServiceOrdered
+from models.workorder import Product, Brand, Satuan, Category, Service, Workorder, ProductOrdered, ServiceOrdered, WorkorderSummary
+from models.customer import Vehicle
 import uuid
 from models.database import get_db
 from schemas.service_product import CreateProduct, ProductResponse, BrandResponse, SatuanResponse, CategoryResponse, CreateService, ServiceResponse
 from services.services_product import EditProductMovedHistory, deleteProductMovedHistory
+import base64
 import decimal
 import datetime
+import json
 from collections.abc import Iterable
+from supports.utils_serializer import to_dict, to_dicts
 
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        result[c.name] = value
-    return result
+def generate_workorder_no(db: Session, when: datetime.datetime) -> str:
+    """Nomor workorder berikutnya untuk bulan ``when``: WO-YYYYMM-XXXX."""
+    period = f"{when.year}{when.month:02d}"
+    prefix = f"WO-{period}-"
+
+    def _legacy_max() -> int:
+        # Nomor terbesar bulan ini sebelum counter dipakai
+        last_wo = db.query(func.max(Workorder.no_wo)).filter(Workorder.no_wo.like(f"{prefix}%")).scalar()
+        return parse_sequence_suffix(last_wo)
+
+    next_num = next_document_number(db, "WO", period, seed=_legacy_max)
+    return f"{prefix}{next_num:04d}"
 
 
 def createNewWorkorder(db: Session, workorder_data: CreateWorkOrder):
 
 
-    # Generate nomor workorder otomatis: WO-YYYYMM-XXXX (increment, tidak error jika ada yang terhapus)
-    today = datetime.datetime.now()
-    prefix = f"WO-{today.year}{today.month:02d}-"
-    # Ambil nomor terbesar bulan ini
-    last_wo = db.query(Workorder).filter(Workorder.no_wo.like(f"{prefix}%")).order_by(Workorder.no_wo.desc()).first()
-    if last_wo and last_wo.no_wo[-4:].isdigit():  # type: ignore
-        last_num = int(last_wo.no_wo[-4:])  # type: ignore
-        next_num = last_num + 1
-    else:
-        next_num = 1
-    auto_no_wo = f"{prefix}{next_num:04d}"
+    # Generate nomor workorder otomatis: WO-YYYYMM-XXXX (counter per bulan, tidak error jika ada yang terhapus)
+    auto_no_wo = generate_workorder_no(db, datetime.datetime.now())
 
     workorder = Workorder(
         id=uuid.uuid4(),
@@ -107,6 +101,8 @@ def createNewWorkorder(db: Session, workorder_data: CreateWorkOrder):
             )
             db.add(service_ordered)
 
+    refresh_workorder_summaries(db, [workorder.id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(workorder)
     return to_dict(workorder)
@@ -114,27 +110,11 @@ def createNewWorkorder(db: Session, workorder_data: CreateWorkOrder):
 
 def ProductMovedCausedProductOrdered(db: Session, product_ordered, performed_by: str = 'system'):
     # Cek apakah product_ordered iterable (list/tuple/set), tapi bukan string/bytes
-    
-    if isinstance(product_ordered, Iterable) and not isinstance(product_ordered, (str, bytes)):
-        for po in product_ordered:
-            move_data = CreateProductMovedHistory(
-                product_id=po.product_id,  # type: ignore
-                type='outcome',
-                quantity=po.quantity,  # type: ignore
-                performed_by=performed_by,
-                notes=f"Product ordered in Workorder {po.workorder_id}",  # type: ignore
-                timestamp=datetime.datetime.now(datetime.timezone.utc),
-                reference_type='workorder', reference_id=po.workorder_id,
-                workorder_id=po.workorder_id,
-                customer_id=po.workorder.customer_id,
-                vehicle_id=po.workorder.vehicle_id,
-                selling_price=po.price,
-                hpp_snapshot=po.product.cost if po.product else None,
-            )
-            createProductMoveHistoryNew(db, move_data)
-    else:
-        po = product_ordered
-        move_data = CreateProductMovedHistory(
+    if not (isinstance(product_ordered, Iterable) and not isinstance(product_ordered, (str, bytes))):
+        product_ordered = [product_ordered]
+
+    moves = [
+        CreateProductMovedHistory(
             product_id=po.product_id,  # type: ignore
             type='outcome',
             quantity=po.quantity,  # type: ignore
@@ -148,44 +128,207 @@ def ProductMovedCausedProductOrdered(db: Session, product_ordered, performed_by:
             selling_price=po.price,
             hpp_snapshot=po.product.cost if po.product else None,
         )
-        createProductMoveHistoryNew(db, move_data)
+        for po in product_ordered
+    ]
+    create_stock_movements(db, moves)
+
+
+WORKORDER_LIST_MAX_LIMIT = 200
+
+
+def _workorder_list_options():
+    """Loader options for listing: one JOIN for the to-one side, one SELECT IN per collection."""
+    return (
+        joinedload(Workorder.customer),
+        joinedload(Workorder.karyawan),
+        joinedload(Workorder.vehicle).joinedload(Vehicle.brand),
+        selectinload(Workorder.product_ordered).joinedload(ProductOrdered.product),
+        selectinload(Workorder.service_ordered).joinedload(ServiceOrdered.service),
+    )
+
+
+def _workorder_list_item(wo):
+    wo_dict = to_dict(wo)
+    wo_dict['customer_name'] = wo.customer.nama if wo.customer else None
+    wo_dict['vehicle_no_pol'] = wo.vehicle.no_pol if wo.vehicle else None
+    wo_dict['karyawan_name'] = wo.karyawan.nama if wo.karyawan else None
+    wo_dict['vehicle_model'] = wo.vehicle.model if wo.vehicle else None
+    wo_dict['vehicle_brand'] = wo.vehicle.brand.name if wo.vehicle and wo.vehicle.brand else None
+    wo_dict['vehicle_color'] = wo.vehicle.warna if wo.vehicle else None
+    wo_dict['customer_hp'] = wo.customer.hp if wo.customer else None
+
+    # Tambahkan detail product_ordered
+    product_ordered_list = []
+    for po in wo.product_ordered:
+        po_dict = to_dict(po)
+        # Tambahkan info produk jika perlu
+        if po.product:
+            po_dict['product_name'] = po.product.name
+        product_ordered_list.append(po_dict)
+    wo_dict['product_ordered'] = product_ordered_list
+
+    # Tambahkan detail service_ordered
+    service_ordered_list = []
+    for so in wo.service_ordered:
+        so_dict = to_dict(so)
+        # Tambahkan info service jika perlu
+        if so.service:
+            so_dict['service_name'] = so.service.name
+        service_ordered_list.append(so_dict)
+    wo_dict['service_ordered'] = service_ordered_list
+    return wo_dict
+
+
+def _encode_workorder_cursor(tanggal_masuk, workorder_id) -> str:
+    payload = {"t": tanggal_masuk.isoformat(), "i": str(workorder_id)}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def _decode_workorder_cursor(cursor: str) -> tuple:
+    """
+    Decode a workorder listing cursor into (tanggal_masuk, id).
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.datetime.fromisoformat(payload["t"]), uuid.UUID(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid workorder cursor") from e
+
+
+def _filter_workorder_list(query, model, id_column, cursor, plate_match, status=None, status_pembayaran=None,
+                           karyawan_id=None, customer_id=None, start_date=None, end_date=None):
+    """Apply the listing filters and keyset cursor to a Workorder or WorkorderSummary query."""
+    if status:
+        query = query.filter(model.status == status)
+    if status_pembayaran:
+        query = query.filter(model.status_pembayaran == status_pembayaran)
+    if karyawan_id:
+        query = query.filter(model.karyawan_id == karyawan_id)
+    if customer_id:
+        query = query.filter(model.customer_id == customer_id)
+    if start_date:
+        query = query.filter(model.tanggal_masuk >= datetime.datetime.combine(start_date, datetime.time.min))
+    if end_date:
+        query = query.filter(model.tanggal_masuk < datetime.datetime.combine(
+            end_date + datetime.timedelta(days=1), datetime.time.min
+        ))
+    if plate_match is not None:
+        query = query.filter(plate_match)
+    if cursor:
+        after_tanggal, after_id = _decode_workorder_cursor(cursor)
+        query = query.filter(tuple_(model.tanggal_masuk, id_column) < tuple_(after_tanggal, after_id))
+    return query
+
+
+def list_workorders(
+    db: Session,
+    limit: int = 50,
+    cursor: str = None,
+    status: str = None,
+    status_pembayaran: str = None,
+    karyawan_id=None,
+    customer_id=None,
+    start_date: datetime.date = None,
+    end_date: datetime.date = None,
+    no_pol: str = None,
+):
+    """
+    List workorders newest first, keyset-paginated on (tanggal_masuk, id).
+
+    Filters are applied in SQL and the relationships used by the listing are
+    eager-loaded, so a page costs a fixed number of queries however many
+    workorders, products or services it contains. Pass next_cursor from the
+    previous page to continue.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    limit = max(1, min(limit, WORKORDER_LIST_MAX_LIMIT))
+    plate_match = None
+    if no_pol:
+        plate_match = Workorder.vehicle_id.in_(
+            select(Vehicle.id).where(Vehicle.no_pol.ilike(f"%{no_pol.strip()}%"))
+        )
+    query = _filter_workorder_list(
+        db.query(Workorder), Workorder, Workorder.id, cursor, plate_match, status=status,
+        status_pembayaran=status_pembayaran, karyawan_id=karyawan_id, customer_id=customer_id,
+        start_date=start_date, end_date=end_date,
+    )
+
+    # One extra row tells us whether there is a next page
+    workorders = query.options(*_workorder_list_options()).order_by(
+        Workorder.tanggal_masuk.desc(), Workorder.id.desc()
+    ).limit(limit + 1).all()
+    has_next = len(workorders) > limit
+    workorders = workorders[:limit]
+
+    next_cursor = None
+    if has_next:
+        last = workorders[-1]
+        next_cursor = _encode_workorder_cursor(last.tanggal_masuk, last.id)
+    return {
+        "items": [_workorder_list_item(wo) for wo in workorders],
+        "next_cursor": next_cursor,
+        "has_next": has_next,
+    }
+
+
+def list_workorder_summaries(
+    db: Session,
+    limit: int = 50,
+    cursor: str = None,
+    status: str = None,
+    status_pembayaran: str = None,
+    karyawan_id=None,
+    customer_id=None,
+    start_date: datetime.date = None,
+    end_date: datetime.date = None,
+    no_pol: str = None,
+):
+    """
+    Front desk listing read from workorder_summary only.
+
+    Same filters and (tanggal_masuk, id) cursor as list_workorders(), but
+    every field, including names and line totals, comes from one table.
+    There are no joins and no line loading.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    limit = max(1, min(limit, WORKORDER_LIST_MAX_LIMIT))
+    plate_match = WorkorderSummary.vehicle_no_pol.ilike(f"%{no_pol.strip()}%") if no_pol else None
+    query = _filter_workorder_list(
+        db.query(WorkorderSummary), WorkorderSummary, WorkorderSummary.workorder_id, cursor, plate_match,
+        status=status, status_pembayaran=status_pembayaran, karyawan_id=karyawan_id,
+        customer_id=customer_id, start_date=start_date, end_date=end_date,
+    )
+    rows = query.order_by(
+        WorkorderSummary.tanggal_masuk.desc(), WorkorderSummary.workorder_id.desc()
+    ).limit(limit + 1).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_next:
+        next_cursor = _encode_workorder_cursor(rows[-1].tanggal_masuk, rows[-1].workorder_id)
+    return {
+        "items": to_dicts(rows),
+        "next_cursor": next_cursor,
+        "has_next": has_next,
+    }
+
+
+def get_workorder_summary(db: Session, workorder_id: str):
+    summary = db.query(WorkorderSummary).filter(WorkorderSummary.workorder_id == workorder_id).first()
+    return to_dict(summary) if summary else None
 
 
 def getAllWorkorders(db: Session):
-    workorders = db.query(Workorder).order_by(Workorder.tanggal_masuk.desc()).all()
-    result = []
-    for wo in workorders:
-        wo_dict = to_dict(wo)
-        wo_dict['customer_name'] = wo.customer.nama if wo.customer else None
-        wo_dict['vehicle_no_pol'] = wo.vehicle.no_pol if wo.vehicle else None
-        wo_dict['karyawan_name'] = wo.karyawan.nama if wo.karyawan else None
-        wo_dict['vehicle_model'] = wo.vehicle.model if wo.vehicle else None
-        wo_dict['vehicle_brand'] = wo.vehicle.brand.name if wo.vehicle and wo.vehicle.brand else None
-        wo_dict['vehicle_color'] = wo.vehicle.warna if wo.vehicle else None
-        wo_dict['customer_hp'] = wo.customer.hp if wo.customer else None
-
-        # Tambahkan detail product_ordered
-        product_ordered_list = []
-        for po in wo.product_ordered:
-            po_dict = to_dict(po)
-            # Tambahkan info produk jika perlu
-            if po.product:
-                po_dict['product_name'] = po.product.name
-            product_ordered_list.append(po_dict)
-        wo_dict['product_ordered'] = product_ordered_list
-
-        # Tambahkan detail service_ordered
-        service_ordered_list = []
-        for so in wo.service_ordered:
-            so_dict = to_dict(so)
-            # Tambahkan info service jika perlu
-            if so.service:
-                so_dict['service_name'] = so.service.name
-            service_ordered_list.append(so_dict)
-        wo_dict['service_ordered'] = service_ordered_list
-
-        result.append(wo_dict)
-    return result
+    workorders = db.query(Workorder).options(*_workorder_list_options()).order_by(Workorder.tanggal_masuk.desc()).all()
+    return [_workorder_list_item(wo) for wo in workorders]
 
 def getWorkorderByID(db: Session, workorder_id: str):
     wo = db.query(Workorder).filter(Workorder.id == workorder_id).first()
@@ -229,13 +372,15 @@ def getWorkorderByID(db: Session, workorder_id: str):
     return wo_dict
 
 # --- Tambahkan helper ini di services_workorder.py (mis. di atas updateStatusWorkorder) ---
-def _wo_stock_already_moved(db: Session, wo_id: str) -> bool:
+def _wo_stock_already_moved(db: Session, wo_id: uuid.UUID) -> bool:
     """
     Cek apakah riwayat pergerakan stok untuk WO ini sudah pernah dibuat
-    (berdasarkan pola 'WO:{wo_id}' di kolom notes ProductMovedHistory).
+    (workorder_id + reference_type='workorder', dilayani partial index
+    ix_product_moved_history_workorder_ref, tidak tergantung panjang riwayat).
     """
     exists = db.query(ProductMovedHistory.id).filter(
-        ProductMovedHistory.notes.ilike(f"%WO:{wo_id}%")
+        ProductMovedHistory.workorder_id == wo_id,
+        ProductMovedHistory.reference_type == 'workorder',
     ).first()
     return exists is not None
 
@@ -248,6 +393,8 @@ def updateStatusWorkorder(db: Session, data_entry: SalesPaymentJournalEntry):
     wo.status = 'dibayar'  # type: ignore
     wo.status_pembayaran='lunas'  # type: ignore
     db.add(wo)
+    refresh_workorder_summaries(db, [wo.id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(wo)
 
@@ -273,6 +420,8 @@ def UpdateDateWorkordernya(db: Session, workorder_id: str, new_tanggal_keluar: d
 
     
 
+    refresh_workorder_summaries(db, [wo.id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(wo)
 
@@ -313,6 +462,8 @@ def updateWorkOrdeKeluhannya(db: Session, workorder_id: str, data: UpdateWorkord
     # Log perubahan keluhan
     
 
+    refresh_workorder_summaries(db, [wo.id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(wo)
 
@@ -443,6 +594,8 @@ def UpdateWorkorderOrdersnya(db: Session, workorder_id: str, update_data: Create
             if so.id not in new_so_ids:
                 db.delete(so)
 
+    refresh_workorder_summaries(db, [wo.id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(wo)
 
@@ -464,6 +617,8 @@ def updateServiceorderedOnlynya(db: Session, service_ordered_data: CreateService
         discount=service_ordered_data.discount
     )
     db.add(new_so)
+    refresh_workorder_summaries(db, [new_so.workorder_id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(new_so)
 
@@ -490,6 +645,8 @@ def updateProductOrderedOnlynya(db: Session, product_ordered_data: CreateProduct
         discount=product_ordered_data.discount
     )
     db.add(new_po)
+    refresh_workorder_summaries(db, [new_po.workorder_id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(new_po)
 
@@ -503,6 +660,25 @@ def updateProductOrderedOnlynya(db: Session, product_ordered_data: CreateProduct
 
 
 
+def _move_workorder_stock(db: Session, wo: Workorder):
+    """Deduct stock for every ProductOrdered of a completed workorder in one transaction."""
+    moves = [
+        CreateProductMovedHistory(
+            product_id=po.product_id,
+            type='outcome',
+            quantity=po.quantity,
+            performed_by='system',
+            notes=f"WO:{wo.id} ({wo.no_wo}) complete → deduct for ProductOrdered:{po.id}",
+            timestamp=datetime.datetime.now(datetime.timezone.utc),
+            reference_type='workorder', reference_id=wo.id,
+            workorder_id=wo.id, customer_id=wo.customer_id,
+            vehicle_id=wo.vehicle_id, selling_price=po.price,
+            hpp_snapshot=po.product.cost if po.product else None,
+        )
+        for po in wo.product_ordered
+    ]
+    create_stock_movements(db, moves)
+
 def update_only_workorder(db: Session, workorder_id: str, data: CreateWorkorderOnly):
     wo = db.query(Workorder).filter(Workorder.id == workorder_id).first()
     today = datetime.datetime.now()
@@ -536,27 +712,16 @@ def update_only_workorder(db: Session, workorder_id: str, data: CreateWorkorderO
     wo.pajak = data.pajak  # type: ignore
 
     db.add(wo)
+    refresh_workorder_summaries(db, [wo.id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(wo)
     
     # Jika status berubah menjadi 'selesai', pindahkan stok produk
     if old_status != 'selesai' and data.status == 'selesai':  # type: ignore
         # Move stock for products if not already moved
-        if not _wo_stock_already_moved(db, str(wo.id)):
-            for po in wo.product_ordered:
-                move_data = CreateProductMovedHistory(
-                    product_id=po.product_id,
-                    type='outcome',
-                    quantity=po.quantity,
-                    performed_by='system',
-                    notes=f"WO:{wo.id} ({wo.no_wo}) complete → deduct for ProductOrdered:{po.id}",
-                    timestamp=datetime.datetime.now(datetime.timezone.utc),
-                    reference_type='workorder', reference_id=wo.id,
-                    workorder_id=wo.id, customer_id=wo.customer_id,
-                    vehicle_id=wo.vehicle_id, selling_price=po.price,
-                    hpp_snapshot=po.product.cost if po.product else None,
-                )
-                createProductMoveHistoryNew(db, move_data)
+        if not _wo_stock_already_moved(db, wo.id):
+            _move_workorder_stock(db, wo)
     
     wo_dict = to_dict(wo)
     return wo_dict
@@ -572,6 +737,8 @@ def update_only_productordered(db: Session, product_ordered_id: str, data: Creat
     po.discount = data.discount  # type: ignore
 
     db.add(po)
+    refresh_workorder_summaries(db, [po.workorder_id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(po)
 
@@ -593,6 +760,8 @@ def update_only_serviceordered(db: Session, service_ordered_id: str, data: Creat
     so.discount = data.discount  # type: ignore
 
     db.add(so)
+    refresh_workorder_summaries(db, [so.workorder_id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(so)
 
@@ -618,7 +787,10 @@ def deleteWorkorder(db: Session, workorder_id: str):
 
     
     
+    tanggal_masuk = wo.tanggal_masuk
     db.delete(wo)
+    refresh_workorder_summaries(db, [wo.id], previous_dates=[tanggal_masuk])
+    invalidate_dashboard_cache(db)
     db.commit()
     return True
 
@@ -656,6 +828,8 @@ def update_workorder_lengkap(db: Session, workorder_id: str, data: CreateWorkOrd
     wo.vehicle_id = data.vehicle_id  # type: ignore
     wo.pajak = data.pajak  # type: ignore
     db.add(wo)
+    refresh_workorder_summaries(db, [wo.id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(wo)
     wo_dict = to_dict(wo)
@@ -684,21 +858,8 @@ def update_workorder_lengkap(db: Session, workorder_id: str, data: CreateWorkOrd
         print(f"hasil : {total_create_sales}")
 
         # Move stock for products if not already moved
-        if not _wo_stock_already_moved(db, str(wo.id)):
-            for po in wo.product_ordered:
-                move_data = CreateProductMovedHistory(
-                    product_id=po.product_id,
-                    type='outcome',
-                    quantity=po.quantity,
-                    performed_by='system',
-                    notes=f"WO:{wo.id} ({wo.no_wo}) complete → deduct for ProductOrdered:{po.id}",
-                    timestamp=datetime.datetime.now(datetime.timezone.utc),
-                    reference_type='workorder', reference_id=wo.id,
-                    workorder_id=wo.id, customer_id=wo.customer_id,
-                    vehicle_id=wo.vehicle_id, selling_price=po.price,
-                    hpp_snapshot=po.product.cost if po.product else None,
-                )
-                createProductMoveHistoryNew(db, move_data)
+        if not _wo_stock_already_moved(db, wo.id):
+            _move_workorder_stock(db, wo)
     else:
         print("Debug: Condition not met, skipping sales journal and stock move")
 
@@ -717,6 +878,8 @@ def addProductOrder(db: Session, data: AddProductOrderById):
         price=data.price
     )
     db.add(new_po)
+    refresh_workorder_summaries(db, [new_po.workorder_id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(new_po)
 
@@ -750,6 +913,8 @@ def updateProductOrder(db: Session, product_ordered_id: str, data: UpdateProduct
         po.price = data.price  # type: ignore
 
     db.add(po)
+    refresh_workorder_summaries(db, [po.workorder_id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(po)
 
@@ -770,6 +935,8 @@ def deleteProductOrder(db: Session, product_ordered_id: str):
 
     workorder_id = po.workorder_id
     db.delete(po)
+    refresh_workorder_summaries(db, [workorder_id])
+    invalidate_dashboard_cache(db)
     db.commit()
 
     # Return updated workorder
@@ -794,6 +961,8 @@ def addServiceOrder(db: Session, data: AddServiceOrderById):
         price=data.price
     )
     db.add(new_so)
+    refresh_workorder_summaries(db, [new_so.workorder_id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(new_so)
 
@@ -825,6 +994,8 @@ def updateServiceOrder(db: Session, service_ordered_id: str, data: UpdateService
         so.price = data.price  # type: ignore
 
     db.add(so)
+    refresh_workorder_summaries(db, [so.workorder_id])
+    invalidate_dashboard_cache(db)
     db.commit()
     db.refresh(so)
 
@@ -845,6 +1016,8 @@ def deleteServiceOrder(db: Session, service_ordered_id: str):
 
     workorder_id = so.workorder_id
     db.delete(so)
+    refresh_workorder_summaries(db, [workorder_id])
+    invalidate_dashboard_cache(db)
     db.commit()
 
     # Return updated workorder
@@ -858,40 +1031,8 @@ def deleteServiceOrder(db: Session, service_ordered_id: str):
     return wo_dict
 
 def getWorkordersByCustomerID(db: Session, customer_id: str):
-    workorders = db.query(Workorder).filter(Workorder.customer_id == customer_id).all()
-    result = []
-    for wo in workorders:
-        wo_dict = to_dict(wo)
-        wo_dict['customer_name'] = wo.customer.nama if wo.customer else None
-        wo_dict['vehicle_no_pol'] = wo.vehicle.no_pol if wo.vehicle else None
-        wo_dict['karyawan_name'] = wo.karyawan.nama if wo.karyawan else None
-        wo_dict['vehicle_model'] = wo.vehicle.model if wo.vehicle else None
-        wo_dict['vehicle_brand'] = wo.vehicle.brand.name if wo.vehicle and wo.vehicle.brand else None
-        wo_dict['vehicle_color'] = wo.vehicle.warna if wo.vehicle else None
-        wo_dict['customer_hp'] = wo.customer.hp if wo.customer else None
-
-        # Tambahkan detail product_ordered
-        product_ordered_list = []
-        for po in wo.product_ordered:
-            po_dict = to_dict(po)
-            # Tambahkan info produk jika perlu
-            if po.product:
-                po_dict['product_name'] = po.product.name
-            product_ordered_list.append(po_dict)
-        wo_dict['product_ordered'] = product_ordered_list
-
-        # Tambahkan detail service_ordered
-        service_ordered_list = []
-        for so in wo.service_ordered:
-            so_dict = to_dict(so)
-            # Tambahkan info service jika perlu
-            if so.service:
-                so_dict['service_name'] = so.service.name
-            service_ordered_list.append(so_dict)
-        wo_dict['service_ordered'] = service_ordered_list
-
-        result.append(wo_dict)
-    return result
+    workorders = db.query(Workorder).options(*_workorder_list_options()).filter(Workorder.customer_id == customer_id).all()
+    return [_workorder_list_item(wo) for wo in workorders]
 
 def get_workorder_status_pembayaran(db: Session, workorder_id: str):
     wo = db.query(Workorder).filter(Workorder.id == workorder_id).first()
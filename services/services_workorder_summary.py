@@ -0,0 +1,173 @@
+"""
+Services untuk workorder_summary (read model daftar/detail workorder)
+
+Each workorder write calls refresh_workorder_summaries() before it commits,
+so the projection (and the workorder's months in monthly_business_summary
+and, once it is a recognized sale, its sales_line_fact rows) changes in the
+same transaction as the workorder. The
+refresh is set-based: one DELETE and one INSERT ... SELECT per call, with
+the product/service lines aggregated in SQL.
+"""
+
+import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from models.customer import Customer, Vehicle
+from models.karyawan import Karyawan
+from models.workorder import Brand, Product, ProductOrdered, Service, ServiceOrdered, Workorder, WorkorderSummary
+from services.services_business_summary import refresh_monthly_business_summary_for_workorders
+from services.services_sales_fact import refresh_sales_line_facts
+
+SUMMARY_REBUILD_BATCH = 1000
+
+
+def _summary_select(workorder_filter):
+    """SELECT producing workorder_summary rows for the workorders matching ``workorder_filter``."""
+    products = select(
+        ProductOrdered.workorder_id.label('workorder_id'),
+        func.count(ProductOrdered.id).label('line_count'),
+        func.coalesce(func.sum(ProductOrdered.subtotal), 0).label('total'),
+        func.coalesce(func.sum(ProductOrdered.quantity * func.coalesce(Product.cost, 0)), 0).label('hpp'),
+    ).outerjoin(Product, Product.id == ProductOrdered.product_id).join(
+        Workorder, Workorder.id == ProductOrdered.workorder_id
+    ).where(workorder_filter).group_by(ProductOrdered.workorder_id).subquery()
+
+    services = select(
+        ServiceOrdered.workorder_id.label('workorder_id'),
+        func.count(ServiceOrdered.id).label('line_count'),
+        func.coalesce(func.sum(ServiceOrdered.subtotal), 0).label('total'),
+        func.coalesce(func.sum(ServiceOrdered.quantity * func.coalesce(Service.cost, 0)), 0).label('hpp'),
+    ).outerjoin(Service, Service.id == ServiceOrdered.service_id).join(
+        Workorder, Workorder.id == ServiceOrdered.workorder_id
+    ).where(workorder_filter).group_by(ServiceOrdered.workorder_id).subquery()
+
+    return select(
+        Workorder.id,
+        Workorder.no_wo,
+        Workorder.tanggal_masuk,
+        Workorder.tanggal_keluar,
+        Workorder.keluhan,
+        Workorder.status,
+        Workorder.status_pembayaran,
+        Workorder.customer_id,
+        Customer.nama,
+        Customer.hp,
+        Workorder.vehicle_id,
+        Vehicle.no_pol,
+        Vehicle.model,
+        Brand.name,
+        Vehicle.warna,
+        Workorder.karyawan_id,
+        Karyawan.nama,
+        func.coalesce(products.c.line_count, 0),
+        func.coalesce(services.c.line_count, 0),
+        func.coalesce(products.c.total, 0),
+        func.coalesce(services.c.total, 0),
+        func.coalesce(products.c.hpp, 0) + func.coalesce(services.c.hpp, 0),
+        Workorder.total_discount,
+        Workorder.pajak,
+        Workorder.dp,
+        Workorder.total_biaya,
+        literal(datetime.datetime.utcnow(), WorkorderSummary.refreshed_at.type),
+    ).select_from(Workorder).outerjoin(
+        Customer, Customer.id == Workorder.customer_id
+    ).outerjoin(
+        Vehicle, Vehicle.id == Workorder.vehicle_id
+    ).outerjoin(
+        Brand, Brand.id == Vehicle.brand_id
+    ).outerjoin(
+        Karyawan, Karyawan.id == Workorder.karyawan_id
+    ).outerjoin(
+        products, products.c.workorder_id == Workorder.id
+    ).outerjoin(
+        services, services.c.workorder_id == Workorder.id
+    ).where(workorder_filter)
+
+
+_SUMMARY_COLUMNS = [
+    'workorder_id', 'no_wo', 'tanggal_masuk', 'tanggal_keluar', 'keluhan', 'status', 'status_pembayaran',
+    'customer_id', 'customer_name', 'customer_hp',
+    'vehicle_id', 'vehicle_no_pol', 'vehicle_model', 'vehicle_brand', 'vehicle_color',
+    'karyawan_id', 'karyawan_name',
+    'product_line_count', 'service_line_count', 'product_total', 'service_total', 'hpp_total',
+    'total_discount', 'pajak', 'dp', 'total_biaya', 'refreshed_at',
+]
+
+
+def refresh_workorder_summaries(
+    db: Session,
+    workorder_ids: Iterable[Any],
+    previous_dates: Iterable[Any] = (),
+    refresh_months: bool = True
+) -> None:
+    """
+    Recompute the workorder_summary rows of the given workorders.
+
+    Pending ORM changes are flushed first. Workorders that no longer exist
+    lose their summary row. The sales_line_fact rows of recognized sales
+    are refreshed as well. Unless ``refresh_months`` is False, the
+    monthly_business_summary months the workorders are in, and were in
+    before this write, are refreshed too. Nothing is committed: call this
+    right before the write's own commit.
+
+    Args:
+        db: Database session.
+        workorder_ids: Workorders touched by the write.
+        previous_dates: tanggal_masuk values from before the write that the
+            summary rows cannot provide, i.e. of deleted workorders.
+        refresh_months: Whether to refresh monthly_business_summary.
+    """
+    ids = list({wid for wid in workorder_ids if wid})
+    if not ids:
+        return
+    db.flush()
+    if refresh_months:
+        # Summary rows still carry the tanggal_masuk from before this write,
+        # so a workorder moved to another month also refreshes the old one
+        previous = db.execute(
+            select(WorkorderSummary.tanggal_masuk).where(WorkorderSummary.workorder_id.in_(ids))
+        ).scalars().all()
+        refresh_monthly_business_summary_for_workorders(db, ids, [*previous, *previous_dates])
+    db.execute(delete(WorkorderSummary).where(WorkorderSummary.workorder_id.in_(ids)))
+    db.execute(insert(WorkorderSummary).from_select(_SUMMARY_COLUMNS, _summary_select(Workorder.id.in_(ids))))
+    refresh_sales_line_facts(db, ids)
+
+
+def refresh_workorder_summaries_for(
+    db: Session,
+    customer_id: Optional[Any] = None,
+    vehicle_id: Optional[Any] = None,
+    karyawan_id: Optional[Any] = None
+) -> None:
+    """Refresh the summaries showing a customer, vehicle or mechanic whose display fields changed."""
+    filters = []
+    if customer_id:
+        filters.append(Workorder.customer_id == customer_id)
+    if vehicle_id:
+        filters.append(Workorder.vehicle_id == vehicle_id)
+    if karyawan_id:
+        filters.append(Workorder.karyawan_id == karyawan_id)
+    for workorder_filter in filters:
+        ids = db.execute(select(Workorder.id).where(workorder_filter)).scalars().all()
+        refresh_workorder_summaries(db, ids, refresh_months=False)
+
+
+def rebuild_workorder_summaries(db: Session, batch_size: int = SUMMARY_REBUILD_BATCH) -> Dict[str, int]:
+    """
+    Rebuild workorder_summary for every workorder, in batches of ids, and commit.
+
+    Use after a deploy or a bulk data fix. Regular writes keep the table current.
+    """
+    ids: List[Any] = db.execute(select(Workorder.id).order_by(Workorder.id)).scalars().all()
+    try:
+        db.execute(delete(WorkorderSummary).where(WorkorderSummary.workorder_id.notin_(select(Workorder.id))))
+        for start in range(0, len(ids), batch_size):
+            refresh_workorder_summaries(db, ids[start:start + batch_size], refresh_months=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {'workorders': len(ids)}
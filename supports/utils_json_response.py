@@ -1,123 +1,90 @@
-from fastapi.responses import JSONResponse
-import uuid
-import decimal
 import datetime
+import decimal
+import json
+import uuid
+from enum import Enum
+from typing import Any
 
-def to_dict(obj):
-    result = {}
-    for c in obj.__table__.columns:
-        value = getattr(obj, c.name)
-        # Konversi UUID ke string
-        if isinstance(value, uuid.UUID):
-            value = str(value)
-        # Konversi Decimal ke float
-        elif isinstance(value, decimal.Decimal):
-            value = float(value)
-        # Konversi datetime/date/time ke isoformat string
-        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            value = value.isoformat()
-        # Konversi bytes ke string (opsional, jika ada kolom bytes)
-        elif isinstance(value, bytes):
-            value = value.decode('utf-8')
-        # Konversi Enum ke string
-        elif hasattr(value, 'value'):
-            value = value.value
-        result[c.name] = value
-    return result
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from supports.utils_serializer import to_dict
 
-def success_response(data=None, message="Success", status_code=200):
-    # Normalize data (convert Decimal, UUID, datetime, Enum, SQLAlchemy models, etc.)
-    def _normalize(value):
-        # import here to avoid top-level heavy imports
-        import uuid as _uuid
-        import decimal as _decimal
-        import datetime as _datetime
-        from enum import Enum as _Enum
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional, stdlib json is the fallback
+    orjson = None
+
+
+def _json_default(value: Any) -> Any:
+    """
+    Encoder hook for the types the JSON encoder does not handle itself.
 
-        # SQLAlchemy model instance -> convert via to_dict
+    Applies the same conversions the old recursive _normalize() did
+    (SQLAlchemy models via to_dict, Decimal -> float, UUID -> str,
+    date/time -> ISO string, bytes -> str, Enum -> value) plus Pydantic
+    models. Containers are not walked here: the encoder only calls this
+    for the leaves it cannot encode.
+    """
+    if hasattr(value, '__table__'):
+        return to_dict(value)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, bytes):
         try:
-            # detect SQLAlchemy declarative model by presence of __table__
-            if hasattr(value, '__table__'):
-                return to_dict(value)
+            return value.decode('utf-8')
         except Exception:
-            pass
-
-        if isinstance(value, _decimal.Decimal):
-            return float(value)
-        if isinstance(value, _uuid.UUID):
             return str(value)
-        if isinstance(value, (_datetime.datetime, _datetime.date, _datetime.time)):
-            return value.isoformat()
-        if isinstance(value, bytes):
-            try:
-                return value.decode('utf-8')
-            except Exception:
-                return str(value)
-        # Enum -> return underlying value
-        if isinstance(value, _Enum):
-            return value.value
-        # recurse for dicts and lists
-        if isinstance(value, dict):
-            return {k: _normalize(v) for k, v in value.items()}
-        if isinstance(value, list):
-            return [_normalize(v) for v in value]
-        if isinstance(value, tuple):
-            return tuple(_normalize(v) for v in value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
 
-        return value
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse that encodes Decimal/UUID/date/Enum/Pydantic/SQLAlchemy
+    values while serializing, in a single pass over the payload.
 
-    normalized = _normalize(data)
-    return JSONResponse(
+    Uses orjson when it is installed, otherwise the stdlib encoder with the
+    same default hook and the same compact output Starlette produces.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content,
+            default=_json_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+def success_response(data=None, message="Success", status_code=200):
+    return FastJSONResponse(
         status_code=status_code,
         content={
             "status": "success",
             "message": message,
-            "data": normalized
+            "data": data
         }
     )
 
 def error_response(message="Error", status_code=400, data=None):
-    # Normalize data similar to success_response to avoid JSON serialization issues
-    def _normalize(value):
-        import uuid as _uuid
-        import decimal as _decimal
-        import datetime as _datetime
-        from enum import Enum as _Enum
-
-        try:
-            if hasattr(value, '__table__'):
-                return to_dict(value)
-        except Exception:
-            pass
-
-        if isinstance(value, _decimal.Decimal):
-            return float(value)
-        if isinstance(value, _uuid.UUID):
-            return str(value)
-        if isinstance(value, (_datetime.datetime, _datetime.date, _datetime.time)):
-            return value.isoformat()
-        if isinstance(value, bytes):
-            try:
-                return value.decode('utf-8')
-            except Exception:
-                return str(value)
-        if isinstance(value, _Enum):
-            return value.value
-        if isinstance(value, dict):
-            return {k: _normalize(v) for k, v in value.items()}
-        if isinstance(value, list):
-            return [_normalize(v) for v in value]
-        if isinstance(value, tuple):
-            return tuple(_normalize(v) for v in value)
-
-        return value
-
-    normalized = _normalize(data)
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status_code,
         content={
             "status": "error",
             "message": message,
-            "data": normalized
+            "data": data
         }
     )
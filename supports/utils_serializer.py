@@ -0,0 +1,134 @@
+"""
+Serializer bersama untuk model SQLAlchemy -> dict yang aman untuk JSON.
+
+Converts UUID to str, Decimal to float, date/time to ISO strings, bytes to
+str and Enum to its value, the same rules the per-service to_dict helpers
+used. The column keys and a converter for each column's declared type are
+worked out once per mapped class and cached, so converting a row is just
+one pass over precomputed (key, converter) pairs.
+"""
+import datetime
+import decimal
+import uuid
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_PLAIN_TYPES = frozenset((str, int, float, bool))
+
+_VALUE_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    uuid.UUID: str,
+    decimal.Decimal: float,
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: datetime.time.isoformat,
+    bytes: lambda value: value.decode('utf-8'),
+}
+
+
+def convert_value(value: Any) -> Any:
+    """Convert one value to its JSON-friendly form, whatever its type."""
+    cls = value.__class__
+    converter = _VALUE_CONVERTERS.get(cls)
+    if converter is not None:
+        return converter(value)
+    if value is None or cls in _PLAIN_TYPES:
+        return value
+    if isinstance(value, Enum):
+        return value.value
+    for base, converter in _VALUE_CONVERTERS.items():
+        if isinstance(value, base):
+            return converter(value)
+    return value
+
+
+def _column_converter(column) -> Optional[Callable[[Any], Any]]:
+    """
+    Converter for a column based on its declared Python type.
+
+    Plain columns (str, int, float, bool) return None and are copied as-is
+    when the value has that exact type. Anything unexpected, such as a str
+    assigned to a UUID column before flush or an Enum in a String column,
+    falls back to convert_value().
+    """
+    try:
+        expected = column.type.python_type
+    except NotImplementedError:
+        return convert_value
+    if expected in _PLAIN_TYPES:
+        return None
+    converter = _VALUE_CONVERTERS.get(expected)
+    if converter is None:
+        return convert_value
+
+    def convert(value, _expected=expected, _converter=converter):
+        if value.__class__ is _expected:
+            return _converter(value)
+        return convert_value(value)
+    return convert
+
+
+class ModelSerializer:
+    """Precomputed column plan for one mapped class."""
+
+    __slots__ = ('plain_keys', 'converted')
+
+    def __init__(self, model_class: type):
+        plain_keys: List[Tuple[str, type]] = []
+        converted: List[Tuple[str, Callable[[Any], Any]]] = []
+        for column in model_class.__table__.columns:
+            converter = _column_converter(column)
+            if converter is None:
+                plain_keys.append((column.name, column.type.python_type))
+            else:
+                converted.append((column.name, converter))
+        self.plain_keys = tuple(plain_keys)
+        self.converted = tuple(converted)
+
+    def __call__(self, obj: Any) -> Dict[str, Any]:
+        # Loaded attributes are read straight from the instance dict; expired
+        # or deferred ones go through getattr so the ORM can load them
+        loaded = obj.__dict__
+        result = {}
+        for key, expected in self.plain_keys:
+            value = loaded[key] if key in loaded else getattr(obj, key)
+            result[key] = value if value is None or value.__class__ is expected else convert_value(value)
+        for key, converter in self.converted:
+            value = loaded[key] if key in loaded else getattr(obj, key)
+            result[key] = None if value is None else converter(value)
+        return result
+
+
+_SERIALIZERS: Dict[type, ModelSerializer] = {}
+
+
+def _convert_columns(obj: Any) -> Dict[str, Any]:
+    """Uncached path for objects whose class is not mapped but that carry their own __table__."""
+    return {c.name: convert_value(getattr(obj, c.name)) for c in obj.__table__.columns}
+
+
+def get_serializer(model_class: type) -> Callable[[Any], Dict[str, Any]]:
+    """Return the cached serializer of a mapped class, building it on first use."""
+    serializer = _SERIALIZERS.get(model_class)
+    if serializer is None:
+        if not hasattr(model_class, '__table__'):
+            return _convert_columns
+        serializer = _SERIALIZERS[model_class] = ModelSerializer(model_class)
+    return serializer
+
+
+def to_dict(obj: Any) -> Dict[str, Any]:
+    """Convert one model instance to a dict of its columns."""
+    return get_serializer(obj.__class__)(obj)
+
+
+def to_dicts(objs: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Convert many model instances, looking the serializer up once per class."""
+    result = []
+    serializer_class = None
+    serializer = None
+    for obj in objs:
+        if obj.__class__ is not serializer_class:
+            serializer_class = obj.__class__
+            serializer = get_serializer(serializer_class)
+        result.append(serializer(obj))
+    return result
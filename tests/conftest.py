@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import models  # noqa: F401  (register all mappers on Base.metadata)
+from models.database import Base
+from services.services_accounting import invalidate_account_cache
+
+
+@pytest.fixture
+def db_session():
+    """In-memory SQLite session with the full schema, for service-level tests."""
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def _register_postgres_functions(dbapi_connection, connection_record):
+        # server_default=text('now()') is used throughout the models, on both
+        # Date and DateTime columns; a bare date parses as either in SQLite
+        dbapi_connection.create_function("now", 0, lambda: datetime.date.today().isoformat())
+
+    Base.metadata.create_all(engine)
+    # The chart-of-accounts cache is process-wide; every test gets a fresh database
+    invalidate_account_cache()
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def query_counter(db_session):
+    """Collects every SQL statement executed on the db_session engine."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
@@ -0,0 +1,79 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from models.accounting import Account
+from schemas.service_accounting import CreateAccount, JournalEntryCreate, JournalLineCreate, JournalType
+from services.services_accounting import (
+    _create_entry,
+    _get_account_by_code,
+    _to_entry_out,
+    account_cache,
+    create_account,
+    edit_account,
+)
+
+
+def _cash_sale(db, amount):
+    return _create_entry(db, JournalEntryCreate(
+        date=date(2026, 7, 1),
+        memo="Penjualan tunai",
+        journal_type=JournalType.SALE,
+        lines=[
+            JournalLineCreate(account_code="1001", debit=Decimal(amount)),
+            JournalLineCreate(account_code="4001", credit=Decimal(amount)),
+        ],
+    ))
+
+
+def _account_selects(statements):
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT") and "FROM accounts" in s]
+
+
+def _seed(db):
+    create_account(db, CreateAccount(code="1001", name="Kas Kasir", normal_balance="debit", account_type="asset"))
+    create_account(db, CreateAccount(code="4001", name="Penjualan", normal_balance="credit", account_type="revenue"))
+
+
+def test_posting_resolves_account_codes_without_querying_accounts(db_session, query_counter):
+    _seed(db_session)
+    _cash_sale(db_session, "100")  # warms the cache
+    query_counter.clear()
+
+    for _ in range(5):
+        entry = _cash_sale(db_session, "10")
+        _to_entry_out(db_session, entry)
+
+    assert _account_selects(query_counter) == []
+
+
+def test_edit_account_invalidates_cache(db_session):
+    _seed(db_session)
+    entry = _cash_sale(db_session, "100")
+    sales = db_session.query(Account).filter(Account.code == "4001").one()
+
+    edit_account(db_session, sales.id, CreateAccount(
+        code="4001", name="Penjualan Produk", normal_balance="credit", account_type="revenue"
+    ))
+    names = {ln["account_code"]: ln["account_name"] for ln in _to_entry_out(db_session, entry)["lines"]}
+    assert names["4001"] == "Penjualan Produk"
+
+    edit_account(db_session, sales.id, CreateAccount(
+        code="4001", name="Penjualan Produk", normal_balance="credit", account_type="revenue", is_active=False
+    ))
+    with pytest.raises(ValueError):
+        _get_account_by_code(db_session, "4001")
+
+
+def test_changes_from_other_workers_are_picked_up_after_ttl(db_session, monkeypatch):
+    _seed(db_session)
+    assert _get_account_by_code(db_session, "1001").name == "Kas Kasir"
+
+    # Simulate another worker renaming the account behind this process' back
+    db_session.query(Account).filter(Account.code == "1001").update({"name": "Kas Besar"})
+    db_session.commit()
+    assert _get_account_by_code(db_session, "1001").name == "Kas Kasir"
+
+    monkeypatch.setattr(account_cache, "ttl_seconds", 0)
+    assert _get_account_by_code(db_session, "1001").name == "Kas Besar"
@@ -0,0 +1,75 @@
+from datetime import date
+from decimal import Decimal
+
+from models.accounting import Account, AccountDailyBalance
+from schemas.service_accounting import (
+    CashBookReportRequest,
+    JournalEntryCreate,
+    JournalLineCreate,
+    JournalType,
+)
+from services.services_accounting import (
+    _create_entry,
+    delete_journal_entry,
+    generate_cash_book_report,
+    rebuild_account_daily_balance,
+)
+
+
+def _seed_accounts(db):
+    kas = Account(code="1001", name="Kas Kasir", normal_balance="debit", account_type="asset", is_active=True)
+    sales = Account(code="4001", name="Penjualan", normal_balance="credit", account_type="revenue", is_active=True)
+    db.add_all([kas, sales])
+    db.commit()
+    return kas, sales
+
+
+def _cash_sale(db, entry_date, amount):
+    return _create_entry(db, JournalEntryCreate(
+        date=entry_date,
+        memo="Penjualan tunai",
+        journal_type=JournalType.SALE,
+        lines=[
+            JournalLineCreate(account_code="1001", debit=Decimal(amount)),
+            JournalLineCreate(account_code="4001", credit=Decimal(amount)),
+        ],
+    ))
+
+
+def _rollup(db):
+    return {
+        (row.account_id, row.date): (row.debit_total, row.credit_total, row.line_count)
+        for row in db.query(AccountDailyBalance).all()
+    }
+
+
+def test_posting_and_deleting_keep_rollup_in_sync_with_journal_lines(db_session):
+    kas, sales = _seed_accounts(db_session)
+
+    first = _cash_sale(db_session, date(2026, 7, 1), "100")
+    _cash_sale(db_session, date(2026, 7, 1), "50")
+    _cash_sale(db_session, date(2026, 7, 3), "25")
+
+    assert _rollup(db_session)[(kas.id, date(2026, 7, 1))] == (Decimal("150.00"), Decimal("0.00"), 2)
+    assert _rollup(db_session)[(sales.id, date(2026, 7, 3))] == (Decimal("0.00"), Decimal("25.00"), 1)
+
+    delete_journal_entry(db_session, first.id)
+    incremental = _rollup(db_session)
+    assert incremental[(kas.id, date(2026, 7, 1))] == (Decimal("50.00"), Decimal("0.00"), 1)
+
+    rebuild_account_daily_balance(db_session)
+    assert _rollup(db_session) == incremental
+
+
+def test_cash_book_opening_balance_comes_from_rollup(db_session):
+    kas, _ = _seed_accounts(db_session)
+    _cash_sale(db_session, date(2025, 12, 31), "1000")
+    _cash_sale(db_session, date(2026, 7, 1), "100")
+    _cash_sale(db_session, date(2026, 7, 2), "40")
+
+    report = generate_cash_book_report(db_session, CashBookReportRequest(
+        account_id=kas.id, start_date=date(2026, 7, 2), end_date=date(2026, 7, 31),
+    ))
+
+    assert report.opening_balance == Decimal("1100.00")
+    assert [entry.balance for entry in report.entries] == [Decimal("1140.00")]
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from models.accounting import Account
+from schemas.service_accounting import CashBookReportRequest, JournalEntryCreate, JournalLineCreate, JournalType
+from services.services_accounting import _create_entry, export_cash_book_report, generate_cash_book_report
+
+
+@pytest.fixture
+def cash_account(db_session):
+    kas = Account(code="1001", name="Kas Kasir", normal_balance="debit", account_type="asset", is_active=True)
+    other = Account(code="4001", name="Penjualan", normal_balance="credit", account_type="revenue", is_active=True)
+    db_session.add_all([kas, other])
+    db_session.commit()
+
+    movements = [
+        (date(2026, 6, 30), "500", "0"),
+        (date(2026, 7, 1), "100", "0"),
+        (date(2026, 7, 1), "0", "30"),
+        (date(2026, 7, 2), "70", "0"),
+        (date(2026, 7, 2), "0", "10"),
+        (date(2026, 7, 5), "250", "0"),
+    ]
+    for entry_date, debit, credit in movements:
+        amount = Decimal(debit) or Decimal(credit)
+        _create_entry(db_session, JournalEntryCreate(
+            date=entry_date,
+            memo=f"Mutasi {entry_date}",
+            journal_type=JournalType.GENERAL,
+            lines=[
+                JournalLineCreate(account_code="1001", debit=Decimal(debit), credit=Decimal(credit)),
+                JournalLineCreate(account_code="4001", debit=Decimal(credit), credit=Decimal(debit)),
+            ],
+        ))
+    return kas
+
+
+def _request(account, **kwargs):
+    return CashBookReportRequest(account_id=account.id, start_date=date(2026, 7, 1), end_date=date(2026, 7, 31), **kwargs)
+
+
+def test_keyset_pages_match_full_report_and_carry_running_balance(db_session, cash_account):
+    full = generate_cash_book_report(db_session, _request(cash_account))
+
+    pages = []
+    cursor = None
+    while True:
+        page = generate_cash_book_report(db_session, _request(cash_account, limit=2, cursor=cursor))
+        pages.append(page)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+
+    assert [len(page.entries) for page in pages] == [2, 2, 1]
+    assert pages[0].opening_balance == full.opening_balance == Decimal("500.00")
+    assert pages[1].opening_balance == pages[0].entries[-1].balance
+    assert [e.balance for page in pages for e in page.entries] == [e.balance for e in full.entries]
+    assert full.entries[-1].balance == Decimal("880.00")
+
+
+def test_cursor_is_bound_to_its_account(db_session, cash_account):
+    page = generate_cash_book_report(db_session, _request(cash_account, limit=1))
+    other = db_session.query(Account).filter(Account.code == "4001").one()
+
+    with pytest.raises(ValueError):
+        generate_cash_book_report(db_session, _request(other, limit=1, cursor=page.next_cursor))
+    with pytest.raises(ValueError):
+        generate_cash_book_report(db_session, _request(cash_account, limit=1, cursor="not-a-cursor"))
+
+
+def test_streaming_export_yields_opening_row_then_running_balances(db_session, cash_account):
+    ndjson = [json.loads(line) for line in export_cash_book_report(db_session, _request(cash_account), "ndjson")]
+    assert ndjson[0]["memo"] == "Saldo awal"
+    assert ndjson[0]["balance"] == "500.00"
+    assert [row["balance"] for row in ndjson[1:]] == ["600.00", "570.00", "640.00", "630.00", "880.00"]
+
+    rows = list(csv.DictReader(io.StringIO("".join(export_cash_book_report(db_session, _request(cash_account), "csv")))))
+    assert [row["balance"] for row in rows] == [row["balance"] for row in ndjson]
+
+    with pytest.raises(ValueError):
+        export_cash_book_report(db_session, _request(cash_account), "xlsx")
@@ -0,0 +1,82 @@
+from datetime import datetime
+from decimal import Decimal
+
+from models.inventory import Inventory, ProductCostHistory, ProductCostReplay, ProductMovedHistory
+from models.workorder import Product
+from services.services_costing import replay_average_costs, replay_pending_costs, request_cost_replay
+from services.services_inventory_extended import update_inventory_adjustment
+
+
+def _move(db, product, move_type, quantity, day, price=None, hpp=None):
+    move = ProductMovedHistory(product_id=product.id, type=move_type, quantity=Decimal(quantity),
+                               timestamp=datetime(2026, 10, day, 9), performed_by="admin",
+                               purchase_price=Decimal(price) if price else None,
+                               hpp_snapshot=Decimal(hpp) if hpp else None)
+    db.add(move)
+    return move
+
+
+def _seed(db):
+    oli = Product(name="Oli", min_stock=Decimal("5"), cost=Decimal("999"), is_consignment=False)
+    busi = Product(name="Busi", min_stock=Decimal("5"), cost=Decimal("15"), is_consignment=False)
+    db.add_all([oli, busi])
+    db.flush()
+    db.add(Inventory(product_id=oli.id, quantity=Decimal("10"), created_at=datetime(2026, 10, 1)))
+    _move(db, oli, "income", "10", 1, price="100")
+    _move(db, oli, "outcome", "-4", 2, hpp="100")
+    adjustment = _move(db, oli, "adjustment", "0", 3)
+    _move(db, oli, "income", "6", 4, price="130")
+    sale = _move(db, oli, "outcome", "-2", 5, hpp="999")
+    _move(db, busi, "outcome", "-1", 2)     # never purchased, keeps its manual cost
+    db.commit()
+    return oli.id, busi.id, adjustment.id, sale.id
+
+
+def test_full_replay_recomputes_costs_history_and_hpp(db_session, query_counter):
+    oli_id, busi_id, _, sale_id = _seed(db_session)
+
+    query_counter.clear()
+    result = replay_average_costs(db_session)
+
+    assert len(query_counter) <= 8
+    assert (result["products"], result["movements"], result["cost_history"], result["hpp_updated"]) == (2, 6, 2, 2)
+    assert db_session.get(Product, oli_id).cost == Decimal("115.00")
+    assert db_session.get(Product, busi_id).cost == Decimal("15.00")
+    assert db_session.get(ProductMovedHistory, sale_id).hpp_snapshot == Decimal("115.00")
+    assert sorted(h.new_cost for h in db_session.query(ProductCostHistory).all()) == [Decimal("100.00"), Decimal("115.00")]
+
+    # running it again regenerates instead of duplicating
+    replay_average_costs(db_session)
+    assert db_session.query(ProductCostHistory).count() == 2
+
+
+def test_backdated_adjustment_is_replayed_incrementally(db_session):
+    oli_id, busi_id, adjustment_id, sale_id = _seed(db_session)
+    replay_average_costs(db_session)
+
+    # stock sold out before the second receipt, so it sets the cost on its own
+    update_inventory_adjustment(db_session, adjustment_id, {"quantity": Decimal("-6")})
+    assert db_session.query(ProductCostReplay).one().replay_from == datetime(2026, 10, 3, 9)
+
+    result = replay_pending_costs(db_session)
+
+    assert result["products"] == 1 and result["movements"] == 3
+    assert db_session.get(Product, oli_id).cost == Decimal("130.00")
+    assert db_session.get(ProductMovedHistory, sale_id).hpp_snapshot == Decimal("130.00")
+    assert [h.new_cost for h in db_session.query(ProductCostHistory).order_by(ProductCostHistory.created_at)] == [
+        Decimal("100.00"), Decimal("130.00")
+    ]
+    assert db_session.query(ProductCostReplay).count() == 0
+
+
+def test_replay_queue_without_upsert_keeps_the_earliest_date(db_session, monkeypatch):
+    oli_id, busi_id, _, _ = _seed(db_session)
+    monkeypatch.setattr(db_session.get_bind().dialect, "name", "mssql")
+
+    request_cost_replay(db_session, [oli_id], datetime(2026, 10, 3))
+    request_cost_replay(db_session, [oli_id, busi_id], datetime(2026, 10, 4))
+    request_cost_replay(db_session, [busi_id], datetime(2026, 10, 2))
+
+    assert {(r.product_id, r.replay_from) for r in db_session.query(ProductCostReplay).all()} == {
+        (oli_id, datetime(2026, 10, 3)), (busi_id, datetime(2026, 10, 2))
+    }
@@ -0,0 +1,107 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from models.accounting import Account
+from models.customer import Customer
+from models.purchase_order import PurchaseOrder
+from models.supplier import Supplier
+from models.workorder import Product, ProductOrdered, Service, ServiceOrdered, Workorder
+from schemas.service_accounting import DailyReportRequest, JournalEntryCreate, JournalLineCreate, JournalType
+from services.services_accounting import _create_entry, generate_daily_report
+
+REPORT_DATE = date(2026, 7, 12)
+
+# recognized WOs, cash accounts, opening balances, cash lines, product sales,
+# service sales, P&L, WO summary, PO report, outflows
+MAX_DAILY_REPORT_QUERIES = 10
+
+
+def _seed_chart_of_accounts(db):
+    accounts = [
+        ("1001", "Kas Kasir", "debit", "asset"),
+        ("1002", "Bank BCA", "debit", "asset"),
+        ("1003", "QRIS", "debit", "asset"),
+        ("1004", "Debit EDC", "debit", "asset"),
+        ("1005", "Kas Kecil", "debit", "asset"),
+        ("2001", "Piutang Usaha", "debit", "asset"),
+        ("3001", "Hutang Usaha", "credit", "liability"),
+        ("4001", "Penjualan Produk", "credit", "revenue"),
+        ("6010", "Biaya Listrik", "debit", "expense"),
+    ]
+    for code, name, normal_balance, account_type in accounts:
+        db.add(Account(code=code, name=name, normal_balance=normal_balance, account_type=account_type, is_active=True))
+    db.commit()
+
+
+def _seed_day(db, volume, batch):
+    customer = Customer(nama="Budi", hp="0812", alamat="Jl. Mawar")
+    supplier = Supplier(nama="PT Oli", hp="0813", alamat="Jl. Melati")
+    product = Product(name="Oli", price=Decimal("100"), cost=Decimal("60"), min_stock=Decimal("0"))
+    service = Service(name="Servis", price="50", cost=Decimal("10"))
+    db.add_all([customer, supplier, product, service])
+    db.flush()
+
+    for i in range(volume):
+        wo = Workorder(
+            no_wo=f"WO-{batch}{i:02d}", tanggal_masuk=datetime(2026, 7, 12, 9), keluhan="Servis rutin",
+            status="selesai", total_biaya=Decimal("150"), customer_id=customer.id,
+        )
+        db.add(wo)
+        db.flush()
+        db.add(ProductOrdered(quantity=1, subtotal=100, price=100, discount=0, product_id=product.id, workorder_id=wo.id))
+        db.add(ServiceOrdered(quantity=1, subtotal=50, price=50, discount=0, service_id=service.id, workorder_id=wo.id))
+        _create_entry(db, JournalEntryCreate(
+            date=REPORT_DATE, memo=f"Penjualan {wo.no_wo}", journal_type=JournalType.SALE,
+            customer_id=customer.id, workorder_id=wo.id,
+            lines=[
+                JournalLineCreate(account_code="1001", debit=Decimal("150")),
+                JournalLineCreate(account_code="4001", credit=Decimal("150")),
+            ],
+        ))
+
+        po = PurchaseOrder(po_no=f"PO-{batch}{i:02d}", supplier_id=supplier.id, date=REPORT_DATE, total=Decimal("80"))
+        db.add(po)
+        db.flush()
+        _create_entry(db, JournalEntryCreate(
+            date=REPORT_DATE, memo=f"Bayar {po.po_no}", journal_type=JournalType.AP_PAYMENT,
+            supplier_id=supplier.id, purchase_id=po.id,
+            lines=[
+                JournalLineCreate(account_code="3001", debit=Decimal("80")),
+                JournalLineCreate(account_code="1002", credit=Decimal("80")),
+            ],
+        ))
+        _create_entry(db, JournalEntryCreate(
+            date=REPORT_DATE, memo="Listrik", journal_type=JournalType.EXPENSE,
+            lines=[
+                JournalLineCreate(account_code="6010", debit=Decimal("20")),
+                JournalLineCreate(account_code="1005", credit=Decimal("20")),
+            ],
+        ))
+    db.commit()
+
+
+def _count_daily_report_queries(db, query_counter):
+    db.expunge_all()
+    query_counter.clear()
+    report = generate_daily_report(db, DailyReportRequest(date=REPORT_DATE))
+    return report, len(query_counter)
+
+
+def test_daily_report_query_count_is_independent_of_volume(db_session, query_counter):
+    _seed_chart_of_accounts(db_session)
+    _seed_day(db_session, volume=1, batch="A")
+    small_report, small_count = _count_daily_report_queries(db_session, query_counter)
+
+    _seed_day(db_session, volume=12, batch="B")
+    large_report, large_count = _count_daily_report_queries(db_session, query_counter)
+
+    assert small_count == large_count
+    assert large_count <= MAX_DAILY_REPORT_QUERIES
+
+    assert len(large_report.outflows.expenses.items) == 13
+    assert len(large_report.outflows.purchase_order_payments.items) == 13
+    assert large_report.outflows.purchase_order_payments.items[0].supplier_name == "PT Oli"
+    assert large_report.outflows.purchase_order_payments.items[0].purchase_order_no == "PO-A00"
+    assert large_report.outflows.expenses.items[0].category == "Biaya Listrik"
+    assert large_report.cashier_cash.cash_in == Decimal("1950")
+    assert large_report.work_orders.total_workorders == 13
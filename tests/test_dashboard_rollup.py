@@ -0,0 +1,99 @@
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from models.attendance import Attendance
+from models.expenses import ExpenseStatus, ExpenseType
+from models.karyawan import Karyawan
+from models.purchase_order import PurchaseOrder, PurchaseOrderStatus
+from models.supplier import Supplier
+from models.workorder import Workorder
+from schemas.service_expenses import CreateExpenses
+from services.services_business_summary import rebuild_monthly_business_summary
+from services.services_dashboard import (
+    compute_dashboard_aggregates,
+    get_combined_monthly,
+    get_dashboard_summary,
+    get_expenses_monthly,
+    get_workorder_pie,
+)
+from services.services_expenses import create_expenses
+
+
+def _workorder(no, entered, status, total):
+    return Workorder(id=uuid.uuid4(), no_wo=no, tanggal_masuk=entered, keluhan="Servis", status=status,
+                     total_biaya=Decimal(total))
+
+
+def _seed(db, today):
+    this_month = today.replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+    db.add_all([
+        _workorder("WO-1", datetime.combine(today, datetime.min.time()) + timedelta(hours=9), "draft", "0"),
+        _workorder("WO-2", datetime.combine(this_month, datetime.min.time()), "Selesai", "300"),
+        _workorder("WO-3", datetime.combine(last_month, datetime.min.time()), "selesai", "200"),
+        _workorder("WO-4", datetime.combine(today + timedelta(days=1), datetime.min.time()), "dikerjakan", "0"),
+    ])
+    asep = Karyawan(nama="Asep", hp="0812", email="asep@bengkel.id")
+    toko = Supplier(nama="Toko", hp="0811", alamat="Jl. A")
+    db.add_all([asep, toko])
+    db.flush()
+    db.add(Attendance(karyawan_id=asep.id, date=today, status="Present"))
+    db.add_all([
+        PurchaseOrder(po_no="PO-1", supplier_id=toko.id, date=this_month, total=Decimal("150"),
+                      status=PurchaseOrderStatus.diterima),
+        PurchaseOrder(po_no="PO-2", supplier_id=toko.id, date=this_month, total=Decimal("999"),
+                      status=PurchaseOrderStatus.draft),
+    ])
+    db.commit()
+    rebuild_monthly_business_summary(db)
+    return _label(last_month), _label(this_month)
+
+
+def _label(day):
+    return day.strftime("%Y-%m")
+
+
+def test_aggregates_compute_every_card_with_range_predicates(db_session, query_counter):
+    today = date(2026, 10, 18)
+    last_label, this_label = _seed(db_session, today)
+
+    query_counter.clear()
+    aggregates = compute_dashboard_aggregates(db_session, today)
+
+    assert len(query_counter) == 4  # today's count, rollup totals, attendance, rollup series
+    assert not any("date_trunc" in s or "AS DATE" in s for s in query_counter)
+    assert aggregates["summary"] == {
+        "workorders_today": 1, "workorders_finished": 2, "workorders_pending": 2, "employees_present": 1,
+    }
+    assert aggregates["workorder_pie"] == {"completed": 2, "pending": 2}
+    monthly = {m["month"]: m for m in aggregates["monthly"]}
+    assert len(aggregates["monthly"]) == 24 and aggregates["monthly"][-1]["month"] == this_label
+    assert monthly[this_label] == {"month": this_label, "sales": 300.0, "purchase": 150.0, "expenses": 0.0}
+    assert monthly[last_label]["sales"] == 200.0
+
+
+def test_cached_snapshot_is_shared_until_a_write_invalidates_it(db_session, query_counter):
+    today = date.today()
+    _, this_label = _seed(db_session, today)
+    assert get_dashboard_summary(db_session)["workorders_finished"] == 2
+
+    query_counter.clear()
+    assert get_workorder_pie(db_session) == {"completed": 2, "pending": 2}
+    assert [m["month"] for m in get_combined_monthly(db_session, months=3)][-1] == this_label
+    assert len(query_counter) == 2  # one cache read per call
+
+    # a write outside the service layer, in a month no later write touches, waits for a rollup rebuild
+    last_month = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    db_session.add(_workorder("WO-5", datetime.combine(last_month, datetime.min.time()), "selesai", "50"))
+    db_session.commit()
+    assert get_dashboard_summary(db_session)["workorders_finished"] == 2
+
+    create_expenses(db_session, CreateExpenses(name="Listrik", description="PLN", expense_type=ExpenseType.listrik,
+                                               status=ExpenseStatus.open, amount=Decimal("75"), date=today))
+
+    assert get_expenses_monthly(db_session, months=1) == [{"month": this_label, "total": 75.0}]
+    assert get_dashboard_summary(db_session)["workorders_finished"] == 2
+
+    rebuild_monthly_business_summary(db_session)
+    assert get_dashboard_summary(db_session)["workorders_finished"] == 3
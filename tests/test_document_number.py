@@ -0,0 +1,60 @@
+import datetime
+import uuid
+
+from models.accounting import JournalEntry, JournalType
+from models.workorder import Workorder
+from services.services_accounting import generate_entry_no, generate_entry_nos
+from services.services_document_number import allocate_document_numbers
+from services.services_workorder import generate_workorder_no
+
+
+def test_counter_continues_after_numbers_issued_before_it_existed(db_session):
+    day = datetime.date(2026, 10, 18)
+    db_session.add(JournalEntry(entry_no="SAL-20261018-007", date=day, journal_type=JournalType.sale))
+    db_session.commit()
+
+    assert generate_entry_no(db_session, "sale", day) == "SAL-20261018-008"
+    assert generate_entry_no(db_session, "sale", day) == "SAL-20261018-009"
+    assert generate_entry_no(db_session, "purchase", day) == "PUR-20261018-001"
+
+
+def test_block_allocation_reserves_consecutive_numbers(db_session):
+    day = datetime.date(2026, 10, 18)
+
+    assert generate_entry_nos(db_session, "expense", day, 3) == [
+        "EXP-20261018-001", "EXP-20261018-002", "EXP-20261018-003"
+    ]
+    assert allocate_document_numbers(db_session, "EXP", "20261018", 2) == [4, 5]
+
+
+def test_rolled_back_allocation_gives_numbers_back(db_session):
+    day = datetime.date(2026, 10, 18)
+    generate_entry_no(db_session, "general", day)
+    db_session.commit()
+
+    generate_entry_no(db_session, "general", day)
+    db_session.rollback()
+
+    assert generate_entry_no(db_session, "general", day) == "GEN-20261018-002"
+
+
+def test_workorder_numbers_are_monthly(db_session, query_counter):
+    db_session.add(Workorder(id=uuid.uuid4(), no_wo="WO-202610-0041", tanggal_masuk=datetime.datetime(2026, 10, 1),
+                             keluhan="Servis rutin", status="draft", total_biaya=0))
+    db_session.commit()
+
+    assert generate_workorder_no(db_session, datetime.datetime(2026, 10, 18)) == "WO-202610-0042"
+
+    query_counter.clear()
+    assert generate_workorder_no(db_session, datetime.datetime(2026, 10, 19)) == "WO-202610-0043"
+    assert not any("LIKE" in s for s in query_counter)
+
+    assert generate_workorder_no(db_session, datetime.datetime(2026, 11, 1)) == "WO-202611-0001"
+
+
+def test_databases_without_upsert_lock_the_counter_row(db_session, monkeypatch):
+    monkeypatch.setattr(db_session.get_bind().dialect, "name", "mssql")
+
+    assert allocate_document_numbers(db_session, "CR", "202610", 2, seed=lambda: 4) == [5, 6]
+    assert allocate_document_numbers(db_session, "CR", "202610", seed=lambda: 99) == [7]
+    assert allocate_document_numbers(db_session, "CR", "202611") == [1]
@@ -1,10 +1,13 @@
 from datetime import date, datetime
+from decimal import Decimal
 from types import SimpleNamespace
 from uuid import uuid4
 
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from models.inventory import Inventory
+from models.workorder import Product
 from routes import routes_product
 from services import services_product
 
@@ -50,22 +53,19 @@ def _inventory_item(index):
     }
 
 
-def test_service_paginates_26_products_into_25_and_1(monkeypatch):
-    products = [SimpleNamespace(index=index) for index in range(26)]
-    db = SimpleNamespace(query=lambda model: FluentQuery(products), get_bind=lambda: object())
-    monkeypatch.setattr(
-        services_product,
-        "inspect",
-        lambda bind: SimpleNamespace(has_table=lambda table: False),
-    )
-    monkeypatch.setattr(
-        services_product,
-        "_build_inventory_item",
-        lambda db, product, consignment_available=None: _inventory_item(product.index),
-    )
+def _seed_products(db, count, stock=lambda index: Decimal("50")):
+    for index in range(count):
+        product = Product(id=uuid4(), name=f"Product {index:02d}", min_stock=Decimal("10"), price=Decimal("150000"))
+        db.add(product)
+        db.add(Inventory(product_id=product.id, quantity=stock(index), created_at=datetime(2026, 1, 1)))
+    db.commit()
 
-    first = services_product.get_inventory_products_paginated(db, page=1, limit=25)
-    second = services_product.get_inventory_products_paginated(db, page=2, limit=25)
+
+def test_service_paginates_26_products_into_25_and_1(db_session):
+    _seed_products(db_session, 26)
+
+    first = services_product.get_inventory_products_paginated(db_session, page=1, limit=25)
+    second = services_product.get_inventory_products_paginated(db_session, page=2, limit=25)
 
     assert len(first["data"]) == 25
     assert len(second["data"]) == 1
@@ -79,6 +79,24 @@ def test_service_paginates_26_products_into_25_and_1(monkeypatch):
     }
     assert second["pagination"]["has_previous"] is True
     assert second["pagination"]["has_next"] is False
+    assert second["data"][0]["name"] == "Product 25"
+
+
+def test_service_filters_stock_status_in_sql_and_hydrates_only_the_page(db_session, query_counter):
+    # every third product is at or below min_stock (10)
+    _seed_products(db_session, 30, stock=lambda index: Decimal("10") if index % 3 == 0 else Decimal("11"))
+
+    query_counter.clear()
+    reorder = services_product.get_inventory_products_paginated(db_session, page=2, limit=4, stock_status="reorder")
+
+    assert reorder["pagination"]["total"] == 10
+    assert [item["name"] for item in reorder["data"]] == ["Product 12", "Product 15", "Product 18", "Product 21"]
+    assert {item["stock_status"] for item in reorder["data"]} == {"reorder"}
+    # count, page ids, page products, purchase sources (+ has_table check)
+    assert len(query_counter) <= 5
+
+    safe = services_product.get_inventory_products_paginated(db_session, page=1, limit=25, stock_status="safe")
+    assert safe["pagination"]["total"] == 20
 
 
 def test_route_has_single_envelope_and_validates_query(monkeypatch):
@@ -0,0 +1,84 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from models.consignment import ConsignmentReceipt
+from models.inventory import Inventory
+from models.purchase_order import PurchaseOrder, PurchaseOrderLine, PurchaseOrderStatus
+from models.supplier import Supplier
+from models.workorder import Product
+from services import services_product
+
+
+def _seed(db, n_products=6):
+    po_vendor = Supplier(nama="Vendor PO", supplier_code="VND-PO", hp="0811", alamat="Jl. A")
+    cons_vendor = Supplier(nama="Vendor Titip", supplier_code="VND-CR", hp="0812", alamat="Jl. B")
+    db.add_all([po_vendor, cons_vendor])
+    products = [Product(name=f"Oli {i}", min_stock=Decimal("5"), price=Decimal("100"), is_consignment=False)
+                for i in range(n_products)]
+    db.add_all(products)
+    db.flush()
+
+    older = PurchaseOrder(po_no="PO-1", supplier_id=po_vendor.id, date=date(2026, 1, 10), total=0,
+                          status=PurchaseOrderStatus.diterima, created_at=datetime(2026, 1, 10, 8))
+    newer = PurchaseOrder(po_no="PO-2", supplier_id=po_vendor.id, date=date(2026, 3, 1), total=0,
+                          status=PurchaseOrderStatus.dibayarkan, created_at=datetime(2026, 3, 1, 8))
+    draft = PurchaseOrder(po_no="PO-3", supplier_id=po_vendor.id, date=date(2026, 5, 1), total=0,
+                          status=PurchaseOrderStatus.draft, created_at=datetime(2026, 5, 1, 8))
+    db.add_all([older, newer, draft])
+    db.flush()
+
+    for i, product in enumerate(products):
+        db.add(Inventory(product_id=product.id, quantity=Decimal(i), created_at=datetime(2026, 1, 1)))
+        if i % 3 == 2:
+            continue  # no purchase history at all
+        db.add(PurchaseOrderLine(purchase_order_id=older.id, product_id=product.id, quantity=1,
+                                 price=Decimal("50") + i, subtotal=0))
+        db.add(PurchaseOrderLine(purchase_order_id=newer.id, product_id=product.id, quantity=1,
+                                 price=Decimal("60") + i, subtotal=0))
+        db.add(PurchaseOrderLine(purchase_order_id=draft.id, product_id=product.id, quantity=1,
+                                 price=Decimal("999"), subtotal=0))
+        if i % 3 == 1:
+            db.add(ConsignmentReceipt(product_id=product.id, supplier_id=cons_vendor.id, receipt_number=f"CR-{i}",
+                                      receipt_date=date(2026, 4, 1), quantity_received=Decimal("2"),
+                                      unit_price=Decimal("70") + i, received_by="admin",
+                                      created_at=datetime(2026, 4, 1, 9)))
+    db.commit()
+    return products
+
+
+def test_batch_resolver_matches_per_product_lookup(db_session):
+    products = _seed(db_session)
+
+    batch = services_product._get_latest_purchase_sources(db_session, [p.id for p in products])
+
+    for product in products:
+        single = services_product._get_latest_purchase_source(db_session, product.id)
+        if single is None:
+            assert product.id not in batch
+        else:
+            assert batch[product.id]['price'] == single['price']
+            assert batch[product.id]['supplier'].supplier_code == single['supplier'].supplier_code
+    assert batch[products[1].id]['supplier'].supplier_code == "VND-CR"
+    assert batch[products[0].id]['price'] == Decimal("60.00")
+
+
+def test_inventory_listing_query_count_does_not_grow_with_products(db_session, query_counter):
+    _seed(db_session, n_products=3)
+    query_counter.clear()
+    small = services_product.getAllInventoryProducts(db_session)
+    small_queries = len(query_counter)
+
+    db_session.query(PurchaseOrderLine).delete()
+    db_session.query(ConsignmentReceipt).delete()
+    db_session.query(PurchaseOrder).delete()
+    db_session.query(Inventory).delete()
+    db_session.query(Product).delete()
+    db_session.query(Supplier).delete()
+    db_session.commit()
+    _seed(db_session, n_products=30)
+    query_counter.clear()
+    large = services_product.getAllInventoryProducts(db_session)
+
+    assert len(small) == 3 and len(large) == 30
+    assert len(query_counter) == small_queries
+    assert {item['vendor_code'] for item in large} == {"VND-PO", "VND-CR", None}
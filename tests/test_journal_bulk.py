@@ -0,0 +1,85 @@
+from datetime import date
+from decimal import Decimal
+
+from models.accounting import Account, AccountDailyBalance, JournalEntry, JournalLine
+from schemas.service_accounting import JournalEntryCreate, JournalLineCreate, JournalType
+from services.services_accounting import (
+    _create_entry,
+    create_journal_entries_bulk,
+    rebuild_account_daily_balance,
+)
+
+
+def _seed_accounts(db):
+    db.add_all([
+        Account(code="1001", name="Kas Kasir", normal_balance="debit", account_type="asset", is_active=True),
+        Account(code="6001", name="Biaya Operasional", normal_balance="debit", account_type="expense", is_active=True),
+    ])
+    db.commit()
+
+
+def _expense(entry_date, amount, account_code="6001", credit=None):
+    return JournalEntryCreate(
+        date=entry_date,
+        memo="Import biaya",
+        journal_type=JournalType.EXPENSE,
+        lines=[
+            JournalLineCreate(account_code=account_code, debit=Decimal(amount)),
+            JournalLineCreate(account_code="1001", credit=Decimal(credit or amount)),
+        ],
+    )
+
+
+def _rollup(db):
+    return {
+        (row.account_id, row.date): (row.debit_total, row.credit_total, row.line_count)
+        for row in db.query(AccountDailyBalance).all()
+    }
+
+
+def test_bulk_posting_uses_fixed_statements_and_continues_numbering(db_session, query_counter):
+    _seed_accounts(db_session)
+    _create_entry(db_session, _expense(date(2026, 7, 1), "5"))
+    payloads = [_expense(date(2026, 7, 1 + i % 2), str(10 + i)) for i in range(40)]
+
+    query_counter.clear()
+    result = create_journal_entries_bulk(db_session, payloads)
+
+    assert result["created"] == 40 and result["errors"] == []
+    # one counter bump per (type, date), entries, lines and one rollup upsert per date
+    assert len(query_counter) <= 8
+    assert len([s for s in query_counter if "INSERT INTO journal_lines" in s]) == 1
+
+    numbers = sorted(e["entry_no"] for e in result["entries"] if e["entry_no"].startswith("EXP-20260701"))
+    assert numbers[0] == "EXP-20260701-002" and numbers[-1] == "EXP-20260701-021"
+    assert db_session.query(JournalLine).count() == 82
+
+    incremental = _rollup(db_session)
+    rebuild_account_daily_balance(db_session)
+    assert _rollup(db_session) == incremental
+
+
+def test_atomic_batch_rejects_everything_on_one_bad_item(db_session):
+    _seed_accounts(db_session)
+    payloads = [_expense(date(2026, 7, 1), "10"), _expense(date(2026, 7, 1), "10", credit="9")]
+
+    result = create_journal_entries_bulk(db_session, payloads)
+
+    assert result["created"] == 0
+    assert [e["index"] for e in result["errors"]] == [1]
+    assert db_session.query(JournalEntry).count() == 0
+
+
+def test_non_atomic_batch_posts_valid_items_and_reports_the_rest(db_session):
+    _seed_accounts(db_session)
+    payloads = [
+        _expense(date(2026, 7, 1), "10"),
+        _expense(date(2026, 7, 1), "10", account_code="9999"),
+        _expense(date(2026, 7, 2), "20"),
+    ]
+
+    result = create_journal_entries_bulk(db_session, payloads, atomic=False)
+
+    assert [e["index"] for e in result["entries"]] == [0, 2]
+    assert result["errors"][0]["index"] == 1 and "9999" in result["errors"][0]["error"]
+    assert db_session.query(JournalEntry).count() == 2
@@ -0,0 +1,55 @@
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from models.purchase_order import PurchaseOrderStatus
+from models.supplier import Supplier
+from schemas.service_accounting import ProductSalesReportItem
+from supports import utils_json_response
+from supports.utils_json_response import error_response, success_response
+
+
+def _payload():
+    supplier_id = uuid.uuid4()
+    return supplier_id, {
+        "id": supplier_id,
+        "total": Decimal("12.50"),
+        "tanggal": date(2026, 10, 18),
+        "dibuat": datetime(2026, 10, 18, 9, 30),
+        "status": PurchaseOrderStatus.draft,
+        "supplier": Supplier(id=supplier_id, nama="Toko", hp="0811", alamat="Jl. A"),
+        "item": ProductSalesReportItem(workorder_no="WO-1", workorder_date=date(2026, 10, 18), customer_name="Budi",
+                                       product_name="Oli", quantity=Decimal("1"), price=Decimal("10"),
+                                       subtotal=Decimal("10"), discount=Decimal("0")),
+        "rows": [(1, "a")],
+    }
+
+
+def test_success_response_encodes_nested_values_in_the_envelope():
+    supplier_id, data = _payload()
+
+    body = json.loads(success_response(data=data, message="OK").body)
+
+    assert body["status"] == "success" and body["message"] == "OK"
+    encoded = body["data"]
+    assert encoded["id"] == str(supplier_id)
+    assert encoded["total"] == 12.5
+    assert encoded["tanggal"] == "2026-10-18" and encoded["dibuat"] == "2026-10-18T09:30:00"
+    assert encoded["status"] == PurchaseOrderStatus.draft.value
+    assert encoded["supplier"]["id"] == str(supplier_id) and encoded["supplier"]["nama"] == "Toko"
+    assert encoded["item"]["price"] == 10.0
+    assert encoded["rows"] == [[1, "a"]]
+
+
+def test_stdlib_fallback_renders_the_same_json(monkeypatch):
+    _, data = _payload()
+    fast = success_response(data=data).body
+
+    monkeypatch.setattr(utils_json_response, "orjson", None)
+    fallback = success_response(data=data).body
+
+    assert json.loads(fallback) == json.loads(fast)
+    assert json.loads(error_response(message="Gagal", status_code=422).body) == {
+        "status": "error", "message": "Gagal", "data": None
+    }
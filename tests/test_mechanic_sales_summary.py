@@ -0,0 +1,99 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from models.accounting import Account
+from models.customer import Customer
+from models.karyawan import Karyawan
+from models.workorder import Product, ProductOrdered, Service, ServiceOrdered, Workorder
+from schemas.service_accounting import (
+    JournalEntryCreate,
+    JournalLineCreate,
+    JournalType,
+    MechanicSalesDetailRequest,
+    MechanicSalesReportRequest,
+)
+from services.services_accounting import _create_entry, generate_mechanic_sales_report, get_mechanic_sales_details
+
+OCT_1, OCT_2 = date(2026, 10, 1), date(2026, 10, 2)
+
+
+def _seed(db):
+    budi = Customer(nama="Budi", hp="0811", alamat="Jl. A")
+    asep = Karyawan(nama="Asep", hp="0812", email="asep@bengkel.id")
+    dedi = Karyawan(nama="Dedi", hp="0813", email="dedi@bengkel.id")
+    oli = Product(name="Oli", price=Decimal("100"), cost=Decimal("60"), min_stock=Decimal("0"))
+    servis = Service(name="Servis", price="50", cost=Decimal("10"))
+    db.add_all([budi, asep, dedi, oli, servis,
+                Account(code="1001", name="Kas Kasir", normal_balance="debit", account_type="asset", is_active=True),
+                Account(code="4001", name="Penjualan", normal_balance="credit", account_type="revenue", is_active=True)])
+    db.flush()
+    for no, mechanic, entered, products, services, sold in [
+        ("WO-1", asep, datetime(2026, 10, 1, 9), 3, 1, True),
+        ("WO-2", asep, datetime(2026, 10, 1, 23, 30), 1, 0, True),
+        ("WO-3", asep, datetime(2026, 10, 2, 0, 0), 0, 2, True),
+        ("WO-4", dedi, datetime(2026, 10, 1, 10), 1, 1, True),
+        ("WO-5", dedi, datetime(2026, 10, 3, 10), 1, 1, True),  # outside the range
+        ("WO-6", dedi, datetime(2026, 10, 1, 11), 1, 1, False),  # not recognized as a sale
+    ]:
+        wo = Workorder(no_wo=no, tanggal_masuk=entered, keluhan="Servis", status="selesai", total_biaya=0,
+                       customer_id=budi.id, karyawan_id=mechanic.id)
+        db.add(wo)
+        db.flush()
+        db.add_all([ProductOrdered(quantity=1, price=100, subtotal=100, discount=0, product_id=oli.id, workorder_id=wo.id)
+                    for _ in range(products)])
+        db.add_all([ServiceOrdered(quantity=1, price=50, subtotal=50, discount=0, service_id=servis.id, workorder_id=wo.id)
+                    for _ in range(services)])
+        if sold:
+            _create_entry(db, JournalEntryCreate(
+                date=entered.date(), memo=f"Penjualan {no}", journal_type=JournalType.SALE,
+                customer_id=budi.id, workorder_id=wo.id,
+                lines=[JournalLineCreate(account_code="1001", debit=Decimal("1")),
+                       JournalLineCreate(account_code="4001", credit=Decimal("1"))],
+            ), commit=False)
+    db.commit()
+    return asep, dedi
+
+
+def _totals(report):
+    return [(i.mechanic_name, i.date, i.total_product_sales, i.total_service_sales,
+             i.product_line_count, i.service_line_count) for i in report.items]
+
+
+def test_summary_mode_matches_detail_totals_in_one_query(db_session, query_counter):
+    _seed(db_session)
+    detailed = generate_mechanic_sales_report(db_session, MechanicSalesReportRequest(start_date=OCT_1, end_date=OCT_2))
+
+    query_counter.clear()
+    summary = generate_mechanic_sales_report(
+        db_session, MechanicSalesReportRequest(start_date=OCT_1, end_date=OCT_2, include_details=False))
+
+    assert len(query_counter) == 1
+    assert _totals(summary) == [
+        ("Asep", OCT_1, Decimal("400"), Decimal("50"), 4, 1),
+        ("Asep", OCT_2, Decimal("0"), Decimal("100"), 0, 2),
+        ("Dedi", OCT_1, Decimal("100"), Decimal("50"), 1, 1),
+    ]
+    assert sorted(_totals(summary)) == sorted(_totals(detailed))
+    assert summary.total_sales == detailed.total_sales == Decimal("700")
+    assert all(not i.product_details and not i.service_details for i in summary.items)
+
+
+def test_drill_down_pages_through_one_mechanic_day(db_session):
+    asep, _ = _seed(db_session)
+
+    first = get_mechanic_sales_details(db_session, MechanicSalesDetailRequest(mechanic_id=asep.id, date=OCT_1, limit=3))
+    second = get_mechanic_sales_details(db_session, MechanicSalesDetailRequest(mechanic_id=asep.id, date=OCT_1, limit=3, page=2))
+
+    assert (first.total, first.total_pages, first.has_next, second.has_next) == (5, 2, True, False)
+    lines = first.items + second.items
+    assert [(i.workorder_no, i.line_type) for i in lines] == [
+        ("WO-1", "product"), ("WO-1", "product"), ("WO-1", "product"), ("WO-1", "service"), ("WO-2", "product"),
+    ]
+    assert len({i.line_id for i in lines}) == 5
+    assert lines[-1].item_name == "Oli" and lines[-1].workorder_date == OCT_1
+
+    with pytest.raises(ValueError):
+        get_mechanic_sales_details(db_session, MechanicSalesDetailRequest(mechanic_id=uuid.uuid4(), date=OCT_1))
@@ -0,0 +1,85 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from models.customer import Customer, Vehicle
+from models.dashboard import MonthlyBusinessSummary
+from models.expenses import ExpenseStatus, ExpenseType
+from models.workorder import Brand, Workorder
+from schemas.service_expenses import CreateExpenses, UpdateExpenses
+from schemas.service_workorder import CreateWorkorderOnly
+from services.services_business_summary import rebuild_monthly_business_summary
+from services.services_dashboard import get_monthly_series
+from services.services_expenses import create_expenses, delete_expenses, update_expenses
+from services.services_workorder import deleteWorkorder, update_only_workorder
+from services.services_workorder_summary import refresh_workorder_summaries
+
+SEPT, OCT = date(2026, 9, 1), date(2026, 10, 1)
+
+
+def _rollup(db):
+    db.expire_all()
+    return {
+        row.month: (row.sales_total, row.expense_total, row.workorder_count, row.workorder_completed_count,
+                    row.workorder_status_counts)
+        for row in db.execute(select(MonthlyBusinessSummary)).scalars()
+    }
+
+
+def _seed_workorder(db):
+    honda = Brand(name="Honda")
+    budi = Customer(nama="Budi", hp="0811", alamat="Jl. A")
+    db.add_all([honda, budi])
+    db.flush()
+    vehicle = Vehicle(no_pol="B 1234 XY", brand_id=honda.id, customer_id=budi.id)
+    db.add(vehicle)
+    db.flush()
+    wo = Workorder(id=uuid.uuid4(), no_wo="WO-202609-0001", tanggal_masuk=datetime(2026, 9, 30, 9),
+                   keluhan="Servis", status="selesai", total_biaya=Decimal("300"),
+                   customer_id=budi.id, vehicle_id=vehicle.id)
+    db.add(wo)
+    refresh_workorder_summaries(db, [wo.id])
+    db.commit()
+    return wo
+
+
+def _expense(amount, day):
+    return CreateExpenses(name="Listrik", description="PLN", expense_type=ExpenseType.listrik,
+                          status=ExpenseStatus.open, amount=Decimal(amount), date=day)
+
+
+def test_expense_writes_refresh_the_old_and_new_month(db_session):
+    listrik_id = uuid.UUID(create_expenses(db_session, _expense("75", date(2026, 9, 15)))["id"])
+    create_expenses(db_session, _expense("25", date(2026, 9, 20)))
+    assert _rollup(db_session)[SEPT][1] == Decimal("100.00")
+
+    update_expenses(db_session, listrik_id, UpdateExpenses(date=date(2026, 10, 2)))
+    rollup = _rollup(db_session)
+    assert (rollup[SEPT][1], rollup[OCT][1]) == (Decimal("25.00"), Decimal("75.00"))
+
+    delete_expenses(db_session, listrik_id)
+    assert _rollup(db_session)[OCT][1] == Decimal("0.00")
+    assert [m["expenses"] for m in get_monthly_series(db_session, 2, date(2026, 10, 18))] == [25.0, 0.0]
+
+
+def test_workorder_moving_month_and_deletion_follow_through_the_summary(db_session):
+    wo = _seed_workorder(db_session)
+    assert _rollup(db_session)[SEPT] == (Decimal("300.00"), Decimal("0.00"), 1, 1, {"selesai": 1})
+
+    update_only_workorder(db_session, wo.id, CreateWorkorderOnly(
+        tanggal_masuk=datetime(2026, 10, 1, 8), keluhan="Servis", status="dikerjakan", total_biaya=300,
+        customer_id=wo.customer_id, vehicle_id=wo.vehicle_id,
+    ))
+    rollup = _rollup(db_session)
+    assert rollup[SEPT][2:] == (0, 0, {})
+    assert rollup[OCT] == (Decimal("0.00"), Decimal("0.00"), 1, 0, {"dikerjakan": 1})
+
+    incremental = _rollup(db_session)
+    rebuild_monthly_business_summary(db_session)
+    rebuilt = _rollup(db_session)
+    assert rebuilt[OCT] == incremental[OCT] and SEPT not in rebuilt
+
+    deleteWorkorder(db_session, wo.id)
+    assert _rollup(db_session)[OCT][2:] == (0, 0, {})
@@ -28,12 +28,16 @@ class FakeSession:
         self.reference = reference
         self.committed = False
         self.deleted = None
+        self.executed = []
 
     def query(self, model):
         if getattr(model, "__name__", "") == "Product":
             return FakeQuery(self.product)
         return FakeQuery(self.reference)
 
+    def execute(self, statement):
+        self.executed.append(statement)
+
     def commit(self):
         self.committed = True
 
@@ -0,0 +1,64 @@
+from datetime import date
+from decimal import Decimal
+
+from models.accounting import Account, JournalEntry, JournalLine, JournalType
+from schemas.service_accounting import ProfitLossReportRequest
+from services.services_accounting import generate_profit_loss_report, rebuild_account_daily_balance
+
+
+def _account(db, code, name, normal_balance, account_type, is_active=True):
+    account = Account(
+        code=code,
+        name=name,
+        normal_balance=normal_balance,
+        account_type=account_type,
+        is_active=is_active,
+    )
+    db.add(account)
+    db.flush()
+    return account
+
+
+def _post(db, entry_date, *lines):
+    entry = JournalEntry(entry_no=f"GEN-{entry_date:%Y%m%d}", date=entry_date, journal_type=JournalType.general)
+    db.add(entry)
+    db.flush()
+    for account, debit, credit in lines:
+        db.add(JournalLine(entry_id=entry.id, account_id=account.id, debit=Decimal(debit), credit=Decimal(credit)))
+    db.flush()
+
+
+def test_profit_loss_groups_by_account_in_a_single_query(db_session, query_counter):
+    kas = _account(db_session, "1001", "Kas", "debit", "asset")
+    sales = _account(db_session, "4001", "Penjualan Produk", "credit", "revenue")
+    service = _account(db_session, "4002", "Penjualan Jasa", "credit", "revenue")
+    hpp = _account(db_session, "5001", "HPP", "debit", "expense")
+    idle = _account(db_session, "6001", "Biaya Operasional", "debit", "expense")
+    inactive = _account(db_session, "6099", "Beban Lama", "debit", "expense", is_active=False)
+
+    _post(db_session, date(2026, 7, 1), (kas, "1000", "0"), (sales, "0", "1000"))
+    _post(db_session, date(2026, 7, 2), (kas, "250", "0"), (service, "0", "250"))
+    _post(db_session, date(2026, 7, 2), (sales, "100", "0"), (kas, "0", "100"))  # retur
+    _post(db_session, date(2026, 7, 3), (hpp, "400", "0"), (kas, "0", "400"))
+    _post(db_session, date(2026, 7, 3), (inactive, "75", "0"), (kas, "0", "75"))
+    # Outside the range, must be ignored
+    _post(db_session, date(2026, 6, 30), (kas, "999", "0"), (sales, "0", "999"))
+    _post(db_session, date(2026, 7, 4), (idle, "10", "0"), (idle, "0", "10"))
+    db_session.commit()
+    rebuild_account_daily_balance(db_session)
+
+    query_counter.clear()
+    report = generate_profit_loss_report(
+        db_session,
+        ProfitLossReportRequest(start_date=date(2026, 7, 1), end_date=date(2026, 7, 4)),
+    )
+
+    assert len(query_counter) == 1
+    assert [(item.account_code, item.amount) for item in report.revenues] == [
+        ("4001", Decimal("900.00")),
+        ("4002", Decimal("250.00")),
+    ]
+    assert [(item.account_code, item.amount) for item in report.expenses] == [("5001", Decimal("400.00"))]
+    assert report.total_revenue == Decimal("1150.00")
+    assert report.total_expenses == Decimal("400.00")
+    assert report.net_profit == Decimal("750.00")
@@ -0,0 +1,181 @@
+import os
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from models.accounting import Account, JournalEntry
+from models.inventory import Inventory, ProductCostHistory, ProductCostReplay, ProductMovedHistory
+from models.purchase_order import PurchaseOrder, PurchaseOrderLine, PurchaseOrderStatus
+from models.supplier import Supplier
+from models.workorder import Product
+from schemas.service_purchase_order import UpdatePurchaseOrder, UpdatePurchaseOrderLineSingle
+from services.services_costing import replay_pending_costs
+from services.services_purchase_order import edit_purchase_order, update_purchase_order_line
+
+
+def _seed(db, extra_line_product=None):
+    db.add_all([
+        Account(code="2002", name="Persediaan", normal_balance="debit", account_type="asset", is_active=True),
+        Account(code="3001", name="Hutang Usaha", normal_balance="credit", account_type="liability", is_active=True),
+    ])
+    vendor = Supplier(nama="Vendor", supplier_code="VND-001", hp="0811", alamat="Jl. A")
+    oli = Product(name="Oli", min_stock=Decimal("5"), cost=Decimal("100"), is_consignment=False)
+    busi = Product(name="Busi", min_stock=Decimal("5"), is_consignment=False)
+    titip = Product(name="Helm Titipan", min_stock=Decimal("1"), is_consignment=True)
+    db.add_all([vendor, oli, busi, titip])
+    db.flush()
+    db.add(Inventory(product_id=oli.id, quantity=Decimal("10"), created_at=datetime(2026, 10, 1)))
+
+    po = PurchaseOrder(po_no="PO001", supplier_id=vendor.id, date=date(2026, 10, 18), total=Decimal("2940"),
+                       pajak=Decimal("0"), status=PurchaseOrderStatus.draft)
+    db.add(po)
+    db.flush()
+    lines = [(oli.id, "10", "130"), (oli.id, "10", "160"), (busi.id, "5", "20"), (titip.id, "2", "50")]
+    if extra_line_product:
+        lines.append((extra_line_product, "1", "10"))
+    for product_id, quantity, price in lines:
+        db.add(PurchaseOrderLine(purchase_order_id=po.id, product_id=product_id, quantity=Decimal(quantity),
+                                 price=Decimal(price), subtotal=Decimal(quantity) * Decimal(price)))
+    db.commit()
+    return po.id, oli.id, busi.id, titip.id
+
+
+def _stock(db, product_id):
+    inventory = db.query(Inventory).filter(Inventory.product_id == product_id).first()
+    return inventory.quantity if inventory else None
+
+
+def test_receipt_costs_moves_and_posts_in_one_commit(db_session):
+    po_id, oli_id, busi_id, titip_id = _seed(db_session)
+    commits = []
+    event.listen(db_session, "after_commit", commits.append)
+
+    result = edit_purchase_order(db_session, po_id, UpdatePurchaseOrder(status=PurchaseOrderStatus.diterima))
+
+    assert len(commits) == 1
+    receipt = result["receipt"]
+    assert [line["costing"].get("new_cost") for line in receipt["lines"]] == [115.0, 130.0, 20.0, None]
+    assert receipt["lines"][3]["costing"]["reason"] == "consignment_product"
+    assert receipt["journal_entry"]["lines"][0]["debit"] == 2940.0
+
+    assert db_session.get(Product, oli_id).cost == Decimal("130.00")
+    assert (_stock(db_session, oli_id), _stock(db_session, busi_id), _stock(db_session, titip_id)) == (
+        Decimal("30.00"), Decimal("5.00"), Decimal("2.00")
+    )
+    assert sorted(h.notes for h in db_session.query(ProductCostHistory).all()) == [
+        "Purchase order PO001 received: Average cost: (10.00 × 100.00) + (10.00 × 130.00) / 20.00",
+        "Purchase order PO001 received: Average cost: (20.00 × 115.00) + (10.00 × 160.00) / 30.00",
+        "Purchase order PO001 received: Initial cost set to purchase price (no existing stock)",
+    ]
+    assert db_session.query(JournalEntry).filter(JournalEntry.purchase_id == po_id).count() == 1
+
+
+def test_failed_receipt_leaves_po_and_stock_untouched(db_session):
+    po_id, oli_id, _, _ = _seed(db_session, extra_line_product=uuid.uuid4())
+
+    result = edit_purchase_order(db_session, po_id, UpdatePurchaseOrder(status=PurchaseOrderStatus.diterima))
+
+    assert "not found" in result["message"]
+    assert db_session.get(PurchaseOrder, po_id).status == PurchaseOrderStatus.draft
+    assert _stock(db_session, oli_id) == Decimal("10.00")
+    assert db_session.query(ProductMovedHistory).count() == 0
+    assert db_session.query(JournalEntry).count() == 0
+
+
+def _receive(db):
+    po_id, oli_id, busi_id, titip_id = _seed(db)
+    # the opening stock of oli, so the history matches the inventory
+    db.add(ProductMovedHistory(product_id=oli_id, type="income", quantity=Decimal("10"),
+                               timestamp=datetime(2026, 10, 1), performed_by="admin",
+                               purchase_price=Decimal("100")))
+    edit_purchase_order(db, po_id, UpdatePurchaseOrder(status=PurchaseOrderStatus.diterima))
+    lines = db.query(PurchaseOrderLine).filter(PurchaseOrderLine.purchase_order_id == po_id).all()
+    return {(line.product_id, line.price): line.id for line in lines}, oli_id, busi_id
+
+
+def _receipt(db, line_id):
+    return db.query(ProductMovedHistory).filter(ProductMovedHistory.reference_id == line_id).one()
+
+
+def _cost_history(db, product_id):
+    """(methods, count, cost of the last receipt) of a product's cost history."""
+    rows = db.query(ProductCostHistory).filter(ProductCostHistory.product_id == product_id).all()
+    last = max(rows, key=lambda row: row.new_quantity).new_cost if rows else None
+    return {row.calculation_method for row in rows}, len(rows), last
+
+
+@pytest.fixture
+def jakarta_clock():
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "WIB-7"
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def test_editing_a_received_line_corrects_its_own_receipt_and_stock(db_session):
+    lines, oli_id, _ = _receive(db_session)
+    first, second = lines[(oli_id, Decimal("130.00"))], lines[(oli_id, Decimal("160.00"))]
+
+    update_purchase_order_line(db_session, second, UpdatePurchaseOrderLineSingle(
+        product_id=oli_id, quantity=Decimal("4"), price=Decimal("170")))
+
+    assert (_receipt(db_session, second).quantity, _receipt(db_session, second).purchase_price) == (
+        Decimal("4.00"), Decimal("170.00"))
+    assert (_receipt(db_session, first).quantity, _receipt(db_session, first).purchase_price) == (
+        Decimal("10.00"), Decimal("130.00"))
+    assert _stock(db_session, oli_id) == Decimal("24.00")
+    replay = db_session.query(ProductCostReplay).one()
+    assert (replay.product_id, replay.replay_from) == (oli_id, _receipt(db_session, second).timestamp)
+
+
+def test_moving_a_received_line_to_another_product_moves_the_stock(db_session):
+    lines, oli_id, busi_id = _receive(db_session)
+    line_id = lines[(busi_id, Decimal("20.00"))]
+
+    update_purchase_order_line(db_session, line_id, UpdatePurchaseOrderLineSingle(
+        product_id=oli_id, quantity=Decimal("3"), price=Decimal("20")))
+
+    assert (_receipt(db_session, line_id).product_id, _receipt(db_session, line_id).quantity) == (oli_id, Decimal("3.00"))
+    assert (_stock(db_session, oli_id), _stock(db_session, busi_id)) == (Decimal("33.00"), Decimal("0.00"))
+    assert {r.product_id for r in db_session.query(ProductCostReplay).all()} == {oli_id, busi_id}
+
+    replay_pending_costs(db_session)
+    assert db_session.get(Product, oli_id).cost == Decimal("120.00")
+    assert db_session.get(Product, busi_id).cost == Decimal("0.00")
+    assert _cost_history(db_session, oli_id) == ({"replay"}, 3, Decimal("120.00"))
+    assert _cost_history(db_session, busi_id) == (set(), 0, None)
+
+
+def test_received_stock_that_already_left_cannot_be_taken_back(db_session):
+    lines, oli_id, busi_id = _receive(db_session)
+    line_id = lines[(busi_id, Decimal("20.00"))]
+    db_session.query(Inventory).filter(Inventory.product_id == busi_id).update({"quantity": Decimal("2")})
+    db_session.commit()
+
+    with pytest.raises(ValueError, match="Stock tidak cukup"):
+        update_purchase_order_line(db_session, line_id, UpdatePurchaseOrderLineSingle(
+            product_id=oli_id, quantity=Decimal("3"), price=Decimal("20")))
+
+    assert db_session.get(PurchaseOrderLine, line_id).product_id == busi_id
+    assert (_stock(db_session, oli_id), _stock(db_session, busi_id)) == (Decimal("30.00"), Decimal("2.00"))
+    assert db_session.query(ProductCostReplay).count() == 0
+
+
+def test_replay_after_an_edit_on_a_utc_plus_7_server_averages_each_receipt_once(db_session, jakarta_clock):
+    lines, oli_id, _ = _receive(db_session)
+
+    update_purchase_order_line(db_session, lines[(oli_id, Decimal("160.00"))], UpdatePurchaseOrderLineSingle(
+        product_id=oli_id, quantity=Decimal("4"), price=Decimal("170")))
+    replay_pending_costs(db_session)
+
+    assert db_session.get(Product, oli_id).cost == Decimal("124.17")
+    assert _cost_history(db_session, oli_id) == ({"replay"}, 2, Decimal("124.17"))
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from models.accounting import Account
+from models.customer import Customer
+from models.supplier import Supplier
+from schemas.service_accounting import (
+    JournalEntryCreate,
+    JournalLineCreate,
+    JournalType,
+    ReceivablePayableReportRequest,
+)
+from services.services_accounting import _create_entry, generate_receivable_payable_report
+
+END = date(2026, 10, 18)
+
+
+def _seed(db):
+    db.add_all([
+        Account(code="1001", name="Kas", normal_balance="debit", account_type="asset", is_active=True),
+        Account(code="2001", name="Piutang Usaha", normal_balance="debit", account_type="asset", is_active=True),
+        Account(code="3001", name="Hutang Usaha", normal_balance="credit", account_type="liability", is_active=True),
+        Account(code="4001", name="Penjualan", normal_balance="credit", account_type="revenue", is_active=True),
+        Account(code="5001", name="Persediaan", normal_balance="debit", account_type="asset", is_active=True),
+    ])
+    budi = Customer(nama="Budi", hp="0811", alamat="Jl. A")
+    lunas = Customer(nama="Lunas", hp="0812", alamat="Jl. B")
+    toko = Supplier(nama="Toko Sparepart", hp="0813", alamat="Jl. C")
+    db.add_all([budi, lunas, toko])
+    db.commit()
+    return budi, lunas, toko
+
+
+def _post(db, days_before_end, debit_code, credit_code, amount, **entity):
+    _create_entry(db, JournalEntryCreate(
+        date=END - timedelta(days=days_before_end),
+        journal_type=JournalType.GENERAL,
+        lines=[
+            JournalLineCreate(account_code=debit_code, debit=Decimal(amount)),
+            JournalLineCreate(account_code=credit_code, credit=Decimal(amount)),
+        ],
+        **entity,
+    ))
+
+
+def test_report_returns_open_balances_with_fifo_aging(db_session, query_counter):
+    budi, lunas, toko = _seed(db_session)
+    _post(db_session, 100, "2001", "4001", "100", customer_id=budi.id)
+    _post(db_session, 40, "2001", "4001", "50", customer_id=budi.id)
+    _post(db_session, 5, "2001", "4001", "30", customer_id=budi.id)
+    _post(db_session, 1, "1001", "2001", "120", customer_id=budi.id)
+    _post(db_session, 10, "2001", "4001", "75", customer_id=lunas.id)
+    _post(db_session, 2, "1001", "2001", "75", customer_id=lunas.id)
+    _post(db_session, 70, "5001", "3001", "200", supplier_id=toko.id)
+
+    query_counter.clear()
+    report = generate_receivable_payable_report(
+        db_session, ReceivablePayableReportRequest(start_date=date(2026, 1, 1), end_date=END)
+    )
+
+    assert len(query_counter) == 2
+    assert [item.entity_name for item in report.items] == ["Budi", "Toko Sparepart"]
+
+    customer, supplier = report.items
+    assert customer.total_receivable == Decimal("60.00")
+    # the 120 payment settled the oldest invoice first: 30 current, 30 of the 50
+    assert (customer.aging_0_30, customer.aging_31_60, customer.aging_61_90, customer.aging_90_plus) == (
+        Decimal("30.00"), Decimal("30.00"), Decimal("0.00"), Decimal("0.00")
+    )
+    assert supplier.balance == Decimal("-200.00")
+    assert supplier.aging_61_90 == Decimal("200.00")
+    assert report.net_balance == Decimal("-140.00")
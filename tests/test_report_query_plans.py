@@ -0,0 +1,142 @@
+import re
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from models.accounting import Account
+from models.customer import Customer
+from models.inventory import ProductMovedHistory
+from models.karyawan import Karyawan
+from models.purchase_order import PurchaseOrder, PurchaseOrderLine
+from models.supplier import Supplier
+from models.workorder import Product, ProductOrdered, Service, ServiceOrdered, Workorder
+from schemas.service_accounting import (
+    CashBookReportRequest,
+    DailyReportRequest,
+    JournalEntryCreate,
+    JournalLineCreate,
+    JournalType,
+    MechanicSalesDetailRequest,
+    MechanicSalesReportRequest,
+    ProductSalesReportRequest,
+    PurchaseOrderReportRequest,
+    ServiceSalesReportRequest,
+)
+from schemas.service_inventory import ProductMoveHistoryReportRequest
+from services.services_accounting import (
+    _create_entry,
+    generate_cash_book_report,
+    generate_daily_report,
+    generate_mechanic_sales_report,
+    generate_product_sales_report,
+    generate_purchase_order_report,
+    generate_service_sales_report,
+    generate_work_order_summary,
+    get_mechanic_sales_details,
+)
+from services.services_business_summary import refresh_monthly_business_summary
+from services.services_dashboard import compute_dashboard_aggregates
+from services.services_inventory import generate_product_move_history_report
+
+REPORT_DATE = date(2026, 7, 12)
+
+# Tables that grow with history. A plain "SCAN <table>" in SQLite's plan is a
+# full table scan; "SEARCH ... USING INDEX" or an index-ordered "SCAN ... USING
+# INDEX" is served by an index (the movement report's opening balance reads all
+# earlier history that way by design).
+BIG_TABLES = (
+    "workorder", "product_ordered", "service_ordered", "journal_entries", "journal_lines",
+    "product_moved_history", "purchase_order", "purchase_order_line", "expenses", "attendance",
+    "sales_line_fact",
+)
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(BIG_TABLES)})$")
+
+
+def _seed(db):
+    for code, name, normal_balance, account_type in [
+        ("1001", "Kas Kasir", "debit", "asset"),
+        ("3001", "Hutang Usaha", "credit", "liability"),
+        ("4001", "Penjualan Produk", "credit", "revenue"),
+    ]:
+        db.add(Account(code=code, name=name, normal_balance=normal_balance, account_type=account_type, is_active=True))
+    customer = Customer(nama="Budi", hp="0812", alamat="Jl. Mawar")
+    supplier = Supplier(nama="PT Oli", hp="0813", alamat="Jl. Melati")
+    asep = Karyawan(nama="Asep", hp="0814", email="asep@bengkel.id")
+    oli = Product(name="Oli", price=Decimal("100"), cost=Decimal("60"), min_stock=Decimal("0"))
+    servis = Service(name="Servis", price="50", cost=Decimal("10"))
+    db.add_all([customer, supplier, asep, oli, servis])
+    db.flush()
+
+    wo = Workorder(no_wo="WO-1", tanggal_masuk=datetime(2026, 7, 12, 9), keluhan="Servis", status="selesai",
+                   total_biaya=Decimal("150"), customer_id=customer.id, karyawan_id=asep.id)
+    po = PurchaseOrder(po_no="PO-1", supplier_id=supplier.id, date=REPORT_DATE, total=Decimal("60"))
+    db.add_all([wo, po])
+    db.flush()
+    db.add_all([
+        ProductOrdered(quantity=1, subtotal=100, price=100, discount=0, product_id=oli.id, workorder_id=wo.id),
+        ServiceOrdered(quantity=1, subtotal=50, price=50, discount=0, service_id=servis.id, workorder_id=wo.id),
+        PurchaseOrderLine(purchase_order_id=po.id, product_id=oli.id, quantity=1, price=60, subtotal=60),
+        ProductMovedHistory(product_id=oli.id, type="income", quantity=1, timestamp=datetime(2026, 7, 1),
+                            performed_by="system"),
+    ])
+    _create_entry(db, JournalEntryCreate(
+        date=REPORT_DATE, memo="Penjualan WO-1", journal_type=JournalType.SALE,
+        customer_id=customer.id, workorder_id=wo.id,
+        lines=[
+            JournalLineCreate(account_code="1001", debit=Decimal("150")),
+            JournalLineCreate(account_code="4001", credit=Decimal("150")),
+        ],
+    ))
+    db.commit()
+
+
+REPORTS = {
+    "product_sales": lambda db: generate_product_sales_report(
+        db, ProductSalesReportRequest(start_date=REPORT_DATE, end_date=REPORT_DATE)),
+    "service_sales": lambda db: generate_service_sales_report(
+        db, ServiceSalesReportRequest(start_date=REPORT_DATE, end_date=REPORT_DATE)),
+    "work_order_summary": lambda db: generate_work_order_summary(db, REPORT_DATE, REPORT_DATE),
+    "mechanic_sales": lambda db: generate_mechanic_sales_report(
+        db, MechanicSalesReportRequest(start_date=REPORT_DATE, end_date=REPORT_DATE)),
+    "mechanic_sales_summary": lambda db: generate_mechanic_sales_report(
+        db, MechanicSalesReportRequest(start_date=REPORT_DATE, end_date=REPORT_DATE, include_details=False)),
+    "mechanic_sales_details": lambda db: get_mechanic_sales_details(db, MechanicSalesDetailRequest(
+        mechanic_id=db.query(Karyawan.id).scalar(), date=REPORT_DATE)),
+    "purchase_orders": lambda db: generate_purchase_order_report(
+        db, PurchaseOrderReportRequest(start_date=REPORT_DATE, end_date=REPORT_DATE)),
+    "cash_book": lambda db: generate_cash_book_report(db, CashBookReportRequest(
+        account_id=db.query(Account.id).filter(Account.code == "1001").scalar(),
+        start_date=REPORT_DATE, end_date=REPORT_DATE)),
+    "daily": lambda db: generate_daily_report(db, DailyReportRequest(date=REPORT_DATE)),
+    "product_moves": lambda db: generate_product_move_history_report(
+        db, ProductMoveHistoryReportRequest(start_date=REPORT_DATE, end_date=REPORT_DATE)),
+    "dashboard": lambda db: compute_dashboard_aggregates(db, REPORT_DATE),
+    "monthly_rollup_refresh": lambda db: refresh_monthly_business_summary(db, [REPORT_DATE]),
+}
+
+
+@pytest.mark.parametrize("report", list(REPORTS))
+def test_report_queries_do_not_scan_big_tables(db_session, report):
+    _seed(db_session)
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        REPORTS[report](db_session)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    db_session.rollback()
+    assert statements
+
+    connection = db_session.connection()
+    for statement, parameters in statements:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        full_scans = [row[3] for row in plan if FULL_SCAN.match(row[3])]
+        assert not full_scans, f"{report}: {full_scans} in\n{statement}"
@@ -0,0 +1,136 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from models.accounting import Account
+from models.customer import Customer
+from models.inventory import ProductMovedHistory
+from models.workorder import Product, ProductOrdered, SalesLineFact, Service, ServiceOrdered, Workorder
+from schemas.service_accounting import (
+    JournalEntryCreate,
+    JournalLineCreate,
+    JournalType,
+    ProductSalesReportRequest,
+    ServiceSalesReportRequest,
+)
+from schemas.service_product import CreateService, UpdateProduct
+from services.services_accounting import (
+    _create_entry,
+    delete_journal_entry,
+    generate_product_sales_report,
+    generate_service_sales_report,
+)
+from services import services_product
+from services.services_sales_fact import rebuild_sales_line_facts
+from services.services_workorder_summary import refresh_workorder_summaries
+
+SALE_DATE = date(2026, 10, 5)
+
+
+def _seed(db):
+    budi = Customer(nama="Budi", hp="0811", alamat="Jl. A")
+    oli = Product(name="Oli", price=Decimal("100"), cost=Decimal("60"), min_stock=Decimal("0"))
+    servis = Service(name="Servis", price="50", cost=Decimal("10"))
+    db.add_all([
+        budi, oli, servis,
+        Account(code="1001", name="Kas Kasir", normal_balance="debit", account_type="asset", is_active=True),
+        Account(code="4001", name="Penjualan", normal_balance="credit", account_type="revenue", is_active=True),
+    ])
+    db.flush()
+    workorders = []
+    for no in ("WO-1", "WO-2"):
+        wo = Workorder(no_wo=no, tanggal_masuk=datetime(2026, 10, 4, 9), keluhan="Servis", status="selesai",
+                       total_biaya=Decimal("250"), customer_id=budi.id)
+        db.add(wo)
+        db.flush()
+        db.add_all([
+            ProductOrdered(quantity=2, price=100, subtotal=200, discount=0, product_id=oli.id, workorder_id=wo.id),
+            ServiceOrdered(quantity=1, price=50, subtotal=50, discount=0, service_id=servis.id, workorder_id=wo.id),
+        ])
+        workorders.append(wo)
+    db.commit()
+    return budi, oli, workorders
+
+
+def _sell(db, customer, wo):
+    return _create_entry(db, JournalEntryCreate(
+        date=SALE_DATE, memo=f"Penjualan {wo.no_wo}", journal_type=JournalType.SALE,
+        customer_id=customer.id, workorder_id=wo.id,
+        lines=[JournalLineCreate(account_code="1001", debit=Decimal("250")),
+               JournalLineCreate(account_code="4001", credit=Decimal("250"))],
+    ))
+
+
+def _service_report(db):
+    return generate_service_sales_report(db, ServiceSalesReportRequest(start_date=date(2026, 10, 1), end_date=date(2026, 10, 31)))
+
+
+def _product_report(db):
+    return generate_product_sales_report(db, ProductSalesReportRequest(start_date=date(2026, 10, 1), end_date=date(2026, 10, 31)))
+
+
+def test_reports_read_recognized_sales_from_the_fact_table_only(db_session, query_counter):
+    budi, _, (sold, _) = _seed(db_session)
+    assert _product_report(db_session).items == []
+
+    _sell(db_session, budi, sold)
+    query_counter.clear()
+    products = _product_report(db_session)
+    services = _service_report(db_session)
+
+    assert len(query_counter) == 2
+    assert all(" JOIN " not in s and "FROM sales_line_fact" in s for s in query_counter)
+    assert [(i.workorder_no, i.customer_name, i.product_name, i.quantity, i.hpp) for i in products.items] == [
+        ("WO-1", "Budi", "Oli", Decimal("2"), Decimal("60"))
+    ]
+    assert (products.total_sales, products.total_hpp) == (Decimal("200"), Decimal("120"))
+    assert (services.total_sales, services.total_hpp) == (Decimal("50"), Decimal("10"))
+    assert db_session.query(SalesLineFact.sale_date).distinct().scalar() == SALE_DATE
+
+
+def test_hpp_is_snapshotted_and_facts_follow_later_writes(db_session):
+    budi, oli, (sold, _) = _seed(db_session)
+    entry = _sell(db_session, budi, sold)
+
+    # a later cost change does not rewrite the sale; a line added afterwards takes the new cost
+    oli.cost = Decimal("80")
+    db_session.add(ProductOrdered(quantity=1, price=100, subtotal=100, discount=0, product_id=oli.id,
+                                  workorder_id=sold.id))
+    refresh_workorder_summaries(db_session, [sold.id])
+    db_session.commit()
+    assert sorted(i.hpp for i in _product_report(db_session).items) == [Decimal("60"), Decimal("80")]
+
+    db_session.query(SalesLineFact).delete()
+    db_session.commit()
+    assert rebuild_sales_line_facts(db_session) == {"workorders": 1}
+    assert db_session.query(SalesLineFact).count() == 3
+
+    delete_journal_entry(db_session, entry.id)
+    assert db_session.query(SalesLineFact).count() == 0
+
+
+def test_product_hpp_comes_from_the_workorder_stock_deduction(db_session):
+    budi, oli, (sold, _) = _seed(db_session)
+    for day, hpp in ((4, "50"), (5, "55")):
+        db_session.add(ProductMovedHistory(product_id=oli.id, type="outcome", quantity=Decimal("-2"),
+                                           timestamp=datetime(2026, 10, day, 10), performed_by="admin",
+                                           reference_type="workorder", reference_id=sold.id, workorder_id=sold.id,
+                                           hpp_snapshot=Decimal(hpp)))
+    db_session.commit()
+
+    _sell(db_session, budi, sold)
+
+    assert [i.hpp for i in _product_report(db_session).items] == [Decimal("55")]
+    assert _service_report(db_session).total_hpp == Decimal("10")
+
+
+def test_renamed_products_and_services_show_their_new_name(db_session, monkeypatch):
+    monkeypatch.setattr(services_product, "get_product_by_id", lambda db, product_id: None)
+    budi, oli, (sold, _) = _seed(db_session)
+    _sell(db_session, budi, sold)
+    servis_id = db_session.query(SalesLineFact.item_id).filter(SalesLineFact.line_type == "service").scalar()
+
+    services_product.update_product(db_session, oli.id, UpdateProduct(name="Oli Mesin"))
+    services_product.update_service(db_session, servis_id, CreateService(name="Servis Berkala", price=Decimal("50"), cost=Decimal("10")))
+
+    assert [i.product_name for i in _product_report(db_session).items] == ["Oli Mesin"]
+    assert [(i.service_name, i.hpp) for i in _service_report(db_session).items] == [("Servis Berkala", Decimal("10"))]
@@ -0,0 +1,41 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from models.inventory import ProductMovedHistory
+from models.purchase_order import PurchaseOrder, PurchaseOrderStatus
+from models.supplier import Supplier
+from supports.utils_serializer import to_dict, to_dicts
+
+
+def test_loaded_rows_convert_like_the_per_service_helper(db_session):
+    product_id = uuid.uuid4()
+    db_session.add(ProductMovedHistory(id=uuid.uuid4(), product_id=product_id, type="income", quantity=Decimal("2.50"),
+                                       timestamp=datetime(2026, 10, 18, 9, 30), performed_by="admin",
+                                       purchase_price=Decimal("95.50")))
+    db_session.commit()
+    db_session.expunge_all()
+
+    row = db_session.query(ProductMovedHistory).one()
+    item = to_dict(row)
+
+    assert item["product_id"] == str(product_id)
+    assert item["quantity"] == 2.5
+    assert item["timestamp"] == "2026-10-18T09:30:00"
+    assert item["notes"] is None
+    assert to_dicts([row]) == [item]
+
+
+def test_enum_values_and_unflushed_strings_fall_back_to_value_conversion(db_session):
+    supplier = Supplier(nama="Toko", hp="0811", alamat="Jl. A")
+    db_session.add(supplier)
+    db_session.commit()
+
+    po = PurchaseOrder(po_no="PO-1", supplier_id=str(supplier.id), date=date(2026, 10, 18), total=Decimal("10"),
+                       status=PurchaseOrderStatus.draft)
+    item = to_dict(po)
+
+    assert item["status"] == PurchaseOrderStatus.draft.value
+    assert item["supplier_id"] == str(supplier.id)
+    assert item["date"] == "2026-10-18"
+    assert item["total"] == 10.0
@@ -0,0 +1,73 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from models.inventory import ProductMovedHistory
+from models.supplier import Supplier
+from models.workorder import Product
+from schemas.service_inventory import ProductMoveHistoryReportRequest
+from services.services_inventory import generate_product_move_history_report
+
+
+def _seed(db):
+    oli = Product(name="Oli Mesin", min_stock=Decimal("5"))
+    busi = Product(name="Busi", min_stock=Decimal("5"))
+    vendor = Supplier(nama="Vendor", supplier_code="VND-001", hp="0811", alamat="Jl. A")
+    db.add_all([oli, busi, vendor])
+    db.flush()
+
+    def move(product, move_type, quantity, day, hour=9, **extra):
+        db.add(ProductMovedHistory(product_id=product.id, type=move_type, quantity=Decimal(quantity),
+                                   timestamp=datetime(2026, 10, day, hour), performed_by="admin", **extra))
+
+    move(oli, "income", "10", 1)            # opening
+    move(busi, "income", "4", 2)            # opening
+    move(oli, "income", "5", 10, supplier_id=vendor.id, purchase_price=Decimal("100"))
+    move(oli, "outcome", "3", 11)           # positive outcome still reduces stock
+    move(busi, "outcome", "-1", 11, hour=10)
+    move(oli, "adjustment", "-2", 12)
+    move(oli, "loss", "1", 13)
+    db.commit()
+    return oli, busi
+
+
+def _report(db, **kwargs):
+    return generate_product_move_history_report(db, ProductMoveHistoryReportRequest(
+        start_date=date(2026, 10, 10), end_date=date(2026, 10, 31), **kwargs
+    ))
+
+
+def test_running_balance_is_seeded_from_opening_per_product(db_session):
+    _seed(db_session)
+
+    report = _report(db_session)
+
+    assert [(i.product_name, i.quantity, i.balance_before, i.balance_after) for i in report.items] == [
+        ("Oli Mesin", Decimal("5.00"), Decimal("10.00"), Decimal("15.00")),
+        ("Oli Mesin", Decimal("-3.00"), Decimal("15.00"), Decimal("12.00")),
+        ("Busi", Decimal("-1.00"), Decimal("4.00"), Decimal("3.00")),
+        ("Oli Mesin", Decimal("-2.00"), Decimal("12.00"), Decimal("10.00")),
+        ("Oli Mesin", Decimal("-1.00"), Decimal("10.00"), Decimal("9.00")),
+    ]
+    assert report.items[0].vendor_code == "VND-001" and report.items[0].price == Decimal("100.00")
+    summary = report.summary
+    assert (summary.opening_balance, summary.total_in, summary.total_out, summary.total_adjustment) == (
+        Decimal("14.00"), Decimal("5.00"), Decimal("5.00"), Decimal("-2.00")
+    )
+    assert summary.closing_balance == Decimal("12.00")
+
+
+def test_pages_keep_full_history_balances_without_extra_queries(db_session, query_counter):
+    oli, _ = _seed(db_session)
+    oli_id = oli.id
+
+    query_counter.clear()
+    report = _report(db_session, product_id=oli_id, sort_order="desc", page=2, limit=2)
+
+    assert len(query_counter) <= 4
+    assert report.total_entries == 4 and report.pagination.total_pages == 2
+    assert not report.pagination.has_next and report.pagination.has_previous
+    assert [(i.type, i.balance_after) for i in report.items] == [
+        ("outcome", Decimal("12.00")),
+        ("income", Decimal("15.00")),
+    ]
+    assert report.summary.closing_balance == Decimal("9.00")
@@ -0,0 +1,148 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from models.customer import Customer, Vehicle
+from models.inventory import Inventory, ProductMovedHistory
+from models.workorder import Brand, Product, ProductOrdered, Workorder
+from schemas.service_inventory import CreateProductMovedHistory
+from schemas.service_workorder import CreateWorkorderOnly
+from services.services_inventory import create_stock_movements, createProductMoveHistoryNew, reconcile_inventory_quantities
+from services.services_workorder import update_only_workorder
+
+
+def _product(db, name="Oli Mesin"):
+    product = Product(name=name, min_stock=Decimal("5"))
+    db.add(product)
+    db.commit()
+    return product
+
+
+def _move(product, move_type, quantity):
+    return CreateProductMovedHistory(
+        product_id=product.id,
+        type=move_type,
+        quantity=Decimal(quantity),
+        performed_by="admin",
+        timestamp=datetime(2026, 10, 18, 9),
+    )
+
+
+def _stock(db, product):
+    return db.query(Inventory).filter(Inventory.product_id == product.id).one().quantity
+
+
+def test_movement_is_a_single_commit_without_history_resum(db_session, query_counter):
+    product = _product(db_session)
+    createProductMoveHistoryNew(db_session, _move(product, "income", "10"))
+
+    query_counter.clear()
+    createProductMoveHistoryNew(db_session, _move(product, "outcome", "3"))
+
+    assert not any("sum(product_moved_history.quantity)" in s.lower() for s in query_counter)
+    assert sum(1 for s in query_counter if s.strip().upper() == "COMMIT") <= 1
+    assert _stock(db_session, product) == Decimal("7.00")
+
+
+def test_failed_outcome_leaves_stock_untouched(db_session):
+    product = _product(db_session)
+    createProductMoveHistoryNew(db_session, _move(product, "income", "2"))
+
+    with pytest.raises(ValueError):
+        createProductMoveHistoryNew(db_session, _move(product, "outcome", "5"))
+
+    assert _stock(db_session, product) == Decimal("2.00")
+    assert db_session.query(ProductMovedHistory).count() == 1
+
+
+def test_reconciliation_reports_and_fixes_drift(db_session):
+    oli = _product(db_session, "Oli Mesin")
+    busi = _product(db_session, "Busi")
+    createProductMoveHistoryNew(db_session, _move(oli, "income", "10"))
+    createProductMoveHistoryNew(db_session, _move(busi, "income", "4"))
+    db_session.query(Inventory).filter(Inventory.product_id == oli.id).update({"quantity": Decimal("12")})
+    db_session.commit()
+
+    report = reconcile_inventory_quantities(db_session)
+    assert [(d["product_name"], d["drift"]) for d in report["drifts"]] == [("Oli Mesin", 2.0)]
+    assert _stock(db_session, oli) == Decimal("12.00")
+
+    reconcile_inventory_quantities(db_session, fix=True)
+    assert _stock(db_session, oli) == Decimal("10.00")
+    assert reconcile_inventory_quantities(db_session)["drifts"] == []
+
+
+def test_batch_movements_use_one_history_insert_and_one_commit(db_session, query_counter):
+    products = [_product(db_session, f"Part {i}") for i in range(15)]
+    create_stock_movements(db_session, [_move(p, "income", "5") for p in products])
+
+    query_counter.clear()
+    recorded = create_stock_movements(db_session, [_move(p, "outcome", "2") for p in reversed(products)])
+
+    assert len(recorded) == 15 and recorded[0]["product_id"] == str(products[-1].id)
+    assert sum(1 for s in query_counter if s.startswith("INSERT INTO product_moved_history")) == 1
+    assert sum(1 for s in query_counter if s.strip().upper() == "COMMIT") <= 1
+    assert {_stock(db_session, p) for p in products} == {Decimal("3.00")}
+
+
+def test_batch_is_all_or_nothing(db_session):
+    oli, busi = _product(db_session, "Oli Mesin"), _product(db_session, "Busi")
+    create_stock_movements(db_session, [_move(oli, "income", "5"), _move(busi, "income", "1")])
+
+    with pytest.raises(ValueError):
+        # the second busi line exceeds the stock left by the first one
+        create_stock_movements(db_session, [_move(oli, "outcome", "2"), _move(busi, "outcome", "1"), _move(busi, "outcome", "1")])
+
+    assert _stock(db_session, oli) == Decimal("5.00")
+    assert _stock(db_session, busi) == Decimal("1.00")
+    assert db_session.query(ProductMovedHistory).count() == 2
+
+
+def test_workorder_completion_deducts_once_via_indexed_lookup(db_session):
+    oli = _product(db_session)
+    createProductMoveHistoryNew(db_session, _move(oli, "income", "10"))
+    honda = Brand(name="Honda")
+    budi = Customer(nama="Budi", hp="0811", alamat="Jl. A")
+    db_session.add_all([honda, budi])
+    db_session.flush()
+    vehicle = Vehicle(no_pol="B 1234 XY", brand_id=honda.id, customer_id=budi.id)
+    db_session.add(vehicle)
+    db_session.flush()
+    wo = Workorder(id=uuid.uuid4(), no_wo="WO-1", tanggal_masuk=datetime(2026, 10, 18, 9), keluhan="Servis",
+                   status="dikerjakan", total_biaya=Decimal("300"), customer_id=budi.id, vehicle_id=vehicle.id)
+    db_session.add(wo)
+    db_session.add(ProductOrdered(workorder_id=wo.id, product_id=oli.id, quantity=2, price=150, subtotal=300))
+    db_session.commit()
+
+    def set_status(status):
+        update_only_workorder(db_session, wo.id, CreateWorkorderOnly(
+            tanggal_masuk=wo.tanggal_masuk, keluhan="Servis", status=status, total_biaya=300,
+            customer_id=budi.id, vehicle_id=vehicle.id,
+        ))
+
+    lookups = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT") and "FROM product_moved_history" in statement:
+            lookups.append((statement, parameters))
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        set_status("selesai")
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    statement, parameters = lookups[0]
+    assert "notes" not in statement
+    plan = db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    assert any("USING INDEX ix_product_moved_history_workorder_ref" in row[3] for row in plan)
+
+    set_status("dikerjakan")
+    set_status("selesai")
+    assert _stock(db_session, oli) == Decimal("8.00")
+    assert db_session.query(ProductMovedHistory).filter(ProductMovedHistory.workorder_id == wo.id).count() == 1
+
@@ -0,0 +1,71 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from models.customer import Customer, Vehicle
+from models.karyawan import Karyawan
+from models.workorder import Brand, Product, ProductOrdered, Service, ServiceOrdered, Workorder
+from services.services_workorder import list_workorders
+
+
+def _seed(db, count):
+    honda = Brand(name="Honda")
+    budi = Customer(nama="Budi", hp="0811", alamat="Jl. A")
+    asep = Karyawan(nama="Asep", hp="0812", email=f"asep-{uuid.uuid4()}@bengkel.id")
+    oli = Product(name="Oli", min_stock=Decimal("5"))
+    servis = Service(name="Servis Rutin")
+    db.add_all([honda, budi, asep, oli, servis])
+    db.flush()
+    for i in range(count):
+        vehicle = Vehicle(no_pol=f"B {1000 + i} XY", brand_id=honda.id, customer_id=budi.id)
+        db.add(vehicle)
+        db.flush()
+        wo = Workorder(id=uuid.uuid4(), no_wo=f"WO-202610-{i:04d}", tanggal_masuk=datetime(2026, 10, 1 + i % 20, 9),
+                       keluhan="Servis", status="selesai" if i % 2 else "draft", total_biaya=0,
+                       status_pembayaran="lunas" if i % 3 == 0 else "belum ada pembayaran",
+                       customer_id=budi.id, vehicle_id=vehicle.id, karyawan_id=asep.id)
+        db.add(wo)
+        db.flush()
+        for _ in range(2):
+            db.add(ProductOrdered(workorder_id=wo.id, product_id=oli.id, quantity=1, price=10, subtotal=10))
+            db.add(ServiceOrdered(workorder_id=wo.id, service_id=servis.id, quantity=1, price=20, subtotal=20))
+    db.commit()
+
+
+def test_page_query_count_does_not_grow_with_page_size(db_session, query_counter):
+    _seed(db_session, 30)
+
+    query_counter.clear()
+    small = list_workorders(db_session, limit=2)
+    small_queries = len(query_counter)
+
+    query_counter.clear()
+    large = list_workorders(db_session, limit=25)
+
+    assert len(query_counter) == small_queries <= 3
+    assert len(large["items"]) == 25 and large["has_next"]
+    first = large["items"][0]
+    assert first["vehicle_brand"] == "Honda" and first["karyawan_name"] == "Asep"
+    assert len(first["product_ordered"]) == 2 and first["service_ordered"][0]["service_name"] == "Servis Rutin"
+    assert [wo["no_wo"] for wo in small["items"]] == [wo["no_wo"] for wo in large["items"][:2]]
+
+
+def test_keyset_pages_cover_filtered_rows_once(db_session):
+    _seed(db_session, 30)
+
+    seen, cursor = [], None
+    while True:
+        page = list_workorders(db_session, limit=4, cursor=cursor, status="selesai",
+                               start_date=date(2026, 10, 2), end_date=date(2026, 10, 15))
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if not page["has_next"]:
+            break
+
+    assert len(seen) == len({wo["id"] for wo in seen}) == 12
+    assert all(wo["status"] == "selesai" for wo in seen)
+    keys = [(wo["tanggal_masuk"], wo["id"]) for wo in seen]
+    assert keys == sorted(keys, reverse=True)
+
+    plate = list_workorders(db_session, no_pol="b 1007", status_pembayaran="belum ada pembayaran")
+    assert [wo["vehicle_no_pol"] for wo in plate["items"]] == ["B 1007 XY"]
@@ -0,0 +1,82 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from models.customer import Customer, Vehicle
+from models.karyawan import Karyawan
+from models.workorder import Brand, Product, Service, Workorder, WorkorderSummary
+from schemas.service_customer import UpdateCustomer
+from schemas.service_workorder import AddProductOrderById, AddServiceOrderById
+from services.services_customer import updateCustomer
+from services.services_workorder import (
+    addProductOrder,
+    addServiceOrder,
+    deleteProductOrder,
+    deleteWorkorder,
+    list_workorder_summaries,
+)
+from services.services_workorder_summary import rebuild_workorder_summaries, refresh_workorder_summaries
+
+
+def _seed(db):
+    honda = Brand(name="Honda")
+    budi = Customer(nama="Budi", hp="0811", alamat="Jl. A")
+    asep = Karyawan(nama="Asep", hp="0812", email="asep@bengkel.id")
+    oli = Product(name="Oli", min_stock=Decimal("5"), cost=Decimal("40"))
+    servis = Service(name="Servis Rutin", cost=Decimal("15"))
+    db.add_all([honda, budi, asep, oli, servis])
+    db.flush()
+    vehicle = Vehicle(no_pol="B 1234 XY", model="Vario", warna="Hitam", brand_id=honda.id, customer_id=budi.id)
+    db.add(vehicle)
+    db.flush()
+    wo = Workorder(id=uuid.uuid4(), no_wo="WO-202610-0001", tanggal_masuk=datetime(2026, 10, 18, 9),
+                   keluhan="Servis", status="draft", total_biaya=0,
+                   customer_id=budi.id, vehicle_id=vehicle.id, karyawan_id=asep.id)
+    db.add(wo)
+    refresh_workorder_summaries(db, [wo.id])
+    db.commit()
+    return wo.id, budi.id, oli.id, servis.id
+
+
+def _summary(db, workorder_id):
+    db.expire_all()
+    return db.get(WorkorderSummary, workorder_id)
+
+
+def test_summary_follows_every_write(db_session):
+    wo_id, budi_id, oli_id, servis_id = _seed(db_session)
+    assert _summary(db_session, wo_id).vehicle_brand == "Honda"
+
+    addProductOrder(db_session, AddProductOrderById(workorder_id=wo_id, product_id=oli_id, quantity=2, subtotal=100, price=50))
+    addProductOrder(db_session, AddProductOrderById(workorder_id=wo_id, product_id=oli_id, quantity=1, subtotal=50, price=50))
+    addServiceOrder(db_session, AddServiceOrderById(workorder_id=wo_id, service_id=servis_id, quantity=1, subtotal=80, price=80))
+    summary = _summary(db_session, wo_id)
+    assert (summary.product_line_count, summary.service_line_count) == (2, 1)
+    assert (summary.product_total, summary.service_total, summary.hpp_total) == (
+        Decimal("150.00"), Decimal("80.00"), Decimal("135.00")
+    )
+
+    first_line = db_session.get(Workorder, wo_id).product_ordered[0]
+    deleteProductOrder(db_session, first_line.id)
+    updateCustomer(db_session, budi_id, UpdateCustomer(nama="Budi Santoso"))
+    summary = _summary(db_session, wo_id)
+    assert summary.product_line_count == 1
+    assert summary.customer_name == "Budi Santoso"
+
+    deleteWorkorder(db_session, wo_id)
+    assert _summary(db_session, wo_id) is None
+
+
+def test_listing_is_a_single_table_query_and_matches_rebuild(db_session, query_counter):
+    wo_id, _, oli_id, _ = _seed(db_session)
+    addProductOrder(db_session, AddProductOrderById(workorder_id=wo_id, product_id=oli_id, quantity=2, subtotal=100, price=50))
+
+    query_counter.clear()
+    page = list_workorder_summaries(db_session, no_pol="1234", status="draft")
+
+    assert len(query_counter) == 1 and " JOIN " not in query_counter[0]
+    item = page["items"][0]
+    assert (item["karyawan_name"], item["vehicle_no_pol"], item["product_total"]) == ("Asep", "B 1234 XY", 100.0)
+
+    rebuild_workorder_summaries(db_session)
+    assert list_workorder_summaries(db_session)["items"][0]["product_total"] == 100.0